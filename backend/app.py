@@ -27,6 +27,18 @@ def create_app(config_name='default'):
     db.init_app(app)
     jwt.init_app(app)
     
+    # JSON encoding (Decimal/date/UUID) and response compression
+    from services import http_serialization
+    http_serialization.init_app(app)
+    
+    # 503 when the password-hashing pool is saturated
+    from services.credential_hasher import credential_hasher
+    credential_hasher.init_app(app)
+    
+    # Drop cached AI context snapshots when their rows are written
+    from services.ai_context_cache import ai_context_cache
+    ai_context_cache.init_app(app)
+    
     # Configure CORS
     CORS(app, resources={
         r"/api/*": {
@@ -3,9 +3,22 @@ SAURELLIUS BILLING MANAGER
 Handles subscription plans, usage limits, and overage calculations
 """
 
+import calendar
 from datetime import datetime, timedelta
 from typing import Dict, Optional, Tuple
+from sqlalchemy import or_
 from config import Config
+from models import db, User
+
+# Reward points credited for each generated paystub
+PAYSTUB_REWARD_POINTS = 10
+
+
+def _months_before(moment: datetime, months: int = 1) -> datetime:
+    """Same day and time `months` earlier, clamped to the end of shorter months."""
+    year, month = divmod(moment.year * 12 + moment.month - 1 - months, 12)
+    month += 1
+    return moment.replace(year=year, month=month, day=min(moment.day, calendar.monthrange(year, month)[1]))
 
 
 class BillingManager:
@@ -326,11 +339,45 @@ class BillingManager:
             self.user.paystubs_this_month = 0
             self.user.billing_cycle_start = datetime.utcnow()
     
-    def increment_usage(self):
-        """Increment paystub usage counter."""
+    def increment_usage(self, paystubs: int = 1, reward_points: int = 0):
+        """
+        Count generated paystubs (and credit reward points) with a single
+        UPDATE ... SET col = col + n, so concurrent generations never lose an
+        increment. It joins the caller's transaction and commits with it.
+        """
         if self.user:
-            self.user.paystubs_this_month = (self.user.paystubs_this_month or 0) + 1
-            self.user.total_paystubs_generated = (getattr(self.user, 'total_paystubs_generated', 0) or 0) + 1
+            self.record_usage(self.user.id, paystubs, reward_points)
+            # The in-memory values are stale now; reload them on next access
+            if self.user in db.session:
+                db.session.expire(self.user, ['paystubs_this_month', 'total_paystubs_generated', 'reward_points'])
+    
+    @staticmethod
+    def record_usage(user_id: int, paystubs: int = 1, reward_points: int = 0):
+        """Atomic usage increment for a user id (no row load needed)."""
+        values = {
+            User.paystubs_this_month: db.func.coalesce(User.paystubs_this_month, 0) + paystubs,
+            User.total_paystubs_generated: db.func.coalesce(User.total_paystubs_generated, 0) + paystubs,
+        }
+        if reward_points:
+            values[User.reward_points] = db.func.coalesce(User.reward_points, 0) + reward_points
+        User.query.filter(User.id == user_id).update(values, synchronize_session=False)
+    
+    @staticmethod
+    def rollover_monthly_usage(now: Optional[datetime] = None) -> int:
+        """
+        Start a new usage month for every user whose cycle began a month or
+        more ago. One UPDATE for all users; a reset moves billing_cycle_start
+        to now, so running it again the same day changes nothing.
+        Returns the number of users rolled over (the caller commits).
+        """
+        now = now or datetime.utcnow()
+        return User.query.filter(or_(
+            User.billing_cycle_start.is_(None),
+            User.billing_cycle_start <= _months_before(now),
+        )).update({
+            User.paystubs_this_month: 0,
+            User.billing_cycle_start: now,
+        }, synchronize_session=False)
     
     def recommend_plan_for_user(self) -> Dict:
         """Recommend a plan based on employee count."""
@@ -256,6 +256,11 @@ class Paystub(db.Model):
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_paystubs_user_created', 'user_id', 'created_at', 'id'),
+        db.Index('ix_paystubs_user_employee_created', 'user_id', 'employee_id', 'created_at', 'id'),
+    )
     
     def to_dict(self):
         return {
@@ -486,6 +491,10 @@ class AuditLog(db.Model):
     
     # Timestamp
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_audit_logs_created', 'created_at', 'id'),
+    )
     
     def to_dict(self):
         return {
@@ -681,6 +690,10 @@ class APIClient(db.Model):
     suspended_by = db.Column(db.Integer)
     key_regenerated_at = db.Column(db.DateTime)
     last_request_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_api_clients_created', 'created_at', 'id'),
+    )
     
     def to_dict(self):
         return {
@@ -713,6 +726,10 @@ class APILog(db.Model):
     error_message = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
 
+    __table_args__ = (
+        db.Index('ix_api_logs_client_created', 'client_id', 'created_at', 'id'),
+    )
+
 
 class SecuritySettings(db.Model):
     """User security settings."""
@@ -780,6 +797,10 @@ class Notification(db.Model):
     is_read = db.Column(db.Boolean, default=False)
     read_at = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_notifications_user_created', 'user_id', 'created_at', 'id'),
+    )
     
     def to_dict(self):
         return {
@@ -1136,6 +1157,11 @@ class ContractorInvoicePayment(db.Model):
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_contractor_invoice_payments_client_contractor_date',
+                 'client_id', 'contractor_id', 'payment_date'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -1307,3 +1333,590 @@ class ContractorForm1099(db.Model):
             'filed_at': self.filed_at.isoformat() if self.filed_at else None,
             'sent_to_contractor_at': self.sent_to_contractor_at.isoformat() if self.sent_to_contractor_at else None,
         }
+
+
+class ContractorPaymentYTD(db.Model):
+    """Running 1099 totals per payer, contractor and tax year, updated on each payment."""
+    __tablename__ = 'contractor_payment_ytd'
+
+    id = db.Column(db.Integer, primary_key=True)
+    client_id = db.Column(db.String(36), nullable=False)
+    contractor_id = db.Column(db.String(36), db.ForeignKey('contractor_accounts.id'), nullable=False)
+    tax_year = db.Column(db.Integer, nullable=False)
+
+    total_paid = db.Column(db.Numeric(14, 2), default=0)
+    payment_count = db.Column(db.Integer, default=0)
+    last_payment_date = db.Column(db.String(20))
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('client_id', 'contractor_id', 'tax_year', name='uq_contractor_payment_ytd'),
+        db.Index('ix_contractor_payment_ytd_client_year', 'client_id', 'tax_year'),
+        db.Index('ix_contractor_payment_ytd_contractor_year', 'contractor_id', 'tax_year'),
+    )
+
+    def to_dict(self):
+        return {
+            'client_id': self.client_id,
+            'contractor_id': self.contractor_id,
+            'tax_year': self.tax_year,
+            'total_paid': float(self.total_paid or 0),
+            'payment_count': self.payment_count,
+            'last_payment_date': self.last_payment_date,
+        }
+
+
+# ============================================================================
+# PTO LEDGER
+# ============================================================================
+
+class PTOBalance(db.Model):
+    """Enrollment and running balance snapshot per employee per PTO policy."""
+    __tablename__ = 'pto_balances'
+
+    id = db.Column(db.Integer, primary_key=True)
+    company_id = db.Column(db.String(50), nullable=False, index=True)
+    employee_id = db.Column(db.String(50), nullable=False)
+    policy_id = db.Column(db.String(50), nullable=False)
+    hire_date = db.Column(db.Date, nullable=False)
+    is_active = db.Column(db.Boolean, default=True)
+
+    # Snapshot as of last_ledger_entry_id (hours)
+    available = db.Column(db.Numeric(10, 2), default=0)
+    used = db.Column(db.Numeric(10, 2), default=0)
+    pending = db.Column(db.Numeric(10, 2), default=0)
+    accrued_ytd = db.Column(db.Numeric(10, 2), default=0)
+    carryover = db.Column(db.Numeric(10, 2), default=0)
+    last_accrual_date = db.Column(db.Date)
+    last_ledger_entry_id = db.Column(db.Integer)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('employee_id', 'policy_id', name='uq_pto_balance_employee_policy'),
+    )
+
+    def to_dict(self):
+        return {
+            'available': float(self.available or 0),
+            'used': float(self.used or 0),
+            'pending': float(self.pending or 0),
+            'accrued_ytd': float(self.accrued_ytd or 0),
+            'carryover': float(self.carryover or 0),
+            'last_accrual_date': self.last_accrual_date.isoformat() if self.last_accrual_date else None
+        }
+
+
+class PTOLedgerEntry(db.Model):
+    """Append-only PTO ledger: accruals, usage, carryover and forfeitures."""
+    __tablename__ = 'pto_ledger_entries'
+
+    id = db.Column(db.Integer, primary_key=True)
+    company_id = db.Column(db.String(50), nullable=False)
+    employee_id = db.Column(db.String(50), nullable=False)
+    policy_id = db.Column(db.String(50), nullable=False)
+
+    entry_type = db.Column(db.String(20), nullable=False)  # accrual, usage, carryover, forfeiture, adjustment
+    hours = db.Column(db.Numeric(10, 2), nullable=False)  # signed
+    balance_after = db.Column(db.Numeric(10, 2))
+    effective_date = db.Column(db.Date, nullable=False)
+
+    request_id = db.Column(db.String(36), index=True)
+    payroll_run_id = db.Column(db.String(36), index=True)
+    source_key = db.Column(db.String(100))  # idempotency key, e.g. accrual:2025-01-15
+    created_by = db.Column(db.String(50))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_pto_ledger_employee_policy_date', 'employee_id', 'policy_id', 'effective_date'),
+        db.Index('ix_pto_ledger_company_date', 'company_id', 'effective_date'),
+        db.UniqueConstraint('employee_id', 'policy_id', 'source_key', name='uq_pto_ledger_source'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'employee_id': self.employee_id,
+            'policy_id': self.policy_id,
+            'entry_type': self.entry_type,
+            'hours': float(self.hours),
+            'balance_after': float(self.balance_after) if self.balance_after is not None else None,
+            'effective_date': self.effective_date.isoformat() if self.effective_date else None,
+            'request_id': self.request_id,
+            'payroll_run_id': self.payroll_run_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+
+class PTOLeaveRequest(db.Model):
+    """Employee leave request."""
+    __tablename__ = 'pto_leave_requests'
+
+    id = db.Column(db.String(36), primary_key=True)
+    company_id = db.Column(db.String(50), nullable=False)
+    employee_id = db.Column(db.String(50), nullable=False)
+    policy_id = db.Column(db.String(50), nullable=False)
+    leave_type = db.Column(db.String(30))
+
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=False)
+    hours = db.Column(db.Numeric(10, 2), nullable=False)
+
+    reason = db.Column(db.Text)
+    notes = db.Column(db.Text)
+    is_partial_day = db.Column(db.Boolean, default=False)
+    partial_day_hours = db.Column(db.Float)
+
+    status = db.Column(db.String(20), default='pending')  # pending, approved, denied, cancelled, taken
+    submitted_at = db.Column(db.DateTime, default=datetime.utcnow)
+    reviewed_by = db.Column(db.String(50))
+    reviewed_at = db.Column(db.DateTime)
+    denial_reason = db.Column(db.Text)
+    balance_at_submission = db.Column(db.Numeric(10, 2))
+
+    __table_args__ = (
+        db.Index('ix_pto_requests_employee_status', 'employee_id', 'status'),
+        db.Index('ix_pto_requests_company_dates', 'company_id', 'start_date', 'end_date'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'employee_id': self.employee_id,
+            'company_id': self.company_id,
+            'policy_id': self.policy_id,
+            'leave_type': self.leave_type,
+            'start_date': self.start_date.isoformat() if self.start_date else None,
+            'end_date': self.end_date.isoformat() if self.end_date else None,
+            'hours': float(self.hours),
+            'reason': self.reason or '',
+            'notes': self.notes or '',
+            'is_partial_day': self.is_partial_day,
+            'partial_day_hours': self.partial_day_hours,
+            'status': self.status,
+            'submitted_at': self.submitted_at.isoformat() if self.submitted_at else None,
+            'reviewed_by': self.reviewed_by,
+            'reviewed_at': self.reviewed_at.isoformat() if self.reviewed_at else None,
+            'denial_reason': self.denial_reason,
+            'balance_at_submission': float(self.balance_at_submission or 0)
+        }
+
+
+# ============================================================================
+# GENERAL LEDGER
+# ============================================================================
+
+class GLJournalEntry(db.Model):
+    """Posted journal entry header."""
+    __tablename__ = 'gl_journal_entries'
+
+    id = db.Column(db.String(36), primary_key=True)
+    company_id = db.Column(db.String(50), nullable=False)
+    entry_number = db.Column(db.Integer, nullable=False)
+    entry_date = db.Column(db.Date, nullable=False)
+    description = db.Column(db.String(500))
+    reference = db.Column(db.String(100))
+    source = db.Column(db.String(30), default='manual')  # manual, payroll, reversal
+    total_amount = db.Column(db.Numeric(14, 2), default=0)
+    status = db.Column(db.String(20), default='posted')
+    reversal_of = db.Column(db.String(36))
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    posted_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    lines = db.relationship('GLJournalLine', backref='entry', lazy='selectin',
+                            order_by='GLJournalLine.id')
+
+    __table_args__ = (
+        db.Index('ix_gl_entries_company_date', 'company_id', 'entry_date'),
+        db.Index('ix_gl_entries_company_reference', 'company_id', 'reference'),
+        db.UniqueConstraint('company_id', 'entry_number', name='uq_gl_entry_number'),
+    )
+
+    def to_dict(self, account_names=None):
+        account_names = account_names or {}
+        return {
+            'id': self.id,
+            'entry_number': self.entry_number,
+            'date': self.entry_date.isoformat(),
+            'description': self.description,
+            'reference': self.reference,
+            'source': self.source,
+            'lines': [
+                {
+                    'account_code': line.account_code,
+                    'account_name': account_names.get(line.account_code),
+                    'debit': float(line.debit),
+                    'credit': float(line.credit),
+                    'memo': line.memo or ''
+                }
+                for line in self.lines
+            ],
+            'total_amount': float(self.total_amount or 0),
+            'status': self.status,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'posted_at': self.posted_at.isoformat() if self.posted_at else None
+        }
+
+
+class GLJournalLine(db.Model):
+    """Journal entry line, denormalized with company and date for ledger scans."""
+    __tablename__ = 'gl_journal_lines'
+
+    id = db.Column(db.Integer, primary_key=True)
+    entry_id = db.Column(db.String(36), db.ForeignKey('gl_journal_entries.id'), nullable=False, index=True)
+    company_id = db.Column(db.String(50), nullable=False)
+    account_code = db.Column(db.String(20), nullable=False)
+    entry_date = db.Column(db.Date, nullable=False)
+    debit = db.Column(db.Numeric(14, 2), default=0)
+    credit = db.Column(db.Numeric(14, 2), default=0)
+    memo = db.Column(db.String(255))
+
+    __table_args__ = (
+        db.Index('ix_gl_lines_company_account_date', 'company_id', 'account_code', 'entry_date'),
+    )
+
+
+class GLPeriodBalance(db.Model):
+    """Cumulative debit/credit totals per account through a closed period end."""
+    __tablename__ = 'gl_period_balances'
+
+    id = db.Column(db.Integer, primary_key=True)
+    company_id = db.Column(db.String(50), nullable=False)
+    account_code = db.Column(db.String(20), nullable=False)
+    period_end = db.Column(db.Date, nullable=False)
+    total_debits = db.Column(db.Numeric(16, 2), default=0)
+    total_credits = db.Column(db.Numeric(16, 2), default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('company_id', 'account_code', 'period_end', name='uq_gl_period_balance'),
+        db.Index('ix_gl_period_balances_company_period', 'company_id', 'period_end'),
+    )
+
+
+# ============================================================================
+# PAYROLL ANALYTICS
+# ============================================================================
+
+PAYROLL_MEASURES = (
+    'regular_hours', 'overtime_hours',
+    'regular_pay', 'overtime_pay', 'bonus', 'commission', 'other_earnings', 'gross_pay',
+    'federal_tax', 'state_tax', 'local_tax', 'social_security', 'medicare', 'total_taxes',
+    'pretax_deductions', 'benefit_deductions', 'total_deductions', 'net_pay',
+    'employer_social_security', 'employer_medicare', 'futa', 'suta', 'employer_taxes',
+    'total_cost',
+)
+
+
+class PayrollMeasuresMixin:
+    """Additive payroll amounts shared by the fact table and its cubes."""
+    regular_hours = db.Column(db.Numeric(12, 2), default=0)
+    overtime_hours = db.Column(db.Numeric(12, 2), default=0)
+    regular_pay = db.Column(db.Numeric(14, 2), default=0)
+    overtime_pay = db.Column(db.Numeric(14, 2), default=0)
+    bonus = db.Column(db.Numeric(14, 2), default=0)
+    commission = db.Column(db.Numeric(14, 2), default=0)
+    other_earnings = db.Column(db.Numeric(14, 2), default=0)
+    gross_pay = db.Column(db.Numeric(14, 2), default=0)
+    federal_tax = db.Column(db.Numeric(14, 2), default=0)
+    state_tax = db.Column(db.Numeric(14, 2), default=0)
+    local_tax = db.Column(db.Numeric(14, 2), default=0)
+    social_security = db.Column(db.Numeric(14, 2), default=0)
+    medicare = db.Column(db.Numeric(14, 2), default=0)
+    total_taxes = db.Column(db.Numeric(14, 2), default=0)
+    pretax_deductions = db.Column(db.Numeric(14, 2), default=0)
+    benefit_deductions = db.Column(db.Numeric(14, 2), default=0)
+    total_deductions = db.Column(db.Numeric(14, 2), default=0)
+    net_pay = db.Column(db.Numeric(14, 2), default=0)
+    employer_social_security = db.Column(db.Numeric(14, 2), default=0)
+    employer_medicare = db.Column(db.Numeric(14, 2), default=0)
+    futa = db.Column(db.Numeric(14, 2), default=0)
+    suta = db.Column(db.Numeric(14, 2), default=0)
+    employer_taxes = db.Column(db.Numeric(14, 2), default=0)
+    total_cost = db.Column(db.Numeric(14, 2), default=0)
+
+
+class PayrollFact(PayrollMeasuresMixin, db.Model):
+    """One row per processed paycheck, denormalized for reporting."""
+    __tablename__ = 'payroll_facts'
+
+    id = db.Column(db.Integer, primary_key=True)
+    company_id = db.Column(db.String(50), nullable=False)
+    payroll_run_id = db.Column(db.String(36), nullable=False, index=True)
+    paycheck_id = db.Column(db.String(36), nullable=False, unique=True)
+    employee_id = db.Column(db.String(50), nullable=False)
+    department = db.Column(db.String(100), default='')
+    pay_type = db.Column(db.String(20), default='regular')
+    pay_date = db.Column(db.Date, nullable=False)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_payroll_facts_company_date', 'company_id', 'pay_date'),
+        db.Index('ix_payroll_facts_company_dept_date', 'company_id', 'department', 'pay_date'),
+        db.Index('ix_payroll_facts_company_employee_date', 'company_id', 'employee_id', 'pay_date'),
+    )
+
+
+# ============================================================================
+# YTD ACCUMULATORS
+# ============================================================================
+
+class YTDAccumulator(db.Model):
+    """
+    Running year-to-date amount for one employee, jurisdiction and bucket.
+    Jurisdiction is FED, a state code, or STATE:LOCALITY; buckets are wage
+    bases, taxes withheld and pre-tax deductions.
+    """
+    __tablename__ = 'ytd_accumulators'
+
+    id = db.Column(db.Integer, primary_key=True)
+    company_id = db.Column(db.String(50), nullable=False)
+    employee_id = db.Column(db.String(50), nullable=False)
+    tax_year = db.Column(db.Integer, nullable=False)
+    jurisdiction = db.Column(db.String(30), nullable=False)
+    bucket = db.Column(db.String(40), nullable=False)
+    amount = db.Column(db.Numeric(16, 2), default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('company_id', 'employee_id', 'tax_year', 'jurisdiction', 'bucket',
+                            name='uq_ytd_accumulator'),
+        db.Index('ix_ytd_accumulators_company_year', 'company_id', 'tax_year'),
+    )
+
+
+class YTDPosting(db.Model):
+    """Per-paycheck amounts a payroll run added to the accumulators; reversed on void."""
+    __tablename__ = 'ytd_postings'
+
+    id = db.Column(db.Integer, primary_key=True)
+    company_id = db.Column(db.String(50), nullable=False)
+    payroll_run_id = db.Column(db.String(36), nullable=False, index=True)
+    paycheck_id = db.Column(db.String(36), nullable=False)
+    employee_id = db.Column(db.String(50), nullable=False)
+    tax_year = db.Column(db.Integer, nullable=False)
+    jurisdiction = db.Column(db.String(30), nullable=False)
+    bucket = db.Column(db.String(40), nullable=False)
+    amount = db.Column(db.Numeric(16, 2), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+# ============================================================================
+# FEDERAL TAX DEPOSITS
+# ============================================================================
+
+class TaxLiabilityQuarter(db.Model):
+    """Running Form 941 liability per EIN and quarter; lookback periods sum four rows."""
+    __tablename__ = 'tax_liability_quarters'
+
+    id = db.Column(db.Integer, primary_key=True)
+    ein = db.Column(db.String(20), nullable=False)
+    tax_type = db.Column(db.String(10), nullable=False, default='941')
+    year = db.Column(db.Integer, nullable=False)
+    quarter = db.Column(db.Integer, nullable=False)
+    liability = db.Column(db.Numeric(16, 2), default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('ein', 'tax_type', 'year', 'quarter', name='uq_tax_liability_quarter'),
+    )
+
+
+class DepositorStatus(db.Model):
+    """Deposit schedule an EIN follows for a calendar year, fixed from its lookback period."""
+    __tablename__ = 'depositor_statuses'
+
+    id = db.Column(db.Integer, primary_key=True)
+    ein = db.Column(db.String(20), nullable=False)
+    year = db.Column(db.Integer, nullable=False)
+    schedule = db.Column(db.String(20), nullable=False)  # monthly, semiweekly
+    lookback_liability = db.Column(db.Numeric(16, 2), default=0)
+    # Set when a $100,000 next-day deposit made the EIN semiweekly for this and next year
+    next_day_triggered_on = db.Column(db.Date)
+    determined_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('ein', 'year', name='uq_depositor_status'),
+    )
+
+    def to_dict(self):
+        return {
+            'ein': self.ein,
+            'year': self.year,
+            'schedule': self.schedule,
+            'lookback_liability': float(self.lookback_liability or 0),
+            'next_day_triggered_on': self.next_day_triggered_on.isoformat() if self.next_day_triggered_on else None
+        }
+
+
+class DepositObligation(db.Model):
+    """
+    Federal tax liability accumulated into one EFTPS deposit. Liabilities in
+    the same deposit period merge into the open obligation; the queue submits
+    pending obligations in due-date and priority order.
+    """
+    __tablename__ = 'deposit_obligations'
+
+    id = db.Column(db.String(36), primary_key=True)
+    company_id = db.Column(db.String(50), nullable=False)
+    ein = db.Column(db.String(20), nullable=False)
+    tax_type = db.Column(db.String(10), nullable=False, default='941')
+    tax_period = db.Column(db.String(10), nullable=False)  # 2024-Q1
+    period_key = db.Column(db.String(40), nullable=False)  # deposit period the liability falls in
+    schedule = db.Column(db.String(20), nullable=False)  # monthly, semiweekly, next_day
+    amount = db.Column(db.Numeric(16, 2), default=0)
+    first_liability_date = db.Column(db.Date, nullable=False)
+    due_date = db.Column(db.Date, nullable=False)
+    priority = db.Column(db.Integer, default=2)  # 0 = next-day, lower is more urgent
+    is_open = db.Column(db.Boolean, default=True)
+
+    status = db.Column(db.String(20), default='pending')  # pending, submitting, submitted, failed, cancelled
+    attempts = db.Column(db.Integer, default=0)
+    filing_id = db.Column(db.String(36))
+    confirmation_number = db.Column(db.String(50))
+    settlement_date = db.Column(db.Date)
+    last_error = db.Column(db.Text)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    submitted_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_deposit_obligations_queue', 'status', 'due_date', 'priority'),
+        db.Index('ix_deposit_obligations_period', 'ein', 'tax_type', 'period_key', 'is_open'),
+        db.Index('ix_deposit_obligations_company', 'company_id', 'due_date'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'company_id': self.company_id,
+            'ein': self.ein,
+            'tax_type': self.tax_type,
+            'tax_period': self.tax_period,
+            'schedule': self.schedule,
+            'amount': float(self.amount or 0),
+            'first_liability_date': self.first_liability_date.isoformat() if self.first_liability_date else None,
+            'due_date': self.due_date.isoformat() if self.due_date else None,
+            'priority': self.priority,
+            'status': self.status,
+            'attempts': self.attempts,
+            'filing_id': self.filing_id,
+            'confirmation_number': self.confirmation_number,
+            'settlement_date': self.settlement_date.isoformat() if self.settlement_date else None,
+            'last_error': self.last_error,
+            'submitted_at': self.submitted_at.isoformat() if self.submitted_at else None
+        }
+
+
+class PayrollCube(PayrollMeasuresMixin, db.Model):
+    """
+    Pre-aggregated payroll facts per month or quarter. Cells are keyed by
+    department and pay type; the '*'/'*' cell is the period rollup and
+    carries the exact distinct employee count.
+    """
+    __tablename__ = 'payroll_cubes'
+
+    id = db.Column(db.Integer, primary_key=True)
+    company_id = db.Column(db.String(50), nullable=False)
+    grain = db.Column(db.String(10), nullable=False)  # month, quarter
+    period_start = db.Column(db.Date, nullable=False)
+    department = db.Column(db.String(100), nullable=False, default='*')
+    pay_type = db.Column(db.String(20), nullable=False, default='*')
+
+    paycheck_count = db.Column(db.Integer, default=0)
+    employee_count = db.Column(db.Integer, default=0)
+    payroll_run_count = db.Column(db.Integer, default=0)
+
+    refreshed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('company_id', 'grain', 'period_start', 'department', 'pay_type',
+                            name='uq_payroll_cube_cell'),
+    )
+
+
+# ============================================================================
+# YEAR-END FORMS
+# ============================================================================
+
+class YearEndRun(db.Model):
+    """Bulk W-2/W-3 generation run with a resumable employee checkpoint."""
+    __tablename__ = 'year_end_runs'
+
+    id = db.Column(db.String(36), primary_key=True)
+    company_id = db.Column(db.Integer)  # None = every company on the platform
+    tax_year = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), default='running')  # running, completed, failed
+
+    # Highest employee id whose W-2 is committed; resume starts after it
+    checkpoint_employee_id = db.Column(db.Integer, default=0)
+    w2_count = db.Column(db.Integer, default=0)
+    error_count = db.Column(db.Integer, default=0)
+    w3_totals = db.Column(db.JSON, default={})  # {company_id: {box: amount, 'number_of_w2s': n}}
+    errors = db.Column(db.JSON, default=[])
+    last_error = db.Column(db.Text)
+
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_year_end_runs_scope', 'tax_year', 'company_id', 'status'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'company_id': self.company_id,
+            'tax_year': self.tax_year,
+            'status': self.status,
+            'checkpoint_employee_id': self.checkpoint_employee_id,
+            'w2_count': self.w2_count,
+            'error_count': self.error_count,
+            'companies': len(self.w3_totals or {}),
+            'errors': (self.errors or [])[:50],
+            'last_error': self.last_error,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
+
+
+class YearEndForm(db.Model):
+    """Persisted W-2 or W-3 produced by a year-end run."""
+    __tablename__ = 'year_end_forms'
+
+    id = db.Column(db.String(36), primary_key=True)
+    run_id = db.Column(db.String(36), db.ForeignKey('year_end_runs.id'), nullable=False, index=True)
+    form_type = db.Column(db.String(10), nullable=False)  # W-2, W-3
+    tax_year = db.Column(db.Integer, nullable=False)
+    company_id = db.Column(db.Integer, nullable=False)
+    employee_id = db.Column(db.Integer)
+    control_number = db.Column(db.String(20))
+    data = db.Column(db.JSON, nullable=False)
+    status = db.Column(db.String(20), default='generated')
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('form_type', 'tax_year', 'company_id', 'employee_id',
+                            name='uq_year_end_form'),
+        db.Index('ix_year_end_forms_company_year', 'company_id', 'tax_year', 'form_type'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'run_id': self.run_id,
+            'form_type': self.form_type,
+            'tax_year': self.tax_year,
+            'company_id': self.company_id,
+            'employee_id': self.employee_id,
+            'data': self.data,
+            'status': self.status,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
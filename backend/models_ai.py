@@ -286,6 +286,17 @@ class AIFeatureContext(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
+class AIContextVersion(db.Model):
+    """
+    Per-user counter bumped in the same transaction as any write to that
+    user's AI context data, so every worker can tell its cached snapshot is stale.
+    """
+    __tablename__ = 'ai_context_versions'
+
+    user_id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+
 # Helper function to initialize AI profile for new users
 def get_or_create_ai_profile(user_id):
     """Get existing AI profile or create new one for user"""
@@ -3,24 +3,50 @@ ACCOUNTING ROUTES
 General Ledger, Chart of Accounts, Journal Entries API endpoints
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import date
 
 accounting_bp = Blueprint('accounting', __name__, url_prefix='/api/accounting')
 
 
+def _company_id(data=None):
+    """
+    Company scope for general ledger queries: the requested company if the
+    caller may act for it (otherwise PermissionError, answered with 403), or
+    the caller's own company (ValueError, answered with 400, if they have none).
+    """
+    from services.tenancy import resolve_company_id
+    
+    requested = (data or {}).get('company_id') or request.args.get('company_id')
+    return str(resolve_company_id(get_jwt_identity(), requested))
+
+
+@accounting_bp.errorhandler(PermissionError)
+def _forbidden(e):
+    return jsonify({'success': False, 'message': str(e)}), 403
+
+
+@accounting_bp.errorhandler(ValueError)
+def _bad_request(e):
+    return jsonify({'success': False, 'message': str(e)}), 400
+
+
 @accounting_bp.route('/accounts', methods=['GET'])
 @jwt_required()
 def get_chart_of_accounts():
-    """Get chart of accounts"""
-    from services.accounting_service import accounting_service
-    
-    account_type = request.args.get('type')
-    accounts = accounting_service.get_chart_of_accounts()
+    """Get chart of accounts with posted ledger balances"""
+    from services.general_ledger_service import general_ledger
     
-    if account_type:
-        accounts = [a for a in accounts if a['type'] == account_type]
+    try:
+        as_of = request.args.get('as_of')
+        accounts = general_ledger.get_chart_of_accounts(
+            _company_id(),
+            account_type=request.args.get('type'),
+            as_of=date.fromisoformat(as_of) if as_of else None
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     
     return jsonify({'success': True, 'accounts': accounts})
 
@@ -49,10 +75,16 @@ def create_account():
 @accounting_bp.route('/accounts/<code>', methods=['GET'])
 @jwt_required()
 def get_account(code):
-    """Get account by code"""
-    from services.accounting_service import accounting_service
+    """Get account by code with its posted ledger balance"""
+    from services.general_ledger_service import general_ledger
     
-    account = accounting_service.get_account(code)
+    try:
+        as_of = request.args.get('as_of')
+        account = general_ledger.get_account(
+            _company_id(), code, as_of=date.fromisoformat(as_of) if as_of else None
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     if not account:
         return jsonify({'success': False, 'message': 'Account not found'}), 404
     
@@ -63,13 +95,14 @@ def get_account(code):
 @jwt_required()
 def get_account_ledger(code):
     """Get ledger for an account"""
-    from services.accounting_service import accounting_service
+    from services.general_ledger_service import general_ledger
     
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     
     try:
-        ledger = accounting_service.get_account_ledger(
+        ledger = general_ledger.get_account_ledger(
+            _company_id(),
             code,
             start_date=date.fromisoformat(start_date) if start_date else None,
             end_date=date.fromisoformat(end_date) if end_date else None
@@ -83,16 +116,18 @@ def get_account_ledger(code):
 @jwt_required()
 def get_journal_entries():
     """Get journal entries"""
-    from services.accounting_service import accounting_service
+    from services.general_ledger_service import general_ledger
     
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     source = request.args.get('source')
     
-    entries = accounting_service.get_journal_entries(
+    entries = general_ledger.get_journal_entries(
+        _company_id(),
         start_date=date.fromisoformat(start_date) if start_date else None,
         end_date=date.fromisoformat(end_date) if end_date else None,
-        source=source
+        source=source,
+        limit=request.args.get('limit', type=int)
     )
     
     return jsonify({'success': True, 'entries': entries})
@@ -102,12 +137,13 @@ def get_journal_entries():
 @jwt_required()
 def create_journal_entry():
     """Create a journal entry"""
-    from services.accounting_service import accounting_service
+    from services.general_ledger_service import general_ledger
     
     data = request.get_json()
     
     try:
-        entry = accounting_service.create_journal_entry(
+        entry = general_ledger.post_entry(
+            _company_id(data),
             entry_date=date.fromisoformat(data['date']),
             description=data['description'],
             lines=data['lines'],
@@ -123,13 +159,14 @@ def create_journal_entry():
 @jwt_required()
 def reverse_journal_entry(entry_id):
     """Reverse a journal entry"""
-    from services.accounting_service import accounting_service
+    from services.general_ledger_service import general_ledger
     
     data = request.get_json() or {}
     reversal_date = data.get('reversal_date')
     
     try:
-        entry = accounting_service.reverse_journal_entry(
+        entry = general_ledger.reverse_entry(
+            _company_id(data),
             entry_id,
             reversal_date=date.fromisoformat(reversal_date) if reversal_date else None
         )
@@ -142,11 +179,12 @@ def reverse_journal_entry(entry_id):
 @jwt_required()
 def get_trial_balance():
     """Get trial balance report"""
-    from services.accounting_service import accounting_service
+    from services.general_ledger_service import general_ledger
     
     as_of = request.args.get('as_of_date')
     
-    report = accounting_service.get_trial_balance(
+    report = general_ledger.get_trial_balance(
+        _company_id(),
         as_of_date=date.fromisoformat(as_of) if as_of else None
     )
     
@@ -157,7 +195,7 @@ def get_trial_balance():
 @jwt_required()
 def get_income_statement():
     """Get income statement (P&L)"""
-    from services.accounting_service import accounting_service
+    from services.general_ledger_service import general_ledger
     
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
@@ -165,7 +203,8 @@ def get_income_statement():
     if not start_date or not end_date:
         return jsonify({'success': False, 'message': 'start_date and end_date required'}), 400
     
-    report = accounting_service.get_income_statement(
+    report = general_ledger.get_income_statement(
+        _company_id(),
         start_date=date.fromisoformat(start_date),
         end_date=date.fromisoformat(end_date)
     )
@@ -177,11 +216,12 @@ def get_income_statement():
 @jwt_required()
 def get_balance_sheet():
     """Get balance sheet"""
-    from services.accounting_service import accounting_service
+    from services.general_ledger_service import general_ledger
     
     as_of = request.args.get('as_of_date')
     
-    report = accounting_service.get_balance_sheet(
+    report = general_ledger.get_balance_sheet(
+        _company_id(),
         as_of_date=date.fromisoformat(as_of) if as_of else None
     )
     
@@ -192,12 +232,91 @@ def get_balance_sheet():
 @jwt_required()
 def create_payroll_entry():
     """Create journal entry from payroll data"""
-    from services.accounting_service import accounting_service
+    from services.general_ledger_service import general_ledger
     
     data = request.get_json()
     
     try:
-        entry = accounting_service.create_payroll_journal_entry(data)
-        return jsonify({'success': True, 'entry': entry}), 201
+        entries = general_ledger.post_payroll_entries(_company_id(data), [data])
+        return jsonify({'success': True, 'entry': entries[0]}), 201
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+
+@accounting_bp.route('/payroll-entries/bulk', methods=['POST'])
+@jwt_required()
+def create_payroll_entries_bulk():
+    """Post all journal entries for a payroll run in one transaction"""
+    from services.general_ledger_service import general_ledger
+    
+    data = request.get_json()
+    
+    try:
+        entries = general_ledger.post_payroll_entries(_company_id(data), data.get('entries', []))
+        return jsonify({'success': True, 'entries': entries, 'count': len(entries)}), 201
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+
+@accounting_bp.route('/periods/close', methods=['POST'])
+@jwt_required()
+def close_period():
+    """Snapshot account balances through a period end"""
+    from services.general_ledger_service import general_ledger
+    
+    data = request.get_json()
+    
+    try:
+        result = general_ledger.close_period(
+            _company_id(data),
+            period_end=date.fromisoformat(data['period_end'])
+        )
+        return jsonify({'success': True, 'period': result})
+    except (KeyError, ValueError) as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+
+@accounting_bp.route('/periods/reopen', methods=['POST'])
+@jwt_required()
+def reopen_period():
+    """Reopen closed periods from a period end so back-dated entries can be posted"""
+    from services.general_ledger_service import general_ledger
+    
+    data = request.get_json()
+    
+    try:
+        result = general_ledger.reopen_period(
+            _company_id(data),
+            period_end=date.fromisoformat(data['period_end'])
+        )
+        return jsonify({'success': True, 'period': result})
+    except (KeyError, ValueError) as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+
+@accounting_bp.route('/export/<format>', methods=['GET'])
+@jwt_required()
+def export_journal(format):
+    """Stream general ledger journal lines as CSV, XLSX or JSON lines"""
+    from services.report_export_service import report_export_service
+    
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    
+    try:
+        chunks, mimetype, filename = report_export_service.stream(
+            'journal_lines',
+            format,
+            company_id=_company_id(),
+            start_date=date.fromisoformat(start_date) if start_date else None,
+            end_date=date.fromisoformat(end_date) if end_date else None,
+            account_code=request.args.get('account_code')
+        )
     except ValueError as e:
         return jsonify({'success': False, 'message': str(e)}), 400
+    
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
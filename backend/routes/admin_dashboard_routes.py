@@ -9,6 +9,8 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime, timedelta
 from sqlalchemy import func, desc
 from models import db, User, Company, Employee, Paystub, Subscription, Invoice, PayrollRun, AuditLog
+from services.pagination import paginate, estimated_count
+from services.credential_hasher import credential_hasher
 
 admin_dashboard_bp = Blueprint('admin_dashboard', __name__, url_prefix='/api/admin-dashboard')
 
@@ -186,8 +188,6 @@ def get_users_overview():
 def get_employers_list():
     """Get paginated employer list from actual database"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 25, type=int)
         status = request.args.get('status', 'all')
         search = request.args.get('search', '')
         
@@ -203,16 +203,29 @@ def get_employers_list():
                 (User.last_name.ilike(f'%{search}%'))
             )
         
-        total = query.count()
-        employers_raw = query.order_by(desc(User.created_at)).offset((page - 1) * per_page).limit(per_page).all()
+        employers_raw, pagination = paginate(
+            query, User.created_at, User.id, request.args,
+            count_key=('admin_employers', status, search), default_limit=25,
+        )
+        
+        # Companies and employee counts for the whole page in two queries
+        user_ids = [emp.id for emp in employers_raw]
+        companies = {}
+        employee_counts = {}
+        if user_ids:
+            for company in db.session.query(Company).filter(Company.user_id.in_(user_ids)).order_by(Company.id):
+                companies.setdefault(company.user_id, company)
+            employee_counts = dict(
+                db.session.query(Employee.user_id, func.count(Employee.id))
+                .filter(Employee.user_id.in_(user_ids))
+                .group_by(Employee.user_id)
+                .all()
+            )
         
         employers = []
         for emp in employers_raw:
-            # Get company info
-            company = db.session.query(Company).filter(Company.user_id == emp.id).first()
-            
-            # Count employees for this employer
-            employee_count = db.session.query(Employee).filter(Employee.user_id == emp.id).count()
+            company = companies.get(emp.id)
+            employee_count = employee_counts.get(emp.id, 0)
             
             # Calculate MRR
             mrr = PLAN_PRICES.get(emp.subscription_tier, 0)
@@ -234,13 +247,16 @@ def get_employers_list():
             'success': True,
             'data': {
                 'employers': employers,
-                'total': total,
-                'pages': (total + per_page - 1) // per_page,
-                'current_page': page,
-                'per_page': per_page
+                'total': pagination['total'],
+                'pages': pagination['pages'],
+                'current_page': pagination.get('page'),
+                'per_page': pagination['per_page'],
+                'next_cursor': pagination['next_cursor']
             }
         }), 200
         
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -441,7 +457,8 @@ def get_system_health():
                 'total_employees': total_employees,
                 'total_paystubs': total_paystubs,
                 'total_payroll_runs': total_payroll_runs
-            }
+            },
+            'password_hashing': credential_hasher.stats()
         }
         return jsonify({'success': True, 'data': data}), 200
         
@@ -487,13 +504,10 @@ def get_ai_usage():
 def get_activity_logs():
     """Get platform activity logs from database"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 50, type=int)
-        
-        query = db.session.query(AuditLog).order_by(desc(AuditLog.created_at))
-        total = query.count()
-        
-        logs_raw = query.offset((page - 1) * per_page).limit(per_page).all()
+        logs_raw, pagination = paginate(
+            db.session.query(AuditLog), AuditLog.created_at, AuditLog.id, request.args,
+            default_limit=50, total=estimated_count(db.session, AuditLog),
+        )
         
         now = datetime.utcnow()
         logs = []
@@ -522,11 +536,14 @@ def get_activity_logs():
             'success': True,
             'data': {
                 'logs': logs,
-                'total': total,
-                'pages': (total + per_page - 1) // per_page,
-                'current_page': page
+                'total': pagination['total'],
+                'pages': pagination['pages'],
+                'current_page': pagination.get('page'),
+                'next_cursor': pagination['next_cursor']
             }
         }), 200
         
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
@@ -8,6 +8,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime, timedelta
 from sqlalchemy import or_, and_, func
 from models import db, User
+from services.credential_hasher import credential_hasher
 
 admin_support_bp = Blueprint('admin_support', __name__, url_prefix='/api/admin/support')
 
@@ -237,7 +238,7 @@ def reset_customer_password(customer_id):
         if not new_password or len(new_password) < 8:
             return jsonify({'success': False, 'message': 'Password must be at least 8 characters'}), 400
         
-        customer.set_password(new_password)
+        credential_hasher.set_password(customer, new_password)
         db.session.commit()
         
         return jsonify({
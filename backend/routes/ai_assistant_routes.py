@@ -3,11 +3,12 @@ SAURELLIUS AI ASSISTANT ROUTES
 Comprehensive AI endpoints for platform-wide intelligent assistance
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from services.saurellius_ai_service import get_saurellius_ai
 from services.ai_memory_service import get_ai_service
 from models import db
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -42,6 +43,41 @@ def ai_chat():
     return jsonify(result)
 
 
+def _sse(event, data):
+    """One server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@ai_assistant_bp.route('/api/ai/chat/stream', methods=['POST'])
+@jwt_required()
+def ai_chat_stream():
+    """
+    Streaming version of /api/ai/chat as server-sent events.
+    Events: start (session_id), token (text), then done or error.
+    """
+    user_id = get_jwt_identity()
+    data = request.get_json()
+    
+    message = data.get('message', '').strip()
+    if not message:
+        return jsonify({'success': False, 'message': 'Message required'}), 400
+    
+    feature = data.get('feature', 'general')
+    session_id = data.get('session_id')
+    
+    ai = get_saurellius_ai()
+    events = ai.stream_chat(user_id, message, feature, session_id)
+    
+    return Response(
+        stream_with_context(_sse(event, payload) for event, payload in events),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+
 @ai_assistant_bp.route('/api/ai/quick-help', methods=['POST'])
 @jwt_required()
 def ai_quick_help():
@@ -473,6 +509,7 @@ def ai_status():
             'features': list(ai.FEATURE_PROMPTS.keys()),
             'capabilities': [
                 'chat',
+                'chat_stream',
                 'insights',
                 'predictions',
                 'payroll_analysis',
@@ -447,7 +447,24 @@ def analyze_payroll_run():
     data = request.get_json()
     payroll_data = data.get('payroll_data', {})
     
-    analysis = saurellius_ai.analyze_payroll_run(payroll_data)
+    # A run id gets its paychecks scored locally; the model only explains what is flagged
+    anomaly_check = None
+    if data.get('run_id'):
+        from services.payroll_run_service import payroll_run_service
+        from services.tenancy import resolve_company_id
+        run = payroll_run_service.get_payroll_run(data['run_id'])
+        if not run:
+            return jsonify({'success': False, 'message': 'Payroll run not found'}), 404
+        try:
+            # Scores carry each employee's gross and net: only for the run's own company
+            resolve_company_id(get_jwt_identity(), run['company_id'])
+            anomaly_check = payroll_run_service.check_anomalies(data['run_id'])
+        except PermissionError as e:
+            return jsonify({'success': False, 'message': str(e)}), 403
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+    
+    analysis = saurellius_ai.analyze_payroll_run(payroll_data, anomaly_check)
     
     return jsonify({
         'success': True,
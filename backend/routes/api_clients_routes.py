@@ -10,6 +10,7 @@ from sqlalchemy import func, desc
 import secrets
 import hashlib
 from models import db, User, APIClient, APILog, Notification
+from services.pagination import paginate, keyset_page, clamp_limit, cached_count, count_cache
 
 api_clients_bp = Blueprint('api_clients', __name__, url_prefix='/api/admin/tax-engine')
 
@@ -48,8 +49,6 @@ def require_admin(f):
 def get_clients():
     """Get all API clients."""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
         status_filter = request.args.get('status')
         tier_filter = request.args.get('tier')
         
@@ -60,25 +59,24 @@ def get_clients():
         if tier_filter:
             query = query.filter(APIClient.api_tier == tier_filter)
         
-        query = query.order_by(desc(APIClient.created_at))
-        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+        clients_raw, pagination = paginate(
+            query, APIClient.created_at, APIClient.id, request.args,
+            count_key=('api_clients', status_filter, tier_filter), default_limit=20,
+        )
         
-        clients = [client.to_dict() for client in pagination.items]
+        clients = [client.to_dict() for client in clients_raw]
         
-        # Get summary stats
-        total_clients = APIClient.query.count()
-        active_clients = APIClient.query.filter(APIClient.status == 'active').count()
+        # Get summary stats (same cache keys as the unfiltered and active-only lists)
+        total_clients = cached_count(('api_clients', None, None), APIClient.query)
+        active_clients = cached_count(
+            ('api_clients', 'active', None), APIClient.query.filter(APIClient.status == 'active')
+        )
         total_requests = db.session.query(func.sum(APIClient.requests_this_month)).scalar() or 0
         
         return jsonify({
             'success': True,
             'clients': clients,
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': pagination.total,
-                'pages': pagination.pages
-            },
+            'pagination': pagination,
             'summary': {
                 'total_clients': total_clients,
                 'active_clients': active_clients,
@@ -132,6 +130,7 @@ def create_client():
         
         db.session.add(client)
         db.session.commit()
+        count_cache.invalidate('api_clients')
         
         # Return the full credentials (only shown once)
         return jsonify({
@@ -159,8 +158,15 @@ def get_client(client_id):
         if not client:
             return jsonify({'success': False, 'error': 'Client not found'}), 404
         
-        # Get usage stats
-        logs = APILog.query.filter_by(client_id=client_id).order_by(desc(APILog.created_at)).limit(100).all()
+        # Recent requests, newest first; ?cursor= continues into older ones
+        try:
+            logs = keyset_page(
+                APILog.query.filter_by(client_id=client_id), APILog.created_at, APILog.id,
+                cursor=request.args.get('cursor'),
+                limit=clamp_limit(request.args.get('limit', type=int), default=100),
+            )
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         
         return jsonify({
             'success': True,
@@ -171,7 +177,8 @@ def get_client(client_id):
                 'status_code': log.status_code,
                 'response_time_ms': log.response_time_ms,
                 'created_at': log.created_at.isoformat() if log.created_at else None
-            } for log in logs]
+            } for log in logs.items],
+            'next_cursor': logs.next_cursor
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -201,6 +208,7 @@ def update_client(client_id):
             client.rate_limit = data['rate_limit']
         
         db.session.commit()
+        count_cache.invalidate('api_clients')
         
         return jsonify({
             'success': True,
@@ -228,6 +236,7 @@ def suspend_client(client_id):
         client.suspended_by = user_id
         
         db.session.commit()
+        count_cache.invalidate('api_clients')
         
         return jsonify({
             'success': True,
@@ -254,6 +263,7 @@ def reactivate_client(client_id):
         client.suspended_by = None
         
         db.session.commit()
+        count_cache.invalidate('api_clients')
         
         return jsonify({
             'success': True,
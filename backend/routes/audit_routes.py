@@ -9,6 +9,8 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime, date, timedelta
 import uuid
 
+from services.pagination import keyset_slice
+
 audit_bp = Blueprint('audit', __name__, url_prefix='/api/audit')
 
 # In-memory storage (replace with database in production)
@@ -98,8 +100,9 @@ def get_audit_logs():
     user_id = request.args.get('user_id')
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
-    limit = int(request.args.get('limit', 100))
-    offset = int(request.args.get('offset', 0))
+    limit = request.args.get('limit', 100, type=int)
+    offset = request.args.get('offset', 0, type=int)
+    cursor = request.args.get('cursor')
     
     logs = list(AUDIT_LOGS.values())
     
@@ -125,18 +128,27 @@ def get_audit_logs():
     if end_date:
         logs = [l for l in logs if l['timestamp'] <= end_date]
     
-    # Sort by timestamp descending
-    logs.sort(key=lambda x: x['timestamp'], reverse=True)
+    # Sort by timestamp descending (id breaks ties so cursors are stable)
+    logs.sort(key=lambda x: (x['timestamp'], x['id']), reverse=True)
     
     total = len(logs)
-    logs = logs[offset:offset + limit]
+    if cursor or not offset:
+        try:
+            page = keyset_slice(logs, 'timestamp', 'id', cursor, limit)
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        logs, next_cursor = page.items, page.next_cursor
+    else:
+        logs = logs[offset:offset + limit]
+        next_cursor = None
     
     return jsonify({
         'success': True,
         'logs': logs,
         'total': total,
         'limit': limit,
-        'offset': offset
+        'offset': offset,
+        'next_cursor': next_cursor
     })
 
 
@@ -15,6 +15,7 @@ from flask_jwt_extended import (
 from models import User, db
 from services.email_service import email_service
 from services.recaptcha_service import recaptcha_service
+from services.credential_hasher import credential_hasher
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -57,7 +58,7 @@ def signup():
         subscription_tier='free',
         subscription_status='active'
     )
-    user.set_password(password)
+    credential_hasher.set_password(user, password)
     
     db.session.add(user)
     db.session.commit()
@@ -127,7 +128,7 @@ def employee_register():
         subscription_tier='free',
         subscription_status='active'
     )
-    user.set_password(password)
+    credential_hasher.set_password(user, password)
     
     db.session.add(user)
     db.session.commit()
@@ -188,7 +189,7 @@ def contractor_register():
         subscription_tier='free',
         subscription_status='active'
     )
-    user.set_password(password)
+    credential_hasher.set_password(user, password)
     
     db.session.add(user)
     db.session.commit()
@@ -250,7 +251,7 @@ def employer_register():
         subscription_tier='free',
         subscription_status='trial'
     )
-    user.set_password(password)
+    credential_hasher.set_password(user, password)
     
     db.session.add(user)
     db.session.commit()
@@ -294,13 +295,13 @@ def login():
     
     user = User.query.filter_by(email=email).first()
     
-    if not user or not user.check_password(password):
+    if not user or not credential_hasher.check_password(user, password):
         return jsonify({
             'success': False,
             'message': 'Invalid email or password'
         }), 401
     
-    # Update last login
+    # Update last login (and persist a rehash from check_password)
     user.last_login = datetime.utcnow()
     db.session.commit()
     
@@ -415,7 +416,7 @@ def change_password():
             'message': 'Current and new password are required'
         }), 400
     
-    if not user.check_password(current_password):
+    if not credential_hasher.verify(user.password_hash, current_password):
         return jsonify({
             'success': False,
             'message': 'Current password is incorrect'
@@ -427,7 +428,7 @@ def change_password():
             'message': 'New password must be at least 8 characters'
         }), 400
     
-    user.set_password(new_password)
+    credential_hasher.set_password(user, new_password)
     db.session.commit()
     
     return jsonify({
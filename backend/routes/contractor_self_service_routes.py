@@ -526,6 +526,19 @@ def generate_1099():
     return jsonify(result)
 
 
+@contractor_ss_bp.route('/1099/generate-all', methods=['POST'])
+@jwt_required()
+def generate_all_1099s():
+    """Generate 1099-NECs for every eligible contractor (client action)."""
+    client_id = get_jwt_identity()
+    data = request.get_json() or {}
+
+    year = data.get('year', datetime.utcnow().year - 1)
+
+    result = contractor_self_service.generate_all_1099s(client_id, year)
+    return jsonify(result)
+
+
 @contractor_ss_bp.route('/1099/file', methods=['POST'])
 @jwt_required()
 def file_1099_to_irs():
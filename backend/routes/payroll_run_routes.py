@@ -63,13 +63,17 @@ def get_payroll_runs():
 def create_payroll_run():
     """Create a new payroll run"""
     from services.payroll_run_service import payroll_run_service
+    from services.tenancy import resolve_company_id
     
     data = request.get_json()
     data['created_by'] = get_jwt_identity()
     
     try:
+        data['company_id'] = resolve_company_id(data['created_by'], data.get('company_id'))
         run = payroll_run_service.create_payroll_run(data)
         return jsonify({'success': True, 'payroll_run': run}), 201
+    except PermissionError as e:
+        return jsonify({'success': False, 'message': str(e)}), 403
     except ValueError as e:
         return jsonify({'success': False, 'message': str(e)}), 400
 
@@ -134,6 +138,74 @@ def add_employees_batch(run_id):
     })
 
 
+@payroll_run_bp.route('/<run_id>/calculate', methods=['POST'])
+@jwt_required()
+def calculate_payroll_run(run_id):
+    """Calculate every employee the run selects; in the background unless wait is set"""
+    from flask import current_app
+    from services.payroll_run_calculator import payroll_run_calculator
+    from services.payroll_run_service import payroll_run_service
+    from services.tenancy import resolve_company_id
+    
+    data = request.get_json(silent=True) or {}
+    
+    run = payroll_run_service.get_payroll_run(run_id)
+    if not run:
+        return jsonify({'success': False, 'message': 'Payroll run not found'}), 404
+    
+    try:
+        resolve_company_id(get_jwt_identity(), run['company_id'])
+        if data.get('wait'):
+            result = payroll_run_calculator.calculate(
+                run_id, get_jwt_identity(), data.get('defaults'), data.get('inputs')
+            )
+            return jsonify({'success': True, **result})
+        
+        progress = payroll_run_calculator.start_background(
+            current_app._get_current_object(), run_id, get_jwt_identity(),
+            data.get('defaults'), data.get('inputs')
+        )
+        return jsonify({'success': True, 'progress': progress}), 202
+    except PermissionError as e:
+        return jsonify({'success': False, 'message': str(e)}), 403
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+
+def _run_for_caller(run_id):
+    """The run and None, or None and an error response unless the caller's company owns it"""
+    from services.payroll_run_service import payroll_run_service
+    from services.tenancy import resolve_company_id
+    
+    run = payroll_run_service.get_payroll_run(run_id)
+    if not run:
+        return None, (jsonify({'success': False, 'message': 'Payroll run not found'}), 404)
+    try:
+        resolve_company_id(get_jwt_identity(), run['company_id'])
+    except PermissionError as e:
+        return None, (jsonify({'success': False, 'message': str(e)}), 403)
+    except ValueError as e:
+        return None, (jsonify({'success': False, 'message': str(e)}), 400)
+    return run, None
+
+
+@payroll_run_bp.route('/<run_id>/calculate', methods=['GET'])
+@jwt_required()
+def get_calculation_progress(run_id):
+    """Progress of the run's latest calculation"""
+    from services.payroll_run_calculator import payroll_run_calculator
+    
+    _, error = _run_for_caller(run_id)
+    if error:
+        return error
+    
+    progress = payroll_run_calculator.get_progress(run_id)
+    if not progress:
+        return jsonify({'success': False, 'message': 'No calculation for this payroll run'}), 404
+    
+    return jsonify({'success': True, 'progress': progress})
+
+
 @payroll_run_bp.route('/<run_id>/paychecks', methods=['GET'])
 @jwt_required()
 def get_paychecks(run_id):
@@ -145,6 +217,23 @@ def get_paychecks(run_id):
     return jsonify({'success': True, 'paychecks': paychecks})
 
 
+@payroll_run_bp.route('/<run_id>/anomalies', methods=['GET'])
+@jwt_required()
+def check_anomalies(run_id):
+    """Paychecks that deviate from each employee's pay history"""
+    from services.payroll_run_service import payroll_run_service
+    
+    _, error = _run_for_caller(run_id)
+    if error:
+        return error
+    
+    try:
+        check = payroll_run_service.check_anomalies(run_id)
+        return jsonify({'success': True, 'anomaly_check': check})
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+
 @payroll_run_bp.route('/<run_id>/submit', methods=['POST'])
 @jwt_required()
 def submit_for_approval(run_id):
@@ -202,6 +291,26 @@ def cancel_payroll(run_id):
         return jsonify({'success': False, 'message': str(e)}), 400
 
 
+@payroll_run_bp.route('/<run_id>/void', methods=['POST'])
+@jwt_required()
+def void_payroll(run_id):
+    """Void a completed payroll run and reverse its YTD postings"""
+    from services.payroll_run_service import payroll_run_service
+
+    _, error = _run_for_caller(run_id)
+    if error:
+        return error
+
+    data = request.get_json() or {}
+    reason = data.get('reason', 'Voided by user')
+
+    try:
+        run = payroll_run_service.void_payroll(run_id, reason)
+        return jsonify({'success': True, 'payroll_run': run})
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+
 @payroll_run_bp.route('/calculate-preview', methods=['POST'])
 @jwt_required()
 def calculate_preview():
@@ -8,7 +8,7 @@ import tempfile
 import uuid
 from flask import Blueprint, request, jsonify, send_file
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from services.paystub_generator import paystub_generator, COLOR_THEMES, number_to_words
+from services.paystub_generator import paystub_generator, COLOR_THEMES, PDF_BACKENDS, number_to_words
 
 paystub_gen_bp = Blueprint('paystub_generator', __name__)
 
@@ -100,7 +100,8 @@ def generate_paystub():
             "net_pay": 1700.00,
             "net_pay_ytd": 20400.00
         },
-        "theme": "diego_original"  // optional
+        "theme": "diego_original",  // optional
+        "pdf_backend": "native"  // optional: "chromium" or "native"
     }
     """
     data = request.get_json()
@@ -119,6 +120,12 @@ def generate_paystub():
     if theme not in COLOR_THEMES:
         theme = 'diego_original'
     
+    if data.get('pdf_backend') and data['pdf_backend'] not in PDF_BACKENDS:
+        return jsonify({
+            'success': False,
+            'message': f"Invalid pdf_backend. Available: {', '.join(PDF_BACKENDS)}"
+        }), 400
+    
     # Add amount_words if not present
     if 'amount_words' not in data['totals']:
         data['totals']['amount_words'] = number_to_words(data['totals']['net_pay'])
@@ -132,7 +139,7 @@ def generate_paystub():
     output_path = os.path.join(output_dir, filename)
     
     # Generate the paystub
-    result = paystub_generator.generate_paystub_pdf(data, output_path, theme)
+    result = paystub_generator.generate_paystub_pdf(data, output_path, theme, data.get('pdf_backend'))
     
     if not result['success']:
         return jsonify({
@@ -171,6 +178,12 @@ def generate_paystub_with_metadata():
     if theme not in COLOR_THEMES:
         theme = 'diego_original'
     
+    if data.get('pdf_backend') and data['pdf_backend'] not in PDF_BACKENDS:
+        return jsonify({
+            'success': False,
+            'message': f"Invalid pdf_backend. Available: {', '.join(PDF_BACKENDS)}"
+        }), 400
+    
     if 'amount_words' not in data['totals']:
         data['totals']['amount_words'] = number_to_words(data['totals']['net_pay'])
     
@@ -180,7 +193,7 @@ def generate_paystub_with_metadata():
     output_dir = tempfile.mkdtemp()
     output_path = os.path.join(output_dir, filename)
     
-    result = paystub_generator.generate_paystub_pdf(data, output_path, theme)
+    result = paystub_generator.generate_paystub_pdf(data, output_path, theme, data.get('pdf_backend'))
     
     if not result['success']:
         return jsonify({
@@ -199,6 +212,7 @@ def generate_paystub_with_metadata():
         'theme': result['theme'],
         'theme_key': result['theme_key'],
         'file_size': result['file_size'],
+        'pdf_backend': result['backend'],
         'generator': result['generator'],
         'snappt_compliant': result['snappt_compliant'],
         'generated_at': result['generated_at'],
@@ -231,12 +245,11 @@ def preview_paystub():
         data['totals']['amount_words'] = number_to_words(data['totals']['net_pay'])
     
     # Generate preview elements
-    verification_id = paystub_generator.anti_tamper.generate_verification_id()
-    document_hash = paystub_generator.anti_tamper.generate_document_fingerprint(data)[:12].upper()
-    qr_base64 = paystub_generator.generate_verification_qr(data, verification_id)
+    seal = paystub_generator.create_verification_seal(data)
+    verification_id, document_hash = seal.verification_id, seal.document_hash
     
     # Generate HTML
-    html_content = paystub_generator.generate_html(data, theme, qr_base64, verification_id, document_hash)
+    html_content = paystub_generator.generate_html(data, theme, seal.svg, verification_id, document_hash)
     
     return jsonify({
         'success': True,
@@ -277,9 +290,20 @@ def convert_amount_to_words():
 def verify_paystub():
     """
     Verify a paystub hasn't been tampered with.
-    Requires the document data and tamper seal.
+    Requires the document data and tamper seal, or the token scanned from the QR code.
     """
     data = request.get_json()
+    
+    token = data.get('verification_token')
+    if token:
+        fields = paystub_generator.anti_tamper.verify_verification_token(token)
+        return jsonify({
+            'success': True,
+            'verified': fields is not None,
+            'document': fields,
+            'message': 'Verification code is authentic' if fields else 'Verification code is invalid or forged'
+        }), 200
+    
     document_data = data.get('document_data', {})
     seal = data.get('tamper_seal', '')
     
@@ -302,13 +326,15 @@ def verify_paystub():
 @jwt_required()
 def generator_status():
     """Check paystub generator status and capabilities"""
-    from services.paystub_generator import HAS_PLAYWRIGHT, HAS_QR
+    from services.paystub_generator import HAS_PLAYWRIGHT, HAS_QR, HAS_REPORTLAB
     
     return jsonify({
         'success': True,
-        'status': 'operational' if HAS_PLAYWRIGHT else 'limited',
+        'status': 'operational' if HAS_PLAYWRIGHT or HAS_REPORTLAB else 'limited',
         'capabilities': {
-            'pdf_generation': HAS_PLAYWRIGHT,
+            'pdf_generation': HAS_PLAYWRIGHT or HAS_REPORTLAB,
+            'pdf_backends': {'chromium': HAS_PLAYWRIGHT, 'native': HAS_REPORTLAB},
+            'default_pdf_backend': paystub_generator.default_backend,
             'qr_codes': HAS_QR,
             'themes_available': len(COLOR_THEMES),
             'security_features': [
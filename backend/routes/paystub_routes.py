@@ -13,8 +13,9 @@ from datetime import datetime, date
 from flask import Blueprint, request, jsonify, current_app, send_file
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import User, Employee, Company, Paystub, db
-from billing import BillingManager
+from billing import BillingManager, PAYSTUB_REWARD_POINTS
 from services.paystub_generator import paystub_generator, COLOR_THEMES, number_to_words
+from services.pagination import paginate, count_cache
 
 paystubs_bp = Blueprint('paystubs', __name__)
 
@@ -25,10 +26,6 @@ def list_paystubs():
     """Get all paystubs for the current user."""
     user_id = get_jwt_identity()
     
-    # Pagination
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
-    
     # Filters
     employee_id = request.args.get('employee_id', type=int)
     start_date = request.args.get('start_date')
@@ -45,18 +42,20 @@ def list_paystubs():
     if end_date:
         query = query.filter(Paystub.pay_date <= end_date)
     
-    paystubs = query.order_by(Paystub.created_at.desc())\
-        .paginate(page=page, per_page=per_page, error_out=False)
+    # Keyset pagination on (created_at, id); ?cursor= continues, ?page= still works
+    try:
+        paystubs, pagination = paginate(
+            query, Paystub.created_at, Paystub.id, request.args,
+            count_key=('paystubs', int(user_id), employee_id, start_date, end_date),
+            default_limit=20,
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     
     return jsonify({
         'success': True,
-        'paystubs': [p.to_dict() for p in paystubs.items],
-        'pagination': {
-            'page': paystubs.page,
-            'pages': paystubs.pages,
-            'total': paystubs.total,
-            'per_page': per_page
-        }
+        'paystubs': [p.to_dict() for p in paystubs],
+        'pagination': pagination
     }), 200
 
 
@@ -175,20 +174,18 @@ def create_paystub():
     
     db.session.add(paystub)
     
-    # Update usage
-    billing.increment_usage()
-    
-    # Award reward points (10 points per paystub)
-    user.reward_points = (user.reward_points or 0) + 10
+    # Update usage and award reward points (atomic increments on the user row)
+    billing.increment_usage(reward_points=PAYSTUB_REWARD_POINTS)
     
     db.session.commit()
+    count_cache.invalidate('paystubs', int(user_id))
     
     return jsonify({
         'success': True,
         'message': 'Paystub generated successfully',
         'paystub': paystub.to_dict(),
         'overage_charged': overage,
-        'reward_points_earned': 10
+        'reward_points_earned': PAYSTUB_REWARD_POINTS
     }), 201
 
 
@@ -354,7 +351,7 @@ def generate_paystub_with_pdf():
     output_dir = tempfile.mkdtemp()
     output_path = os.path.join(output_dir, filename)
     
-    pdf_result = paystub_generator.generate_paystub_pdf(generator_data, output_path, theme)
+    pdf_result = paystub_generator.generate_paystub_pdf(generator_data, output_path, theme, data.get('pdf_backend'))
     
     pdf_base64 = None
     if pdf_result.get('success') and os.path.exists(output_path):
@@ -387,9 +384,9 @@ def generate_paystub_with_pdf():
     )
     
     db.session.add(paystub)
-    billing.increment_usage()
-    user.reward_points = (user.reward_points or 0) + 10
+    billing.increment_usage(reward_points=PAYSTUB_REWARD_POINTS)
     db.session.commit()
+    count_cache.invalidate('paystubs', int(user_id))
     
     return jsonify({
         'success': True,
@@ -403,7 +400,7 @@ def generate_paystub_with_pdf():
         },
         'paystub': paystub.to_dict(),
         'overage_charged': overage,
-        'reward_points_earned': 10
+        'reward_points_earned': PAYSTUB_REWARD_POINTS
     }), 201
 
 
@@ -462,9 +459,9 @@ def duplicate_paystub(paystub_id):
     )
     
     db.session.add(duplicate)
-    billing.increment_usage()
-    user.reward_points = (user.reward_points or 0) + 10
+    billing.increment_usage(reward_points=PAYSTUB_REWARD_POINTS)
     db.session.commit()
+    count_cache.invalidate('paystubs', int(user_id))
     
     return jsonify({
         'success': True,
@@ -486,6 +483,7 @@ def delete_paystub(paystub_id):
     
     db.session.delete(paystub)
     db.session.commit()
+    count_cache.invalidate('paystubs', int(user_id))
     
     return jsonify({
         'success': True,
@@ -10,6 +10,27 @@ from datetime import date
 pto_bp = Blueprint('pto', __name__, url_prefix='/api/pto')
 
 
+def _company_id(data=None):
+    """
+    Company scope for ledger queries: the requested company if the caller may
+    act for it (otherwise PermissionError, answered with 403), or their own.
+    """
+    from services.tenancy import resolve_company_id
+    
+    requested = (data or {}).get('company_id') or request.args.get('company_id')
+    return str(resolve_company_id(get_jwt_identity(), requested))
+
+
+@pto_bp.errorhandler(PermissionError)
+def _forbidden(e):
+    return jsonify({'success': False, 'message': str(e)}), 403
+
+
+@pto_bp.errorhandler(ValueError)
+def _bad_request(e):
+    return jsonify({'success': False, 'message': str(e)}), 400
+
+
 @pto_bp.route('/policies', methods=['GET'])
 @jwt_required()
 def get_policies():
@@ -56,13 +77,14 @@ def get_policy(policy_id):
 @jwt_required()
 def enroll_employee():
     """Enroll employee in PTO policies"""
-    from services.pto_service import pto_service
+    from services.pto_ledger_service import pto_ledger
     
     data = request.get_json()
     
     try:
-        balances = pto_service.enroll_employee(
-            employee_id=data['employee_id'],
+        balances = pto_ledger.enroll_employee(
+            company_id=_company_id(data),
+            employee_id=str(data['employee_id']),
             hire_date=data['hire_date'],
             policy_ids=data.get('policy_ids')
         )
@@ -75,10 +97,10 @@ def enroll_employee():
 @jwt_required()
 def get_balances(employee_id):
     """Get PTO balances for an employee"""
-    from services.pto_service import pto_service
+    from services.pto_ledger_service import pto_ledger
     
     try:
-        balances = pto_service.get_employee_balances(employee_id)
+        balances = pto_ledger.get_employee_balances(employee_id)
         return jsonify({'success': True, 'balances': balances})
     except ValueError as e:
         return jsonify({'success': False, 'message': str(e)}), 404
@@ -88,13 +110,13 @@ def get_balances(employee_id):
 @jwt_required()
 def process_accrual():
     """Process PTO accrual for an employee"""
-    from services.pto_service import pto_service
+    from services.pto_ledger_service import pto_ledger
     
     data = request.get_json()
     
     try:
-        result = pto_service.process_accrual(
-            employee_id=data['employee_id'],
+        result = pto_ledger.process_accrual(
+            employee_id=str(data['employee_id']),
             policy_id=data['policy_id'],
             pay_period_end=date.fromisoformat(data['pay_period_end']),
             hours_worked=data.get('hours_worked')
@@ -104,18 +126,75 @@ def process_accrual():
         return jsonify({'success': False, 'message': str(e)}), 400
 
 
+@pto_bp.route('/accrual/run', methods=['POST'])
+@jwt_required()
+def run_payroll_accruals():
+    """Post accruals for every enrolled employee for a pay period (payroll close)"""
+    from services.pto_ledger_service import pto_ledger
+    
+    data = request.get_json()
+    
+    try:
+        result = pto_ledger.run_payroll_accruals(
+            company_id=_company_id(data),
+            pay_period_end=date.fromisoformat(data['pay_period_end']),
+            hours_worked={str(k): v for k, v in (data.get('hours_worked') or {}).items()},
+            payroll_run_id=data.get('payroll_run_id')
+        )
+        return jsonify({'success': True, 'result': result})
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+
+@pto_bp.route('/ledger/<employee_id>', methods=['GET'])
+@jwt_required()
+def get_ledger(employee_id):
+    """Get PTO ledger entries for an employee"""
+    from services.pto_ledger_service import pto_ledger
+    
+    entries = pto_ledger.get_ledger(
+        employee_id,
+        policy_id=request.args.get('policy_id'),
+        limit=min(request.args.get('limit', 100, type=int), 500)
+    )
+    
+    return jsonify({'success': True, 'entries': entries})
+
+
+@pto_bp.route('/ledger/rebuild', methods=['POST'])
+@jwt_required()
+def rebuild_ledger():
+    """Import existing leave history into the ledger and rebuild balance snapshots"""
+    from services.pto_ledger_service import pto_ledger
+    from services.tenancy import company_scope
+    
+    data = request.get_json(silent=True) or {}
+    
+    if data.get('all_companies'):
+        # Rebuilding every company's balances is a platform operation
+        if company_scope(get_jwt_identity()) is not None:
+            return jsonify({'success': False, 'message': 'Admin access required'}), 403
+        company_id = None
+    else:
+        company_id = _company_id(data)
+    
+    result = pto_ledger.backfill(company_id=company_id)
+    return jsonify({'success': True, 'result': result})
+
+
 @pto_bp.route('/requests', methods=['GET'])
 @jwt_required()
 def get_leave_requests():
     """Get leave requests"""
-    from services.pto_service import pto_service
+    from services.pto_ledger_service import pto_ledger
     
     employee_id = request.args.get('employee_id')
     status = request.args.get('status')
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     
-    requests = pto_service.get_leave_requests(
+    requests = pto_ledger.get_leave_requests(
+        company_id=request.args.get('company_id'),
         employee_id=employee_id,
         status=status,
         start_date=date.fromisoformat(start_date) if start_date else None,
@@ -129,13 +208,13 @@ def get_leave_requests():
 @jwt_required()
 def submit_leave_request():
     """Submit a leave request"""
-    from services.pto_service import pto_service
+    from services.pto_ledger_service import pto_ledger
     
     data = request.get_json()
-    employee_id = data.get('employee_id') or get_jwt_identity()
+    employee_id = str(data.get('employee_id') or get_jwt_identity())
     
     try:
-        request_obj = pto_service.submit_leave_request(employee_id, data)
+        request_obj = pto_ledger.submit_leave_request(employee_id, data)
         return jsonify({'success': True, 'request': request_obj}), 201
     except ValueError as e:
         return jsonify({'success': False, 'message': str(e)}), 400
@@ -145,12 +224,12 @@ def submit_leave_request():
 @jwt_required()
 def approve_request(request_id):
     """Approve a leave request"""
-    from services.pto_service import pto_service
+    from services.pto_ledger_service import pto_ledger
     
     reviewer_id = get_jwt_identity()
     
     try:
-        request_obj = pto_service.approve_request(request_id, reviewer_id)
+        request_obj = pto_ledger.approve_request(request_id, reviewer_id)
         return jsonify({'success': True, 'request': request_obj})
     except ValueError as e:
         return jsonify({'success': False, 'message': str(e)}), 400
@@ -160,14 +239,14 @@ def approve_request(request_id):
 @jwt_required()
 def deny_request(request_id):
     """Deny a leave request"""
-    from services.pto_service import pto_service
+    from services.pto_ledger_service import pto_ledger
     
     data = request.get_json()
     reviewer_id = get_jwt_identity()
     reason = data.get('reason', 'Request denied')
     
     try:
-        request_obj = pto_service.deny_request(request_id, reviewer_id, reason)
+        request_obj = pto_ledger.deny_request(request_id, reviewer_id, reason)
         return jsonify({'success': True, 'request': request_obj})
     except ValueError as e:
         return jsonify({'success': False, 'message': str(e)}), 400
@@ -177,12 +256,12 @@ def deny_request(request_id):
 @jwt_required()
 def cancel_request(request_id):
     """Cancel a leave request"""
-    from services.pto_service import pto_service
+    from services.pto_ledger_service import pto_ledger
     
     employee_id = get_jwt_identity()
     
     try:
-        request_obj = pto_service.cancel_request(request_id, employee_id)
+        request_obj = pto_ledger.cancel_request(request_id, employee_id)
         return jsonify({'success': True, 'request': request_obj})
     except ValueError as e:
         return jsonify({'success': False, 'message': str(e)}), 400
@@ -192,10 +271,10 @@ def cancel_request(request_id):
 @jwt_required()
 def mark_leave_taken(request_id):
     """Mark leave as taken"""
-    from services.pto_service import pto_service
+    from services.pto_ledger_service import pto_ledger
     
     try:
-        request_obj = pto_service.mark_leave_taken(request_id)
+        request_obj = pto_ledger.mark_leave_taken(request_id, recorded_by=str(get_jwt_identity()))
         return jsonify({'success': True, 'request': request_obj})
     except ValueError as e:
         return jsonify({'success': False, 'message': str(e)}), 400
@@ -205,13 +284,13 @@ def mark_leave_taken(request_id):
 @jwt_required()
 def get_team_calendar():
     """Get team leave calendar"""
-    from services.pto_service import pto_service
+    from services.pto_ledger_service import pto_ledger
     
     employee_ids = request.args.getlist('employee_ids')
     month = request.args.get('month', date.today().month, type=int)
     year = request.args.get('year', date.today().year, type=int)
     
-    calendar = pto_service.get_team_calendar(employee_ids, month, year)
+    calendar = pto_ledger.get_team_calendar(_company_id(), employee_ids, month, year)
     
     return jsonify({'success': True, 'calendar': calendar})
 
@@ -231,14 +310,17 @@ def get_holidays():
 @pto_bp.route('/year-end-carryover', methods=['POST'])
 @jwt_required()
 def process_carryover():
-    """Process year-end balance carryover"""
-    from services.pto_service import pto_service
+    """Process year-end balance carryover for one employee or the whole company"""
+    from services.pto_ledger_service import pto_ledger
     
     data = request.get_json()
-    employee_id = data['employee_id']
     
     try:
-        result = pto_service.process_year_end_carryover(employee_id)
+        result = pto_ledger.run_year_end_carryover(
+            company_id=_company_id(data),
+            year=int(data.get('year', date.today().year)),
+            employee_id=str(data['employee_id']) if data.get('employee_id') else None
+        )
         return jsonify({'success': True, 'result': result})
     except ValueError as e:
         return jsonify({'success': False, 'message': str(e)}), 400
@@ -248,8 +330,8 @@ def process_carryover():
 @jwt_required()
 def get_liability_report():
     """Get PTO liability report"""
-    from services.pto_service import pto_service
+    from services.pto_ledger_service import pto_ledger
     
-    report = pto_service.get_pto_liability_report()
+    report = pto_ledger.get_pto_liability_report(_company_id())
     
     return jsonify({'success': True, 'report': report})
@@ -144,6 +144,77 @@ def get_deposit_schedule():
     })
 
 
+@regulatory_bp.route('/eftps/depositor-status', methods=['GET'])
+@jwt_required()
+def get_depositor_status():
+    """Get deposit schedules for the caller's EINs, or some of them (comma-separated)."""
+    from models import Company
+    from services.deposit_scheduler_service import deposit_scheduler
+    from services.tenancy import company_scope
+
+    def digits(ein):
+        return ''.join(c for c in ein if c.isdigit())
+
+    eins = [e for e in request.args.get('ein', '').split(',') if e.strip()]
+    scope = company_scope(get_jwt_identity())
+    if scope is not None:
+        # Looking an EIN up also records its status, so only the caller's own EINs
+        own = {digits(ein) for (ein,) in Company.query.filter(
+            Company.id.in_(scope), Company.ein.isnot(None)
+        ).with_entities(Company.ein)} - {''}
+        if not eins:
+            eins = sorted(own)
+        elif any(digits(e) not in own for e in eins):
+            return jsonify({'success': False, 'message': 'Not authorized for this EIN'}), 403
+    if not eins:
+        return jsonify({'success': False, 'message': 'ein is required'}), 400
+    year = request.args.get('year', datetime.utcnow().year, type=int)
+
+    return jsonify({'success': True, 'year': year, 'statuses': deposit_scheduler.determine_many(eins, year)})
+
+
+@regulatory_bp.route('/eftps/queue', methods=['GET'])
+@jwt_required()
+def get_deposit_queue():
+    """Get the caller's pending deposit obligations, most urgent first."""
+    from services.deposit_scheduler_service import deposit_scheduler
+    from services.tenancy import resolve_company_id
+
+    try:
+        company_id = resolve_company_id(get_jwt_identity(), request.args.get('company_id'))
+    except PermissionError as e:
+        return jsonify({'success': False, 'message': str(e)}), 403
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    if request.args.get('due_only') == 'true':
+        obligations = deposit_scheduler.queue(limit=request.args.get('limit', 500, type=int), company_id=company_id)
+    else:
+        obligations = deposit_scheduler.upcoming(company_id, limit=request.args.get('limit', 100, type=int))
+
+    return jsonify({'success': True, 'obligations': obligations, 'count': len(obligations)})
+
+
+@regulatory_bp.route('/eftps/queue/submit', methods=['POST'])
+@jwt_required()
+def submit_deposit_queue():
+    """Submit the caller's due deposit obligations to EFTPS."""
+    from services.deposit_scheduler_service import deposit_scheduler
+    from services.tenancy import resolve_company_id
+
+    data = request.get_json() or {}
+    try:
+        company_id = resolve_company_id(get_jwt_identity(), data.get('company_id'))
+        as_of = datetime.fromisoformat(data['as_of']).date() if data.get('as_of') else None
+    except PermissionError as e:
+        return jsonify({'success': False, 'message': str(e)}), 403
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    result = deposit_scheduler.submit_due(as_of=as_of, company_id=company_id)
+    return jsonify({'success': True, 'company_id': company_id, **result})
+
+
 # ============================================================================
 # STATE FILINGS
 # ============================================================================
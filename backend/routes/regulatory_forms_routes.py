@@ -6,9 +6,12 @@ I-9, W-4, W-9, W-2, 1099-NEC, 941, 940, SS-4, etc.
 
 from flask import Blueprint, jsonify, send_file, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
+import io
 import os
 from datetime import datetime
 
+from services.response_cache import cached_response
+
 regulatory_forms_bp = Blueprint('regulatory_forms', __name__, url_prefix='/api/forms')
 
 # Base directory for regulatory forms
@@ -169,8 +172,14 @@ AVAILABLE_FORMS = {
 }
 
 
+def _forms_dir_version():
+    """Cache version for listings that report which PDFs are on disk."""
+    return os.stat(FORMS_DIR).st_mtime_ns if os.path.isdir(FORMS_DIR) else None
+
+
 @regulatory_forms_bp.route('/list', methods=['GET'])
 @jwt_required()
+@cached_response(version=_forms_dir_version)
 def list_forms():
     """List all available regulatory forms."""
     try:
@@ -257,6 +266,93 @@ def download_form(form_id):
         }), 500
 
 
+def _filled_file(form_id, render):
+    """Run a form render and send the PDF or ZIP it produces."""
+    from services.form_render_service import form_renderer
+
+    output = request.args.get('output', 'pdf')
+    copies = [c for c in request.args.get('copies', '').split(',') if c] or None
+    try:
+        data = render(form_renderer, copies, output)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({'success': False, 'message': str(e)}), 503
+
+    extension = 'zip' if output == 'zip' else 'pdf'
+    return send_file(
+        io.BytesIO(data),
+        mimetype='application/zip' if output == 'zip' else 'application/pdf',
+        as_attachment=True,
+        download_name=f"{form_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}.{extension}"
+    )
+
+
+@regulatory_forms_bp.route('/fill/<form_id>', methods=['POST'])
+@jwt_required()
+def fill_form(form_id):
+    """Fill a form with the posted records (form data or raw field names)."""
+    data = request.get_json() or {}
+    records = data.get('records') or ([data['record']] if data.get('record') else [])
+    if not records:
+        return jsonify({'success': False, 'message': 'records is required'}), 400
+
+    return _filled_file(form_id, lambda renderer, copies, output: renderer.render(
+        form_id, records, data.get('copies') or copies, data.get('output', output)
+    ))
+
+
+@regulatory_forms_bp.route('/batch/w-2', methods=['GET'])
+@jwt_required()
+def batch_w2s():
+    """Print every stored W-2 for one of the caller's companies, e.g. ?company_id=1&tax_year=2024&copies=CopyB"""
+    from services.tenancy import resolve_company_id
+
+    tax_year = request.args.get('tax_year', datetime.now().year - 1, type=int)
+    try:
+        company_id = resolve_company_id(get_jwt_identity(), request.args.get('company_id'))
+    except PermissionError as e:
+        return jsonify({'success': False, 'message': str(e)}), 403
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    return _filled_file('w-2', lambda renderer, copies, output: renderer.company_w2s(
+        company_id, tax_year, copies, output
+    ))
+
+
+@regulatory_forms_bp.route('/batch/1099-nec', methods=['GET'])
+@jwt_required()
+def batch_1099s():
+    """Print every stored 1099-NEC the caller issued as payer, e.g. ?tax_year=2024"""
+    from services.tenancy import company_scope
+
+    # Contractor payers are keyed by the paying user's id; only admins may name another payer
+    caller = str(get_jwt_identity())
+    client_id = request.args.get('client_id') or caller
+    tax_year = request.args.get('tax_year', datetime.now().year - 1, type=int)
+    if client_id != caller and company_scope(caller) is not None:
+        return jsonify({'success': False, 'message': 'Not authorized for this payer'}), 403
+
+    return _filled_file('1099-nec', lambda renderer, copies, output: renderer.client_1099s(
+        client_id, tax_year, copies, output
+    ))
+
+
+@regulatory_forms_bp.route('/fields/<form_id>', methods=['GET'])
+@jwt_required()
+def get_form_fields(form_id):
+    """Pages, copies and fillable fields of a form template."""
+    from services.form_render_service import form_renderer
+
+    try:
+        return jsonify({'success': True, 'form_id': form_id, 'pages': form_renderer.field_map(form_id)})
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({'success': False, 'message': str(e)}), 503
+
+
 @regulatory_forms_bp.route('/info/<form_id>', methods=['GET'])
 @jwt_required()
 def get_form_info(form_id):
@@ -303,6 +399,7 @@ def get_form_info(form_id):
 
 @regulatory_forms_bp.route('/categories', methods=['GET'])
 @jwt_required()
+@cached_response()
 def get_categories():
     """Get list of form categories."""
     categories = {
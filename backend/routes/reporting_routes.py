@@ -3,13 +3,21 @@ REPORTING ROUTES
 Reports, analytics, and data exports API endpoints
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import date
 
 reporting_bp = Blueprint('reporting', __name__, url_prefix='/api/reports')
 
 
+def _fact_company(data=None):
+    """Company whose payroll facts back a report: the requested one if the caller may act for it, else their own"""
+    from services.tenancy import resolve_company_id
+    
+    requested = (data or {}).get('company_id') or request.args.get('company_id')
+    return resolve_company_id(get_jwt_identity(), requested)
+
+
 @reporting_bp.route('', methods=['GET'])
 @jwt_required()
 def get_reports():
@@ -48,11 +56,17 @@ def generate_payroll_summary():
     
     data = request.get_json()
     
-    report = reporting_service.generate_payroll_summary(
-        start_date=date.fromisoformat(data['start_date']),
-        end_date=date.fromisoformat(data['end_date']),
-        payroll_data=data.get('payroll_data', [])
-    )
+    try:
+        report = reporting_service.generate_payroll_summary(
+            start_date=date.fromisoformat(data['start_date']),
+            end_date=date.fromisoformat(data['end_date']),
+            payroll_data=data.get('payroll_data'),
+            company_id=_fact_company(data) if data.get('payroll_data') is None else None
+        )
+    except PermissionError as e:
+        return jsonify({'success': False, 'message': str(e)}), 403
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     
     return jsonify({'success': True, 'report': report}), 201
 
@@ -115,11 +129,17 @@ def generate_department_summary():
     
     data = request.get_json()
     
-    report = reporting_service.generate_department_summary(
-        start_date=date.fromisoformat(data['start_date']),
-        end_date=date.fromisoformat(data['end_date']),
-        department_data=data.get('department_data', {})
-    )
+    try:
+        report = reporting_service.generate_department_summary(
+            start_date=date.fromisoformat(data['start_date']),
+            end_date=date.fromisoformat(data['end_date']),
+            department_data=data.get('department_data'),
+            company_id=_fact_company(data) if data.get('department_data') is None else None
+        )
+    except PermissionError as e:
+        return jsonify({'success': False, 'message': str(e)}), 403
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     
     return jsonify({'success': True, 'report': report}), 201
 
@@ -132,11 +152,17 @@ def generate_labor_cost():
     
     data = request.get_json()
     
-    report = reporting_service.generate_labor_cost_report(
-        start_date=date.fromisoformat(data['start_date']),
-        end_date=date.fromisoformat(data['end_date']),
-        labor_data=data.get('labor_data', {})
-    )
+    try:
+        report = reporting_service.generate_labor_cost_report(
+            start_date=date.fromisoformat(data['start_date']),
+            end_date=date.fromisoformat(data['end_date']),
+            labor_data=data.get('labor_data'),
+            company_id=_fact_company(data) if data.get('labor_data') is None else None
+        )
+    except PermissionError as e:
+        return jsonify({'success': False, 'message': str(e)}), 403
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     
     return jsonify({'success': True, 'report': report}), 201
 
@@ -165,11 +191,32 @@ def get_analytics_dashboard():
     
     year = request.args.get('year', date.today().year, type=int)
     
-    dashboard = reporting_service.generate_analytics_dashboard(year)
+    try:
+        dashboard = reporting_service.generate_analytics_dashboard(year, company_id=_fact_company())
+    except PermissionError as e:
+        return jsonify({'success': False, 'message': str(e)}), 403
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     
     return jsonify({'success': True, 'dashboard': dashboard})
 
 
+@reporting_bp.route('/analytics/rebuild', methods=['POST'])
+@jwt_required()
+def rebuild_payroll_facts():
+    """Load payroll facts for completed runs processed before the fact table existed"""
+    from services.payroll_fact_service import payroll_facts
+    
+    try:
+        result = payroll_facts.backfill(_fact_company(request.get_json(silent=True)))
+    except PermissionError as e:
+        return jsonify({'success': False, 'message': str(e)}), 403
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    return jsonify({'success': True, 'result': result})
+
+
 @reporting_bp.route('/schedule', methods=['GET'])
 @jwt_required()
 def get_scheduled_reports():
@@ -210,6 +257,65 @@ def export_report(report_id, format):
         return jsonify({'success': False, 'message': str(e)}), 400
 
 
+
+def _export_response(chunks, mimetype, filename):
+    """Chunked download response for an export generator"""
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+
+@reporting_bp.route('/<report_id>/download/<format>', methods=['GET'])
+@jwt_required()
+def download_report(report_id, format):
+    """Download a generated report as CSV, XLSX or JSON lines"""
+    from services.reporting_service import reporting_service
+    from services.report_export_service import report_export_service
+    
+    report = reporting_service.get_report(report_id)
+    if not report:
+        return jsonify({'success': False, 'message': 'Report not found'}), 404
+    
+    try:
+        chunks, mimetype, filename = report_export_service.stream_report(report, format)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    return _export_response(chunks, mimetype, filename)
+
+
+@reporting_bp.route('/export/<dataset>/<format>', methods=['GET'])
+@jwt_required()
+def stream_export(dataset, format):
+    """Stream a payroll register, tax liability, labor cost or earnings export from the database"""
+    from services.report_export_service import report_export_service
+    from services.tenancy import resolve_company_id
+    
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    
+    try:
+        chunks, mimetype, filename = report_export_service.stream(
+            dataset.replace('-', '_'),
+            format,
+            company_id=resolve_company_id(get_jwt_identity(), request.args.get('company_id')),
+            start_date=date.fromisoformat(start_date) if start_date else None,
+            end_date=date.fromisoformat(end_date) if end_date else None,
+            payroll_run_id=request.args.get('payroll_run_id'),
+            employee_id=request.args.get('employee_id', type=int)
+        )
+    except PermissionError as e:
+        return jsonify({'success': False, 'message': str(e)}), 403
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    return _export_response(chunks, mimetype, filename)
+
 # =============================================================================
 # ADVANCED ANALYTICS & PREDICTIVE INSIGHTS
 # =============================================================================
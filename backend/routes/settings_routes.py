@@ -9,6 +9,7 @@ import uuid
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import User, db, SecuritySettings, ActiveSession, Notification
+from services.pagination import keyset_page, clamp_limit
 
 settings_bp = Blueprint('settings', __name__)
 
@@ -482,16 +483,23 @@ def update_theme_preference():
 @settings_bp.route('/api/notifications', methods=['GET'])
 @jwt_required()
 def get_notifications():
-    """Get user's notifications."""
+    """Get user's notifications, newest first; pass next_cursor back as ?cursor= for older ones."""
     user_id = get_jwt_identity()
     
-    notifications = Notification.query.filter_by(
-        user_id=user_id
-    ).order_by(Notification.created_at.desc()).limit(50).all()
+    try:
+        page = keyset_page(
+            Notification.query.filter_by(user_id=user_id),
+            Notification.created_at, Notification.id,
+            cursor=request.args.get('cursor'),
+            limit=clamp_limit(request.args.get('limit', type=int), default=50),
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     
     return jsonify({
         'success': True,
-        'data': [n.to_dict() for n in notifications],
+        'data': [n.to_dict() for n in page.items],
+        'next_cursor': page.next_cursor,
         'unread_count': Notification.query.filter_by(user_id=user_id, is_read=False).count()
     })
 
@@ -3,15 +3,24 @@
 API endpoints for state-by-state payroll compliance rules
 """
 
-from flask import Blueprint, request, jsonify
+from datetime import date
+
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required
+from services.response_cache import cached_response
 from services.state_payroll_rules import state_payroll_rules
 
 state_rules_bp = Blueprint('state_rules', __name__)
 
 
+def _rules_version():
+    """Cache version: the rules file in effect today."""
+    return state_payroll_rules.snapshot().digest
+
+
 @state_rules_bp.route('/api/states', methods=['GET'])
 @jwt_required()
+@cached_response(version=_rules_version)
 def get_all_states():
     """Get list of all states with basic info."""
     states_list = [
@@ -249,30 +258,17 @@ def get_pfl_states():
 
 @state_rules_bp.route('/api/states/all-rules', methods=['GET'])
 @jwt_required()
+@cached_response(version=_rules_version)
 def get_all_state_rules():
-    """Get comprehensive rules for all states (large response)."""
-    all_states = state_payroll_rules.get_all_states_summary()
-    
-    # Convert Decimal values to float for JSON serialization
-    for state_code, rules in all_states.items():
-        if rules.get('sdi_info'):
-            rules['sdi_info'] = {
-                k: float(v) if hasattr(v, '__float__') else v
-                for k, v in rules['sdi_info'].items()
-            }
-        if rules.get('pfl_info'):
-            rules['pfl_info'] = {
-                k: float(v) if hasattr(v, '__float__') else v
-                for k, v in rules['pfl_info'].items()
-            }
-        if rules.get('overtime') and rules['overtime'].get('rate'):
-            rules['overtime']['rate'] = float(rules['overtime']['rate'])
-    
-    return jsonify({
-        'success': True,
-        'states': all_states,
-        'total_states': len(all_states)
-    }), 200
+    """Get comprehensive rules for all states (large response, revalidated by ETag)."""
+    on_date = request.args.get('date')
+    try:
+        on_date = date.fromisoformat(on_date) if on_date else None
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    body, _ = state_payroll_rules.all_states_payload(on_date)
+    return current_app.response_class(body, mimetype='application/json')
 
 
 # =============================================================================
@@ -311,11 +311,11 @@ def handle_successful_checkout(session):
         user.stripe_subscription_id = subscription_id
         user.stripe_customer_id = customer_id
         user.subscription_status = 'active'
-        user.paystubs_this_month = 0  # Reset usage
+        billing = BillingManager(user)
+        billing.reset_monthly_usage()  # New subscription starts a new usage cycle
         db.session.commit()
         
         # Send confirmation email
-        billing = BillingManager(user)
         plan_info = billing.get_plan_info(plan)
         try:
             email_service.send_subscription_confirmation(
@@ -385,7 +385,7 @@ def handle_successful_payment(invoice):
             user.subscription_status = 'active'
         
         # Reset monthly usage on successful payment (new billing cycle)
-        user.paystubs_this_month = 0
+        BillingManager(user).reset_monthly_usage()
         db.session.commit()
         
         current_app.logger.info(f"Payment succeeded for user {user.id}")
@@ -26,6 +26,8 @@ from decimal import Decimal, ROUND_HALF_UP
 import uuid
 import hashlib
 
+from services.response_cache import cached_response
+
 tax_engine_v2_bp = Blueprint('tax_engine_v2', __name__, url_prefix='/api/v2/tax')
 
 # =============================================================================
@@ -1161,6 +1163,7 @@ def check_benefit_taxability():
 
 @tax_engine_v2_bp.route('/benefits/types', methods=['GET'])
 @require_api_key
+@cached_response()
 def list_benefit_types():
     """List all supported benefit types and their taxability."""
     return jsonify({
@@ -1206,6 +1209,7 @@ def get_account_info():
 
 @tax_engine_v2_bp.route('/schema', methods=['GET'])
 @require_api_key
+@cached_response()
 def get_api_schema():
     """Get API schema and endpoint documentation."""
     return jsonify({
@@ -1607,6 +1611,7 @@ def calculate_canadian_gross_to_net():
 
 @tax_engine_v2_bp.route('/ca/rates/federal', methods=['GET'])
 @require_api_key
+@cached_response()
 def get_canadian_federal_rates():
     """Get Canadian federal tax rates for 2025."""
     return jsonify({
@@ -1640,6 +1645,7 @@ def get_canadian_federal_rates():
 
 @tax_engine_v2_bp.route('/ca/rates/provincial/<province>', methods=['GET'])
 @require_api_key
+@cached_response()
 def get_canadian_provincial_rates(province):
     """Get Canadian provincial tax rates."""
     province = province.upper()
@@ -1692,6 +1698,7 @@ def get_canadian_provincial_rates(province):
 
 @tax_engine_v2_bp.route('/ca/provinces', methods=['GET'])
 @require_api_key
+@cached_response()
 def list_canadian_provinces():
     """List all Canadian provinces and territories."""
     return jsonify({
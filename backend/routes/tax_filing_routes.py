@@ -230,3 +230,87 @@ def export_efile_data():
     )
     
     return jsonify({'success': True, 'export': export})
+
+
+# =============================================================================
+# YEAR-END BULK W-2 / W-3
+# =============================================================================
+
+def _year_end_run_for_caller(run_id):
+    """The run as a dict and None, or None and an error response if the caller may not see it"""
+    from services.tenancy import company_scope
+    from services.year_end_service import year_end_pipeline
+    
+    run = year_end_pipeline.get_run(run_id)
+    if not run:
+        return None, (jsonify({'success': False, 'message': 'Run not found'}), 404)
+    
+    scope = company_scope(get_jwt_identity())
+    if scope is not None and run['company_id'] not in scope:
+        return None, (jsonify({'success': False, 'message': 'Not authorized for this run'}), 403)
+    return run, None
+
+
+@tax_filing_bp.route('/year-end/runs', methods=['POST'])
+@jwt_required()
+def start_year_end_run():
+    """Generate every W-2 and W-3 for a company (or, for admins, all companies) in the background"""
+    from flask import current_app
+    from services.tenancy import company_scope, resolve_company_id
+    from services.year_end_service import year_end_pipeline
+    
+    data = request.get_json() or {}
+    user_id = get_jwt_identity()
+    
+    if data.get('all_companies'):
+        # A platform-wide run (and its restart) touches every company's forms
+        if company_scope(user_id) is not None:
+            return jsonify({'success': False, 'message': 'Admin access required'}), 403
+        company_id = None
+    else:
+        try:
+            company_id = resolve_company_id(user_id, data.get('company_id'))
+        except PermissionError as e:
+            return jsonify({'success': False, 'message': str(e)}), 403
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+    
+    run = year_end_pipeline.start_background(
+        current_app._get_current_object(),
+        tax_year=data.get('tax_year', date.today().year - 1),
+        company_id=company_id,
+        restart=data.get('restart', False)
+    )
+    
+    return jsonify({'success': True, 'run': run}), 202
+
+
+@tax_filing_bp.route('/year-end/runs/<run_id>', methods=['GET'])
+@jwt_required()
+def get_year_end_run(run_id):
+    """Get year-end run progress"""
+    run, error = _year_end_run_for_caller(run_id)
+    if error:
+        return error
+    
+    return jsonify({'success': True, 'run': run})
+
+
+@tax_filing_bp.route('/year-end/runs/<run_id>/forms', methods=['GET'])
+@jwt_required()
+def get_year_end_forms(run_id):
+    """Page through the forms generated by a year-end run"""
+    from services.year_end_service import year_end_pipeline
+    
+    run, error = _year_end_run_for_caller(run_id)
+    if error:
+        return error
+    
+    forms = year_end_pipeline.get_forms(
+        run_id,
+        form_type=request.args.get('form_type', 'W-2'),
+        after_employee_id=request.args.get('after', 0, type=int),
+        limit=min(request.args.get('limit', 100, type=int), 1000)
+    )
+    
+    return jsonify({'success': True, 'forms': forms})
@@ -10,44 +10,14 @@ from datetime import datetime, date, timedelta
 from decimal import Decimal, ROUND_HALF_UP
 import uuid
 
+from services.time_compliance_service import time_compliance_engine, calculate_employee_hours
+
 timeclock_bp = Blueprint('timeclock', __name__, url_prefix='/api/timeclock')
 
 # In-memory storage
 TIME_ENTRIES = {}
 PUNCH_RECORDS = {}
 
-# State-specific overtime rules
-STATE_OT_RULES = {
-    'CA': {
-        'daily_ot_threshold': 8,
-        'daily_double_threshold': 12,
-        'weekly_ot_threshold': 40,
-        'seventh_day_rule': True,  # 1.5x first 8 hrs, 2x after
-        'meal_break_required': True,
-        'meal_break_hours': 5,
-        'meal_break_minutes': 30,
-        'rest_break_per_hours': 4,
-        'rest_break_minutes': 10,
-    },
-    'CO': {
-        'daily_ot_threshold': 12,
-        'weekly_ot_threshold': 40,
-    },
-    'AK': {
-        'daily_ot_threshold': 8,
-        'weekly_ot_threshold': 40,
-    },
-    'NV': {
-        'daily_ot_threshold': 8,
-        'weekly_ot_threshold': 40,
-        'daily_ot_condition': 'hourly_rate_under_1.5x_minimum',
-    },
-    'DEFAULT': {
-        'weekly_ot_threshold': 40,
-    }
-}
-
-
 @timeclock_bp.route('/punch', methods=['POST'])
 @jwt_required()
 def punch():
@@ -269,132 +239,18 @@ def calculate_overtime():
     end_date = date.fromisoformat(data['end_date'])
     hourly_rate = float(data.get('hourly_rate', 0))
     
-    # Get state rules
-    rules = STATE_OT_RULES.get(work_state, STATE_OT_RULES['DEFAULT'])
-    daily_ot_threshold = rules.get('daily_ot_threshold')
-    daily_double_threshold = rules.get('daily_double_threshold')
-    weekly_ot_threshold = rules.get('weekly_ot_threshold', 40)
-    seventh_day_rule = rules.get('seventh_day_rule', False)
-    
-    # Get entries for the period
-    entries = [e for e in TIME_ENTRIES.values() 
-               if e['employee_id'] == employee_id 
-               and start_date.isoformat() <= e['date'] <= end_date.isoformat()]
-    
-    entries.sort(key=lambda x: x['date'])
-    
-    # Calculate by week
-    weeks = {}
-    for entry in entries:
-        entry_date = date.fromisoformat(entry['date'])
-        # Get start of week (Monday)
-        week_start = entry_date - timedelta(days=entry_date.weekday())
-        week_key = week_start.isoformat()
-        
-        if week_key not in weeks:
-            weeks[week_key] = {
-                'days': {},
-                'total_hours': 0,
-                'regular_hours': 0,
-                'overtime_hours': 0,
-                'double_time_hours': 0,
-                'consecutive_days': 0,
-            }
-        
-        day_key = entry['date']
-        if day_key not in weeks[week_key]['days']:
-            weeks[week_key]['days'][day_key] = {
-                'hours': 0,
-                'regular': 0,
-                'overtime': 0,
-                'double_time': 0,
-            }
-        
-        weeks[week_key]['days'][day_key]['hours'] += entry.get('total_hours', 0)
-        weeks[week_key]['total_hours'] += entry.get('total_hours', 0)
-    
-    # Process each week
-    total_regular = 0
-    total_ot = 0
-    total_dt = 0
-    
-    for week_key, week_data in weeks.items():
-        weekly_regular_used = 0
-        days_worked = sorted(week_data['days'].keys())
-        
-        for i, day_key in enumerate(days_worked):
-            day = week_data['days'][day_key]
-            hours = day['hours']
-            day_regular = 0
-            day_ot = 0
-            day_dt = 0
-            
-            # California 7th consecutive day rule
-            is_seventh_day = seventh_day_rule and i >= 6
-            
-            if is_seventh_day:
-                # 7th day: first 8 hours at 1.5x, over 8 at 2x
-                if hours <= 8:
-                    day_ot = hours
-                else:
-                    day_ot = 8
-                    day_dt = hours - 8
-            elif daily_ot_threshold:
-                # Daily overtime states (CA, CO, AK)
-                if hours <= daily_ot_threshold:
-                    day_regular = hours
-                elif daily_double_threshold and hours > daily_double_threshold:
-                    day_regular = daily_ot_threshold
-                    day_ot = daily_double_threshold - daily_ot_threshold
-                    day_dt = hours - daily_double_threshold
-                else:
-                    day_regular = daily_ot_threshold
-                    day_ot = hours - daily_ot_threshold
-            else:
-                # Federal rules - weekly only
-                day_regular = hours
-            
-            day['regular'] = day_regular
-            day['overtime'] = day_ot
-            day['double_time'] = day_dt
-            
-            weekly_regular_used += day_regular
-        
-        # Weekly overtime (for non-daily OT states)
-        if not daily_ot_threshold:
-            total_week_hours = sum(d['hours'] for d in week_data['days'].values())
-            if total_week_hours > weekly_ot_threshold:
-                # Redistribute to weekly OT
-                week_regular = weekly_ot_threshold
-                week_ot = total_week_hours - weekly_ot_threshold
-            else:
-                week_regular = total_week_hours
-                week_ot = 0
-            
-            week_data['regular_hours'] = week_regular
-            week_data['overtime_hours'] = week_ot
-            total_regular += week_regular
-            total_ot += week_ot
-        else:
-            # Sum daily calculations
-            week_data['regular_hours'] = sum(d['regular'] for d in week_data['days'].values())
-            week_data['overtime_hours'] = sum(d['overtime'] for d in week_data['days'].values())
-            week_data['double_time_hours'] = sum(d['double_time'] for d in week_data['days'].values())
-            
-            # Also check weekly cap for daily OT states
-            if week_data['regular_hours'] > weekly_ot_threshold:
-                excess = week_data['regular_hours'] - weekly_ot_threshold
-                week_data['overtime_hours'] += excess
-                week_data['regular_hours'] = weekly_ot_threshold
-            
-            total_regular += week_data['regular_hours']
-            total_ot += week_data['overtime_hours']
-            total_dt += week_data['double_time_hours']
+    entries = [e for e in TIME_ENTRIES.values() if e['employee_id'] == employee_id]
+    results = time_compliance_engine.calculate_period(
+        entries, start_date, end_date, employee_states={employee_id: work_state}
+    )
+    result = results.get(employee_id) or calculate_employee_hours([], work_state)
+    hours = result['hours']
+    ot_multiplier = result['rules_applied'].get('ot_multiplier', 1.5)
     
     # Calculate pay
-    regular_pay = round(total_regular * hourly_rate, 2)
-    ot_pay = round(total_ot * hourly_rate * 1.5, 2)
-    dt_pay = round(total_dt * hourly_rate * 2, 2)
+    regular_pay = round(hours['regular'] * hourly_rate, 2)
+    ot_pay = round(hours['overtime'] * hourly_rate * ot_multiplier, 2)
+    dt_pay = round(hours['double_time'] * hourly_rate * 2, 2)
     total_pay = regular_pay + ot_pay + dt_pay
     
     return jsonify({
@@ -403,15 +259,10 @@ def calculate_overtime():
             'employee_id': employee_id,
             'period': f'{start_date.isoformat()} to {end_date.isoformat()}',
             'work_state': work_state,
-            'rules_applied': rules,
+            'rules_applied': result['rules_applied'],
             'hourly_rate': hourly_rate,
             
-            'hours': {
-                'regular': round(total_regular, 2),
-                'overtime': round(total_ot, 2),
-                'double_time': round(total_dt, 2),
-                'total': round(total_regular + total_ot + total_dt, 2),
-            },
+            'hours': hours,
             
             'pay': {
                 'regular': regular_pay,
@@ -420,86 +271,63 @@ def calculate_overtime():
                 'total': total_pay,
             },
             
-            'weekly_breakdown': weeks,
+            'weekly_breakdown': result['weekly_breakdown'],
         }
     })
 
 
+@timeclock_bp.route('/calculate-period', methods=['POST'])
+@jwt_required()
+def calculate_period():
+    """Calculate overtime and break violations for every employee in a pay period"""
+    data = request.get_json()
+    
+    start_date = date.fromisoformat(data['start_date'])
+    end_date = date.fromisoformat(data['end_date'])
+    employee_states = {
+        emp_id: state.upper() for emp_id, state in (data.get('employee_states') or {}).items()
+    }
+    
+    results = time_compliance_engine.calculate_period(
+        TIME_ENTRIES.values(), start_date, end_date,
+        employee_states=employee_states,
+        default_state=data.get('default_state', 'DEFAULT').upper()
+    )
+    
+    return jsonify({
+        'success': True,
+        'period': f'{start_date.isoformat()} to {end_date.isoformat()}',
+        'employee_count': len(results),
+        'employees': results,
+        'compliance': time_compliance_engine.summarize_violations(results),
+    })
+
+
 @timeclock_bp.route('/meal-break-violations', methods=['GET'])
 @jwt_required()
 def check_meal_break_violations():
-    """Check for California meal/rest break violations"""
+    """Check meal/rest break violations under one state's rules (California unless work_state is given)"""
     employee_id = request.args.get('employee_id')
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
+    work_state = request.args.get('work_state', 'CA').upper()
     
-    entries = list(TIME_ENTRIES.values())
-    
-    if employee_id:
-        entries = [e for e in entries if e['employee_id'] == employee_id]
+    grouped = time_compliance_engine.group_entries(
+        TIME_ENTRIES.values(), start_date, end_date,
+        employee_ids=[employee_id] if employee_id else None
+    )
+    results = {}
+    for emp_id, entries in grouped.items():
+        results[emp_id] = calculate_employee_hours(entries, work_state)
     
-    if start_date:
-        entries = [e for e in entries if e['date'] >= start_date]
-    
-    if end_date:
-        entries = [e for e in entries if e['date'] <= end_date]
-    
-    violations = []
-    
-    for entry in entries:
-        hours_worked = entry.get('total_hours', 0)
-        breaks = entry.get('breaks', [])
-        
-        # California rules
-        if hours_worked > 5:
-            # Must have 30-minute meal break
-            meal_breaks = [b for b in breaks if b.get('type') == 'meal' and b.get('duration_minutes', 0) >= 30]
-            if not meal_breaks:
-                violations.append({
-                    'entry_id': entry['id'],
-                    'employee_id': entry['employee_id'],
-                    'date': entry['date'],
-                    'violation_type': 'missing_meal_break',
-                    'hours_worked': hours_worked,
-                    'penalty': 'One hour of pay at regular rate',
-                    'description': 'Worked over 5 hours without 30-minute meal break'
-                })
-        
-        if hours_worked > 10:
-            # Must have second meal break
-            meal_breaks = [b for b in breaks if b.get('type') == 'meal' and b.get('duration_minutes', 0) >= 30]
-            if len(meal_breaks) < 2:
-                violations.append({
-                    'entry_id': entry['id'],
-                    'employee_id': entry['employee_id'],
-                    'date': entry['date'],
-                    'violation_type': 'missing_second_meal_break',
-                    'hours_worked': hours_worked,
-                    'penalty': 'One hour of pay at regular rate',
-                    'description': 'Worked over 10 hours without second 30-minute meal break'
-                })
-        
-        # Rest break check (every 4 hours)
-        rest_periods_required = int(hours_worked / 4)
-        rest_breaks = [b for b in breaks if b.get('type') == 'rest']
-        if len(rest_breaks) < rest_periods_required:
-            violations.append({
-                'entry_id': entry['id'],
-                'employee_id': entry['employee_id'],
-                'date': entry['date'],
-                'violation_type': 'missing_rest_break',
-                'hours_worked': hours_worked,
-                'rest_periods_required': rest_periods_required,
-                'rest_periods_taken': len(rest_breaks),
-                'penalty': 'One hour of pay at regular rate',
-                'description': f'Required {rest_periods_required} rest breaks, only {len(rest_breaks)} taken'
-            })
+    summary = time_compliance_engine.summarize_violations(results)
     
     return jsonify({
         'success': True,
-        'violations': violations,
-        'count': len(violations),
-        'total_penalty_hours': len(violations)  # Each violation = 1 hour penalty
+        'work_state': work_state,
+        'violations': summary['violations'],
+        'count': summary['count'],
+        'total_penalty_hours': summary['total_penalty_hours']
     })
 
 
@@ -0,0 +1,84 @@
+"""
+SAURELLIUS PAYSTUB HTML BENCHMARK
+Templating cost per stub for every theme: PaystubGenerator.generate_html in this tree
+vs the generate_html of a baseline git revision, on the same stubs and QR seal.
+
+Run: python -m scripts.benchmark_paystub_html [--baseline HEAD] [--stubs 200] [--repeat 7]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import subprocess
+import time
+import types
+
+from services.paystub_generator import COLOR_THEMES, PaystubGenerator, qr_svg
+from scripts.benchmark_paystub_pdf import sample_paystub
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+QR_MARKUP = qr_svg([[(x * y + x) % 3 == 0 for x in range(45)] for y in range(45)])
+VERIFICATION_ID = 'SAU2025ABCDEFGH'
+DOCUMENT_HASH = '9f86d081884c7d659a2feaa0c55ad015'
+
+
+def load_baseline(revision: str) -> PaystubGenerator:
+    """A generator built from services/paystub_generator.py as of `revision`."""
+    path = 'backend/services/paystub_generator.py'
+    source = subprocess.run(['git', 'show', f'{revision}:{path}'], cwd=BACKEND_DIR,
+                            check=True, capture_output=True, text=True).stdout
+    module = types.ModuleType('baseline_paystub_generator')
+    module.__file__ = f'{revision}:{path}'
+    exec(compile(source, module.__file__, 'exec'), module.__dict__)
+    # generate_html needs no instance state; skip __init__ (it starts PDF helpers)
+    return module.PaystubGenerator.__new__(module.PaystubGenerator)
+
+
+def render_batch(generator, stubs) -> float:
+    """Render every stub in every theme; returns the elapsed seconds."""
+    started = time.perf_counter()
+    for theme in COLOR_THEMES:
+        for stub in stubs:
+            generator.generate_html(stub, theme, QR_MARKUP, VERIFICATION_ID, DOCUMENT_HASH)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--baseline', default='HEAD', help='git revision to compare against')
+    parser.add_argument('--stubs', type=int, default=200, help='stubs rendered per theme')
+    parser.add_argument('--repeat', type=int, default=7)
+    args = parser.parse_args()
+
+    stubs = [sample_paystub(i) for i in range(args.stubs)]
+    renders = len(COLOR_THEMES) * len(stubs)
+    generators = {
+        f'baseline {args.baseline}': load_baseline(args.baseline),
+        'working tree': PaystubGenerator.__new__(PaystubGenerator),
+    }
+
+    print(f"{len(COLOR_THEMES)} themes x {len(stubs)} stubs = {renders:,} renders, "
+          f"best of {args.repeat} interleaved runs\n")
+    header = f"{'generate_html':<24}{'us/stub':>10}{'stubs/s':>12}{'total ms':>11}"
+    print(header)
+    print('-' * len(header))
+
+    # Interleave the two so clock drift and noisy neighbours hit both equally
+    best = {}
+    for generator in generators.values():
+        render_batch(generator, stubs[:10])  # warm up
+    for _ in range(args.repeat):
+        for name, generator in generators.items():
+            elapsed = render_batch(generator, stubs)
+            best[name] = min(best.get(name, elapsed), elapsed)
+    for name, elapsed in best.items():
+        print(f"{name:<24}{elapsed / renders * 1e6:>10.1f}{renders / elapsed:>12,.0f}{elapsed * 1000:>11.1f}")
+
+    baseline, current = best.values()
+    print(f"\nworking tree takes {current / baseline:.0%} of the baseline time per stub")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+SAURELLIUS PAYSTUB PDF BENCHMARK
+Throughput and memory per stub for each PDF backend (headless Chromium vs native ReportLab).
+Each backend runs in its own process so peak RSS is not shared between them.
+
+Run: python -m scripts.benchmark_paystub_pdf [--count 50] [--theme diego_original] [--backends chromium,native]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import importlib.util
+import json
+import resource
+import statistics
+import subprocess
+import tempfile
+import time
+
+from services.paystub_generator import paystub_generator, number_to_words, PDF_BACKENDS
+
+
+def sample_paystub(i: int) -> dict:
+    """A realistic biweekly stub; amounts vary so no two renders are identical."""
+    rate = 28 + i % 40
+    regular = rate * 80
+    overtime = rate * 1.5 * (i % 6)
+    gross = round(regular + overtime, 2)
+    taxes = [('Federal Income Tax', 0.12), ('Social Security', 0.062), ('Medicare', 0.0145),
+             ('CA State Tax', 0.045), ('CA SDI', 0.009)]
+    deductions = [{'description': name, 'type': 'Tax', 'current': round(gross * pct, 2),
+                   'ytd': round(gross * pct * 6, 2)} for name, pct in taxes]
+    deductions.append({'description': '401(k)', 'type': 'Pre-Tax', 'current': round(gross * 0.05, 2),
+                       'ytd': round(gross * 0.3, 2)})
+    net = round(gross - sum(d['current'] for d in deductions), 2)
+    return {
+        'company': {'name': 'TechStart Solutions LLC', 'address': '123 Market St, San Francisco, CA 94105'},
+        'employee': {'name': f'Employee {i:04d}', 'state': 'CA', 'ssn_masked': f'XXX-XX-{1000 + i % 9000}'},
+        'pay_info': {'period_start': '2025-03-01', 'period_end': '2025-03-14', 'pay_date': '2025-03-21'},
+        'check_info': {'number': str(100000 + i)},
+        'earnings': [
+            {'description': 'Regular', 'rate': f'${rate:.2f}', 'hours': '80', 'current': regular, 'ytd': regular * 6},
+            {'description': 'Overtime', 'rate': f'${rate * 1.5:.2f}', 'hours': str(i % 6),
+             'current': overtime, 'ytd': overtime * 6},
+        ],
+        'deductions': deductions,
+        'totals': {'gross_pay': gross, 'gross_pay_ytd': gross * 6, 'net_pay': net, 'net_pay_ytd': net * 6,
+                   'amount_words': number_to_words(net)},
+    }
+
+
+def _maxrss_mb(who) -> float:
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(who).ru_maxrss / 1024
+
+
+def worker(backend: str, count: int, theme: str) -> dict:
+    """Render `count` stubs in this process and report timings and memory."""
+    baseline_mb = _maxrss_mb(resource.RUSAGE_SELF)
+    baseline_child_mb = _maxrss_mb(resource.RUSAGE_CHILDREN)  # helpers spawned at import time
+    samples, sizes = [], []
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        for i in range(count):
+            path = os.path.join(tmp, f'stub_{i}.pdf')
+            t = time.perf_counter()
+            result = paystub_generator.generate_paystub_pdf(sample_paystub(i), path, theme, backend)
+            samples.append((time.perf_counter() - t) * 1000)
+            if not result['success']:
+                return {'backend': backend, 'error': result['error']}
+            sizes.append(result['file_size'])
+        elapsed = time.perf_counter() - started
+
+    return {
+        'backend': backend,
+        'count': count,
+        'median_ms': statistics.median(samples),
+        'p95_ms': sorted(samples)[int(len(samples) * 0.95) - 1] if len(samples) > 1 else samples[0],
+        'stubs_per_sec': count / elapsed,
+        'self_rss_mb': _maxrss_mb(resource.RUSAGE_SELF),
+        'rss_growth_mb': _maxrss_mb(resource.RUSAGE_SELF) - baseline_mb,
+        'child_rss_mb': (_maxrss_mb(resource.RUSAGE_CHILDREN)
+                         if _maxrss_mb(resource.RUSAGE_CHILDREN) > baseline_child_mb else None),
+        'avg_kb': statistics.mean(sizes) / 1024,
+    }
+
+
+def _mb(n):
+    return '-' if n is None else f'{n:,.0f}'
+
+
+def run_isolated(backend: str, count: int, theme: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, '-m', 'scripts.benchmark_paystub_pdf', '--worker', backend,
+         '--count', str(count), '--theme', theme],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True, text=True,
+    )
+    lines = [line for line in out.stdout.splitlines() if line.startswith('{')]
+    if not lines:
+        return {'backend': backend, 'error': (out.stderr.strip().splitlines() or ['worker failed'])[-1]}
+    return json.loads(lines[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=50, help='stubs rendered per backend')
+    parser.add_argument('--theme', default='diego_original')
+    parser.add_argument('--backends', default=','.join(PDF_BACKENDS))
+    parser.add_argument('--worker', choices=PDF_BACKENDS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(worker(args.worker, args.count, args.theme)))
+        return
+
+    # ReportLab's optional C speedups
+    accel = 'yes' if importlib.util.find_spec('_rl_accel') else 'no'
+    print(f"{args.count} stubs per backend, theme {args.theme}, rl_accel: {accel}\n")
+    header = (f"{'backend':<10}{'median ms':>11}{'p95 ms':>9}{'stubs/s':>9}"
+              f"{'RSS MB':>9}{'browser MB':>12}{'avg KB':>9}")
+    print(header)
+    print('-' * len(header))
+    results = {}
+    for backend in args.backends.split(','):
+        r = run_isolated(backend.strip(), args.count, args.theme)
+        results[backend] = r
+        if 'error' in r:
+            print(f"{backend:<10}  unavailable: {r['error'][:80]}")
+            continue
+        print(f"{backend:<10}{r['median_ms']:>11.1f}{r['p95_ms']:>9.1f}{r['stubs_per_sec']:>9.1f}"
+              f"{r['self_rss_mb']:>9.0f}{_mb(r['child_rss_mb']):>12}{r['avg_kb']:>9.1f}")
+
+    chromium, native = results.get('chromium', {}), results.get('native', {})
+    if 'median_ms' in chromium and 'median_ms' in native:
+        print(f"\nnative is {chromium['median_ms'] / native['median_ms']:.1f}x faster per stub")
+
+
+if __name__ == '__main__':
+    main()
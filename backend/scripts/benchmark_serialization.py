@@ -0,0 +1,197 @@
+"""
+SAURELLIUS SERIALIZATION BENCHMARK
+Encoding time and wire bytes for our largest JSON responses:
+Flask's default provider vs FastJSONProvider, then gzip/brotli on top.
+
+Run: python -m scripts.benchmark_serialization [--employees 500] [--repeat 20]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import gzip
+import statistics
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from services.http_serialization import FastJSONProvider, HAS_BROTLI, HAS_ORJSON, DEFAULT_COMPRESSION
+from services.payroll_run_service import SaurelliusPayrollRun
+from services.state_payroll_rules import state_payroll_rules
+
+if HAS_BROTLI:
+    import brotli
+
+
+# =============================================================================
+# PAYLOADS
+# =============================================================================
+
+def payroll_register(employees: int) -> dict:
+    """A processed-size payroll run with one paycheck per employee."""
+    service = SaurelliusPayrollRun('bench_company')
+    run = service.create_payroll_run({
+        'pay_period_start': '2025-03-01',
+        'pay_period_end': '2025-03-14',
+        'pay_date': '2025-03-21',
+        'pay_frequency': 'biweekly',
+    })
+    for i in range(employees):
+        service.add_employee_to_payroll(run['id'], {
+            'employee_id': f'emp_{i:05d}',
+            'first_name': 'Employee',
+            'last_name': str(i),
+            'pay_type': 'hourly',
+            'pay_rate': 22 + i % 40,
+            'regular_hours': 80,
+            'overtime_hours': i % 7,
+            'filing_status': 'single' if i % 2 else 'married_filing_jointly',
+            'work_state': ('CA', 'NY', 'TX', 'IL')[i % 4],
+            'retirement_401k_percent': 5,
+            'health_insurance': 125,
+        })
+    return {
+        'success': True,
+        'payroll_run': service.get_payroll_run(run['id']),
+        'paychecks': service.get_paychecks_for_run(run['id']),
+    }
+
+
+def all_states_summary() -> dict:
+    states = state_payroll_rules.get_all_states_summary()
+    return {'success': True, 'states': states, 'total_states': len(states)}
+
+
+def paystub_list(count: int) -> dict:
+    start = date(2024, 1, 5)
+    stubs = []
+    for i in range(count):
+        period_end = start + timedelta(days=14 * (i % 26))
+        gross = Decimal('3076.92') + i % 50
+        stubs.append({
+            'id': i + 1,
+            'employee_id': 1000 + i % 200,
+            'pay_period_start': period_end - timedelta(days=13),
+            'pay_period_end': period_end,
+            'pay_date': period_end + timedelta(days=5),
+            'gross_pay': gross,
+            'net_pay': (gross * Decimal('0.74')).quantize(Decimal('0.01')),
+            'total_deductions': (gross * Decimal('0.26')).quantize(Decimal('0.01')),
+            'verification_id': uuid.uuid4(),
+            'pdf_url': f'https://cdn.example.com/paystubs/{i}.pdf',
+            'theme': 'diego_original',
+            'status': 'completed',
+            'created_at': datetime(2025, 1, 1) + timedelta(hours=i),
+        })
+    return {'success': True, 'paystubs': stubs, 'total': count}
+
+
+def ai_context(memories: int) -> dict:
+    return {
+        'success': True,
+        'context': {
+            'user': {'id': 42, 'role': 'employer', 'company': 'TechStart Solutions LLC'},
+            'memories': [{
+                'id': uuid.uuid4(),
+                'category': ('preference', 'fact', 'task', 'payroll')[i % 4],
+                'content': f'Remembered detail {i}: prefers biweekly payroll on Fridays, CA and NY employees.',
+                'importance': Decimal('0.5') + Decimal(i % 5) / 10,
+                'created_at': datetime(2025, 1, 1) + timedelta(minutes=i),
+            } for i in range(memories)],
+            'recent_payrolls': [{
+                'pay_date': date(2025, 1, 3) + timedelta(days=14 * i),
+                'gross': Decimal('182344.10') + i,
+                'employees': 120 + i,
+            } for i in range(26)],
+        },
+    }
+
+
+# =============================================================================
+# MEASUREMENT
+# =============================================================================
+
+def _median_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t) * 1000)
+    return statistics.median(samples)
+
+
+def benchmark(name: str, payload: dict, app: Flask, repeat: int) -> dict:
+    stock = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app)
+
+    with app.app_context():
+        stock_body = stock.response(payload).get_data()
+        fast_body = fast.response(payload).get_data()
+        stock_ms = _median_ms(lambda: stock.response(payload), repeat)
+        fast_ms = _median_ms(lambda: fast.response(payload), repeat)
+
+    gzip_level = DEFAULT_COMPRESSION['COMPRESS_GZIP_LEVEL']
+    gz = gzip.compress(fast_body, compresslevel=gzip_level, mtime=0)
+    gzip_ms = _median_ms(lambda: gzip.compress(fast_body, compresslevel=gzip_level, mtime=0), repeat)
+    result = {
+        'name': name,
+        'stock_bytes': len(stock_body), 'stock_ms': stock_ms,
+        'fast_bytes': len(fast_body), 'fast_ms': fast_ms,
+        'gzip_bytes': len(gz), 'gzip_ms': gzip_ms,
+        'br_bytes': None, 'br_ms': None,
+    }
+    if HAS_BROTLI:
+        quality = DEFAULT_COMPRESSION['COMPRESS_BR_QUALITY']
+        result['br_bytes'] = len(brotli.compress(fast_body, quality=quality))
+        result['br_ms'] = _median_ms(lambda: brotli.compress(fast_body, quality=quality), repeat)
+    return result
+
+
+def _kb(n):
+    return '-' if n is None else f'{n / 1024:,.1f}'
+
+
+def _ms(n):
+    return '-' if n is None else f'{n:,.2f}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--employees', type=int, default=500, help='paychecks in the payroll register')
+    parser.add_argument('--paystubs', type=int, default=1000, help='rows in the paystub list')
+    parser.add_argument('--memories', type=int, default=300, help='memories in the AI context payload')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    payloads = [
+        ('payroll register', payroll_register(args.employees)),
+        ('all-states rules', all_states_summary()),
+        ('paystub list', paystub_list(args.paystubs)),
+        ('AI context', ai_context(args.memories)),
+    ]
+
+    print(f"orjson: {'yes' if HAS_ORJSON else 'no'}   brotli: {'yes' if HAS_BROTLI else 'no'}   "
+          f"median of {args.repeat} runs\n")
+    header = (f"{'endpoint':<18}{'stock KB':>10}{'stock ms':>10}{'fast KB':>10}{'fast ms':>10}"
+              f"{'gzip KB':>10}{'gzip ms':>10}{'br KB':>10}{'br ms':>10}{'wire saved':>12}{'encode x':>10}")
+    print(header)
+    print('-' * len(header))
+    for name, payload in payloads:
+        r = benchmark(name, payload, app, args.repeat)
+        wire = r['br_bytes'] or r['gzip_bytes']
+        print(f"{r['name']:<18}{_kb(r['stock_bytes']):>10}{_ms(r['stock_ms']):>10}"
+              f"{_kb(r['fast_bytes']):>10}{_ms(r['fast_ms']):>10}"
+              f"{_kb(r['gzip_bytes']):>10}{_ms(r['gzip_ms']):>10}"
+              f"{_kb(r['br_bytes']):>10}{_ms(r['br_ms']):>10}"
+              f"{1 - wire / r['stock_bytes']:>11.0%}{r['stock_ms'] / r['fast_ms']:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -15,8 +15,14 @@ except ImportError:
     saurellius_ai = None
     gemini_ai = None
 
+from .rules_registry import RulesRegistry, rules_registry
+from .response_cache import ResponseCache, response_cache, cached_response
+from .pagination import KeysetPage, keyset_page, paginate, count_cache
+from .tenancy import company_scope, resolve_company_id
 from .state_payroll_rules import StatePayrollRules, state_payroll_rules
-from .paystub_generator import PaystubGenerator, paystub_generator, COLOR_THEMES, number_to_words
+from .paystub_generator import PaystubGenerator, paystub_generator, VerificationSeal, COLOR_THEMES, number_to_words
+from .paystub_pdf_renderer import NativePaystubRenderer, native_renderer
+from .paystub_templates import PaystubTemplates, paystub_templates
 from .messaging_service import SaurelliusCommunicationsHub, communications_hub, RECOGNITION_BADGES
 from .swipe_service import SaurelliusSwipe, swipe_service
 from .workforce_service import SaurelliusWorkforce, workforce_service
@@ -24,13 +30,20 @@ from .benefits_service import SaurelliusBenefits, benefits_service
 
 # Enterprise Services
 from .accounting_service import SaurelliusAccounting, accounting_service
+from .general_ledger_service import GeneralLedgerService, general_ledger
 from .contractor_service import SaurelliusContractors, contractor_service
 from .ach_service import SaurelliusACH, ach_service
 from .tax_filing_service import SaurelliusTaxFiling, tax_filing_service
 from .pto_service import SaurelliusPTO, pto_service
+from .pto_ledger_service import PTOLedgerService, pto_ledger
 from .garnishment_service import SaurelliusGarnishments, garnishment_service
 from .payroll_run_service import SaurelliusPayrollRun, payroll_run_service
+from .payroll_run_calculator import PayrollRunCalculator, payroll_run_calculator
 from .reporting_service import SaurelliusReporting, reporting_service
+from .report_export_service import ReportExportService, report_export_service
+from .payroll_fact_service import PayrollFactService, payroll_facts
+from .payroll_anomaly_service import PayrollAnomalyDetector, payroll_anomaly_detector
+from .ytd_service import YTDAccumulatorService, ytd_accumulators
 from .onboarding_service import SaurelliusOnboarding, onboarding_service
 from .tax_engine_service import SaurelliusTaxEngine, tax_engine
 from .compliance_service import DocuGinuityCompliance, compliance_service
@@ -39,8 +52,13 @@ from .scheduler_service import TaxUpdateScheduler, tax_scheduler, get_scheduler,
 # Production Activation Services
 from .production_tax_engine import ProductionTaxEngine
 from .payroll_processing_service import PayrollProcessingService
+from .time_compliance_service import TimeComplianceEngine, time_compliance_engine
 from .ach_generation_service import ACHGenerationService
 from .government_forms_service import GovernmentFormsService
+from .year_end_service import YearEndPipeline, year_end_pipeline
+from .credential_hasher import CredentialHasher, credential_hasher, HasherSaturated
+from .memory_retrieval import MemoryRetrieval, memory_retrieval
+from .ai_context_cache import AIContextCache, ai_context_cache
 from .security_service import SecurityService
 from .employer_registration_service import EmployerRegistrationService
 from .employee_onboarding_service import EmployeeOnboardingService
@@ -55,6 +73,8 @@ from .document_storage_service import DocumentStorageService, document_storage
 
 # Regulatory Filing
 from .regulatory_filing_service import RegulatoryFilingService, regulatory_filing_service
+from .form_render_service import FormRenderService, form_renderer
+from .deposit_scheduler_service import DepositScheduler, deposit_scheduler
 
 __all__ = [
     # Core
@@ -67,10 +87,26 @@ __all__ = [
     'gemini_ai',
     'StatePayrollRules',
     'state_payroll_rules',
+    'RulesRegistry',
+    'rules_registry',
+    'ResponseCache',
+    'response_cache',
+    'cached_response',
+    'KeysetPage',
+    'keyset_page',
+    'paginate',
+    'count_cache',
+    'company_scope',
+    'resolve_company_id',
     'PaystubGenerator',
     'paystub_generator',
+    'VerificationSeal',
     'COLOR_THEMES',
     'number_to_words',
+    'NativePaystubRenderer',
+    'native_renderer',
+    'PaystubTemplates',
+    'paystub_templates',
     'SaurelliusCommunicationsHub',
     'communications_hub',
     'RECOGNITION_BADGES',
@@ -83,6 +119,8 @@ __all__ = [
     # Enterprise
     'SaurelliusAccounting',
     'accounting_service',
+    'GeneralLedgerService',
+    'general_ledger',
     'SaurelliusContractors',
     'contractor_service',
     'SaurelliusACH',
@@ -91,12 +129,24 @@ __all__ = [
     'tax_filing_service',
     'SaurelliusPTO',
     'pto_service',
+    'PTOLedgerService',
+    'pto_ledger',
     'SaurelliusGarnishments',
     'garnishment_service',
     'SaurelliusPayrollRun',
     'payroll_run_service',
+    'PayrollRunCalculator',
+    'payroll_run_calculator',
     'SaurelliusReporting',
     'reporting_service',
+    'ReportExportService',
+    'report_export_service',
+    'PayrollFactService',
+    'payroll_facts',
+    'PayrollAnomalyDetector',
+    'payroll_anomaly_detector',
+    'YTDAccumulatorService',
+    'ytd_accumulators',
     'SaurelliusOnboarding',
     'onboarding_service',
     # Tax Engine API
@@ -113,8 +163,19 @@ __all__ = [
     # Production Activation
     'ProductionTaxEngine',
     'PayrollProcessingService',
+    'TimeComplianceEngine',
+    'time_compliance_engine',
     'ACHGenerationService',
     'GovernmentFormsService',
+    'YearEndPipeline',
+    'year_end_pipeline',
+    'CredentialHasher',
+    'credential_hasher',
+    'HasherSaturated',
+    'MemoryRetrieval',
+    'memory_retrieval',
+    'AIContextCache',
+    'ai_context_cache',
     'SecurityService',
     'EmployerRegistrationService',
     'EmployeeOnboardingService',
@@ -130,4 +191,8 @@ __all__ = [
     # Regulatory Filing
     'RegulatoryFilingService',
     'regulatory_filing_service',
+    'FormRenderService',
+    'form_renderer',
+    'DepositScheduler',
+    'deposit_scheduler',
 ]
@@ -43,6 +43,15 @@ class AccountCategory(Enum):
     OPERATING_EXPENSE = "operating_expense"
 
 
+# Account codes rolled up in payroll expense and liability breakdowns
+PAYROLL_EXPENSE_CODES = ["5000", "5010", "5020", "5030", "5040", "5050",
+                         "5100", "5110", "5120", "5130",
+                         "5200", "5210", "5220", "5230", "5240", "5250", "5260", "5300", "5400"]
+PAYROLL_LIABILITY_CODES = ["2100", "2110", "2120", "2130", "2200", "2210", "2220",
+                           "2230", "2240", "2250", "2260", "2300", "2310", "2320",
+                           "2330", "2340", "2350", "2400", "2410", "2500", "2510", "2520"]
+
+
 class SaurelliusAccounting:
     """Complete accounting system with double-entry bookkeeping"""
     
@@ -172,18 +181,7 @@ class SaurelliusAccounting:
         Lines format: [{"account_code": "5000", "debit": 1000.00, "credit": 0.00, "memo": ""}]
         """
         entry_id = str(uuid.uuid4())
-        
-        # Validate debits equal credits
-        total_debits = sum(Decimal(str(line.get("debit", 0))) for line in lines)
-        total_credits = sum(Decimal(str(line.get("credit", 0))) for line in lines)
-        
-        if total_debits != total_credits:
-            raise ValueError(f"Debits ({total_debits}) must equal credits ({total_credits})")
-        
-        # Validate all accounts exist
-        for line in lines:
-            if line["account_code"] not in self.accounts:
-                raise ValueError(f"Account {line['account_code']} does not exist")
+        total_debits = self.validate_lines(lines)
         
         # Create entry
         entry = {
@@ -223,11 +221,35 @@ class SaurelliusAccounting:
         self.journal_entries.append(entry)
         return entry
     
+    def validate_lines(self, lines: List[dict]) -> Decimal:
+        """Check debits equal credits and all accounts exist; returns total debits"""
+        total_debits = sum(Decimal(str(line.get("debit", 0))) for line in lines)
+        total_credits = sum(Decimal(str(line.get("credit", 0))) for line in lines)
+        
+        if total_debits != total_credits:
+            raise ValueError(f"Debits ({total_debits}) must equal credits ({total_credits})")
+        
+        for line in lines:
+            if line["account_code"] not in self.accounts:
+                raise ValueError(f"Account {line['account_code']} does not exist")
+        
+        return total_debits
+    
     def create_payroll_journal_entry(self, payroll_data: dict) -> dict:
         """
         Create journal entries for a payroll run.
         Automatically debits expenses and credits liabilities.
         """
+        return self.create_journal_entry(
+            entry_date=date.fromisoformat(payroll_data.get("pay_date", date.today().isoformat())),
+            description=f"Payroll - {payroll_data.get('pay_period', 'Current Period')}",
+            lines=self.build_payroll_lines(payroll_data),
+            reference=payroll_data.get("payroll_id"),
+            source="payroll"
+        )
+    
+    def build_payroll_lines(self, payroll_data: dict) -> List[dict]:
+        """Debit expense and credit liability lines for payroll totals"""
         lines = []
         
         # Gross wages expense
@@ -416,13 +438,7 @@ class SaurelliusAccounting:
                 "memo": "Garnishments payable"
             })
         
-        return self.create_journal_entry(
-            entry_date=date.fromisoformat(payroll_data.get("pay_date", date.today().isoformat())),
-            description=f"Payroll - {payroll_data.get('pay_period', 'Current Period')}",
-            lines=lines,
-            reference=payroll_data.get("payroll_id"),
-            source="payroll"
-        )
+        return lines
     
     def get_journal_entries(self, start_date: Optional[date] = None, 
                            end_date: Optional[date] = None,
@@ -547,12 +563,8 @@ class SaurelliusAccounting:
     
     def _get_payroll_expense_breakdown(self) -> dict:
         """Get detailed breakdown of payroll expenses"""
-        payroll_codes = ["5000", "5010", "5020", "5030", "5040", "5050",
-                        "5100", "5110", "5120", "5130",
-                        "5200", "5210", "5220", "5230", "5240", "5250", "5260", "5300", "5400"]
-        
         breakdown = {}
-        for code in payroll_codes:
+        for code in PAYROLL_EXPENSE_CODES:
             if code in self.accounts:
                 account = self.accounts[code]
                 if account["balance"] != 0:
@@ -602,12 +614,8 @@ class SaurelliusAccounting:
     
     def _get_payroll_liabilities(self) -> dict:
         """Get breakdown of payroll-related liabilities"""
-        liability_codes = ["2100", "2110", "2120", "2130", "2200", "2210", "2220",
-                         "2230", "2240", "2250", "2260", "2300", "2310", "2320",
-                         "2330", "2340", "2350", "2400", "2410", "2500", "2510", "2520"]
-        
         breakdown = {}
-        for code in liability_codes:
+        for code in PAYROLL_LIABILITY_CODES:
             if code in self.accounts:
                 account = self.accounts[code]
                 if account["balance"] != 0:
@@ -0,0 +1,200 @@
+"""
+AI CONTEXT CACHE
+Per-(user, feature) snapshots of the database-backed part of the AI context, kept as compact JSON
+Built lazily on first use; a commit that writes a user's paystubs, employees, memories or insights bumps
+that user's shared version row, and every worker checks it on each hit
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from itertools import chain
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import event, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from models import db, User, Company, Employee, Paystub
+from models_ai import AIContextVersion, UserAIMemory, UserAIInsight
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on snapshot age; covers the rolling 30-day payroll total and bulk writes the listener cannot see
+SNAPSHOT_TTL_SECONDS = int(os.environ.get('AI_CONTEXT_TTL', 300))
+RECENT_TURNS = 5
+
+# Models whose writes change a user's snapshot, with the column that names the user
+WATCHED_MODELS = {
+    Paystub: 'user_id',
+    Employee: 'user_id',
+    UserAIMemory: 'user_id',
+    UserAIInsight: 'user_id',
+    Company: 'user_id',
+    User: 'id',
+}
+
+_PENDING = 'ai_context_users'
+
+Snapshot = Dict[str, Any]
+
+
+def _dumps(snapshot: Snapshot) -> bytes:
+    return json.dumps(snapshot, separators=(',', ':'), default=str).encode()
+
+
+class AIContextCache:
+    """
+    Bounded LRU of serialized context snapshots keyed by (user_id, feature).
+    Every hit decodes a fresh dict, so callers may mutate what they get.
+    Each entry remembers the user's shared version (ai_context_versions) it
+    was built at; a hit re-reads that one row, so a write committed by any
+    worker retires the entry everywhere. A per-user generation stops a build
+    that raced a local invalidation from storing data read before the write.
+    """
+
+    def __init__(self, ttl: int = SNAPSHOT_TTL_SECONDS, max_entries: int = 2048):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple[int, str], Tuple[float, int, bytes]]' = OrderedDict()
+        self._generations: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._watching = False
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, user_id: int, feature: str,
+            build: Callable[[], Tuple[Snapshot, Optional[float]]]) -> Snapshot:
+        """
+        Cached snapshot, or build() -> (snapshot, max_age_seconds) on a miss.
+        max_age shortens the TTL, e.g. when an insight expires sooner.
+        """
+        key = (int(user_id), feature)
+        now = time.monotonic()
+        version = self._shared_version(key[0])
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now and entry[1] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return json.loads(entry[2])
+            self.misses += 1
+            generation = self._generations.get(key[0], 0)
+
+        snapshot, max_age = build()
+        ttl = self.ttl if max_age is None else max(min(self.ttl, max_age), 0)
+        body = _dumps(snapshot)
+        with self._lock:
+            if self._generations.get(key[0], 0) == generation and ttl > 0:
+                self._entries[key] = (now + ttl, version, body)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return json.loads(body)
+
+    def invalidate(self, user_id: Optional[int] = None):
+        """Drop one user's snapshots (every snapshot when user_id is None)."""
+        with self._lock:
+            self.invalidations += 1
+            if user_id is None:
+                self._entries.clear()
+                for uid in self._generations:
+                    self._generations[uid] += 1
+                return
+            uid = int(user_id)
+            self._generations[uid] = self._generations.get(uid, 0) + 1
+            for key in [k for k in self._entries if k[0] == uid]:
+                del self._entries[key]
+
+    def turn_logged(self, user_id: int, activity: Dict[str, Any]):
+        """Prepend a conversation turn to the user's snapshots instead of dropping them."""
+        uid = int(user_id)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == uid]:
+                expires, version, body = self._entries[key]
+                snapshot = json.loads(body)
+                snapshot['recent_conversations'] = ([activity] + snapshot.get('recent_conversations', []))[:RECENT_TURNS]
+                self._entries[key] = (expires, version, _dumps(snapshot))
+
+    # -------------------------------------------------------------------------
+    # WRITE TRACKING
+    # -------------------------------------------------------------------------
+
+    def _collect(self, session, flush_context):
+        users = session.info.setdefault(_PENDING, set())
+        for obj in chain(session.new, session.dirty, session.deleted):
+            column = WATCHED_MODELS.get(type(obj))
+            if column is not None:
+                user_id = getattr(obj, column, None)
+                if user_id is not None:
+                    users.add(user_id)
+
+    def _shared_version(self, user_id: int) -> int:
+        version = db.session.execute(
+            select(AIContextVersion.version).where(AIContextVersion.user_id == user_id)
+        ).scalar()
+        return version or 0
+
+    def mark_changed(self, session, user_id: int):
+        """Retire a user's snapshots when `session` commits (for bulk writes the listener cannot see)."""
+        session.info.setdefault(_PENDING, set()).add(user_id)
+
+    def _publish(self, session):
+        """Bump the pending users' shared versions inside the committing transaction."""
+        session.flush()  # the listener sees this transaction's last writes first
+        users = sorted({int(u) for u in session.info.get(_PENDING, ())})
+        if not users:
+            return
+        table = AIContextVersion.__table__
+        dialect = session.get_bind().dialect.name
+        if dialect in ('postgresql', 'sqlite'):
+            insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+            stmt = insert(table).values([{'user_id': u, 'version': 1} for u in users])
+            session.execute(stmt.on_conflict_do_update(
+                index_elements=[table.c.user_id], set_={'version': table.c.version + 1}
+            ))
+            return
+        session.execute(update(table).where(table.c.user_id.in_(users)).values(version=table.c.version + 1))
+        existing = set(session.execute(select(table.c.user_id).where(table.c.user_id.in_(users))).scalars())
+        missing = [{'user_id': u, 'version': 1} for u in users if u not in existing]
+        if missing:
+            session.execute(table.insert(), missing)
+
+    def _committed(self, session):
+        for user_id in session.info.pop(_PENDING, ()):
+            self.invalidate(user_id)
+
+    def _rolled_back(self, session):
+        session.info.pop(_PENDING, None)
+
+    def init_app(self, app):
+        """
+        Listen to ORM flushes and publish at commit, so a snapshot is never
+        rebuilt from data another request is about to change. Bulk
+        query.update()/delete() calls bypass the listener and use mark_changed.
+        """
+        if not self._watching:
+            event.listen(Session, 'after_flush', self._collect)
+            event.listen(Session, 'before_commit', self._publish)
+            event.listen(Session, 'after_commit', self._committed)
+            event.listen(Session, 'after_rollback', self._rolled_back)
+            self._watching = True
+        return app
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'entries': len(self._entries),
+            'bytes': sum(len(body) for _, _, body in self._entries.values()),
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'ttl_seconds': self.ttl,
+        }
+
+
+# Singleton instance
+ai_context_cache = AIContextCache()
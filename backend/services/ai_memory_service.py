@@ -12,6 +12,8 @@ from models_ai import (
 import json
 import logging
 from sqlalchemy import func, desc
+from services.memory_retrieval import memory_retrieval
+from services.ai_context_cache import ai_context_cache
 
 logger = logging.getLogger(__name__)
 
@@ -44,23 +46,47 @@ class AIMemoryService:
     # CONTEXT BUILDING
     # =========================================================================
     
-    def build_full_context(self, feature: str = 'general') -> dict:
+    def build_full_context(self, feature: str = 'general', query: str = None,
+                           session_id: str = None) -> dict:
         """
         Build comprehensive context for AI interactions.
         This is the main method that provides all relevant user context.
+        The database-backed parts come from a cached per-feature snapshot.
+        With a query (the user's message), memories are ranked by relevance to
+        it and related turns from earlier sessions are included.
         """
+        snapshot = ai_context_cache.get(self.user_id, feature, lambda: self._build_snapshot(feature))
         context = {
-            'user': self._get_user_context(),
-            'business': self._get_business_context(),
+            'user': snapshot['user'],
+            'business': snapshot['business'],
             'profile': self.profile.to_context_dict(),
-            'recent_activity': self._get_recent_activity(),
-            'memories': self._get_relevant_memories(feature),
-            'insights': self._get_active_insights(),
+            'recent_activity': (snapshot['recent_conversations'] + snapshot['recent_paystubs'])[:10],
+            'memories': self._get_relevant_memories(feature, query=query, candidates=snapshot['memories']),
+            'insights': snapshot['insights'],
             'feature_context': feature,
             'timestamp': datetime.utcnow().isoformat()
         }
+        if query:
+            context['related_conversations'] = self.search_conversations(
+                query, limit=5, exclude_session=session_id
+            )
         return context
     
+    def _build_snapshot(self, feature: str) -> tuple:
+        """Context parts read from the database, and how long they stay valid (None = cache default)"""
+        insights = self._active_insight_rows()
+        expiries = [i.valid_until for i in insights if i.valid_until]
+        max_age = (min(expiries) - datetime.utcnow()).total_seconds() if expiries else None
+        snapshot = {
+            'user': self._get_user_context(),
+            'business': self._get_business_context(),
+            'recent_conversations': self._get_recent_conversations(),
+            'recent_paystubs': self._get_recent_paystubs(),
+            'memories': self._load_memories(feature),
+            'insights': [i.to_dict() for i in insights],
+        }
+        return snapshot, max_age
+    
     def _get_user_context(self) -> dict:
         """Get basic user information for context"""
         if not self.user:
@@ -106,39 +132,41 @@ class AIMemoryService:
         
         return context
     
-    def _get_recent_activity(self, limit: int = 10) -> list:
-        """Get recent user activity for context"""
-        activities = []
-        
-        # Recent conversations
+    @staticmethod
+    def _conversation_activity(convo) -> dict:
+        return {
+            'type': 'conversation',
+            'context': convo.context_type,
+            'message': convo.message[:100] if convo.role == 'user' else None,
+            'time': convo.created_at.isoformat() if convo.created_at else None
+        }
+    
+    def _get_recent_conversations(self, limit: int = 5) -> list:
+        """Latest conversation turns, newest first"""
         recent_convos = UserAIConversation.query.filter_by(
             user_id=self.user_id
-        ).order_by(desc(UserAIConversation.created_at)).limit(5).all()
+        ).order_by(desc(UserAIConversation.created_at)).limit(limit).all()
         
-        for convo in recent_convos:
-            activities.append({
-                'type': 'conversation',
-                'context': convo.context_type,
-                'message': convo.message[:100] if convo.role == 'user' else None,
-                'time': convo.created_at.isoformat()
-            })
-        
-        # Recent paystubs
+        return [self._conversation_activity(convo) for convo in recent_convos]
+    
+    def _get_recent_paystubs(self, limit: int = 3) -> list:
+        """Latest paystubs, newest first"""
         recent_paystubs = Paystub.query.filter_by(
             user_id=self.user_id
-        ).order_by(desc(Paystub.created_at)).limit(3).all()
+        ).order_by(desc(Paystub.created_at)).limit(limit).all()
         
-        for ps in recent_paystubs:
-            activities.append({
-                'type': 'paystub_created',
-                'amount': float(ps.gross_pay) if ps.gross_pay else 0,
-                'time': ps.created_at.isoformat() if ps.created_at else None
-            })
-        
-        return activities[:limit]
+        return [{
+            'type': 'paystub_created',
+            'amount': float(ps.gross_pay) if ps.gross_pay else 0,
+            'time': ps.created_at.isoformat() if ps.created_at else None
+        } for ps in recent_paystubs]
     
-    def _get_relevant_memories(self, feature: str, limit: int = 10) -> list:
-        """Get memories relevant to the current feature/context"""
+    def _get_recent_activity(self, limit: int = 10) -> list:
+        """Get recent user activity for context"""
+        return (self._get_recent_conversations() + self._get_recent_paystubs())[:limit]
+    
+    def _load_memories(self, feature: str, limit: int = 10) -> list:
+        """The feature's most important memories (plus general ones)"""
         memories = UserAIMemory.query.filter_by(
             user_id=self.user_id
         ).filter(
@@ -148,24 +176,51 @@ class AIMemoryService:
             desc(UserAIMemory.access_count)
         ).limit(limit).all()
         
-        result = []
-        for mem in memories:
-            result.append({
-                'type': mem.memory_type,
-                'key': mem.key,
-                'value': mem.value,
-                'importance': mem.importance
-            })
-            # Update access tracking
-            mem.access_count += 1
-            mem.last_accessed = datetime.utcnow()
+        return [{
+            'id': mem.id,
+            'type': mem.memory_type,
+            'key': mem.key,
+            'value': mem.value,
+            'importance': mem.importance
+        } for mem in memories]
+    
+    def _get_relevant_memories(self, feature: str, limit: int = 10, query: str = None,
+                               candidates: list = None) -> list:
+        """
+        Get memories relevant to the current feature/context.
+        Memories matching the query come first; the feature's most important
+        memories (candidates, loaded when not given) fill any remaining slots.
+        """
+        if candidates is None:
+            candidates = self._load_memories(feature, limit)
+        
+        memories = []
+        if query:
+            memories = [{
+                'id': hit['id'],
+                'type': hit['type'],
+                'key': hit['key'],
+                'value': hit['value'],
+                'importance': hit['importance']
+            } for hit in memory_retrieval.search(self.user_id, query, limit=limit, sources=('memory',))]
+        
+        seen = {m['id'] for m in memories}
+        memories += [m for m in candidates if m['id'] not in seen][:limit - len(memories)]
+        
+        # Update access tracking in one statement; a bulk update leaves the cached snapshot alone
+        if memories:
+            UserAIMemory.query.filter(
+                UserAIMemory.id.in_([m['id'] for m in memories])
+            ).update({
+                UserAIMemory.access_count: UserAIMemory.access_count + 1,
+                UserAIMemory.last_accessed: datetime.utcnow()
+            }, synchronize_session=False)
+            db.session.commit()
         
-        db.session.commit()
-        return result
+        return [{k: m[k] for k in ('type', 'key', 'value', 'importance')} for m in memories]
     
-    def _get_active_insights(self, limit: int = 5) -> list:
-        """Get active/relevant insights for the user"""
-        insights = UserAIInsight.query.filter_by(
+    def _active_insight_rows(self, limit: int = 5) -> list:
+        return UserAIInsight.query.filter_by(
             user_id=self.user_id,
             status='new'
         ).filter(
@@ -175,8 +230,10 @@ class AIMemoryService:
             desc(UserAIInsight.priority == 'high'),
             desc(UserAIInsight.created_at)
         ).limit(limit).all()
-        
-        return [i.to_dict() for i in insights]
+    
+    def _get_active_insights(self, limit: int = 5) -> list:
+        """Get active/relevant insights for the user"""
+        return [i.to_dict() for i in self._active_insight_rows(limit)]
     
     # =========================================================================
     # MEMORY MANAGEMENT
@@ -194,6 +251,7 @@ class AIMemoryService:
         ).first()
         
         if existing:
+            memory = existing
             existing.value = value
             existing.importance = max(existing.importance, importance)
             existing.confidence = confidence
@@ -212,6 +270,7 @@ class AIMemoryService:
             db.session.add(memory)
         
         db.session.commit()
+        memory_retrieval.memory_saved(memory)
         logger.info(f"Stored memory for user {self.user_id}: {key}")
     
     def recall(self, key: str) -> str:
@@ -232,22 +291,32 @@ class AIMemoryService:
         UserAIMemory.query.filter_by(
             user_id=self.user_id, key=key
         ).delete()
+        ai_context_cache.mark_changed(db.session, self.user_id)
         db.session.commit()
+        memory_retrieval.memory_forgotten(self.user_id, key)
     
     def search_memories(self, query: str, limit: int = 10) -> list:
-        """Search memories by content"""
-        memories = UserAIMemory.query.filter(
-            UserAIMemory.user_id == self.user_id,
-            (UserAIMemory.key.ilike(f'%{query}%')) | 
-            (UserAIMemory.value.ilike(f'%{query}%'))
-        ).order_by(desc(UserAIMemory.importance)).limit(limit).all()
-        
+        """Search memories by content, best matches first (BM25, plus embeddings when configured)"""
+        return [{
+            'key': hit['key'],
+            'value': hit['value'],
+            'type': hit['type'],
+            'category': hit['category'],
+            'score': hit['score']
+        } for hit in memory_retrieval.search(self.user_id, query, limit=limit, sources=('memory',))]
+    
+    def search_conversations(self, query: str, limit: int = 5, exclude_session: str = None) -> list:
+        """Past conversation turns most relevant to a query"""
         return [{
-            'key': m.key,
-            'value': m.value,
-            'type': m.memory_type,
-            'category': m.category
-        } for m in memories]
+            'role': hit['role'],
+            'message': hit['message'],
+            'context': hit['context'],
+            'time': hit['time'],
+            'score': hit['score']
+        } for hit in memory_retrieval.search(
+            self.user_id, query, limit=limit, sources=('turn',),
+            exclude_sessions=(exclude_session,) if exclude_session else ()
+        )]
     
     # =========================================================================
     # CONVERSATION MANAGEMENT
@@ -276,6 +345,8 @@ class AIMemoryService:
             self.profile.total_interactions += 1
         
         db.session.commit()
+        memory_retrieval.turn_logged(convo)
+        ai_context_cache.turn_logged(self.user_id, self._conversation_activity(convo))
         return convo.id
     
     def get_conversation_history(self, session_id: str = None, limit: int = 20) -> list:
@@ -24,11 +24,28 @@ from models import (
     ContractorExpense,
     ContractorMileageLog,
     ContractorForm1099,
+    ContractorPaymentYTD,
     db,
 )
+from cryptography.fernet import Fernet, InvalidToken
+from sqlalchemy import case, func
+from sqlalchemy.exc import IntegrityError
 
-# Encryption key from environment
-ENCRYPTION_KEY = os.environ.get('SAURELLIUS_ENCRYPTION_KEY', 'default-dev-key-change-in-production')
+# Encryption key from environment (a Fernet key, as in the other services). TINs and
+# account numbers are stored reversibly, so there is no fallback key: without one
+# nothing sensitive is written and nothing can be read back.
+ENCRYPTION_KEY = os.environ.get('SAURELLIUS_ENCRYPTION_KEY')
+cipher_suite = None
+if ENCRYPTION_KEY:
+    cipher_suite = Fernet(ENCRYPTION_KEY if isinstance(ENCRYPTION_KEY, bytes) else ENCRYPTION_KEY.encode())
+
+# Keeps IN (...) lists under SQLite's bound-parameter limit
+ID_BATCH_SIZE = 500
+
+
+def _year_bounds(year: int) -> Tuple[str, str]:
+    """ISO date range for a tax year; sargable on the payment_date index."""
+    return f"{year}-01-01", f"{year + 1}-01-01"
 
 
 class ContractorSelfServiceManager:
@@ -131,10 +148,21 @@ class ContractorSelfServiceManager:
         """Encrypt sensitive data (SSN, EIN, bank accounts)."""
         if not data:
             return ''
-        # In production: Use proper AES-256 encryption
-        key = hashlib.sha256(ENCRYPTION_KEY.encode()).digest()
-        encrypted = hashlib.sha256(f"{key}{data}".encode()).hexdigest()
-        return f"ENC:{encrypted[:32]}"
+        if cipher_suite is None:
+            raise RuntimeError('SAURELLIUS_ENCRYPTION_KEY is not set; refusing to store sensitive data')
+        return cipher_suite.encrypt(data.encode()).decode()
+
+    def _decrypt_sensitive_data(self, token: str) -> str:
+        """
+        Decrypt a value from _encrypt_sensitive_data. Values stored as
+        one-way 'ENC:' digests before encryption was reversible return ''.
+        """
+        if not token or token.startswith('ENC:') or cipher_suite is None:
+            return ''
+        try:
+            return cipher_suite.decrypt(token.encode()).decode()
+        except InvalidToken:
+            return ''
 
     def _mask_ssn(self, ssn: str) -> str:
         """Mask SSN for display (show last 4)."""
@@ -455,12 +483,126 @@ class ContractorSelfServiceManager:
         return w9.to_safe_dict()
 
     def _payments_for_year(self, contractor_id: str, year: int) -> List[ContractorInvoicePayment]:
+        start, end = _year_bounds(year)
         return (
             ContractorInvoicePayment.query.filter(ContractorInvoicePayment.contractor_id == contractor_id)
-            .filter(ContractorInvoicePayment.payment_date.like(f"{year}%"))
+            .filter(ContractorInvoicePayment.payment_date >= start)
+            .filter(ContractorInvoicePayment.payment_date < end)
             .all()
         )
 
+    def _apply_payment_ytd(self, payment: ContractorInvoicePayment) -> None:
+        """Add a payment to its (payer, contractor, tax year) running total."""
+        tax_year = int(payment.payment_date[:4])
+        amount = Decimal(str(payment.amount))
+        if self._add_to_payment_ytd(payment, tax_year, amount):
+            return
+        try:
+            with db.session.begin_nested():
+                db.session.add(ContractorPaymentYTD(
+                    client_id=payment.client_id,
+                    contractor_id=payment.contractor_id,
+                    tax_year=tax_year,
+                    total_paid=amount,
+                    payment_count=1,
+                    last_payment_date=payment.payment_date,
+                ))
+        except IntegrityError:
+            # A concurrent first payment created the row (uq_contractor_payment_ytd); add to it
+            self._add_to_payment_ytd(payment, tax_year, amount)
+
+    def _add_to_payment_ytd(self, payment: ContractorInvoicePayment, tax_year: int,
+                            amount: Decimal) -> int:
+        return (
+            ContractorPaymentYTD.query.filter_by(
+                client_id=payment.client_id,
+                contractor_id=payment.contractor_id,
+                tax_year=tax_year,
+            )
+            .update(
+                {
+                    ContractorPaymentYTD.total_paid: ContractorPaymentYTD.total_paid + amount,
+                    ContractorPaymentYTD.payment_count: ContractorPaymentYTD.payment_count + 1,
+                    ContractorPaymentYTD.last_payment_date: case(
+                        (ContractorPaymentYTD.last_payment_date >= payment.payment_date,
+                         ContractorPaymentYTD.last_payment_date),
+                        else_=payment.payment_date,
+                    ),
+                },
+                synchronize_session=False,
+            )
+        )
+
+    def _reconcile_payment_ytd(self, year: int, client_id: str = None,
+                               contractor_id: str = None) -> None:
+        """
+        Rebuild the running totals in scope when they don't account for every
+        payment, e.g. payments recorded before the totals table existed.
+        """
+        start, end = _year_bounds(year)
+        payments = ContractorInvoicePayment.query.filter(
+            ContractorInvoicePayment.payment_date >= start,
+            ContractorInvoicePayment.payment_date < end,
+        )
+        counted = db.session.query(
+            func.coalesce(func.sum(ContractorPaymentYTD.payment_count), 0)
+        ).filter(ContractorPaymentYTD.tax_year == year)
+        if client_id:
+            payments = payments.filter(ContractorInvoicePayment.client_id == client_id)
+            counted = counted.filter(ContractorPaymentYTD.client_id == client_id)
+        if contractor_id:
+            payments = payments.filter(ContractorInvoicePayment.contractor_id == contractor_id)
+            counted = counted.filter(ContractorPaymentYTD.contractor_id == contractor_id)
+        if payments.count() != counted.scalar():
+            self.rebuild_payment_ytd(client_id=client_id, year=year, contractor_id=contractor_id)
+
+    def rebuild_payment_ytd(self, client_id: str = None, year: int = None,
+                            contractor_id: str = None) -> int:
+        """
+        Recompute running 1099 totals from the payments table in one
+        GROUP BY pass. Used to backfill payments recorded before the
+        totals table existed.
+        """
+        tax_year = func.substr(ContractorInvoicePayment.payment_date, 1, 4)
+        query = db.session.query(
+            ContractorInvoicePayment.client_id,
+            ContractorInvoicePayment.contractor_id,
+            tax_year.label('tax_year'),
+            func.sum(ContractorInvoicePayment.amount),
+            func.count(ContractorInvoicePayment.id),
+            func.max(ContractorInvoicePayment.payment_date),
+        ).filter(ContractorInvoicePayment.payment_date.isnot(None))
+        existing = ContractorPaymentYTD.query
+        if client_id:
+            query = query.filter(ContractorInvoicePayment.client_id == client_id)
+            existing = existing.filter(ContractorPaymentYTD.client_id == client_id)
+        if contractor_id:
+            query = query.filter(ContractorInvoicePayment.contractor_id == contractor_id)
+            existing = existing.filter(ContractorPaymentYTD.contractor_id == contractor_id)
+        if year:
+            start, end = _year_bounds(year)
+            query = query.filter(ContractorInvoicePayment.payment_date >= start,
+                                 ContractorInvoicePayment.payment_date < end)
+            existing = existing.filter(ContractorPaymentYTD.tax_year == year)
+
+        rows = [
+            {
+                'client_id': payer,
+                'contractor_id': contractor_id,
+                'tax_year': int(row_year),
+                'total_paid': Decimal(str(total or 0)).quantize(Decimal('0.01')),
+                'payment_count': count,
+                'last_payment_date': last_date,
+            }
+            for payer, contractor_id, row_year, total, count, last_date in query.group_by(
+                ContractorInvoicePayment.client_id, ContractorInvoicePayment.contractor_id, tax_year
+            )
+        ]
+        existing.delete(synchronize_session=False)
+        db.session.bulk_insert_mappings(ContractorPaymentYTD, rows)
+        db.session.commit()
+        return len(rows)
+
     def setup_payment_method(self, contractor_id: str, data: Dict) -> Dict:
         """Set up contractor payment method."""
         contractor = ContractorAccount.query.get(contractor_id)
@@ -795,6 +937,7 @@ class ContractorSelfServiceManager:
             notes=data.get('notes', ''),
         )
         db.session.add(payment)
+        self._apply_payment_ytd(payment)
 
         invoice.amount_paid = float(Decimal(str(invoice.amount_paid)) + amount)
         if invoice.amount_paid >= invoice.total:
@@ -944,8 +1087,17 @@ class ContractorSelfServiceManager:
         if not contractor:
             return {'success': False, 'error': 'Contractor not found'}
 
-        year_payments = self._payments_for_year(contractor_id, year)
-        total_paid = sum(Decimal(str(p.amount)) for p in year_payments)
+        self._reconcile_payment_ytd(year, contractor_id=contractor_id)
+        total_paid, payment_count = (
+            db.session.query(
+                func.coalesce(func.sum(ContractorPaymentYTD.total_paid), 0),
+                func.coalesce(func.sum(ContractorPaymentYTD.payment_count), 0),
+            )
+            .filter(ContractorPaymentYTD.contractor_id == contractor_id)
+            .filter(ContractorPaymentYTD.tax_year == year)
+            .one()
+        )
+        total_paid = Decimal(str(total_paid))
         eligible = total_paid >= self.THRESHOLD_1099
 
         return {
@@ -954,7 +1106,38 @@ class ContractorSelfServiceManager:
             'total_paid': float(total_paid),
             'threshold': float(self.THRESHOLD_1099),
             'eligible_for_1099': eligible,
-            'payment_count': len(year_payments)
+            'payment_count': int(payment_count)
+        }
+
+    def _latest_w9s(self, contractor_ids: List[str]) -> Dict[str, ContractorW9Form]:
+        """Most recent W-9 per contractor, fetched in batches."""
+        latest = {}
+        for i in range(0, len(contractor_ids), ID_BATCH_SIZE):
+            batch = contractor_ids[i:i + ID_BATCH_SIZE]
+            forms = (
+                ContractorW9Form.query.filter(ContractorW9Form.contractor_id.in_(batch))
+                .order_by(ContractorW9Form.contractor_id, ContractorW9Form.created_at.desc())
+                .all()
+            )
+            for w9 in forms:
+                latest.setdefault(w9.contractor_id, w9)
+        return latest
+
+    def _form_1099_row(self, contractor_id: str, client_id: str, year: int,
+                       w9: ContractorW9Form, total_paid: Decimal) -> Dict:
+        return {
+            'id': str(uuid.uuid4()),
+            'tax_year': year,
+            'contractor_id': contractor_id,
+            'client_id': client_id,
+            'recipient_name': w9.name,
+            'recipient_tin_masked': w9.tin_masked,
+            'recipient_tin_type': w9.tin_type,
+            'recipient_address': w9.address,
+            'box_1_nonemployee_compensation': float(total_paid),
+            'box_4_federal_tax_withheld': 0.0,
+            'status': 'generated',
+            'generated_at': datetime.utcnow(),
         }
 
     def generate_1099_nec(self, contractor_id: str, year: int, client_id: str) -> Dict:
@@ -971,14 +1154,12 @@ class ContractorSelfServiceManager:
         if not w9:
             return {'success': False, 'error': 'W-9 not on file - cannot generate 1099'}
 
-        # Calculate total payments from this client
-        client_payments = (
-            ContractorInvoicePayment.query.filter(ContractorInvoicePayment.contractor_id == contractor_id)
-            .filter(ContractorInvoicePayment.client_id == client_id)
-            .filter(ContractorInvoicePayment.payment_date.like(f"{year}%"))
-            .all()
-        )
-        total_paid = sum(Decimal(str(p.amount)) for p in client_payments)
+        # Running total of payments from this client
+        self._reconcile_payment_ytd(year, client_id=client_id, contractor_id=contractor_id)
+        ytd = ContractorPaymentYTD.query.filter_by(
+            client_id=client_id, contractor_id=contractor_id, tax_year=year
+        ).first()
+        total_paid = Decimal(str(ytd.total_paid)) if ytd else Decimal('0.00')
 
         if total_paid < self.THRESHOLD_1099:
             return {
@@ -986,21 +1167,7 @@ class ContractorSelfServiceManager:
                 'error': f'Total payments (${total_paid}) below $600 threshold'
             }
 
-        form_id = str(uuid.uuid4())
-        form = ContractorForm1099(
-            id=form_id,
-            tax_year=year,
-            contractor_id=contractor_id,
-            client_id=client_id,
-            recipient_name=w9.name,
-            recipient_tin_masked=w9.tin_masked,
-            recipient_tin_type=w9.tin_type,
-            recipient_address=w9.address,
-            box_1_nonemployee_compensation=float(total_paid),
-            box_4_federal_tax_withheld=0.0,
-            status='generated',
-            generated_at=datetime.utcnow(),
-        )
+        form = ContractorForm1099(**self._form_1099_row(contractor_id, client_id, year, w9, total_paid))
         db.session.add(form)
         db.session.commit()
 
@@ -1011,13 +1178,76 @@ class ContractorSelfServiceManager:
             'total_compensation': float(total_paid)
         }
 
+    def generate_all_1099s(self, client_id: str, year: int) -> Dict:
+        """
+        Generate 1099-NECs for every contractor a client paid at least the
+        threshold in the year. Reads the running totals in one pass and
+        skips contractors that already have a form.
+        """
+        self._reconcile_payment_ytd(year, client_id=client_id)
+        totals = (
+            ContractorPaymentYTD.query.filter(ContractorPaymentYTD.client_id == client_id)
+            .filter(ContractorPaymentYTD.tax_year == year)
+            .all()
+        )
+        existing = {
+            contractor_id for (contractor_id,) in
+            db.session.query(ContractorForm1099.contractor_id)
+            .filter(ContractorForm1099.client_id == client_id)
+            .filter(ContractorForm1099.tax_year == year)
+        }
+
+        eligible = {}
+        below_threshold = 0
+        for row in totals:
+            total_paid = Decimal(str(row.total_paid or 0))
+            if total_paid < self.THRESHOLD_1099:
+                below_threshold += 1
+            elif row.contractor_id not in existing:
+                eligible[row.contractor_id] = total_paid
+
+        w9s = self._latest_w9s(sorted(eligible))
+        forms = []
+        missing_w9 = []
+        for contractor_id, total_paid in eligible.items():
+            w9 = w9s.get(contractor_id)
+            if not w9:
+                missing_w9.append(contractor_id)
+                continue
+            forms.append(self._form_1099_row(contractor_id, client_id, year, w9, total_paid))
+
+        if forms:
+            db.session.bulk_insert_mappings(ContractorForm1099, forms)
+            db.session.commit()
+
+        return {
+            'success': True,
+            'tax_year': year,
+            'generated': len(forms),
+            'already_generated': len(existing),
+            'below_threshold': below_threshold,
+            'missing_w9': missing_w9,
+            'total_compensation': sum(f['box_1_nonemployee_compensation'] for f in forms)
+        }
+
     def file_1099_to_irs(self, client_id: str, year: int) -> Dict:
         """
         File all 1099-NEC forms for a client to IRS FIRE system.
         Automatically collects all contractor 1099s for the year.
         """
 
+        from models import Company
         from services.regulatory_filing_service import regulatory_filing_service
+        from services.tenancy import resolve_company_id
+
+        try:
+            payer = Company.query.get(resolve_company_id(client_id))
+        except ValueError:
+            payer = None
+        if not payer or len(re.sub(r'\D', '', payer.ein or '')) != 9:
+            return {'success': False, 'error': 'Company EIN required to file 1099s'}
+
+        generated = self.generate_all_1099s(client_id, year)
 
         forms = (
             ContractorForm1099.query.filter(ContractorForm1099.client_id == client_id)
@@ -1026,30 +1256,51 @@ class ContractorSelfServiceManager:
             .all()
         )
 
-        forms_to_file = [
-            {
+        w9s = self._latest_w9s(sorted({f.contractor_id for f in forms}))
+        forms_to_file = []
+        filed = []
+        missing_tin = []
+        for f in forms:
+            w9 = w9s.get(f.contractor_id)
+            recipient_tin = self._decrypt_sensitive_data(w9.tin_encrypted) if w9 else ''
+            if not recipient_tin:
+                # W-9s collected before TINs were stored reversibly must be resubmitted
+                missing_tin.append(f.contractor_id)
+                continue
+            filed.append(f)
+            forms_to_file.append({
                 'form_id': f.id,
-                'recipient_tin': f.recipient_tin_masked or '',
+                'recipient_tin': recipient_tin,
+                'recipient_tin_type': f.recipient_tin_type,
                 'recipient_name': f.recipient_name,
                 'recipient_address': f.recipient_address,
                 'amount': f.box_1_nonemployee_compensation,
-                'payer_tin': client_id,
-            }
-            for f in forms
-        ]
+                'payer_tin': payer.ein,
+                'payer_name': payer.name,
+                'payer_address': payer.address,
+                'payer_city': payer.city,
+                'payer_state': payer.state,
+                'payer_zip': payer.zip_code,
+                'payer_phone': payer.phone,
+            })
 
         if not forms_to_file:
-            return {'success': False, 'error': 'No 1099 forms ready for filing'}
+            return {
+                'success': False,
+                'error': 'No 1099 forms ready for filing',
+                'missing_w9': generated['missing_w9'],
+                'missing_tin': missing_tin,
+            }
 
         result = regulatory_filing_service.submit_1099_fire(
-            company_id=client_id,
+            company_id=str(payer.id),
             forms=forms_to_file,
             tax_year=year,
             is_correction=False
         )
 
         if result.get('success'):
-            for f in forms:
+            for f in filed:
                 f.status = 'filed'
                 f.filed_at = datetime.utcnow()
             db.session.commit()
@@ -1059,7 +1310,11 @@ class ContractorSelfServiceManager:
             'forms_filed': len(forms_to_file),
             'confirmation_number': result.get('confirmation_number'),
             'filing_id': result.get('filing_id'),
-            'message': result.get('message')
+            'message': result.get('message'),
+            'validation_errors': result.get('validation_errors'),
+            # Paid over the threshold but not filed until a W-9 is on file
+            'missing_w9': generated['missing_w9'],
+            'missing_tin': missing_tin,
         }
 
     def get_1099_forms(self, contractor_id: str, year: int = None) -> List[Dict]:
@@ -3,6 +3,7 @@ SAURELLIUS CONTRACTOR/1099 SERVICE
 Independent contractor management, payments, and 1099 generation
 """
 
+from collections import defaultdict
 from datetime import datetime, date
 from decimal import Decimal, ROUND_HALF_UP
 from typing import Dict, List, Optional, Tuple
@@ -36,6 +37,23 @@ class Form1099Type(Enum):
     K = "1099-K"  # Payment Card Transactions
 
 
+# Payment statuses that count toward 1099 box amounts
+REPORTABLE_STATUSES = ("processed", "paid")
+
+
+def _new_ytd_totals() -> dict:
+    return {
+        "gross": Decimal("0.00"),
+        "withholding": Decimal("0.00"),
+        "net": Decimal("0.00"),
+        "payment_count": 0,
+        "reportable_gross": Decimal("0.00"),
+        "reportable_withholding": Decimal("0.00"),
+        "reportable_count": 0,
+        "monthly": defaultdict(lambda: Decimal("0.00")),
+    }
+
+
 class SaurelliusContractors:
     """Complete contractor management system with 1099 generation"""
     
@@ -45,6 +63,12 @@ class SaurelliusContractors:
         self.payments: List[dict] = []
         self.forms_1099: List[dict] = []
         
+        # Payment indexes, maintained on every write
+        self.payments_by_id: Dict[str, dict] = {}
+        self.payments_by_contractor_year: Dict[Tuple[str, int], List[dict]] = defaultdict(list)
+        # Running totals keyed by (contractor_id, tax_year); this company is the payer
+        self.ytd_totals: Dict[Tuple[str, int], dict] = defaultdict(_new_ytd_totals)
+        
         # IRS thresholds
         self.THRESHOLD_1099_NEC = Decimal("600.00")
         self.THRESHOLD_1099_MISC = Decimal("600.00")
@@ -226,6 +250,7 @@ class SaurelliusContractors:
         }
         
         self.payments.append(payment)
+        self._index_payment(payment, gross_amount, backup_withholding, net_amount)
         
         # Update YTD totals
         contractor["ytd_payments"] += gross_amount
@@ -233,13 +258,46 @@ class SaurelliusContractors:
         
         return payment
     
+    def _index_payment(self, payment: dict, gross: Decimal, withholding: Decimal,
+                       net: Decimal) -> None:
+        """Index a new payment and add it to its contractor's running totals"""
+        payment_date = date.fromisoformat(payment["payment_date"])
+        key = (payment["contractor_id"], payment_date.year)
+        
+        self.payments_by_id[payment["id"]] = payment
+        self.payments_by_contractor_year[key].append(payment)
+        
+        totals = self.ytd_totals[key]
+        totals["gross"] += gross
+        totals["withholding"] += withholding
+        totals["net"] += net
+        totals["payment_count"] += 1
+        totals["monthly"][payment_date.strftime("%Y-%m")] += gross
+    
+    def _set_payment_status(self, payment: dict, status: str) -> None:
+        """Change status, moving the amount into or out of the reportable totals"""
+        was_reportable = payment["status"] in REPORTABLE_STATUSES
+        is_reportable = status in REPORTABLE_STATUSES
+        payment["status"] = status
+        if was_reportable == is_reportable:
+            return
+        
+        sign = 1 if is_reportable else -1
+        totals = self.ytd_totals[(payment["contractor_id"], int(payment["payment_date"][:4]))]
+        totals["reportable_gross"] += sign * Decimal(str(payment["gross_amount"]))
+        totals["reportable_withholding"] += sign * Decimal(str(payment["backup_withholding"]))
+        totals["reportable_count"] += sign
+    
+    def _get_ytd_totals(self, contractor_id: str, year: int) -> dict:
+        """Running totals without creating an empty entry on lookup"""
+        return self.ytd_totals.get((contractor_id, year)) or _new_ytd_totals()
+    
     def get_contractor_payments(self, contractor_id: str, year: Optional[int] = None) -> List[dict]:
         """Get all payments for a contractor"""
-        payments = [p for p in self.payments if p["contractor_id"] == contractor_id]
-        
         if year:
-            payments = [p for p in payments 
-                       if date.fromisoformat(p["payment_date"]).year == year]
+            payments = self.payments_by_contractor_year.get((contractor_id, year), [])
+        else:
+            payments = [p for p in self.payments if p["contractor_id"] == contractor_id]
         
         return sorted(payments, key=lambda x: x["payment_date"], reverse=True)
     
@@ -262,21 +320,21 @@ class SaurelliusContractors:
     
     def process_payment(self, payment_id: str) -> dict:
         """Mark payment as processed"""
-        payment = next((p for p in self.payments if p["id"] == payment_id), None)
+        payment = self.payments_by_id.get(payment_id)
         if not payment:
             raise ValueError(f"Payment {payment_id} not found")
         
-        payment["status"] = "processed"
+        self._set_payment_status(payment, "processed")
         payment["processed_date"] = datetime.now().isoformat()
         return payment
     
     def mark_payment_paid(self, payment_id: str, transaction_id: Optional[str] = None) -> dict:
         """Mark payment as paid"""
-        payment = next((p for p in self.payments if p["id"] == payment_id), None)
+        payment = self.payments_by_id.get(payment_id)
         if not payment:
             raise ValueError(f"Payment {payment_id} not found")
         
-        payment["status"] = "paid"
+        self._set_payment_status(payment, "paid")
         if transaction_id:
             payment["transaction_id"] = transaction_id
         return payment
@@ -287,14 +345,13 @@ class SaurelliusContractors:
         if not contractor:
             raise ValueError(f"Contractor {contractor_id} not found")
         
-        # Get payments for the tax year
-        payments = [p for p in self.payments 
-                   if p["contractor_id"] == contractor_id
-                   and date.fromisoformat(p["payment_date"]).year == tax_year
-                   and p["status"] in ["processed", "paid"]]
-        
-        total_compensation = sum(Decimal(str(p["gross_amount"])) for p in payments)
-        total_withholding = sum(Decimal(str(p["backup_withholding"])) for p in payments)
+        return self._build_1099_nec(contractor, tax_year, self._get_ytd_totals(contractor_id, tax_year))
+    
+    def _build_1099_nec(self, contractor: dict, tax_year: int, totals: dict) -> Optional[dict]:
+        """Create a 1099-NEC from a contractor's running totals for the year"""
+        contractor_id = contractor["id"]
+        total_compensation = totals["reportable_gross"]
+        total_withholding = totals["reportable_withholding"]
         
         # Check if threshold is met
         if total_compensation < self.THRESHOLD_1099_NEC:
@@ -337,7 +394,7 @@ class SaurelliusContractors:
             "correction_of": None,
             
             # Metadata
-            "payment_count": len(payments),
+            "payment_count": totals["reportable_count"],
             "created_at": datetime.now().isoformat(),
             "generated_at": datetime.now().isoformat()
         }
@@ -356,7 +413,8 @@ class SaurelliusContractors:
         
         for contractor_id, contractor in self.contractors.items():
             try:
-                form = self.generate_1099_nec(contractor_id, tax_year)
+                totals = self._get_ytd_totals(contractor_id, tax_year)
+                form = self._build_1099_nec(contractor, tax_year, totals)
                 if form:
                     results["generated"].append({
                         "contractor_id": contractor_id,
@@ -365,16 +423,10 @@ class SaurelliusContractors:
                         "form_id": form["id"]
                     })
                 else:
-                    # Get actual amount for below threshold
-                    payments = [p for p in self.payments 
-                               if p["contractor_id"] == contractor_id
-                               and date.fromisoformat(p["payment_date"]).year == tax_year]
-                    total = sum(Decimal(str(p["gross_amount"])) for p in payments)
-                    
                     results["below_threshold"].append({
                         "contractor_id": contractor_id,
                         "name": f"{contractor['first_name']} {contractor['last_name']}",
-                        "amount": float(total)
+                        "amount": float(totals["gross"])
                     })
             except Exception as e:
                 results["errors"].append({
@@ -412,32 +464,18 @@ class SaurelliusContractors:
         if not contractor:
             raise ValueError(f"Contractor {contractor_id} not found")
         
-        payments = [p for p in self.payments 
-                   if p["contractor_id"] == contractor_id
-                   and date.fromisoformat(p["payment_date"]).year == year]
-        
-        total_gross = sum(Decimal(str(p["gross_amount"])) for p in payments)
-        total_withholding = sum(Decimal(str(p["backup_withholding"])) for p in payments)
-        total_net = sum(Decimal(str(p["net_amount"])) for p in payments)
-        
-        # Group by month
-        monthly = {}
-        for payment in payments:
-            month = date.fromisoformat(payment["payment_date"]).strftime("%Y-%m")
-            if month not in monthly:
-                monthly[month] = Decimal("0.00")
-            monthly[month] += Decimal(str(payment["gross_amount"]))
+        totals = self._get_ytd_totals(contractor_id, year)
         
         return {
             "contractor_id": contractor_id,
             "contractor_name": f"{contractor['first_name']} {contractor['last_name']}",
             "year": year,
-            "payment_count": len(payments),
-            "total_gross": float(total_gross),
-            "total_withholding": float(total_withholding),
-            "total_net": float(total_net),
-            "monthly_breakdown": {k: float(v) for k, v in sorted(monthly.items())},
-            "requires_1099": total_gross >= self.THRESHOLD_1099_NEC,
+            "payment_count": totals["payment_count"],
+            "total_gross": float(totals["gross"]),
+            "total_withholding": float(totals["withholding"]),
+            "total_net": float(totals["net"]),
+            "monthly_breakdown": {k: float(v) for k, v in sorted(totals["monthly"].items())},
+            "requires_1099": totals["gross"] >= self.THRESHOLD_1099_NEC,
             "w9_on_file": contractor["w9_on_file"]
         }
     
@@ -447,28 +485,23 @@ class SaurelliusContractors:
         total_withholding = Decimal("0.00")
         contractors_paid = set()
         
-        for payment in self.payments:
-            if date.fromisoformat(payment["payment_date"]).year == year:
-                total_payments += Decimal(str(payment["gross_amount"]))
-                total_withholding += Decimal(str(payment["backup_withholding"]))
-                contractors_paid.add(payment["contractor_id"])
-        
         # Count by threshold
         above_threshold = 0
         below_threshold = 0
         missing_w9 = 0
         
-        for contractor_id in contractors_paid:
+        for (contractor_id, totals_year), totals in self.ytd_totals.items():
+            if totals_year != year or not totals["payment_count"]:
+                continue
+            total_payments += totals["gross"]
+            total_withholding += totals["withholding"]
+            contractors_paid.add(contractor_id)
+            
             contractor = self.contractors.get(contractor_id)
             if not contractor:
                 continue
             
-            payments = [p for p in self.payments 
-                       if p["contractor_id"] == contractor_id
-                       and date.fromisoformat(p["payment_date"]).year == year]
-            total = sum(Decimal(str(p["gross_amount"])) for p in payments)
-            
-            if total >= self.THRESHOLD_1099_NEC:
+            if totals["gross"] >= self.THRESHOLD_1099_NEC:
                 above_threshold += 1
             else:
                 below_threshold += 1
@@ -0,0 +1,223 @@
+"""
+CREDENTIAL HASHER
+Password hashing and verification on a small, bounded process pool instead of the request thread
+A login storm queues up to a fixed depth and then fails fast with 503, so payroll traffic keeps its CPU
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+logger = logging.getLogger(__name__)
+
+# Method for new hashes; stored hashes with any other method are upgraded at the next login
+DEFAULT_METHOD = 'pbkdf2:sha256:600000'
+DEFAULT_TIMEOUT_SECONDS = 10
+RETRY_AFTER_SECONDS = 2
+SAMPLE_WINDOW = 1024
+
+
+class HasherSaturated(Exception):
+    """Every worker is busy and the wait queue is full (or the wait timed out)"""
+
+
+# =============================================================================
+# WORKER FUNCTIONS (run in the pool processes)
+# =============================================================================
+
+def _timed(fn: Callable, *args) -> Tuple[Any, float, float]:
+    started = time.monotonic()
+    return fn(*args), started, time.monotonic()
+
+
+def _hash(password: str, method: str) -> str:
+    return generate_password_hash(password, method=method)
+
+
+def _verify(pwhash: str, password: str) -> bool:
+    return check_password_hash(pwhash, password)
+
+
+def _pbkdf2_sha256(password: str, salt: bytes, iterations: int) -> bytes:
+    return hashlib.pbkdf2_hmac('sha256', password.encode(), salt, iterations, 32)
+
+
+def _saturated_response(error: HasherSaturated):
+    return {'success': False, 'message': str(error)}, 503, {'Retry-After': str(RETRY_AFTER_SECONDS)}
+
+
+# =============================================================================
+# EXECUTOR
+# =============================================================================
+
+class CredentialHasher:
+    """
+    Runs password work on `workers` processes with at most `max_queue` more
+    calls waiting. Queue wait and hash time are sampled (monotonic clock,
+    shared by parent and children) for the admin health endpoint.
+    With workers=0 the work runs inline but is still bounded and measured.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_queue: Optional[int] = None,
+                 method: Optional[str] = None, timeout: float = DEFAULT_TIMEOUT_SECONDS):
+        if workers is None:
+            workers = int(os.environ.get('PASSWORD_HASH_WORKERS', min(2, os.cpu_count() or 1)))
+        if max_queue is None:
+            max_queue = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', max(workers, 1) * 8))
+        self.workers = workers
+        self.max_queue = max_queue
+        self.method = method or os.environ.get('PASSWORD_HASH_METHOD', DEFAULT_METHOD)
+        self.timeout = timeout
+
+        self._slots = threading.BoundedSemaphore(max(workers, 1) + max_queue)
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_pid: Optional[int] = None
+
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._counts = {'hashed': 0, 'verified': 0, 'rehashed': 0, 'rejected': 0, 'timeouts': 0}
+        self._hash_ms: Deque[float] = deque(maxlen=SAMPLE_WINDOW)
+        self._wait_ms: Deque[float] = deque(maxlen=SAMPLE_WINDOW)
+
+    def _executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers < 1:
+            return None
+        # Pools do not survive a fork, so each gunicorn worker starts its own on first use
+        if self._pool is None or self._pool_pid != os.getpid():
+            with self._lock:
+                if self._pool is None or self._pool_pid != os.getpid():
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                    self._pool_pid = os.getpid()
+        return self._pool
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def _run(self, counter: str, fn: Callable, *args) -> Any:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._counts['rejected'] += 1
+            raise HasherSaturated('Too many sign-in requests right now, please retry shortly')
+
+        with self._lock:
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        submitted = time.monotonic()
+        handed_off = False
+        try:
+            pool = self._executor()
+            if pool is None:
+                result, started, finished = _timed(fn, *args)
+            else:
+                future = pool.submit(_timed, fn, *args)
+                try:
+                    result, started, finished = future.result(timeout=self.timeout)
+                except FutureTimeout:
+                    # cancel() cannot stop a hash that already started; the worker stays
+                    # busy, so the slot is held until the future finishes
+                    if not future.cancel():
+                        future.add_done_callback(self._release)
+                        handed_off = True
+                    with self._lock:
+                        self._counts['timeouts'] += 1
+                    raise HasherSaturated('Password check timed out, please retry shortly')
+                except BrokenProcessPool:
+                    logger.error("Credential hashing pool died; restarting it and running this call inline")
+                    with self._lock:
+                        if self._pool is pool:
+                            self._pool = None
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    result, started, finished = _timed(fn, *args)
+        finally:
+            if not handed_off:
+                self._release()
+
+        with self._lock:
+            self._counts[counter] += 1
+            self._wait_ms.append(max(started - submitted, 0.0) * 1000)
+            self._hash_ms.append((finished - started) * 1000)
+        return result
+
+    # -------------------------------------------------------------------------
+    # PASSWORDS
+    # -------------------------------------------------------------------------
+
+    def hash(self, password: str) -> str:
+        """werkzeug-format hash with the current method."""
+        return self._run('hashed', _hash, password, self.method)
+
+    def verify(self, pwhash: str, password: str) -> bool:
+        if not pwhash:
+            return False
+        return self._run('verified', _verify, pwhash, password)
+
+    def needs_rehash(self, pwhash: str) -> bool:
+        return pwhash.split('$', 1)[0] != self.method
+
+    def set_password(self, user, password: str):
+        user.password_hash = self.hash(password)
+
+    def check_password(self, user, password: str) -> bool:
+        """
+        Verify a user's password. On success a hash made with older cost
+        parameters is replaced in place; the caller's commit persists it.
+        """
+        if not self.verify(user.password_hash, password):
+            return False
+        if self.needs_rehash(user.password_hash):
+            try:
+                user.password_hash = self._run('rehashed', _hash, password, self.method)
+            except HasherSaturated:
+                pass  # the login stands; the upgrade waits for a quieter moment
+        return True
+
+    def pbkdf2_sha256(self, password: str, salt: bytes, iterations: int) -> bytes:
+        """Raw PBKDF2-HMAC-SHA256 key (32 bytes) for SecurityService."""
+        return self._run('hashed', _pbkdf2_sha256, password, salt, iterations)
+
+    # -------------------------------------------------------------------------
+    # METRICS
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _percentiles(samples) -> Dict[str, Optional[float]]:
+        ordered = sorted(samples)
+        if not ordered:
+            return {'p50': None, 'p95': None, 'max': None}
+        return {
+            'p50': round(ordered[len(ordered) // 2], 2),
+            'p95': round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)], 2),
+            'max': round(ordered[-1], 2),
+        }
+
+    def init_app(self, app):
+        """Answer HasherSaturated from any route with 503 and Retry-After."""
+        app.register_error_handler(HasherSaturated, _saturated_response)
+        return app
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'method': self.method,
+            'workers': self.workers,
+            'max_queue': self.max_queue,
+            'in_flight': self._in_flight,
+            'peak_in_flight': self._peak_in_flight,
+            **self._counts,
+            'hash_ms': self._percentiles(self._hash_ms),
+            'queue_wait_ms': self._percentiles(self._wait_ms),
+        }
+
+
+# Singleton instance
+credential_hasher = CredentialHasher()
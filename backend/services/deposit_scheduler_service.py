@@ -0,0 +1,411 @@
+"""
+SAURELLIUS FEDERAL DEPOSIT SCHEDULER
+Monthly / semiweekly / next-day Form 941 deposit obligations from incremental lookback aggregates
+Obligations across every company form one due-date queue submitted to EFTPS in bulk
+"""
+
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from models import db, TaxLiabilityQuarter, DepositorStatus, DepositObligation
+
+
+MONTHLY = 'monthly'
+SEMIWEEKLY = 'semiweekly'
+NEXT_DAY = 'next_day'
+
+LOOKBACK_THRESHOLD = Decimal('50000')
+NEXT_DAY_THRESHOLD = Decimal('100000')
+PRIORITY = {NEXT_DAY: 0, SEMIWEEKLY: 1, MONTHLY: 2}
+
+SUBMIT_BATCH_SIZE = 200
+MAX_ATTEMPTS = 3
+
+
+# =============================================================================
+# BUSINESS DAYS
+# =============================================================================
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    first = date(year, month, 1)
+    return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+
+
+def _last_weekday(year: int, month: int, weekday: int) -> date:
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day: date) -> date:
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+@lru_cache(maxsize=16)
+def federal_holidays(year: int) -> frozenset:
+    """Observed legal holidays in the District of Columbia, which EFTPS follows"""
+    days = {
+        _observed(date(year, 1, 1)),
+        _nth_weekday(year, 1, 0, 3),        # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),        # Washington's Birthday
+        _observed(date(year, 4, 16)),       # DC Emancipation Day
+        _last_weekday(year, 5, 0),          # Memorial Day
+        _observed(date(year, 6, 19)),
+        _observed(date(year, 7, 4)),
+        _nth_weekday(year, 9, 0, 1),        # Labor Day
+        _nth_weekday(year, 10, 0, 2),       # Columbus Day
+        _observed(date(year, 11, 11)),
+        _nth_weekday(year, 11, 3, 4),       # Thanksgiving
+        _observed(date(year, 12, 25)),
+        _observed(date(year + 1, 1, 1)),    # observed on Dec 31 when Jan 1 is a Saturday
+    }
+    return frozenset(d for d in days if d.year == year)
+
+
+def is_business_day(day: date) -> bool:
+    return day.weekday() < 5 and day not in federal_holidays(day.year)
+
+
+def next_business_day(day: date) -> date:
+    day += timedelta(days=1)
+    while not is_business_day(day):
+        day += timedelta(days=1)
+    return day
+
+
+def add_business_days(day: date, count: int) -> date:
+    for _ in range(count):
+        day = next_business_day(day)
+    return day
+
+
+def roll_forward(day: date) -> date:
+    return day if is_business_day(day) else next_business_day(day)
+
+
+def tax_period(day: date) -> str:
+    return f"{day.year}-Q{(day.month - 1) // 3 + 1}"
+
+
+def semiweekly_period(day: date) -> Tuple[date, date]:
+    """Wednesday-Friday or Saturday-Tuesday deposit period containing day"""
+    if day.weekday() in (2, 3, 4):
+        start = day - timedelta(days=day.weekday() - 2)
+        return start, start + timedelta(days=2)
+    start = day - timedelta(days=(day.weekday() - 5) % 7)
+    return start, start + timedelta(days=3)
+
+
+def semiweekly_due_date(day: date) -> date:
+    """Three business days after the semiweekly period closes"""
+    return add_business_days(semiweekly_period(day)[1], 3)
+
+
+def monthly_due_date(day: date) -> date:
+    """15th of the following month, or the next business day"""
+    return roll_forward(date(day.year + day.month // 12, day.month % 12 + 1, 15))
+
+
+def lookback_quarters(year: int) -> List[Tuple[int, int]]:
+    """July 1 of the second preceding year through June 30 of the prior year"""
+    return [(year - 2, 3), (year - 2, 4), (year - 1, 1), (year - 1, 2)]
+
+
+def _as_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    return value if isinstance(value, date) else date.fromisoformat(value[:10])
+
+
+def _normalize_ein(ein: str) -> str:
+    digits = ''.join(c for c in str(ein or '') if c.isdigit())
+    return digits or str(ein or '')
+
+
+class DepositScheduler:
+    """Deposit schedule determination, obligation accrual and the EFTPS submission queue"""
+
+    # =========================================================================
+    # DETERMINATION
+    # =========================================================================
+
+    def determine(self, ein: str, year: int) -> Dict:
+        """Deposit schedule for an EIN and year (an indexed read once determined)"""
+        return self._status(_normalize_ein(ein), year).to_dict()
+
+    def determine_many(self, eins: Iterable[str], year: int) -> Dict[str, Dict]:
+        """Schedules for many EINs: one indexed read, plus one lookback query for new ones"""
+        eins = {_normalize_ein(e) for e in eins}
+        known = {s.ein: s for s in DepositorStatus.query.filter(
+            DepositorStatus.year == year, DepositorStatus.ein.in_(eins)
+        )}
+        missing = eins - known.keys()
+        if missing:
+            lookback = self._lookback_totals(missing, year)
+            triggered = {ein for (ein,) in db.session.query(DepositorStatus.ein).filter(
+                DepositorStatus.year == year - 1,
+                DepositorStatus.ein.in_(missing),
+                DepositorStatus.next_day_triggered_on.isnot(None)
+            )}
+            for ein in missing:
+                known[ein] = self._new_status(ein, year, lookback.get(ein, Decimal('0')), ein in triggered)
+                db.session.add(known[ein])
+            db.session.commit()
+        return {ein: status.to_dict() for ein, status in known.items()}
+
+    def _lookback_totals(self, eins: Iterable[str], year: int) -> Dict[str, Decimal]:
+        quarters = lookback_quarters(year)
+        rows = db.session.query(
+            TaxLiabilityQuarter.ein, db.func.sum(TaxLiabilityQuarter.liability)
+        ).filter(
+            TaxLiabilityQuarter.ein.in_(list(eins)),
+            TaxLiabilityQuarter.tax_type == '941',
+            db.or_(*(db.and_(TaxLiabilityQuarter.year == y, TaxLiabilityQuarter.quarter == q)
+                     for y, q in quarters))
+        ).group_by(TaxLiabilityQuarter.ein)
+        return {ein: Decimal(str(total or 0)) for ein, total in rows}
+
+    def _new_status(self, ein: str, year: int, lookback: Decimal, next_day_last_year: bool) -> DepositorStatus:
+        semiweekly = lookback >= LOOKBACK_THRESHOLD or next_day_last_year
+        return DepositorStatus(
+            ein=ein, year=year,
+            schedule=SEMIWEEKLY if semiweekly else MONTHLY,
+            lookback_liability=lookback
+        )
+
+    def _status(self, ein: str, year: int, lock: bool = False) -> DepositorStatus:
+        query = DepositorStatus.query.filter_by(ein=ein, year=year)
+        status = (query.with_for_update() if lock else query).first()
+        if status is None:
+            prior = DepositorStatus.query.filter_by(ein=ein, year=year - 1).first()
+            status = self._new_status(
+                ein, year, self._lookback_totals([ein], year).get(ein, Decimal('0')),
+                bool(prior and prior.next_day_triggered_on)
+            )
+            db.session.add(status)
+            db.session.flush()
+        return status
+
+    # =========================================================================
+    # ACCRUAL
+    # =========================================================================
+
+    def record_liability(self, company_id: str, ein: str, amount, liability_date,
+                         tax_type: str = '941', commit: bool = True) -> Dict:
+        """
+        Add a payroll's deposit liability. It joins the open obligation for its
+        deposit period; reaching $100,000 makes that obligation due the next
+        business day and the EIN a semiweekly depositor.
+        """
+        ein = _normalize_ein(ein)
+        amount = Decimal(str(amount)).quantize(Decimal('0.01'))
+        day = _as_date(liability_date)
+        if amount <= 0:
+            raise ValueError("Liability amount must be positive")
+
+        # Locking the status row serializes accrual per EIN and year
+        status = self._status(ein, day.year, lock=True)
+        self._add_quarter_liability(ein, tax_type, day, amount)
+
+        period = tax_period(day)
+        if status.schedule == MONTHLY:
+            schedule, period_key, due = MONTHLY, f"M{day:%Y-%m}", monthly_due_date(day)
+        else:
+            start, _ = semiweekly_period(day)
+            schedule, period_key, due = SEMIWEEKLY, f"S{start.isoformat()}/{period}", semiweekly_due_date(day)
+
+        obligation = DepositObligation.query.filter_by(
+            ein=ein, tax_type=tax_type, period_key=period_key, is_open=True, status='pending'
+        ).with_for_update().first()
+        if obligation is None:
+            obligation = DepositObligation(
+                id=str(uuid.uuid4()), company_id=str(company_id), ein=ein, tax_type=tax_type,
+                tax_period=period, period_key=period_key, schedule=schedule, amount=Decimal('0'),
+                first_liability_date=day, due_date=due, priority=PRIORITY[schedule]
+            )
+            db.session.add(obligation)
+        obligation.amount = Decimal(str(obligation.amount or 0)) + amount
+
+        if tax_type in ('941', '944') and obligation.amount >= NEXT_DAY_THRESHOLD:
+            obligation.schedule = NEXT_DAY
+            obligation.priority = PRIORITY[NEXT_DAY]
+            obligation.due_date = min(obligation.due_date, next_business_day(day))
+            obligation.is_open = False  # accumulation restarts after a next-day deposit
+            status.schedule = SEMIWEEKLY
+            status.next_day_triggered_on = status.next_day_triggered_on or day
+
+        if commit:
+            db.session.commit()
+        return obligation.to_dict()
+
+    def reverse_liability(self, obligation_id: str, amount, liability_date,
+                          commit: bool = True) -> Dict:
+        """
+        Back a voided payroll's liability out of its deposit obligation and
+        quarter. Refused once the obligation has gone to EFTPS; an obligation
+        left with nothing to deposit is cancelled.
+        """
+        amount = Decimal(str(amount)).quantize(Decimal('0.01'))
+        day = _as_date(liability_date)
+        obligation = DepositObligation.query.filter_by(id=obligation_id).with_for_update().first()
+        if obligation is None:
+            raise ValueError(f"Deposit obligation {obligation_id} not found")
+        if obligation.status in ('submitting', 'submitted'):
+            raise ValueError("The tax deposit for this payroll has already been submitted to EFTPS")
+
+        status = self._status(obligation.ein, day.year, lock=True)
+        self._add_quarter_liability(obligation.ein, obligation.tax_type, day, -amount)
+
+        was_next_day = obligation.schedule == NEXT_DAY
+        obligation.amount = max(Decimal('0'), Decimal(str(obligation.amount or 0)) - amount)
+        if obligation.amount == 0:
+            obligation.status = 'cancelled'
+            obligation.is_open = False
+        elif obligation.schedule == NEXT_DAY and obligation.amount < NEXT_DAY_THRESHOLD:
+            # Back under $100,000: due on the period's regular date again
+            first = obligation.first_liability_date
+            if obligation.period_key.startswith('M'):
+                obligation.schedule, obligation.due_date = MONTHLY, monthly_due_date(first)
+            else:
+                obligation.schedule, obligation.due_date = SEMIWEEKLY, semiweekly_due_date(first)
+            obligation.priority = PRIORITY[obligation.schedule]
+        if was_next_day and (obligation.schedule != NEXT_DAY or obligation.status == 'cancelled'):
+            self._recheck_next_day(status, obligation)
+
+        if commit:
+            db.session.commit()
+        return obligation.to_dict()
+
+    def _recheck_next_day(self, status: DepositorStatus, reversed_obligation: DepositObligation):
+        """Drop a next-day trigger that no remaining obligation of the year supports"""
+        if status.next_day_triggered_on is None:
+            return
+        year_start, year_end = date(status.year, 1, 1), date(status.year, 12, 31)
+        still_triggered = DepositObligation.query.filter(
+            DepositObligation.ein == status.ein,
+            DepositObligation.id != reversed_obligation.id,
+            DepositObligation.schedule == NEXT_DAY,
+            DepositObligation.status != 'cancelled',
+            DepositObligation.first_liability_date.between(year_start, year_end)
+        ).first()
+        if still_triggered:
+            return
+        prior = DepositorStatus.query.filter_by(ein=status.ein, year=status.year - 1).first()
+        semiweekly = (Decimal(str(status.lookback_liability or 0)) >= LOOKBACK_THRESHOLD
+                      or bool(prior and prior.next_day_triggered_on))
+        status.next_day_triggered_on = None
+        status.schedule = SEMIWEEKLY if semiweekly else MONTHLY
+
+    def _add_quarter_liability(self, ein: str, tax_type: str, day: date, amount: Decimal):
+        quarter = (day.month - 1) // 3 + 1
+        updated = TaxLiabilityQuarter.query.filter_by(
+            ein=ein, tax_type=tax_type, year=day.year, quarter=quarter
+        ).update({
+            TaxLiabilityQuarter.liability: TaxLiabilityQuarter.liability + amount,
+            TaxLiabilityQuarter.updated_at: datetime.utcnow()
+        }, synchronize_session=False)
+        if not updated:
+            db.session.add(TaxLiabilityQuarter(
+                ein=ein, tax_type=tax_type, year=day.year, quarter=quarter, liability=amount
+            ))
+
+    # =========================================================================
+    # QUEUE
+    # =========================================================================
+
+    def _due_query(self, as_of: date, company_id: Optional[str] = None):
+        # EFTPS needs the payment initiated a business day before settlement
+        query = DepositObligation.query.filter(
+            DepositObligation.status.in_(('pending', 'failed')),
+            DepositObligation.attempts < MAX_ATTEMPTS,
+            DepositObligation.due_date <= next_business_day(as_of)
+        )
+        if company_id is not None:
+            query = query.filter(DepositObligation.company_id == str(company_id))
+        return query.order_by(
+            DepositObligation.due_date, DepositObligation.priority, DepositObligation.amount.desc()
+        )
+
+    def queue(self, as_of: Optional[date] = None, limit: int = 500,
+              company_id: Optional[str] = None) -> List[Dict]:
+        """Obligations to submit now, most urgent first"""
+        return [o.to_dict() for o in self._due_query(as_of or date.today(), company_id).limit(limit)]
+
+    def upcoming(self, company_id: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        query = DepositObligation.query.filter(DepositObligation.status.in_(('pending', 'failed')))
+        if company_id is not None:
+            query = query.filter(DepositObligation.company_id == str(company_id))
+        return [o.to_dict() for o in query.order_by(
+            DepositObligation.due_date, DepositObligation.priority
+        ).limit(limit)]
+
+    def submit_due(self, as_of: Optional[date] = None, batch_size: int = SUBMIT_BATCH_SIZE,
+                   company_id: Optional[str] = None) -> Dict:
+        """Submit every due obligation to EFTPS in claimed batches, optionally for one company"""
+        from services.regulatory_filing_service import regulatory_filing_service
+
+        as_of = as_of or date.today()
+        earliest_settlement = next_business_day(as_of)
+        summary = {'submitted': 0, 'failed': 0, 'amount_submitted': 0.0, 'batches': 0}
+
+        while True:
+            ids = [o.id for o in self._due_query(as_of, company_id)
+                   .with_entities(DepositObligation.id).limit(batch_size)]
+            if not ids:
+                break
+            # Claim the batch so a concurrent worker skips it
+            claimed = DepositObligation.query.filter(
+                DepositObligation.id.in_(ids),
+                DepositObligation.status.in_(('pending', 'failed'))
+            ).update({DepositObligation.status: 'submitting'}, synchronize_session=False)
+            db.session.commit()
+            if not claimed:
+                continue
+            summary['batches'] += 1
+
+            batch = DepositObligation.query.filter(
+                DepositObligation.id.in_(ids), DepositObligation.status == 'submitting'
+            ).order_by(DepositObligation.due_date, DepositObligation.priority).all()
+            for obligation in batch:
+                settlement = max(obligation.due_date, earliest_settlement)
+                try:
+                    result = regulatory_filing_service.submit_eftps_deposit(
+                        company_id=obligation.company_id,
+                        ein=obligation.ein,
+                        deposit_type=obligation.tax_type,
+                        amount=float(obligation.amount),
+                        tax_period=obligation.tax_period,
+                        settlement_date=settlement.isoformat()
+                    )
+                except Exception as e:
+                    result = {'success': False, 'error': str(e)}
+
+                obligation.attempts = (obligation.attempts or 0) + 1
+                obligation.is_open = False
+                if result.get('success'):
+                    obligation.status = 'submitted'
+                    obligation.filing_id = result.get('filing_id')
+                    obligation.confirmation_number = result.get('confirmation_number')
+                    obligation.settlement_date = settlement
+                    obligation.submitted_at = datetime.utcnow()
+                    obligation.last_error = None
+                    summary['submitted'] += 1
+                    summary['amount_submitted'] += float(obligation.amount)
+                else:
+                    obligation.status = 'failed'
+                    obligation.last_error = result.get('error') or result.get('message')
+                    summary['failed'] += 1
+            db.session.commit()
+
+        summary['amount_submitted'] = round(summary['amount_submitted'], 2)
+        return summary
+
+
+# Singleton instance
+deposit_scheduler = DepositScheduler()
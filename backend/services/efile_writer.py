@@ -0,0 +1,847 @@
+"""
+SAURELLIUS E-FILE WRITERS
+Streaming fixed-width record writers for SSA EFW2 (W-2/W-3) and IRS FIRE (1099)
+Records are validated as they are written; large submissions roll over into multiple files
+"""
+
+import os
+import re
+import hashlib
+import unicodedata
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+EFW2_RECORD_LENGTH = 512
+FIRE_RECORD_LENGTH = 750
+
+# Upper bound per physical file; both agencies reject oversized uploads
+EFW2_MAX_FILE_BYTES = int(os.getenv('SSA_EFW2_MAX_FILE_BYTES', 250 * 1024 * 1024))
+FIRE_MAX_FILE_BYTES = int(os.getenv('IRS_FIRE_MAX_FILE_BYTES', 250 * 1024 * 1024))
+
+READ_CHUNK = 1024 * 1024
+
+_ONE = Decimal('1')
+
+STATE_FIPS = {
+    'AL': '01', 'AK': '02', 'AZ': '04', 'AR': '05', 'CA': '06', 'CO': '08', 'CT': '09',
+    'DE': '10', 'DC': '11', 'FL': '12', 'GA': '13', 'HI': '15', 'ID': '16', 'IL': '17',
+    'IN': '18', 'IA': '19', 'KS': '20', 'KY': '21', 'LA': '22', 'ME': '23', 'MD': '24',
+    'MA': '25', 'MI': '26', 'MN': '27', 'MS': '28', 'MO': '29', 'MT': '30', 'NE': '31',
+    'NV': '32', 'NH': '33', 'NJ': '34', 'NM': '35', 'NY': '36', 'NC': '37', 'ND': '38',
+    'OH': '39', 'OK': '40', 'OR': '41', 'PA': '42', 'RI': '44', 'SC': '45', 'SD': '46',
+    'TN': '47', 'TX': '48', 'UT': '49', 'VT': '50', 'VA': '51', 'WA': '53', 'WV': '54',
+    'WI': '55', 'WY': '56', 'PR': '72',
+}
+
+_CITY_STATE_ZIP = re.compile(r'^\s*(.*?),?\s+([A-Za-z]{2})\s+(\d{5})(?:-?(\d{4}))?\s*$')
+_ALLOWED_ALPHA = re.compile(r'[^A-Z0-9 \-.,&/#\']')
+
+
+# =============================================================================
+# FIELD FORMATTING
+# =============================================================================
+
+def _alpha(value) -> str:
+    """Upper-case ASCII with only the punctuation both agencies accept."""
+    text = unicodedata.normalize('NFKD', str(value or '')).encode('ascii', 'ignore').decode()
+    return _ALLOWED_ALPHA.sub(' ', text.upper())
+
+
+def _digits(value) -> str:
+    return re.sub(r'\D', '', str(value or ''))
+
+
+def _cents(value) -> int:
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value or 0))
+    return int((value * 100).quantize(_ONE, rounding=ROUND_HALF_UP))
+
+
+def _pick(data: Dict, *keys, default=None):
+    """First present, non-empty value among alternative key spellings."""
+    for key in keys:
+        value = data.get(key)
+        if value not in (None, ''):
+            return value
+    return default
+
+
+def split_city_state_zip(value: str) -> Tuple[str, str, str, str]:
+    """'Austin, TX 78701-1234' -> ('Austin', 'TX', '78701', '1234')."""
+    match = _CITY_STATE_ZIP.match(value or '')
+    if not match:
+        return (value or '').strip(' ,'), '', '', ''
+    city, state, zip5, zip4 = match.groups()
+    return city.strip(' ,'), state.upper(), zip5, zip4 or ''
+
+
+def split_name(full_name: str) -> Tuple[str, str, str]:
+    """'Jane Q Public' -> ('Jane', 'Q', 'Public')."""
+    parts = (full_name or '').split()
+    if not parts:
+        return '', '', ''
+    if len(parts) == 1:
+        return parts[0], '', ''
+    return parts[0], ' '.join(parts[1:-1]), parts[-1]
+
+
+class RecordLayout:
+    """
+    Fixed-width record definition. Fields are (name, start, width, kind)
+    with 1-based start positions as printed in the agency specifications.
+
+    Kinds:
+        A  alphanumeric, left-justified, blank-filled, truncated
+        N  numeric, right-justified, zero-filled; overflow is an error
+        M  money in cents, right-justified, zero-filled; negative or overflow is an error
+        T  taxpayer ID, exactly `width` digits
+    """
+
+    def __init__(self, record_id: str, length: int, fields: List[Tuple[str, int, int, str]],
+                 required: Iterable[str] = ()):
+        self.record_id = record_id
+        self.length = length
+        self.fields = sorted(fields, key=lambda f: f[1])
+        self.required = set(required)
+
+        position = len(record_id)
+        for name, start, width, _ in self.fields:
+            if start <= position or start + width - 1 > length:
+                raise ValueError(f"{record_id}.{name} overlaps or falls outside a {length}-byte record")
+            position = start + width - 1
+
+    def render(self, values: Dict) -> str:
+        parts = [self.record_id]
+        position = len(self.record_id)
+
+        for name, start, width, kind in self.fields:
+            value = values.get(name)
+            if value is None or value == '':
+                if name in self.required:
+                    raise ValueError(f"{self.record_id} record: {name} is required")
+                text = '0' * width if kind in ('N', 'M') else ' ' * width
+            elif kind == 'A':
+                text = _alpha(value)[:width].ljust(width)
+            elif kind == 'T':
+                text = _digits(value)
+                if len(text) != width:
+                    raise ValueError(f"{self.record_id} record: {name} must be {width} digits")
+            else:
+                number = _cents(value) if kind == 'M' else int(_digits(value) or 0)
+                if number < 0:
+                    raise ValueError(f"{self.record_id} record: {name} cannot be negative")
+                text = str(number).zfill(width)
+                if len(text) > width:
+                    raise ValueError(f"{self.record_id} record: {name} exceeds {width} digits")
+
+            parts.append(' ' * (start - 1 - position))
+            parts.append(text)
+            position = start - 1 + width
+
+        parts.append(' ' * (self.length - position))
+        record = ''.join(parts)
+        if len(record) != self.length:
+            raise ValueError(f"{self.record_id} record is {len(record)} bytes, expected {self.length}")
+        return record
+
+
+# =============================================================================
+# FILE ROLLOVER
+# =============================================================================
+
+class _FileSet:
+    """
+    Sequence of output files named <prefix>_001.txt, <prefix>_002.txt, ...
+    EFW2 records are followed by CR/LF; FIRE allows CR/LF in the last two
+    positions of the record itself (`inline_newline`).
+    """
+
+    def __init__(self, directory: str, prefix: str, max_file_bytes: int, inline_newline: bool = False):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.prefix = prefix
+        self.max_file_bytes = max_file_bytes
+        self.inline_newline = inline_newline
+        self.files: List[Dict] = []
+        self.handle = None
+        self.bytes_written = 0
+        self.record_count = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self.handle is not None
+
+    def open(self) -> None:
+        path = os.path.join(self.directory, f"{self.prefix}_{len(self.files) + 1:03d}.txt")
+        self.handle = open(path, 'w+b')
+        self.path = path
+        self.bytes_written = 0
+        self.record_count = 0
+
+    def fits(self, record_bytes: int) -> bool:
+        return self.bytes_written + record_bytes <= self.max_file_bytes
+
+    def write(self, record: str) -> None:
+        data = ((record[:-2] if self.inline_newline else record) + '\r\n').encode('ascii')
+        self.handle.write(data)
+        self.bytes_written += len(data)
+        self.record_count += 1
+
+    def patch(self, offset: int, text: str) -> None:
+        """Overwrite bytes already written, e.g. a header count known only at the end."""
+        self.handle.seek(offset)
+        self.handle.write(text.encode('ascii'))
+        self.handle.seek(0, os.SEEK_END)
+
+    def abort(self) -> None:
+        """Close the current file without recording it."""
+        if self.handle is not None:
+            self.handle.close()
+            self.handle = None
+
+    def close(self, **info) -> Dict:
+        self.handle.flush()
+        self.handle.seek(0)
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: self.handle.read(READ_CHUNK), b''):
+            digest.update(chunk)
+        self.handle.close()
+        self.handle = None
+
+        entry = {
+            'path': self.path,
+            'bytes': self.bytes_written,
+            'record_count': self.record_count,
+            'sha256': digest.hexdigest(),
+            **info,
+        }
+        self.files.append(entry)
+        return entry
+
+
+# =============================================================================
+# SSA EFW2
+# =============================================================================
+
+# (W-2 key, RW position, RT position) for every money field carried in the file
+EFW2_AMOUNTS = [
+    ('box_1', 188, 10),
+    ('box_2', 199, 25),
+    ('box_3', 210, 40),
+    ('box_4', 221, 55),
+    ('box_5', 232, 70),
+    ('box_6', 243, 85),
+    ('box_7', 254, 100),
+    ('box_10', 276, 130),
+    ('box_12_D', 287, 145),
+    ('box_12_E', 298, 160),
+    ('box_12_F', 309, 175),
+    ('box_12_G', 320, 190),
+    ('box_12_H', 331, 205),
+    ('box_11_457', 353, 235),
+    ('box_12_W', 364, 250),
+    ('box_11', 375, 265),
+    ('box_12_Q', 386, 280),
+    ('box_12_C', 408, 295),
+    ('box_12_V', 419, 325),
+    ('box_12_Y', 430, 340),
+    ('box_12_AA', 441, 355),
+    ('box_12_BB', 452, 370),
+    ('box_12_DD', 463, 385),
+    ('box_12_FF', 474, 400),
+]
+
+# Keys used by the W-2 builders in government_forms_service alongside the short box names
+W2_KEY_ALIASES = {
+    'box_1': ('box_1', 'box_1_wages'),
+    'box_2': ('box_2', 'box_2_federal_tax'),
+    'box_3': ('box_3', 'box_3_ss_wages'),
+    'box_4': ('box_4', 'box_4_ss_tax'),
+    'box_5': ('box_5', 'box_5_medicare_wages'),
+    'box_6': ('box_6', 'box_6_medicare_tax'),
+    'box_7': ('box_7', 'box_7_ss_tips'),
+    'box_10': ('box_10', 'box_10_dependent_care'),
+    'box_11': ('box_11', 'box_11_nonqualified'),
+}
+
+_ADDRESS_FIELDS = [
+    ('location_address', 0, 22), ('delivery_address', 22, 22), ('city', 44, 22),
+    ('state', 66, 2), ('zip', 68, 5), ('zip_ext', 73, 4),
+]
+
+
+def _address_fields(base: int) -> List[Tuple[str, int, int, str]]:
+    return [(name, base + offset, width, 'A') for name, offset, width in _ADDRESS_FIELDS]
+
+
+RA_LAYOUT = RecordLayout('RA', EFW2_RECORD_LENGTH, [
+    ('submitter_ein', 3, 9, 'T'),
+    ('user_id', 12, 8, 'A'),
+    ('resub_indicator', 29, 1, 'N'),
+    ('software_code', 36, 2, 'A'),
+    ('company_name', 38, 57, 'A'),
+    *[(f"company_{n}", s, w, k) for n, s, w, k in _address_fields(95)],
+    ('submitter_name', 217, 57, 'A'),
+    *[(f"submitter_{n}", s, w, k) for n, s, w, k in _address_fields(274)],
+    ('contact_name', 396, 27, 'A'),
+    ('contact_phone', 423, 15, 'A'),
+    ('contact_email', 446, 40, 'A'),
+    ('preparer_code', 500, 1, 'A'),
+], required=('submitter_ein', 'user_id', 'company_name', 'contact_name'))
+
+RE_LAYOUT = RecordLayout('RE', EFW2_RECORD_LENGTH, [
+    ('tax_year', 3, 4, 'N'),
+    ('employer_ein', 8, 9, 'T'),
+    ('terminating_business', 26, 1, 'N'),
+    ('employer_name', 40, 57, 'A'),
+    *_address_fields(97),
+    ('kind_of_employer', 174, 1, 'A'),
+    ('employment_code', 219, 1, 'A'),
+    ('third_party_sick_pay', 221, 1, 'N'),
+    ('contact_name', 222, 27, 'A'),
+    ('contact_phone', 249, 15, 'A'),
+    ('contact_email', 279, 40, 'A'),
+], required=('tax_year', 'employer_ein', 'employer_name', 'kind_of_employer', 'employment_code'))
+
+RW_LAYOUT = RecordLayout('RW', EFW2_RECORD_LENGTH, [
+    ('ssn', 3, 9, 'T'),
+    ('first_name', 12, 15, 'A'),
+    ('middle_name', 27, 15, 'A'),
+    ('last_name', 42, 20, 'A'),
+    ('suffix', 62, 4, 'A'),
+    *_address_fields(66),
+    *[(key, rw_pos, 11, 'M') for key, rw_pos, _ in EFW2_AMOUNTS],
+    ('statutory_employee', 486, 1, 'N'),
+    ('retirement_plan', 488, 1, 'N'),
+    ('third_party_sick_pay', 489, 1, 'N'),
+], required=('ssn', 'first_name', 'last_name'))
+
+RS_LAYOUT = RecordLayout('RS', EFW2_RECORD_LENGTH, [
+    ('state_code', 3, 2, 'N'),
+    ('ssn', 10, 9, 'T'),
+    ('first_name', 19, 15, 'A'),
+    ('middle_name', 34, 15, 'A'),
+    ('last_name', 49, 20, 'A'),
+    *_address_fields(73),
+    ('state_employer_account', 248, 20, 'A'),
+    ('state_code_2', 274, 2, 'N'),
+    ('state_wages', 276, 11, 'M'),
+    ('state_tax', 287, 11, 'M'),
+    ('local_wages', 309, 11, 'M'),
+    ('local_tax', 320, 11, 'M'),
+], required=('state_code', 'ssn'))
+
+RT_LAYOUT = RecordLayout('RT', EFW2_RECORD_LENGTH, [
+    ('rw_count', 3, 7, 'N'),
+    *[(key, rt_pos, 15, 'M') for key, _, rt_pos in EFW2_AMOUNTS],
+    # RT-only total with no RW counterpart; always zero-filled here
+    ('third_party_income_tax', 310, 15, 'M'),
+], required=('rw_count',))
+
+RF_LAYOUT = RecordLayout('RF', EFW2_RECORD_LENGTH, [
+    ('rw_count', 8, 9, 'N'),
+], required=('rw_count',))
+
+EFW2_AMOUNT_KEYS = frozenset(key for key, _, _ in EFW2_AMOUNTS)
+
+EMPLOYMENT_CODES = {'941': 'R', '943': 'A', '944': 'F', 'household': 'H', 'military': 'M', 'ct-1': 'X'}
+KINDS_OF_EMPLOYER = {'none apply': 'N', '501c': 'T', 'state/local': 'S', 'state/local 501c': 'Y', 'federal': 'F'}
+
+
+def _zero_totals() -> Dict[str, Decimal]:
+    return {key: Decimal('0.00') for key, _, _ in EFW2_AMOUNTS}
+
+
+def _address(data: Dict, prefix: str) -> Dict:
+    """Address parts from either split fields or a combined 'City, ST 12345' line."""
+    city, state, zip5, zip4 = split_city_state_zip(data.get(f"{prefix}_city_state_zip", ''))
+    return {
+        'location_address': '',
+        'delivery_address': _pick(data, f"{prefix}_address", f"{prefix}_street", default=''),
+        'city': _pick(data, f"{prefix}_city", default=city),
+        'state': _pick(data, f"{prefix}_state", default=state),
+        'zip': _digits(_pick(data, f"{prefix}_zip", default=zip5))[:5],
+        'zip_ext': _digits(_pick(data, f"{prefix}_zip_ext", default=zip4))[:4],
+    }
+
+
+_W2_AMOUNT_KEYS = [(key, W2_KEY_ALIASES.get(key, (key,))) for key, _, _ in EFW2_AMOUNTS]
+
+
+def w2_amounts(w2: Dict) -> Dict[str, Decimal]:
+    """Non-zero EFW2 money fields of a W-2 dict, with Box 12 codes expanded."""
+    amounts = {}
+    for key, aliases in _W2_AMOUNT_KEYS:
+        value = _pick(w2, *aliases)
+        if value:
+            amounts[key] = Decimal(str(value))
+    for entry in w2.get('box_12') or []:
+        key = f"box_12_{entry.get('code', '').upper()}"
+        if key in EFW2_AMOUNT_KEYS and entry.get('amount'):
+            amounts[key] = amounts.get(key, Decimal('0.00')) + Decimal(str(entry['amount']))
+    return amounts
+
+
+class EFW2Writer:
+    """
+    Streams an EFW2 submission: RA, then per employer RE / RW (+RS) / RT,
+    then RF. When a file would exceed `max_file_bytes` the current employer
+    block and file are closed and a new file reopens with RA and RE, so
+    every file is independently valid.
+    """
+
+    def __init__(self, directory: str, submitter: Dict, tax_year: int,
+                 max_file_bytes: int = EFW2_MAX_FILE_BYTES, prefix: str = 'efw2',
+                 include_state_records: bool = True):
+        self.files = _FileSet(directory, prefix, max_file_bytes)
+        self.submitter = submitter
+        self.tax_year = tax_year
+        self.include_state_records = include_state_records
+
+        self.employer: Optional[Dict] = None
+        self.block_count = 0
+        self.block_totals = _zero_totals()
+        self.file_rw_count = 0
+
+        self.employee_count = 0
+        self.totals = _zero_totals()
+        self.employer_totals: Dict[str, Dict] = {}
+
+        # RT + RF must always fit behind the last employee record
+        self._trailer_bytes = 2 * (EFW2_RECORD_LENGTH + 2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def abort(self) -> None:
+        self.files.abort()
+
+    # -- records ---------------------------------------------------------------
+
+    def _ra(self) -> str:
+        s = self.submitter
+        values = {
+            'submitter_ein': _pick(s, 'ein', 'employer_ein'),
+            'user_id': s.get('user_id'),
+            'software_code': s.get('software_code', '98'),
+            'company_name': _pick(s, 'company_name', 'name', 'employer_name'),
+            'submitter_name': _pick(s, 'submitter_name', 'company_name', 'name', 'employer_name'),
+            'contact_name': s.get('contact_name'),
+            'contact_phone': _digits(s.get('contact_phone')),
+            'contact_email': s.get('contact_email'),
+            'preparer_code': s.get('preparer_code', 'L'),
+        }
+        for name, value in _address(s, 'employer').items():
+            values[f"company_{name}"] = value
+            values[f"submitter_{name}"] = value
+        return RA_LAYOUT.render(values)
+
+    def _re(self) -> str:
+        e = self.employer
+        kind = str(e.get('kind_of_employer', 'None apply')).lower()
+        payer = str(e.get('kind_of_payer', '941')).lower()
+        return RE_LAYOUT.render({
+            'tax_year': self.tax_year,
+            'employer_ein': _pick(e, 'employer_ein', 'ein'),
+            'terminating_business': 1 if e.get('terminating_business') else 0,
+            'employer_name': _pick(e, 'employer_name', 'legal_name', 'name'),
+            **_address(e, 'employer'),
+            'kind_of_employer': KINDS_OF_EMPLOYER.get(kind, kind[:1].upper() or 'N'),
+            'employment_code': EMPLOYMENT_CODES.get(payer, 'R'),
+            'third_party_sick_pay': 1 if e.get('third_party_sick_pay') else 0,
+            'contact_name': e.get('contact_name'),
+            'contact_phone': _digits(e.get('contact_phone')),
+            'contact_email': e.get('contact_email'),
+        })
+
+    def _employee_records(self, w2: Dict, amounts: Dict[str, Decimal]) -> List[str]:
+        first, middle, last = split_name(w2.get('employee_name', ''))
+        person = {
+            'ssn': _pick(w2, 'ssn', 'employee_ssn'),
+            'first_name': _pick(w2, 'first_name', default=first),
+            'middle_name': _pick(w2, 'middle_name', default=middle),
+            'last_name': _pick(w2, 'last_name', default=last),
+            **_address(w2, 'employee'),
+        }
+        records = [RW_LAYOUT.render({
+            **person,
+            'suffix': w2.get('suffix'),
+            **amounts,
+            'statutory_employee': 1 if _pick(w2, 'statutory_employee', 'box_13_statutory') else 0,
+            'retirement_plan': 1 if _pick(w2, 'retirement_plan', 'box_13_retirement') else 0,
+            'third_party_sick_pay': 1 if _pick(w2, 'third_party_sick_pay', 'box_13_third_party_sick') else 0,
+        })]
+
+        if self.include_state_records:
+            for state in w2.get('state_data') or []:
+                code = STATE_FIPS.get(str(state.get('state', '')).upper())
+                if not code:
+                    continue
+                records.append(RS_LAYOUT.render({
+                    **person,
+                    'state_code': code,
+                    'state_code_2': code,
+                    'state_employer_account': state.get('state_ein'),
+                    'state_wages': state.get('state_wages'),
+                    'state_tax': state.get('state_tax'),
+                    'local_wages': state.get('local_wages'),
+                    'local_tax': state.get('local_tax'),
+                }))
+        return records
+
+    # -- stream ----------------------------------------------------------------
+
+    def _open_file(self) -> None:
+        self.files.open()
+        self.file_rw_count = 0
+        self.files.write(self._ra())
+
+    def _open_block(self) -> None:
+        self.block_count = 0
+        self.block_totals = _zero_totals()
+        self.files.write(self._re())
+
+    def _close_block(self) -> None:
+        self.files.write(RT_LAYOUT.render({'rw_count': self.block_count, **self.block_totals}))
+
+    def _close_file(self) -> None:
+        self.files.write(RF_LAYOUT.render({'rw_count': self.file_rw_count}))
+        self.files.close(employee_count=self.file_rw_count)
+
+    def begin_employer(self, employer: Dict) -> None:
+        if self.employer is not None:
+            self.end_employer()
+        self.employer = employer
+        self._employer_ein = _digits(_pick(employer, 'employer_ein', 'ein'))
+        self.employer_totals.setdefault(self._employer_ein, _zero_totals())
+        if not self.files.is_open:
+            self._open_file()
+        elif not self.files.fits(EFW2_RECORD_LENGTH + 2 + self._trailer_bytes):
+            self._close_file()
+            self._open_file()
+        self._open_block()
+
+    def validate_w2(self, w2: Dict) -> None:
+        """Render a W-2's records without writing them; raises ValueError."""
+        self._employee_records(w2, w2_amounts(w2))
+
+    def write_w2(self, w2: Dict) -> None:
+        if self.employer is None:
+            raise ValueError('begin_employer() must be called before write_w2()')
+
+        amounts = w2_amounts(w2)
+        records = self._employee_records(w2, amounts)
+
+        needed = len(records) * (EFW2_RECORD_LENGTH + 2) + self._trailer_bytes
+        if not self.files.fits(needed):
+            self._close_block()
+            self._close_file()
+            self._open_file()
+            self._open_block()
+
+        for record in records:
+            self.files.write(record)
+
+        self.block_count += 1
+        self.file_rw_count += 1
+        self.employee_count += 1
+        employer_totals = self.employer_totals[self._employer_ein]
+        for key, value in amounts.items():
+            self.block_totals[key] += value
+            self.totals[key] += value
+            employer_totals[key] += value
+
+    def end_employer(self) -> None:
+        if self.employer is not None:
+            self._close_block()
+            self.employer = None
+
+    def close(self) -> Dict:
+        self.end_employer()
+        if self.files.is_open:
+            self._close_file()
+        return {
+            'files': self.files.files,
+            'employee_count': self.employee_count,
+            'totals': {k: float(v) for k, v in self.totals.items() if v},
+        }
+
+
+# =============================================================================
+# IRS FIRE
+# =============================================================================
+
+FIRE_AMOUNT_CODES = '123456789ABCDEFGHJ'
+
+# type of return code and {amount code: form key} per supported form
+FIRE_RETURN_TYPES = {
+    '1099-NEC': ('NE', {'1': 'amount', '4': 'federal_tax_withheld'}),
+    '1099-MISC': ('A', {'1': 'rents', '2': 'royalties', '3': 'amount', '4': 'federal_tax_withheld'}),
+}
+
+
+def _amount_fields(base: int, width: int) -> List[Tuple[str, int, int, str]]:
+    return [(f"amount_{code}", base + i * width, width, 'M') for i, code in enumerate(FIRE_AMOUNT_CODES)]
+
+
+T_LAYOUT = RecordLayout('T', FIRE_RECORD_LENGTH, [
+    ('payment_year', 2, 4, 'N'),
+    ('prior_year', 6, 1, 'A'),
+    ('transmitter_tin', 7, 9, 'T'),
+    ('tcc', 16, 5, 'A'),
+    ('test_file', 28, 1, 'A'),
+    ('transmitter_name', 30, 40, 'A'),
+    ('company_name', 110, 40, 'A'),
+    ('company_address', 190, 40, 'A'),
+    ('company_city', 230, 40, 'A'),
+    ('company_state', 270, 2, 'A'),
+    ('company_zip', 272, 9, 'A'),
+    ('payee_count', 296, 8, 'N'),
+    ('contact_name', 304, 40, 'A'),
+    ('contact_phone', 344, 15, 'A'),
+    ('contact_email', 359, 50, 'A'),
+    ('sequence', 500, 8, 'N'),
+    ('vendor_indicator', 518, 1, 'A'),
+], required=('payment_year', 'transmitter_tin', 'tcc', 'transmitter_name', 'contact_name'))
+
+A_LAYOUT = RecordLayout('A', FIRE_RECORD_LENGTH, [
+    ('payment_year', 2, 4, 'N'),
+    ('payer_tin', 12, 9, 'T'),
+    ('name_control', 21, 4, 'A'),
+    ('last_filing', 25, 1, 'A'),
+    ('return_type', 26, 2, 'A'),
+    ('amount_codes', 28, 18, 'A'),
+    ('payer_name', 53, 40, 'A'),
+    ('transfer_agent', 133, 1, 'N'),
+    ('payer_address', 134, 40, 'A'),
+    ('payer_city', 174, 40, 'A'),
+    ('payer_state', 214, 2, 'A'),
+    ('payer_zip', 216, 9, 'A'),
+    ('payer_phone', 225, 15, 'A'),
+    ('sequence', 500, 8, 'N'),
+], required=('payment_year', 'payer_tin', 'return_type', 'amount_codes', 'payer_name'))
+
+B_LAYOUT = RecordLayout('B', FIRE_RECORD_LENGTH, [
+    ('payment_year', 2, 4, 'N'),
+    ('corrected', 6, 1, 'A'),
+    ('name_control', 7, 4, 'A'),
+    ('tin_type', 11, 1, 'A'),
+    ('payee_tin', 12, 9, 'T'),
+    ('account_number', 21, 20, 'A'),
+    *_amount_fields(55, 12),
+    ('payee_name', 288, 40, 'A'),
+    ('payee_name_2', 328, 40, 'A'),
+    ('payee_address', 408, 40, 'A'),
+    ('payee_city', 448, 40, 'A'),
+    ('payee_state', 488, 2, 'A'),
+    ('payee_zip', 490, 9, 'A'),
+    ('sequence', 500, 8, 'N'),
+    ('second_tin_notice', 544, 1, 'A'),
+    ('direct_sales', 547, 1, 'A'),
+    ('fatca', 548, 1, 'A'),
+    ('state_tax', 723, 12, 'M'),
+    ('local_tax', 735, 12, 'M'),
+], required=('payment_year', 'payee_tin', 'payee_name'))
+
+C_LAYOUT = RecordLayout('C', FIRE_RECORD_LENGTH, [
+    ('payee_count', 2, 8, 'N'),
+    *_amount_fields(16, 18),
+    ('sequence', 500, 8, 'N'),
+], required=('payee_count',))
+
+F_LAYOUT = RecordLayout('F', FIRE_RECORD_LENGTH, [
+    ('a_count', 2, 8, 'N'),
+    ('zeros', 10, 21, 'N'),
+    ('payee_count', 50, 8, 'N'),
+    ('sequence', 500, 8, 'N'),
+], required=('a_count',))
+
+# T record "total number of payees" is only known once the file is complete
+T_PAYEE_COUNT_OFFSET = 295
+FIRE_SEQUENCE_POSITION = 500
+
+
+class FIREWriter:
+    """
+    Streams an IRS FIRE submission: T, then per payer A / B... / C, then F.
+    Payers must arrive grouped; each change of payer closes the open A
+    block. Files roll over under `max_file_bytes` with T and A re-emitted.
+    """
+
+    def __init__(self, directory: str, transmitter: Dict, tax_year: int, form_type: str = '1099-NEC',
+                 is_correction: bool = False, is_test: bool = False,
+                 max_file_bytes: int = FIRE_MAX_FILE_BYTES, prefix: str = 'fire'):
+        if form_type not in FIRE_RETURN_TYPES:
+            raise ValueError(f"Unsupported FIRE form type: {form_type}")
+        self.files = _FileSet(directory, prefix, max_file_bytes, inline_newline=True)
+        self.transmitter = transmitter
+        self.tax_year = tax_year
+        self.return_type, self.amount_keys = FIRE_RETURN_TYPES[form_type]
+        self.is_correction = is_correction
+        self.is_test = is_test
+
+        self.payer: Optional[Dict] = None
+        self.sequence = 0
+        self.block_count = 0
+        self.block_totals: Dict[str, Decimal] = {}
+        self.file_a_count = 0
+        self.file_b_count = 0
+
+        self.form_count = 0
+        self.totals = {code: Decimal('0.00') for code in self.amount_keys}
+
+        # C + F must always fit behind the last payee record
+        self._trailer_bytes = 2 * FIRE_RECORD_LENGTH
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def abort(self) -> None:
+        self.files.abort()
+
+    def _write(self, record: str) -> None:
+        """Write a rendered record, stamping its position in the file."""
+        self.sequence += 1
+        start = FIRE_SEQUENCE_POSITION - 1
+        self.files.write(record[:start] + str(self.sequence).zfill(8) + record[start + 8:])
+
+    def _open_file(self) -> None:
+        t = self.transmitter
+        self.files.open()
+        self.sequence = 0
+        self.file_a_count = 0
+        self.file_b_count = 0
+        self._write(T_LAYOUT.render({
+            'payment_year': self.tax_year,
+            # A payer filing its own returns is its own transmitter
+            'transmitter_tin': _pick(t, 'tin', default=(self.payer or {}).get('payer_tin')),
+            'tcc': t.get('tcc'),
+            'test_file': 'T' if self.is_test else '',
+            'transmitter_name': t.get('name'),
+            'company_name': _pick(t, 'company_name', 'name'),
+            'company_address': t.get('address'),
+            'company_city': t.get('city'),
+            'company_state': t.get('state'),
+            'company_zip': _digits(t.get('zip')),
+            'contact_name': t.get('contact_name'),
+            'contact_phone': _digits(t.get('contact_phone')),
+            'contact_email': t.get('contact_email'),
+            'vendor_indicator': 'I',
+        }))
+
+    def _open_block(self) -> None:
+        p = self.payer
+        self.block_count = 0
+        self.block_totals = {code: Decimal('0.00') for code in self.amount_keys}
+        self.file_a_count += 1
+        self._write(A_LAYOUT.render({
+            'payment_year': self.tax_year,
+            'payer_tin': p.get('payer_tin'),
+            'return_type': self.return_type,
+            'amount_codes': ''.join(sorted(self.amount_keys, key=FIRE_AMOUNT_CODES.index)),
+            'payer_name': _pick(p, 'payer_name', default=p.get('payer_tin')),
+            'transfer_agent': 0,
+            'payer_address': p.get('payer_address'),
+            'payer_city': p.get('payer_city'),
+            'payer_state': p.get('payer_state'),
+            'payer_zip': _digits(p.get('payer_zip')),
+            'payer_phone': _digits(p.get('payer_phone')),
+        }))
+
+    def _close_block(self) -> None:
+        self._write(C_LAYOUT.render({
+            'payee_count': self.block_count,
+            **{f"amount_{code}": total for code, total in self.block_totals.items()},
+        }))
+
+    def _close_file(self) -> None:
+        self._write(F_LAYOUT.render({'a_count': self.file_a_count, 'payee_count': self.file_b_count}))
+        self.files.patch(T_PAYEE_COUNT_OFFSET, str(self.file_b_count).zfill(8))
+        self.files.close(form_count=self.file_b_count, payer_count=self.file_a_count)
+
+    def _payee_values(self, form: Dict) -> Dict:
+        city, state, zip5, zip4 = split_city_state_zip(form.get('recipient_city_state_zip', ''))
+        tin_type = str(form.get('recipient_tin_type') or form.get('tin_type') or '').lower()
+        values = {
+            'payment_year': self.tax_year,
+            'corrected': 'G' if self.is_correction else '',
+            'tin_type': {'ein': '1', 'ssn': '2', 'itin': '2', 'atin': '2'}.get(tin_type, ''),
+            'payee_tin': form.get('recipient_tin'),
+            'account_number': str(_pick(form, 'account_number', 'form_id', default=''))[:20],
+            'payee_name': form.get('recipient_name'),
+            'payee_name_2': form.get('recipient_business_name'),
+            'payee_address': form.get('recipient_address'),
+            'payee_city': _pick(form, 'recipient_city', default=city),
+            'payee_state': _pick(form, 'recipient_state', default=state),
+            'payee_zip': _digits(_pick(form, 'recipient_zip', default=zip5 + zip4)),
+            'second_tin_notice': '2' if form.get('second_tin_notice') else '',
+            'direct_sales': '1' if form.get('direct_sales') else '',
+            'fatca': '1' if form.get('fatca') else '',
+            'state_tax': form.get('state_tax_withheld'),
+            'local_tax': form.get('local_tax_withheld'),
+        }
+        for code, key in self.amount_keys.items():
+            values[f"amount_{code}"] = form.get(key) or 0
+        return values
+
+    def validate_form(self, form: Dict) -> None:
+        """Render a form's B record without writing it; raises ValueError."""
+        B_LAYOUT.render(self._payee_values(form))
+
+    def write_form(self, form: Dict) -> None:
+        if self.payer is None or _digits(form.get('payer_tin')) != _digits(self.payer.get('payer_tin')):
+            self._begin_payer(form)
+
+        values = self._payee_values(form)
+        record = B_LAYOUT.render(values)
+
+        if not self.files.fits(FIRE_RECORD_LENGTH + self._trailer_bytes):
+            self._close_block()
+            self._close_file()
+            self._open_file()
+            self._open_block()
+
+        self._write(record)
+        self.block_count += 1
+        self.file_b_count += 1
+        self.form_count += 1
+        for code in self.amount_keys:
+            amount = Decimal(str(values[f"amount_{code}"]))
+            self.block_totals[code] += amount
+            self.totals[code] += amount
+
+    def _begin_payer(self, form: Dict) -> None:
+        if self.payer is not None:
+            self._close_block()
+        self.payer = {k: v for k, v in form.items() if k.startswith('payer_')}
+        if not self.files.is_open:
+            self._open_file()
+        elif not self.files.fits(2 * FIRE_RECORD_LENGTH + self._trailer_bytes):
+            self._close_file()
+            self._open_file()
+        self._open_block()
+
+    def close(self) -> Dict:
+        if self.payer is not None:
+            self._close_block()
+            self.payer = None
+        if self.files.is_open:
+            self._close_file()
+        return {
+            'files': self.files.files,
+            'form_count': self.form_count,
+            'totals': {code: float(total) for code, total in self.totals.items()},
+        }
@@ -0,0 +1,539 @@
+"""
+SAURELLIUS FORM RENDERING SERVICE
+Fills the blank IRS PDFs in regulatory_forms/ from W-2, 1099-NEC and 941 records
+Each PDF is parsed once into a cached template; batches stamp thousands of copies into one PDF or a ZIP
+"""
+
+import io
+import logging
+import os
+import re
+import threading
+import zipfile
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from models import Company, ContractorForm1099, YearEndForm
+
+logger = logging.getLogger(__name__)
+
+try:
+    from pypdf import PdfReader, PdfWriter, PageObject
+    from pypdf.generic import (
+        ArrayObject, DecodedStreamObject, DictionaryObject, FloatObject, NameObject,
+    )
+    HAS_PYPDF = True
+except ImportError:
+    HAS_PYPDF = False
+    logger.warning("PDF form rendering unavailable. Install with: pip install pypdf")
+
+
+FORMS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'regulatory_forms')
+
+TEMPLATE_FILES = {
+    'w-2': 'fw2.pdf',
+    'w-4': 'fw4.pdf',
+    'w-9': 'fw9.pdf',
+    '1099-nec': 'f1099nec.pdf',
+    '1099-misc': 'f1099misc.pdf',
+    '941': 'f941.pdf',
+    '940': 'f940.pdf',
+}
+
+FONT_SIZE = 8.0
+MIN_FONT_SIZE = 5.0
+PADDING = 2.0
+COMB_FLAG = 1 << 24
+MULTILINE_FLAG = 1 << 12
+
+# Helvetica advance widths (1/1000 em) for printable ASCII, from the standard AFM
+_HELVETICA_WIDTHS = dict(zip(range(32, 127), (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)))
+
+_FIELD_NAME = re.compile(r'^([a-z])\d+_0*(\d+)$')
+
+
+def text_width(text: str, size: float) -> float:
+    return sum(_HELVETICA_WIDTHS.get(ord(c), 556) for c in text) * size / 1000
+
+
+def _pdf_string(text: str) -> bytes:
+    raw = text.encode('cp1252', 'replace')
+    return b'(' + raw.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+
+
+def _money(value) -> str:
+    if value in (None, '') or not float(value):
+        return ''
+    return f"{float(value):,.2f}"
+
+
+def _dollars_cents(value) -> Tuple[str, str]:
+    """Split an amount for forms with separate dollars and cents boxes."""
+    if value in (None, '') or not float(value):
+        return '', ''
+    dollars, cents = f"{float(value):,.2f}".split('.')
+    return dollars, cents
+
+
+# =============================================================================
+# TEMPLATES
+# =============================================================================
+
+@dataclass
+class FieldSpec:
+    name: str                      # short field name without the [n] index, e.g. f2_09
+    kind: str                      # text or check
+    rect: Tuple[float, float, float, float]
+    align: int = 0                 # 0 left, 1 center, 2 right
+    multiline: bool = False
+    comb: int = 0                  # cell count for comb fields
+
+
+@dataclass
+class TemplatePage:
+    index: int
+    copy: Optional[str]            # CopyA, CopyB, Page1, ... from the field hierarchy
+    width: float
+    height: float
+    content: bytes
+    resources: object
+    fields: Dict[str, FieldSpec] = field(default_factory=dict)   # by short name
+    slots: Dict[str, FieldSpec] = field(default_factory=dict)    # by copy-independent slot, e.g. f9
+
+
+def _slot(short_name: str, occurrence: int) -> Optional[str]:
+    """f2_09 and f1_09 are the same box on different copies; both map to slot f9."""
+    match = _FIELD_NAME.match(short_name)
+    if not match:
+        return None
+    slot = f"{match.group(1)}{int(match.group(2))}"
+    return f"{slot}.{occurrence}" if occurrence else slot
+
+
+class FormTemplate:
+    """A blank government PDF parsed once: page content, resources and field geometry."""
+
+    def __init__(self, form_id: str, path: str):
+        self.form_id = form_id
+        self.path = path
+        self.mtime = os.path.getmtime(path)
+        reader = PdfReader(path)
+        self.pages = [self._load_page(i, page) for i, page in enumerate(reader.pages)]
+
+    def _load_page(self, index: int, page) -> TemplatePage:
+        contents = page.get_contents()
+        box = page.mediabox
+        tpl = TemplatePage(
+            index=index, copy=None,
+            width=float(box.width), height=float(box.height),
+            content=contents.get_data() if contents is not None else b'',
+            resources=page.get('/Resources') or DictionaryObject(),
+        )
+
+        annots = page.get('/Annots')
+        for ref in (annots.get_object() if annots else []):
+            widget = ref.get_object()
+            if widget.get('/Subtype') != '/Widget':
+                continue
+            names, node = [], widget
+            while node is not None:
+                if '/T' in node:
+                    names.append(str(node['/T']))
+                parent = node.get('/Parent')
+                node = parent.get_object() if parent is not None else None
+            if not names:
+                continue
+
+            short, _, occurrence = names[0].partition('[')
+            occurrence = int(occurrence.rstrip(']') or 0)
+            if tpl.copy is None and len(names) > 2:
+                tpl.copy = names[-2].split('[')[0]
+
+            inherited = widget.get('/Parent').get_object() if widget.get('/Parent') is not None else {}
+            field_type = widget.get('/FT') or inherited.get('/FT')
+            flags = int(widget.get('/Ff') or inherited.get('/Ff') or 0)
+            max_len = int(widget.get('/MaxLen') or inherited.get('/MaxLen') or 0)
+            spec = FieldSpec(
+                name=short,
+                kind='check' if field_type == '/Btn' else 'text',
+                rect=tuple(float(v) for v in widget['/Rect']),
+                align=int(widget.get('/Q') or inherited.get('/Q') or 0),
+                multiline=bool(flags & MULTILINE_FLAG),
+                comb=max_len if flags & COMB_FLAG else 0,
+            )
+            key = f"{short}.{occurrence}" if occurrence else short
+            tpl.fields[key] = spec
+            slot = _slot(short, occurrence)
+            if slot:
+                tpl.slots[slot] = spec
+        return tpl
+
+    def pages_for(self, copies: Optional[Iterable[str]]) -> List[TemplatePage]:
+        if not copies:
+            return [p for p in self.pages if p.fields]
+        wanted = list(copies)
+        by_copy = {p.copy: p for p in self.pages if p.copy}
+        missing = [c for c in wanted if c not in by_copy]
+        if missing:
+            raise ValueError(f"{self.form_id} has no {', '.join(missing)}; available: {', '.join(by_copy)}")
+        return [by_copy[c] for c in wanted]
+
+
+_templates: Dict[str, FormTemplate] = {}
+_templates_lock = threading.Lock()
+
+
+def get_template(form_id: str) -> FormTemplate:
+    """Parsed template for a form id, re-read only if the PDF on disk changed."""
+    if not HAS_PYPDF:
+        raise RuntimeError("PDF form rendering requires pypdf")
+    filename = TEMPLATE_FILES.get(form_id)
+    if not filename:
+        raise ValueError(f"No fillable template for form {form_id}")
+    path = os.path.join(FORMS_DIR, filename)
+    if not os.path.exists(path):
+        raise ValueError(f"Form file for {form_id} not available")
+
+    with _templates_lock:
+        template = _templates.get(form_id)
+        if template is None or template.mtime != os.path.getmtime(path):
+            template = _templates[form_id] = FormTemplate(form_id, path)
+        return template
+
+
+# =============================================================================
+# FIELD LAYOUTS
+# =============================================================================
+
+def _w2_values(data: Dict) -> Dict:
+    values = {
+        'f1': data.get('employee_ssn', ''),
+        'f2': data.get('employer_ein', ''),
+        'f3': f"{data.get('employer_name', '')}\n{data.get('employer_address', '')}\n{data.get('employer_city_state_zip', '')}",
+        'f4': data.get('control_number', ''),
+        'f5': data.get('employee_name', ''),
+        'f8': f"{data.get('employee_address', '')}\n{data.get('employee_city_state_zip', '')}",
+        'f9': _money(data.get('box_1_wages')),
+        'f10': _money(data.get('box_2_federal_tax')),
+        'f11': _money(data.get('box_3_ss_wages')),
+        'f12': _money(data.get('box_4_ss_tax')),
+        'f13': _money(data.get('box_5_medicare_wages')),
+        'f14': _money(data.get('box_6_medicare_tax')),
+        'f15': _money(data.get('box_7_ss_tips')),
+        'f16': _money(data.get('box_8_allocated_tips')),
+        'f18': _money(data.get('box_10_dependent_care')),
+        'f19': _money(data.get('box_11_nonqualified')),
+        'c2': bool(data.get('box_13_statutory')),
+        'c3': bool(data.get('box_13_retirement')),
+        'c4': bool(data.get('box_13_third_party_sick')),
+        'f28': '\n'.join(f"{b['description']} {_money(b['amount'])}" for b in data.get('box_14_other') or []),
+    }
+    for i, entry in enumerate((data.get('box_12') or [])[:4]):
+        values[f"f{20 + 2 * i}"] = entry['code']
+        values[f"f{21 + 2 * i}"] = _money(entry['amount'])
+    for i, state in enumerate((data.get('state_data') or [])[:2]):
+        values[f"f{29 + 2 * i}"] = state.get('state', '')
+        values[f"f{30 + 2 * i}"] = state.get('state_ein', '')
+        values[f"f{33 + i}"] = _money(state.get('state_wages'))
+        values[f"f{35 + i}"] = _money(state.get('state_tax'))
+        values[f"f{37 + i}"] = _money(state.get('local_wages'))
+        values[f"f{39 + i}"] = _money(state.get('local_tax'))
+        values[f"f{41 + i}"] = state.get('locality_name', '')
+    return values
+
+
+def _1099_nec_values(data: Dict) -> Dict:
+    values = {
+        'f1': str(data.get('tax_year', ''))[-2:],
+        'f2': '\n'.join(filter(None, (
+            data.get('payer_name'), data.get('payer_address'),
+            data.get('payer_city_state_zip'), data.get('payer_phone'),
+        ))),
+        'f3': data.get('payer_tin', ''),
+        'f4': data.get('recipient_tin', ''),
+        'f5': data.get('recipient_name', ''),
+        'f6': data.get('recipient_address', ''),
+        'f7': data.get('recipient_city_state_zip', ''),
+        'f8': str(data.get('account_number', '')),
+        'f9': _money(data.get('box_1_compensation')),
+        'f11': _money(data.get('box_4_federal_withheld')),
+    }
+    for i, state in enumerate((data.get('state_data') or [])[:2]):
+        values[f"f{12 + i}"] = _money(state.get('state_tax'))
+        values[f"f{14 + i}"] = f"{state.get('state', '')} {state.get('payer_state_id', '')}".strip()
+        values[f"f{16 + i}"] = _money(state.get('state_income'))
+    return values
+
+
+# 941 Part 1 amount lines -> (dollars slot, cents slot); 5a-5d also have a wages column
+_941_LINES = {
+    'line_2_wages': (13, 14), 'line_3_federal_tax': (15, 16),
+    'line_5a_ss_wages': (17, 18), 'line_5a_ss_tax': (19, 20),
+    'line_5b_ss_tips': (21, 22), 'line_5b_ss_tips_tax': (23, 24),
+    'line_5c_medicare_wages': (25, 26), 'line_5c_medicare_tax': (27, 28),
+    'line_5d_additional_medicare_wages': (29, 30), 'line_5d_additional_medicare': (31, 32),
+    'line_5e_total': (33, 34), 'line_6_total_ss_medicare': (37, 38),
+    'line_10_total_taxes': (45, 46), 'line_11_qualified_sick_leave': (47, 48),
+    'line_12_total_taxes_after_credits': (49, 50), 'line_13_deposits': (51, 52),
+    'line_14_balance_due': (53, 54), 'line_15_overpayment': (55, 56),
+}
+
+
+def _941_values(data: Dict) -> Dict:
+    ein = ''.join(c for c in str(data.get('employer_ein', '')) if c.isdigit())
+    values = {
+        'f1': ein[:2], 'f2': ein[2:],
+        'f3': data.get('employer_name', ''),
+        'f5': data.get('employer_address', ''),
+        'f12': str(data.get('line_1_employees', '') or ''),
+    }
+    quarter = data.get('quarter')
+    if quarter in (1, 2, 3, 4):
+        values['c1' if quarter == 1 else f"c1.{quarter - 1}"] = True
+    if 'line_5e_total' not in data and 'line_6_total_ss_medicare' in data:
+        data = {**data, 'line_5e_total': data['line_6_total_ss_medicare']}
+    for key, (dollars, cents) in _941_LINES.items():
+        if data.get(key) not in (None, ''):
+            values[f"f{dollars}"], values[f"f{cents}"] = _dollars_cents(data[key])
+    return values
+
+
+@dataclass
+class FormLayout:
+    values: Callable[[Dict], Dict]
+    copies: Tuple[str, ...]        # default copies printed per record
+
+
+LAYOUTS = {
+    'w-2': FormLayout(_w2_values, ('CopyB', 'CopyC', 'Copy2')),
+    '1099-nec': FormLayout(_1099_nec_values, ('CopyB',)),
+    '941': FormLayout(_941_values, ('Page1',)),
+}
+
+
+# =============================================================================
+# STAMPING
+# =============================================================================
+
+def _text_ops(spec: FieldSpec, value: str) -> List[bytes]:
+    x1, y1, x2, y2 = spec.rect
+    width, height = x2 - x1, y2 - y1
+
+    if spec.comb and not spec.multiline:
+        cell = width / spec.comb
+        size = min(FONT_SIZE, height - PADDING)
+        y = y1 + (height - size * 0.7) / 2
+        return [
+            b'BT /Helv %.1f Tf %.2f %.2f Td %s Tj ET' % (
+                size, x1 + cell * i + (cell - text_width(ch, size)) / 2, y, _pdf_string(ch))
+            for i, ch in enumerate(value[:spec.comb])
+        ]
+
+    lines = value.split('\n') if spec.multiline else [value.replace('\n', ' ')]
+    size = FONT_SIZE
+    widest = max(text_width(line, size) for line in lines)
+    if widest > width - 2 * PADDING:
+        size = max(MIN_FONT_SIZE, size * (width - 2 * PADDING) / widest)
+    leading = size * 1.15
+    if spec.multiline:
+        y = y2 - PADDING - size * 0.8
+    else:
+        y = y1 + (height - size * 0.7) / 2
+
+    ops = []
+    for line in lines:
+        line_width = text_width(line, size)
+        if spec.align == 2:
+            x = x2 - PADDING - line_width
+        elif spec.align == 1:
+            x = x1 + (width - line_width) / 2
+        else:
+            x = x1 + PADDING
+        ops.append(b'BT /Helv %.1f Tf %.2f %.2f Td %s Tj ET' % (size, x, y, _pdf_string(line)))
+        y -= leading
+    return ops
+
+
+def stamp_ops(page: TemplatePage, values: Dict) -> bytes:
+    """Content-stream operators drawing values over one template page."""
+    ops = [b'q /Tpl Do Q 0 g']
+    for key, value in values.items():
+        spec = page.slots.get(key) or page.fields.get(key)
+        if spec is None or value in (None, '', False):
+            continue
+        if spec.kind == 'check':
+            x1, y1, x2, y2 = spec.rect
+            size = min(x2 - x1, y2 - y1) * 0.8
+            ops.append(b'BT /ZaDb %.1f Tf %.2f %.2f Td (4) Tj ET' % (
+                size, x1 + (x2 - x1 - size * 0.75) / 2, y1 + (y2 - y1 - size * 0.7) / 2))
+        else:
+            ops.extend(_text_ops(spec, str(value)))
+    return b'\n'.join(ops)
+
+
+class _StampWriter:
+    """One output document; each template page becomes a shared form XObject."""
+
+    def __init__(self):
+        self.writer = PdfWriter()
+        self._xobjects = {}
+        self._fonts = self.writer._add_object(DictionaryObject({
+            NameObject('/Helv'): self.writer._add_object(DictionaryObject({
+                NameObject('/Type'): NameObject('/Font'),
+                NameObject('/Subtype'): NameObject('/Type1'),
+                NameObject('/BaseFont'): NameObject('/Helvetica'),
+                NameObject('/Encoding'): NameObject('/WinAnsiEncoding'),
+            })),
+            NameObject('/ZaDb'): self.writer._add_object(DictionaryObject({
+                NameObject('/Type'): NameObject('/Font'),
+                NameObject('/Subtype'): NameObject('/Type1'),
+                NameObject('/BaseFont'): NameObject('/ZapfDingbats'),
+            })),
+        }))
+
+    def _xobject(self, form_id: str, page: TemplatePage):
+        key = (form_id, page.index)
+        if key not in self._xobjects:
+            stream = DecodedStreamObject()
+            stream.set_data(page.content)
+            stream = stream.flate_encode()
+            stream.update({
+                NameObject('/Type'): NameObject('/XObject'),
+                NameObject('/Subtype'): NameObject('/Form'),
+                NameObject('/BBox'): ArrayObject([FloatObject(0), FloatObject(0),
+                                                  FloatObject(page.width), FloatObject(page.height)]),
+                NameObject('/Resources'): page.resources.clone(self.writer),
+            })
+            self._xobjects[key] = self.writer._add_object(stream)
+        return self._xobjects[key]
+
+    def add(self, form_id: str, page: TemplatePage, values: Dict):
+        content = DecodedStreamObject()
+        content.set_data(stamp_ops(page, values))
+        out = PageObject.create_blank_page(self.writer, page.width, page.height)
+        out[NameObject('/Resources')] = DictionaryObject({
+            NameObject('/XObject'): DictionaryObject({NameObject('/Tpl'): self._xobject(form_id, page)}),
+            NameObject('/Font'): self._fonts,
+        })
+        out[NameObject('/Contents')] = self.writer._add_object(content.flate_encode())
+        self.writer.add_page(out)
+
+    def getvalue(self) -> bytes:
+        buffer = io.BytesIO()
+        self.writer.write(buffer)
+        return buffer.getvalue()
+
+
+class FormRenderService:
+    """Stamps record data onto cached form templates"""
+
+    def field_map(self, form_id: str) -> List[Dict]:
+        """Pages and fields of a template, for building new layouts"""
+        return [{
+            'page': p.index,
+            'copy': p.copy,
+            'fields': {k: {'slot': next((s for s, v in p.slots.items() if v is spec), None),
+                           'kind': spec.kind, 'rect': spec.rect}
+                       for k, spec in p.fields.items()},
+        } for p in get_template(form_id).pages]
+
+    def _pages(self, form_id: str, copies: Optional[Iterable[str]]):
+        layout = LAYOUTS.get(form_id)
+        template = get_template(form_id)
+        pages = template.pages_for(copies or (layout.copies if layout else None))
+        return pages, (layout.values if layout else dict)
+
+    def render_pdf(self, form_id: str, records: Iterable[Dict],
+                   copies: Optional[Iterable[str]] = None) -> bytes:
+        """One merged PDF: every requested copy of every record, in record order."""
+        pages, to_values = self._pages(form_id, copies)
+        out = _StampWriter()
+        count = 0
+        for record in records:
+            values = to_values(record)
+            for page in pages:
+                out.add(form_id, page, values)
+            count += 1
+        if not count:
+            raise ValueError("No records to render")
+        return out.getvalue()
+
+    def render_zip(self, form_id: str, records: Iterable[Dict],
+                   copies: Optional[Iterable[str]] = None,
+                   name: Callable[[Dict, int], str] = None) -> bytes:
+        """A ZIP with one PDF per record."""
+        pages, to_values = self._pages(form_id, copies)
+        name = name or (lambda record, i: f"{form_id}_{i:05d}.pdf")
+        buffer = io.BytesIO()
+        count = 0
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for record in records:
+                out = _StampWriter()
+                values = to_values(record)
+                for page in pages:
+                    out.add(form_id, page, values)
+                count += 1
+                archive.writestr(name(record, count), out.getvalue())
+        if not count:
+            raise ValueError("No records to render")
+        return buffer.getvalue()
+
+
+    # =========================================================================
+    # STORED FORMS
+    # =========================================================================
+
+    def render(self, form_id: str, records: Iterable[Dict], copies: Optional[Iterable[str]] = None,
+               output: str = 'pdf', name: Callable[[Dict, int], str] = None) -> bytes:
+        if output == 'zip':
+            return self.render_zip(form_id, records, copies, name)
+        if output != 'pdf':
+            raise ValueError("output must be pdf or zip")
+        return self.render_pdf(form_id, records, copies)
+
+    def company_w2s(self, company_id: int, tax_year: int, copies: Optional[Iterable[str]] = None,
+                    output: str = 'pdf') -> bytes:
+        """Every W-2 a year-end run persisted for the company, in employee order."""
+        forms = YearEndForm.query.filter_by(
+            company_id=company_id, tax_year=tax_year, form_type='W-2'
+        ).order_by(YearEndForm.employee_id).yield_per(500)
+        return self.render('w-2', (f.data for f in forms), copies, output,
+                           lambda data, i: f"W-2_{tax_year}_{data.get('control_number') or i}.pdf")
+
+    def client_1099s(self, client_id: str, tax_year: int, copies: Optional[Iterable[str]] = None,
+                     output: str = 'pdf') -> bytes:
+        """Every 1099-NEC generated for a payer's contractors."""
+        company = Company.query.get(int(client_id)) if str(client_id).isdigit() else None
+        payer = {
+            'payer_name': company.name if company else '',
+            'payer_address': company.address if company else '',
+            'payer_city_state_zip': f"{company.city}, {company.state} {company.zip_code}" if company else '',
+            'payer_tin': company.ein if company else '',
+            'payer_phone': company.phone if company else '',
+        }
+        forms = ContractorForm1099.query.filter_by(
+            client_id=str(client_id), tax_year=tax_year
+        ).order_by(ContractorForm1099.id).yield_per(500)
+        records = ({
+            **payer,
+            'tax_year': f.tax_year,
+            'recipient_tin': f.recipient_tin_masked or '',
+            'recipient_name': f.recipient_name or '',
+            'recipient_address': f.recipient_address or '',
+            'account_number': f.contractor_id,
+            'box_1_compensation': f.box_1_nonemployee_compensation,
+            'box_4_federal_withheld': f.box_4_federal_tax_withheld,
+        } for f in forms)
+        return self.render('1099-nec', records, copies, output,
+                           lambda data, i: f"1099-NEC_{tax_year}_{data['account_number']}.pdf")
+
+
+# Singleton instance
+form_renderer = FormRenderService()
@@ -478,47 +478,35 @@ Provide JSON:
     
     def detect_anomalies(self, paystub_history: List[Dict]) -> Dict[str, Any]:
         """
-        AI-powered anomaly detection in paystub patterns.
-        Identifies potentially fraudulent or erroneous entries.
+        Anomaly detection in paystub patterns.
+        Outliers are found statistically (median/MAD per metric); the model
+        only writes the recommendation for what was flagged.
         """
         if len(paystub_history) < 3:
             return {"anomalies_detected": False, "items": []}
         
-        # Summarize history for prompt
-        summary = []
-        for i, stub in enumerate(paystub_history[-10:]):  # Last 10
-            summary.append(f"Pay {i+1}: Gross ${stub.get('gross_pay', 0)}, Net ${stub.get('net_pay', 0)}")
+        from services.payroll_anomaly_service import payroll_anomaly_detector
+        result = payroll_anomaly_detector.check_series(paystub_history)
+        result["recommendation"] = self._explain_anomalies(
+            [f"Pay {item['pay_period']}: {item['issue']} ({item['severity']})" for item in result["items"]]
+        )
+        return result
+    
+    def _explain_anomalies(self, flagged: List[str], limit: int = 20) -> str:
+        """Short recommendation for flagged rows, written by the model when it is available"""
+        if not flagged:
+            return "No unusual pay patterns found."
         
-        prompt = f"""Analyze these recent paystubs for anomalies:
-
-{chr(10).join(summary)}
+        prompt = f"""These payroll entries were flagged by statistical checks against each employee's pay history:
 
-Look for:
-1. Unusual spikes or drops in pay
-2. Inconsistent deduction patterns
-3. Potential data entry errors
-4. Patterns that might indicate fraud
+{chr(10).join(flagged[:limit])}
 
-Return JSON:
-{{
-    "anomalies_detected": true/false,
-    "risk_level": "low/medium/high",
-    "items": [{{"pay_period": X, "issue": "description", "severity": "low/medium/high"}}],
-    "recommendation": "what to do"
-}}"""
+In 2-3 sentences, explain the likely causes (data entry error, missed or duplicate hours, rate change, fraud) and what the payroll admin should verify before approving."""
 
-        response = self._safe_generate(prompt, max_tokens=500)
-        
-        try:
-            if response:
-                start = response.find('{')
-                end = response.rfind('}') + 1
-                if start >= 0 and end > start:
-                    return json.loads(response[start:end])
-        except json.JSONDecodeError:
-            pass
-        
-        return {"anomalies_detected": False, "risk_level": "low", "items": []}
+        return self._safe_generate(prompt, max_tokens=250) or (
+            f"Review {len(flagged)} flagged item(s) before approving: confirm hours, rates and one-time pay "
+            f"against source records."
+        )
 
     # =========================================================================
     #  NATURAL LANGUAGE QUERIES
@@ -1046,10 +1034,15 @@ Provide JSON:
     #  PAYROLL INTELLIGENCE (ENHANCED)
     # =========================================================================
     
-    def analyze_payroll_run(self, payroll_data: Dict) -> Dict[str, Any]:
+    def analyze_payroll_run(self, payroll_data: Dict, anomaly_check: Optional[Dict] = None) -> Dict[str, Any]:
         """
         Comprehensive AI analysis of a payroll run before processing.
+        With anomaly_check (from the payroll anomaly detector) the anomalies are
+        taken from it and the model is only given the flagged rows to explain.
         """
+        if anomaly_check is not None:
+            return self._analyze_checked_run(payroll_data, anomaly_check)
+        
         prompt = f"""Analyze this payroll run before processing:
 
 Payroll Summary:
@@ -1098,6 +1091,28 @@ Provide comprehensive analysis JSON:
         
         return {"ready_to_process": True, "confidence_score": 85, "anomalies": [], "warnings": []}
 
+    def _analyze_checked_run(self, payroll_data: Dict, anomaly_check: Dict) -> Dict[str, Any]:
+        anomalies = [{
+            "employee": item.get("employee") or item.get("employee_id"),
+            "issue": "; ".join(issue["issue"] for issue in item["issues"]),
+            "severity": item["severity"],
+        } for item in anomaly_check.get("items", [])]
+        warnings = []
+        if anomaly_check.get("without_history"):
+            warnings.append(f"{anomaly_check['without_history']} employee(s) have no pay history to compare against")
+        
+        return {
+            "ready_to_process": anomaly_check.get("risk_level") != "high",
+            "risk_level": anomaly_check.get("risk_level", "low"),
+            "anomalies": anomalies,
+            "warnings": warnings,
+            "recommendations": [self._explain_anomalies(
+                [f"{a['employee']}: {a['issue']} ({a['severity']})" for a in anomalies]
+            )],
+            "checked": anomaly_check.get("checked", 0),
+            "flagged": anomaly_check.get("flagged", len(anomalies)),
+        }
+
     def suggest_payroll_optimizations(self, company_data: Dict) -> Dict[str, Any]:
         """
         AI suggestions for optimizing payroll operations.
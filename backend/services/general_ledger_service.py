@@ -0,0 +1,505 @@
+"""
+SAURELLIUS GENERAL LEDGER SERVICE
+Persistent double-entry general ledger with period closing snapshots
+As-of balances are the latest closed snapshot plus posted activity since
+"""
+
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+import uuid
+
+from sqlalchemy.exc import IntegrityError
+
+from models import db, GLJournalEntry, GLJournalLine, GLPeriodBalance
+from services.accounting_service import (
+    accounting_service, PAYROLL_EXPENSE_CODES, PAYROLL_LIABILITY_CODES
+)
+
+
+ZERO = Decimal("0.00")
+DEBIT_NORMAL = ("asset", "expense")
+# Passes at numbering a batch when concurrent postings race for the same entry numbers
+NUMBER_ATTEMPTS = 3
+
+
+def _dec(value) -> Decimal:
+    return Decimal(str(value or 0)).quantize(Decimal("0.01"))
+
+
+class GeneralLedgerService:
+    """
+    DB-backed general ledger.
+
+    Lines are stored with (company_id, account_code, entry_date) so account
+    ledgers are index range scans. close_period() stores cumulative debit and
+    credit totals per account at a period end; reports read the nearest
+    snapshot and add only the lines posted after it.
+    """
+
+    def __init__(self, chart=accounting_service):
+        self.chart = chart
+
+    # =========================================================================
+    # POSTING
+    # =========================================================================
+
+    def post_entry(self, company_id: str, entry_date: date, description: str,
+                   lines: List[dict], reference: Optional[str] = None,
+                   source: str = "manual", reversal_of: Optional[str] = None) -> dict:
+        """Validate and post a single journal entry"""
+        entries = self._post_many(company_id, [{
+            "entry_date": entry_date,
+            "description": description,
+            "lines": lines,
+            "reference": reference,
+            "source": source,
+            "reversal_of": reversal_of,
+        }])
+        return entries[0]
+
+    def post_payroll_entries(self, company_id: str, payroll_batches: List[dict]) -> List[dict]:
+        """
+        Post the journal entries for a payroll run in one transaction, e.g. one
+        entry per department or per pay group. Each batch uses the same keys
+        as SaurelliusAccounting.create_payroll_journal_entry.
+        """
+        specs = []
+        for batch in payroll_batches:
+            specs.append({
+                "entry_date": date.fromisoformat(batch.get("pay_date", date.today().isoformat())),
+                "description": batch.get("description") or f"Payroll - {batch.get('pay_period', 'Current Period')}",
+                "lines": self.chart.build_payroll_lines(batch),
+                "reference": batch.get("payroll_id"),
+                "source": "payroll",
+            })
+        return self._post_many(company_id, specs)
+
+    def _post_many(self, company_id: str, specs: List[dict]) -> List[dict]:
+        if not specs:
+            return []
+
+        earliest = min(spec["entry_date"] for spec in specs)
+        closed_through = self.closed_through(company_id)
+        if closed_through and earliest <= closed_through:
+            raise ValueError(
+                f"Period closed through {closed_through.isoformat()}; "
+                f"reopen it before posting an entry dated {earliest.isoformat()}"
+            )
+
+        now = datetime.utcnow()
+        entry_rows = []
+        line_rows = []
+        results = []
+
+        for spec in specs:
+            lines = spec["lines"]
+            total = _dec(self.chart.validate_lines(lines))
+            entry_id = str(uuid.uuid4())
+            entry_rows.append({
+                "id": entry_id,
+                "company_id": company_id,
+                "entry_date": spec["entry_date"],
+                "description": spec["description"],
+                "reference": spec.get("reference"),
+                "source": spec.get("source", "manual"),
+                "total_amount": total,
+                "status": "posted",
+                "reversal_of": spec.get("reversal_of"),
+                "created_at": now,
+                "posted_at": now,
+            })
+            result_lines = []
+            for line in lines:
+                debit = _dec(line.get("debit", 0))
+                credit = _dec(line.get("credit", 0))
+                line_rows.append({
+                    "entry_id": entry_id,
+                    "company_id": company_id,
+                    "account_code": line["account_code"],
+                    "entry_date": spec["entry_date"],
+                    "debit": debit,
+                    "credit": credit,
+                    "memo": line.get("memo", ""),
+                })
+                result_lines.append({
+                    "account_code": line["account_code"],
+                    "account_name": self.chart.accounts[line["account_code"]]["name"],
+                    "debit": float(debit),
+                    "credit": float(credit),
+                    "memo": line.get("memo", "")
+                })
+            results.append({
+                "id": entry_id,
+                "date": spec["entry_date"].isoformat(),
+                "description": spec["description"],
+                "reference": spec.get("reference"),
+                "source": spec.get("source", "manual"),
+                "lines": result_lines,
+                "total_amount": float(total),
+                "status": "posted",
+                "created_at": now.isoformat(),
+                "posted_at": now.isoformat()
+            })
+
+        for attempt in range(NUMBER_ATTEMPTS):
+            next_number = (db.session.query(db.func.max(GLJournalEntry.entry_number))
+                           .filter(GLJournalEntry.company_id == company_id).scalar() or 0) + 1
+            for offset, (row, result) in enumerate(zip(entry_rows, results)):
+                row["entry_number"] = result["entry_number"] = next_number + offset
+            try:
+                with db.session.begin_nested():
+                    db.session.bulk_insert_mappings(GLJournalEntry, entry_rows)
+                    db.session.bulk_insert_mappings(GLJournalLine, line_rows)
+                break
+            except IntegrityError:
+                # A concurrent posting took these numbers (uq_gl_entry_number); renumber and retry
+                if attempt == NUMBER_ATTEMPTS - 1:
+                    raise
+        db.session.commit()
+        return results
+
+    def reverse_entry(self, company_id: str, entry_id: str,
+                      reversal_date: Optional[date] = None) -> dict:
+        """Post a reversing entry for a journal entry"""
+        original = GLJournalEntry.query.filter_by(id=entry_id, company_id=company_id).first()
+        if not original:
+            raise ValueError(f"Journal entry {entry_id} not found")
+
+        return self.post_entry(
+            company_id,
+            entry_date=reversal_date or date.today(),
+            description=f"REVERSAL: {original.description}",
+            lines=[{
+                "account_code": line.account_code,
+                "debit": line.credit,
+                "credit": line.debit,
+                "memo": f"Reversal: {line.memo or ''}"
+            } for line in original.lines],
+            reference=f"REV-{original.reference}",
+            source="reversal",
+            reversal_of=original.id
+        )
+
+    # =========================================================================
+    # PERIOD SNAPSHOTS
+    # =========================================================================
+
+    def close_period(self, company_id: str, period_end: date) -> dict:
+        """Store cumulative per-account totals through period_end"""
+        totals = self._raw_totals_as_of(company_id, period_end)
+
+        GLPeriodBalance.query.filter_by(
+            company_id=company_id, period_end=period_end
+        ).delete(synchronize_session=False)
+        now = datetime.utcnow()
+        db.session.bulk_insert_mappings(GLPeriodBalance, [
+            {
+                "company_id": company_id,
+                "account_code": code,
+                "period_end": period_end,
+                "total_debits": debits,
+                "total_credits": credits,
+                "created_at": now,
+            }
+            for code, (debits, credits) in totals.items()
+        ])
+        db.session.commit()
+
+        return {
+            "company_id": company_id,
+            "period_end": period_end.isoformat(),
+            "accounts": len(totals),
+        }
+
+    def reopen_period(self, company_id: str, period_end: date) -> dict:
+        """
+        Drop the snapshots at and after period_end so back-dated entries can be
+        posted; close_period() must be run again once they are in.
+        """
+        removed = GLPeriodBalance.query.filter(
+            GLPeriodBalance.company_id == company_id,
+            GLPeriodBalance.period_end >= period_end
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        closed_through = self.closed_through(company_id)
+
+        return {
+            "company_id": company_id,
+            "period_end": period_end.isoformat(),
+            "snapshots_removed": removed,
+            "closed_through": closed_through.isoformat() if closed_through else None,
+        }
+
+    def closed_through(self, company_id: str) -> Optional[date]:
+        """Latest closed period end; entries on or before it are rejected"""
+        return db.session.query(db.func.max(GLPeriodBalance.period_end)).filter(
+            GLPeriodBalance.company_id == company_id
+        ).scalar()
+
+    def _raw_totals_as_of(self, company_id: str, as_of: date,
+                          account_codes: Optional[Iterable[str]] = None) -> Dict[str, Tuple[Decimal, Decimal]]:
+        """Cumulative (debits, credits) per account: snapshot plus delta"""
+        codes = list(account_codes) if account_codes is not None else None
+
+        snapshot_date = db.session.query(db.func.max(GLPeriodBalance.period_end)).filter(
+            GLPeriodBalance.company_id == company_id,
+            GLPeriodBalance.period_end <= as_of
+        ).scalar()
+
+        totals: Dict[str, Tuple[Decimal, Decimal]] = {}
+        if snapshot_date:
+            query = db.session.query(
+                GLPeriodBalance.account_code,
+                GLPeriodBalance.total_debits,
+                GLPeriodBalance.total_credits
+            ).filter(
+                GLPeriodBalance.company_id == company_id,
+                GLPeriodBalance.period_end == snapshot_date
+            )
+            if codes is not None:
+                query = query.filter(GLPeriodBalance.account_code.in_(codes))
+            for code, debits, credits in query:
+                totals[code] = (_dec(debits), _dec(credits))
+
+        delta = db.session.query(
+            GLJournalLine.account_code,
+            db.func.sum(GLJournalLine.debit),
+            db.func.sum(GLJournalLine.credit)
+        ).filter(
+            GLJournalLine.company_id == company_id,
+            GLJournalLine.entry_date <= as_of
+        )
+        if snapshot_date:
+            delta = delta.filter(GLJournalLine.entry_date > snapshot_date)
+        if codes is not None:
+            delta = delta.filter(GLJournalLine.account_code.in_(codes))
+        for code, debits, credits in delta.group_by(GLJournalLine.account_code):
+            base_debits, base_credits = totals.get(code, (ZERO, ZERO))
+            totals[code] = (base_debits + _dec(debits), base_credits + _dec(credits))
+
+        return totals
+
+    def balances_as_of(self, company_id: str, as_of: date,
+                       account_codes: Optional[Iterable[str]] = None) -> Dict[str, Decimal]:
+        """Natural-side balance per account as of a date"""
+        balances = {}
+        for code, (debits, credits) in self._raw_totals_as_of(company_id, as_of, account_codes).items():
+            account = self.chart.accounts.get(code)
+            if not account:
+                continue
+            balances[code] = debits - credits if account["type"] in DEBIT_NORMAL else credits - debits
+        return balances
+
+    # =========================================================================
+    # QUERIES & REPORTS
+    # =========================================================================
+
+    def get_chart_of_accounts(self, company_id: str, account_type: Optional[str] = None,
+                              as_of: Optional[date] = None) -> List[dict]:
+        """Chart of accounts with posted ledger balances as of a date"""
+        balances = self.balances_as_of(company_id, as_of or date.today())
+        return [
+            self._account_with_balance(account, balances.get(account["code"], ZERO))
+            for account in self.chart.get_chart_of_accounts()
+            if not account_type or account["type"] == account_type
+        ]
+
+    def get_account(self, company_id: str, account_code: str,
+                    as_of: Optional[date] = None) -> Optional[dict]:
+        """One account with its posted ledger balance as of a date"""
+        account = self.chart.get_account(account_code)
+        if not account:
+            return None
+        balance = self.balances_as_of(company_id, as_of or date.today(), [account_code])
+        return self._account_with_balance(account, balance.get(account_code, ZERO))
+
+    def get_journal_entries(self, company_id: str, start_date: Optional[date] = None,
+                            end_date: Optional[date] = None, source: Optional[str] = None,
+                            limit: Optional[int] = None) -> List[dict]:
+        """Get journal entries with optional filters, newest first"""
+        query = GLJournalEntry.query.filter(GLJournalEntry.company_id == company_id)
+        if start_date:
+            query = query.filter(GLJournalEntry.entry_date >= start_date)
+        if end_date:
+            query = query.filter(GLJournalEntry.entry_date <= end_date)
+        if source:
+            query = query.filter(GLJournalEntry.source == source)
+        query = query.order_by(GLJournalEntry.entry_date.desc(), GLJournalEntry.entry_number.desc())
+        if limit:
+            query = query.limit(limit)
+
+        names = {code: a["name"] for code, a in self.chart.accounts.items()}
+        return [entry.to_dict(names) for entry in query.all()]
+
+    def get_account_ledger(self, company_id: str, account_code: str,
+                           start_date: Optional[date] = None,
+                           end_date: Optional[date] = None) -> dict:
+        """Ledger for one account: opening balance plus an index range scan of lines"""
+        account = self.chart.get_account(account_code)
+        if not account:
+            raise ValueError(f"Account {account_code} not found")
+
+        opening = ZERO
+        if start_date:
+            opening = self.balances_as_of(
+                company_id, start_date - timedelta(days=1), [account_code]
+            ).get(account_code, ZERO)
+
+        query = db.session.query(
+            GLJournalLine.entry_date, GLJournalLine.debit, GLJournalLine.credit,
+            GLJournalEntry.description, GLJournalEntry.reference
+        ).join(GLJournalEntry, GLJournalEntry.id == GLJournalLine.entry_id).filter(
+            GLJournalLine.company_id == company_id,
+            GLJournalLine.account_code == account_code
+        )
+        if start_date:
+            query = query.filter(GLJournalLine.entry_date >= start_date)
+        if end_date:
+            query = query.filter(GLJournalLine.entry_date <= end_date)
+
+        debit_normal = account["type"] in DEBIT_NORMAL
+        running_balance = opening
+        transactions = []
+        for entry_date, debit, credit, description, reference in query.order_by(
+            GLJournalLine.entry_date, GLJournalLine.id
+        ):
+            debit, credit = _dec(debit), _dec(credit)
+            running_balance += (debit - credit) if debit_normal else (credit - debit)
+            transactions.append({
+                "date": entry_date.isoformat(),
+                "description": description,
+                "reference": reference,
+                "debit": float(debit),
+                "credit": float(credit),
+                "balance": float(running_balance)
+            })
+
+        return {
+            "account": self._account_with_balance(account, running_balance),
+            "opening_balance": float(opening),
+            "transactions": transactions,
+            "ending_balance": float(running_balance)
+        }
+
+    def _account_with_balance(self, account: dict, balance: Decimal) -> dict:
+        result = dict(account)
+        result["balance"] = float(balance)
+        return result
+
+    def get_trial_balance(self, company_id: str, as_of_date: Optional[date] = None) -> dict:
+        """Trial balance as of a date"""
+        as_of_date = as_of_date or date.today()
+        balances = self.balances_as_of(company_id, as_of_date)
+
+        trial_balance = {
+            "as_of_date": as_of_date.isoformat(),
+            "accounts": [],
+            "total_debits": 0,
+            "total_credits": 0
+        }
+
+        for code in sorted(balances):
+            balance = float(balances[code])
+            if balance == 0:
+                continue
+            account = self.chart.accounts[code]
+            debit_normal = account["type"] in DEBIT_NORMAL
+            debit = balance if debit_normal else 0
+            credit = abs(balance) if not debit_normal else 0
+            if balance < 0:
+                debit, credit = credit, abs(debit)
+
+            trial_balance["accounts"].append({
+                "code": code,
+                "name": account["name"],
+                "type": account["type"],
+                "debit": debit if debit > 0 else 0,
+                "credit": credit if credit > 0 else 0
+            })
+            trial_balance["total_debits"] += debit if debit > 0 else 0
+            trial_balance["total_credits"] += credit if credit > 0 else 0
+
+        return trial_balance
+
+    def get_income_statement(self, company_id: str, start_date: date, end_date: date) -> dict:
+        """Income statement for a period: balance at end minus balance before start"""
+        codes = [c for c, a in self.chart.accounts.items() if a["type"] in ("revenue", "expense")]
+        closing = self.balances_as_of(company_id, end_date, codes)
+        opening = self.balances_as_of(company_id, start_date - timedelta(days=1), codes)
+        activity = {code: closing.get(code, ZERO) - opening.get(code, ZERO) for code in codes}
+
+        def section(account_type):
+            accounts = [
+                {"code": code, "name": self.chart.accounts[code]["name"], "amount": float(amount)}
+                for code, amount in sorted(activity.items())
+                if amount != 0 and self.chart.accounts[code]["type"] == account_type
+            ]
+            return {"accounts": accounts, "total": sum(a["amount"] for a in accounts)}
+
+        revenue = section("revenue")
+        expenses = section("expense")
+
+        return {
+            "period": {
+                "start": start_date.isoformat(),
+                "end": end_date.isoformat()
+            },
+            "revenue": revenue,
+            "expenses": expenses,
+            "net_income": revenue["total"] - expenses["total"],
+            "payroll_expense_breakdown": {
+                self.chart.accounts[code]["name"]: float(activity[code])
+                for code in PAYROLL_EXPENSE_CODES
+                if code in activity and activity[code] != 0
+            }
+        }
+
+    def get_balance_sheet(self, company_id: str, as_of_date: Optional[date] = None) -> dict:
+        """Balance sheet as of a date"""
+        as_of_date = as_of_date or date.today()
+        balances = self.balances_as_of(company_id, as_of_date)
+
+        def accounts_of(account_type):
+            return [
+                {"code": code, "name": self.chart.accounts[code]["name"], "balance": float(balance)}
+                for code, balance in sorted(balances.items())
+                if balance != 0 and self.chart.accounts[code]["type"] == account_type
+            ]
+
+        def total_of(account_type):
+            return float(sum(
+                (b for c, b in balances.items() if self.chart.accounts[c]["type"] == account_type),
+                ZERO
+            ))
+
+        total_liabilities = total_of("liability")
+        total_equity = total_of("equity")
+        net_income = total_of("revenue") - total_of("expense")
+
+        return {
+            "as_of_date": as_of_date.isoformat(),
+            "assets": {
+                "accounts": accounts_of("asset"),
+                "total": total_of("asset")
+            },
+            "liabilities": {
+                "accounts": accounts_of("liability"),
+                "total": total_liabilities,
+                "payroll_liabilities": {
+                    self.chart.accounts[code]["name"]: float(balances[code])
+                    for code in PAYROLL_LIABILITY_CODES
+                    if code in balances and balances[code] != 0
+                }
+            },
+            "equity": {
+                "accounts": accounts_of("equity"),
+                "net_income": net_income,
+                "total": total_equity + net_income
+            },
+            "total_liabilities_and_equity": total_liabilities + total_equity + net_income
+        }
+
+
+# Singleton instance
+general_ledger = GeneralLedgerService()
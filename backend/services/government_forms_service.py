@@ -38,6 +38,18 @@ class GovernmentFormsService:
         '940': (1, 31),               # Jan 31
     }
     
+    # W-3 total box -> W-2 data field it sums
+    W3_BOXES = {
+        'box_1': 'box_1_wages',
+        'box_2': 'box_2_federal_tax',
+        'box_3': 'box_3_ss_wages',
+        'box_4': 'box_4_ss_tax',
+        'box_5': 'box_5_medicare_wages',
+        'box_6': 'box_6_medicare_tax',
+        'box_7': 'box_7_ss_tips',
+        'box_10': 'box_10_dependent_care',
+    }
+    
     def __init__(self):
         self.forms = {}
     
@@ -54,14 +66,37 @@ class GovernmentFormsService:
     ) -> Dict:
         """Generate Form W-2 for an employee."""
         form_id = str(uuid.uuid4())
+        w2_data = self.build_w2_data(company, employee, ytd_data, tax_year, form_id[:8].upper())
+        
+        form_record = {
+            'id': form_id,
+            'form_type': self.FORM_W2,
+            'tax_year': tax_year,
+            'company_id': company.get('id'),
+            'employee_id': employee.get('id'),
+            'data': w2_data,
+            'status': 'generated',
+            'created_at': datetime.utcnow().isoformat()
+        }
         
-        # W-2 Box calculations
-        w2_data = {
+        self.forms[form_id] = form_record
+        return form_record
+    
+    def build_w2_data(
+        self,
+        company: Dict,
+        employee: Dict,
+        ytd_data: Dict,
+        tax_year: int,
+        control_number: str
+    ) -> Dict:
+        """W-2 box values for an employee, without storing a form record."""
+        return {
             'form_type': self.FORM_W2,
             'tax_year': tax_year,
             
             # Control number (a)
-            'control_number': form_id[:8].upper(),
+            'control_number': control_number,
             
             # Employer information (b, c)
             'employer_ein': company['ein'],
@@ -119,20 +154,6 @@ class GovernmentFormsService:
             # State/Local (Boxes 15-20)
             'state_data': self._calculate_state_local_boxes(ytd_data, employee)
         }
-        
-        form_record = {
-            'id': form_id,
-            'form_type': self.FORM_W2,
-            'tax_year': tax_year,
-            'company_id': company.get('id'),
-            'employee_id': employee.get('id'),
-            'data': w2_data,
-            'status': 'generated',
-            'created_at': datetime.utcnow().isoformat()
-        }
-        
-        self.forms[form_id] = form_record
-        return form_record
     
     def _calculate_box_12(self, ytd_data: Dict) -> List[Dict]:
         """Calculate Box 12 coded amounts."""
@@ -179,20 +200,29 @@ class GovernmentFormsService:
         return box_14
     
     def _calculate_state_local_boxes(self, ytd_data: Dict, employee: Dict) -> List[Dict]:
-        """Calculate state and local tax information (Boxes 15-20)."""
+        """Calculate state and local tax information (Boxes 15-20), one entry per state worked in."""
         state_data = []
+        state_wages = ytd_data.get('state_taxable_wages', {})
+        state_tax = ytd_data.get('ytd_state_tax', {})
         
-        # Primary state
+        # Primary (current work) state first, then any state left during the year
         work_state = employee.get('work_state', '')
-        if work_state and ytd_data.get('ytd_state_tax', {}).get(work_state, 0) > 0:
+        states = [work_state] if work_state else []
+        states += sorted(s for s in set(state_wages) | set(state_tax) if s and s != work_state)
+        
+        for state in states:
+            if not (state_wages.get(state, 0) > 0 or state_tax.get(state, 0) > 0):
+                continue
             state_data.append({
-                'state': work_state,
-                'state_ein': employee.get('company_state_ein', ''),
-                'state_wages': round(ytd_data.get('state_taxable_wages', {}).get(work_state, ytd_data.get('ytd_gross', 0)), 2),
-                'state_tax': round(ytd_data.get('ytd_state_tax', {}).get(work_state, 0), 2),
-                'local_wages': round(ytd_data.get('local_taxable_wages', {}).get(work_state, 0), 2),
-                'local_tax': round(ytd_data.get('ytd_local_tax', {}).get(work_state, 0), 2),
-                'locality_name': ytd_data.get('locality_name', '')
+                'state': state,
+                'state_ein': employee.get('company_state_ein', '') if state == work_state else '',
+                'state_wages': round(state_wages.get(state, ytd_data.get('ytd_gross', 0)), 2),
+                'state_tax': round(state_tax.get(state, 0), 2),
+                'local_wages': round(ytd_data.get('local_taxable_wages', {}).get(state, 0), 2),
+                'local_tax': round(ytd_data.get('ytd_local_tax', {}).get(state, 0), 2),
+                'locality_name': ytd_data.get('locality_names', {}).get(
+                    state, ytd_data.get('locality_name', '') if state == work_state else ''
+                )
             })
         
         return state_data
@@ -206,30 +236,11 @@ class GovernmentFormsService:
         form_id = str(uuid.uuid4())
         
         # Sum all W-2 amounts
-        totals = {
-            'box_1': sum(f['data']['box_1_wages'] for f in w2_forms),
-            'box_2': sum(f['data']['box_2_federal_tax'] for f in w2_forms),
-            'box_3': sum(f['data']['box_3_ss_wages'] for f in w2_forms),
-            'box_4': sum(f['data']['box_4_ss_tax'] for f in w2_forms),
-            'box_5': sum(f['data']['box_5_medicare_wages'] for f in w2_forms),
-            'box_6': sum(f['data']['box_6_medicare_tax'] for f in w2_forms),
-            'box_7': sum(f['data']['box_7_ss_tips'] for f in w2_forms),
-            'box_10': sum(f['data']['box_10_dependent_care'] for f in w2_forms),
-        }
+        totals = {}
+        for f in w2_forms:
+            self.accumulate_w3_totals(totals, f['data'])
         
-        w3_data = {
-            'form_type': self.FORM_W3,
-            'tax_year': tax_year,
-            'control_number': form_id[:8].upper(),
-            'kind_of_payer': '941',  # Regular 941 filer
-            'kind_of_employer': 'None apply',
-            'number_of_w2s': len(w2_forms),
-            'employer_ein': company['ein'],
-            'employer_name': company['legal_name'],
-            'employer_address': company['physical_address'],
-            'employer_city_state_zip': f"{company['physical_city']}, {company['physical_state']} {company['physical_zip']}",
-            'totals': {k: round(v, 2) for k, v in totals.items()}
-        }
+        w3_data = self.build_w3_data(company, totals, len(w2_forms), tax_year, form_id[:8].upper())
         
         form_record = {
             'id': form_id,
@@ -245,6 +256,35 @@ class GovernmentFormsService:
         self.forms[form_id] = form_record
         return form_record
     
+    def accumulate_w3_totals(self, totals: Dict, w2_data: Dict) -> Dict:
+        """Add one W-2's amounts into running W-3 totals."""
+        for box, field in self.W3_BOXES.items():
+            totals[box] = round(totals.get(box, 0) + w2_data[field], 2)
+        return totals
+    
+    def build_w3_data(
+        self,
+        company: Dict,
+        totals: Dict,
+        number_of_w2s: int,
+        tax_year: int,
+        control_number: str
+    ) -> Dict:
+        """W-3 transmittal values from accumulated W-2 totals."""
+        return {
+            'form_type': self.FORM_W3,
+            'tax_year': tax_year,
+            'control_number': control_number,
+            'kind_of_payer': '941',  # Regular 941 filer
+            'kind_of_employer': 'None apply',
+            'number_of_w2s': number_of_w2s,
+            'employer_ein': company['ein'],
+            'employer_name': company['legal_name'],
+            'employer_address': company['physical_address'],
+            'employer_city_state_zip': f"{company['physical_city']}, {company['physical_state']} {company['physical_zip']}",
+            'totals': {box: round(totals.get(box, 0), 2) for box in self.W3_BOXES}
+        }
+    
     # ==========================================================================
     # FORM 1099-NEC GENERATION
     # ==========================================================================
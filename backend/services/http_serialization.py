@@ -0,0 +1,150 @@
+"""
+HTTP SERIALIZATION
+App-wide JSON provider that encodes Decimal, date/datetime and UUID natively (orjson when installed)
+Negotiated br/gzip compression of text responses above a size threshold
+"""
+
+import dataclasses
+import decimal
+import gzip
+import json
+import logging
+import uuid
+from datetime import date, datetime, time
+from typing import Any
+
+from flask import current_app, request
+from flask.json.provider import DefaultJSONProvider
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+    logger.warning("Fast JSON encoding unavailable. Install with: pip install orjson")
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'application/javascript', 'application/xml',
+    'image/svg+xml', 'text/html', 'text/plain', 'text/css', 'text/csv', 'text/xml',
+}
+
+DEFAULT_COMPRESSION = {
+    'COMPRESS_MIN_SIZE': 1024,
+    'COMPRESS_GZIP_LEVEL': 6,
+    'COMPRESS_BR_QUALITY': 4,
+}
+
+
+def _default(obj: Any) -> Any:
+    """Types neither encoder handles on its own."""
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if HAS_ORJSON:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider for app.json. Decimal serializes as a number and dates as
+    ISO 8601, so routes can return model values without converting by hand.
+    """
+
+    default = staticmethod(_default)
+    ensure_ascii = False
+    sort_keys = False
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        if HAS_ORJSON:
+            try:
+                return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+            except TypeError:
+                pass  # e.g. integers beyond 64 bits; the stdlib encoder copes
+        return json.dumps(obj, default=_default, ensure_ascii=False,
+                          separators=(',', ':')).encode('utf-8')
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            kwargs.setdefault('default', _default)
+            kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+            return json.dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if HAS_ORJSON and not kwargs:
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                pass  # NaN/Infinity literals and other stdlib extensions
+        return json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        if self.compact is False or (self.compact is None and self._app.debug):
+            body = json.dumps(obj, default=_default, ensure_ascii=False, indent=2).encode('utf-8')
+        else:
+            body = self.dumps_bytes(obj)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+
+def _compress_response(response):
+    """after_request hook: encode large text bodies with the best encoding the client accepts."""
+    config = current_app.config
+    if (
+        response.status_code < 200 or response.status_code in (204, 206, 304)
+        or response.direct_passthrough or response.is_streamed
+        or 'Content-Encoding' in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        or request.method == 'HEAD'
+    ):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    if len(body) < config['COMPRESS_MIN_SIZE']:
+        return response
+
+    offers = ['br', 'gzip'] if HAS_BROTLI else ['gzip']
+    encoding = request.accept_encodings.best_match(offers)
+    if encoding == 'br':
+        compressed = brotli.compress(body, quality=config['COMPRESS_BR_QUALITY'])
+    elif encoding == 'gzip':
+        compressed = gzip.compress(body, compresslevel=config['COMPRESS_GZIP_LEVEL'], mtime=0)
+    else:
+        return response
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f"{etag}-{encoding}")
+    return response
+
+
+def init_app(app):
+    """Install the JSON provider and the compression hook on an app."""
+    app.json = FastJSONProvider(app)
+    for key, value in DEFAULT_COMPRESSION.items():
+        app.config.setdefault(key, value)
+    app.after_request(_compress_response)
+    return app
@@ -0,0 +1,513 @@
+"""
+MEMORY RETRIEVAL
+Local BM25 index over each user's AI memories and past conversation turns, kept in step with the database
+Optional on-disk embedding vectors (flat numpy) fused with BM25 by reciprocal rank, no network required
+"""
+
+import hashlib
+import logging
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from models import db
+from models_ai import UserAIConversation, UserAIMemory
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    from sentence_transformers import SentenceTransformer
+    HAS_EMBEDDINGS = HAS_NUMPY
+except ImportError:
+    HAS_EMBEDDINGS = False
+
+# Local model directory (or cached model name) for the optional vector half of the search
+EMBEDDING_MODEL = os.environ.get('AI_EMBEDDING_MODEL')
+if EMBEDDING_MODEL and not HAS_EMBEDDINGS:
+    logger.warning("AI_EMBEDDING_MODEL is set but embeddings are unavailable. "
+                   "Install with: pip install sentence-transformers numpy")
+INDEX_DIR = os.environ.get('AI_RETRIEVAL_DIR', os.path.join(tempfile.gettempdir(), 'saurellius-ai-index'))
+MAX_CACHED_USERS = int(os.environ.get('AI_RETRIEVAL_MAX_USERS', 256))
+# Writes from this process arrive through the hooks; other workers' writes are pulled at most this often
+SYNC_INTERVAL_SECONDS = float(os.environ.get('AI_RETRIEVAL_SYNC_SECONDS', 5))
+MAX_SHARDS = 8
+RRF_K = 60
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+STOPWORDS = frozenset("""
+a an and are as at be but by can do does for from has have how i if in is it its me my of on or our so
+that the their them they this to was we what when where which who why will with you your
+""".split())
+
+DocId = Tuple[str, int]  # ('memory', id) or ('turn', id)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords; a trailing plural 's' is folded."""
+    tokens = []
+    for token in TOKEN_RE.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+# =============================================================================
+# BM25
+# =============================================================================
+
+class BM25Index:
+    """Okapi BM25 with an inverted index that supports add, replace and remove"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[Hashable, int]] = {}
+        self._terms: Dict[Hashable, Tuple[str, ...]] = {}
+        self._lengths: Dict[Hashable, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._lengths
+
+    def add(self, doc_id: Hashable, text: str):
+        if doc_id in self._lengths:
+            self.remove(doc_id)
+        tokens = tokenize(text)
+        counts = Counter(tokens)
+        for term, tf in counts.items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+        self._terms[doc_id] = tuple(counts)
+        self._lengths[doc_id] = len(tokens)
+        self._total_length += len(tokens)
+
+    def remove(self, doc_id: Hashable):
+        length = self._lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self._total_length -= length
+        for term in self._terms.pop(doc_id):
+            docs = self._postings[term]
+            del docs[doc_id]
+            if not docs:
+                del self._postings[term]
+
+    def search(self, query: str, limit: int = 10,
+               accept: Optional[Callable[[Hashable], bool]] = None) -> List[Tuple[Hashable, float]]:
+        n = len(self._lengths)
+        if not n:
+            return []
+        avg_length = self._total_length / n or 1.0
+        k1, b = self.k1, self.b
+        scores: Dict[Hashable, float] = {}
+        for term in set(tokenize(query)):
+            docs = self._postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, tf in docs.items():
+                norm = k1 * (1 - b + b * self._lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        if accept is not None:
+            ranked = [item for item in ranked if accept(item[0])]
+        return ranked[:limit]
+
+
+# =============================================================================
+# VECTORS (optional)
+# =============================================================================
+
+class VectorStore:
+    """
+    Normalized embeddings for one user, searched with a flat dot product.
+    Persisted as append-only .npz shards (ids, text digests, vectors) under
+    INDEX_DIR/<user_id>/ and compacted into one shard past MAX_SHARDS.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._keys: List[DocId] = []
+        self._digests: Dict[DocId, str] = {}
+        self._rows: Dict[DocId, int] = {}
+        self._matrix = None
+        self._pending: List[Tuple[DocId, str, object]] = []
+
+    def load(self, live: Dict[DocId, str]) -> List[DocId]:
+        """Read shards, keep vectors whose document text is unchanged, return ids still needing one."""
+        vectors: Dict[DocId, object] = {}
+        for path in self._shards():
+            with np.load(path, allow_pickle=False) as shard:
+                for kind, doc, digest, vector in zip(shard['kinds'], shard['docs'], shard['digests'], shard['vectors']):
+                    doc_id = (str(kind), int(doc))
+                    if live.get(doc_id) == str(digest):
+                        vectors[doc_id] = vector
+        self._keys = list(vectors)
+        self._digests = {doc_id: live[doc_id] for doc_id in self._keys}
+        self._rows = {doc_id: i for i, doc_id in enumerate(self._keys)}
+        self._matrix = np.vstack([vectors[k] for k in self._keys]) if self._keys else None
+        return [doc_id for doc_id in live if doc_id not in vectors]
+
+    def add(self, doc_id: DocId, digest: str, vector):
+        self._pending.append((doc_id, digest, vector))
+
+    def remove(self, doc_id: DocId):
+        self._digests.pop(doc_id, None)
+
+    def flush(self):
+        """Fold pending vectors into the matrix and write them as a new shard."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        for doc_id, digest, vector in pending:
+            self._digests[doc_id] = digest
+            if doc_id in self._rows:
+                self._matrix[self._rows[doc_id]] = vector
+            else:
+                self._rows[doc_id] = len(self._keys)
+                self._keys.append(doc_id)
+                self._matrix = vector[None, :] if self._matrix is None else np.vstack([self._matrix, vector])
+        os.makedirs(self.directory, exist_ok=True)
+        if len(self._shards()) >= MAX_SHARDS:
+            self._compact()
+        else:
+            self._write(pending, f'{time.time_ns()}.npz')
+
+    def search(self, query_vector, limit: int,
+               accept: Optional[Callable[[DocId], bool]] = None) -> List[Tuple[DocId, float]]:
+        if self._matrix is None:
+            return []
+        scores = self._matrix @ query_vector
+        results = []
+        for row in np.argsort(-scores):
+            doc_id = self._keys[row]
+            if doc_id not in self._digests or (accept is not None and not accept(doc_id)):
+                continue
+            results.append((doc_id, float(scores[row])))
+            if len(results) >= limit:
+                break
+        return results
+
+    def _shards(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                      if name.endswith('.npz'))
+
+    def _write(self, rows: Sequence[Tuple[DocId, str, object]], name: str):
+        tmp = os.path.join(self.directory, f'.{name}.tmp.npz')
+        np.savez(tmp, kinds=np.array([r[0][0] for r in rows]), docs=np.array([r[0][1] for r in rows]),
+                 digests=np.array([r[1] for r in rows]), vectors=np.vstack([r[2] for r in rows]))
+        os.replace(tmp, os.path.join(self.directory, name))
+
+    def _compact(self):
+        old = self._shards()
+        live = [(doc_id, self._digests[doc_id], self._matrix[row])
+                for doc_id, row in self._rows.items() if doc_id in self._digests]
+        if live:
+            self._write(live, f'{time.time_ns()}.npz')
+        for path in old:
+            os.remove(path)
+
+
+class _Embedder:
+    """Lazily loaded sentence-embedding model; AI_EMBEDDING_MODEL should be a local path when offline"""
+
+    def __init__(self, model_name: Optional[str]):
+        self.model_name = model_name
+        self._model = None
+        self._failed = False
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return HAS_EMBEDDINGS and bool(self.model_name) and not self._failed
+
+    def encode(self, texts: List[str]):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    try:
+                        self._model = SentenceTransformer(self.model_name)
+                    except Exception as e:
+                        self._failed = True
+                        logger.warning(f"Embedding model '{self.model_name}' unavailable, using BM25 only: {e}")
+                        raise
+        return self._model.encode(texts, normalize_embeddings=True, convert_to_numpy=True).astype('float32')
+
+
+# =============================================================================
+# PER-USER INDEX
+# =============================================================================
+
+def _memory_text(key: str, value: str, category: Optional[str]) -> str:
+    return ' '.join(filter(None, (key.replace('_', ' '), value, category)))
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+
+class UserIndex:
+    """Everything one user's searches need, plus the marks used to pull deltas from the database"""
+
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self.bm25 = BM25Index()
+        self.docs: Dict[DocId, Dict] = {}
+        self.memory_ids: Dict[str, int] = {}  # memory key -> id, for forget()
+        self.memory_synced_at: Optional[datetime] = None
+        self.last_turn_id = 0
+        self.synced = time.monotonic()
+        self.vectors: Optional[VectorStore] = None
+        self.lock = threading.Lock()
+
+    @property
+    def memory_count(self) -> int:
+        return len(self.memory_ids)
+
+    def put_memory(self, memory: UserAIMemory) -> Optional[DocId]:
+        """Index a memory row; returns its id, or None when its text was already indexed."""
+        if memory.updated_at and (self.memory_synced_at is None or memory.updated_at > self.memory_synced_at):
+            self.memory_synced_at = memory.updated_at
+        doc_id = ('memory', memory.id)
+        previous = self.memory_ids.get(memory.key)
+        if previous is not None and previous != memory.id:
+            self.drop(('memory', previous))
+        self.memory_ids[memory.key] = memory.id
+        text = _memory_text(memory.key, memory.value, memory.category)
+        digest = _digest(text)
+        unchanged = doc_id in self.docs and self.docs[doc_id]['digest'] == digest
+        self.docs[doc_id] = {
+            'source': 'memory', 'key': memory.key, 'value': memory.value, 'type': memory.memory_type,
+            'category': memory.category, 'importance': memory.importance or 0, 'digest': digest,
+        }
+        if unchanged:
+            return None
+        self.bm25.add(doc_id, text)
+        return doc_id
+
+    def put_turn(self, turn: UserAIConversation) -> DocId:
+        doc_id = ('turn', turn.id)
+        self.docs[doc_id] = {
+            'source': 'conversation', 'role': turn.role, 'message': turn.message,
+            'session_id': turn.session_id, 'context': turn.context_type,
+            'time': turn.created_at.isoformat() if turn.created_at else None, 'digest': _digest(turn.message),
+        }
+        self.bm25.add(doc_id, turn.message)
+        self.last_turn_id = max(self.last_turn_id, turn.id)
+        return doc_id
+
+    def drop(self, doc_id: DocId):
+        doc = self.docs.pop(doc_id, None)
+        if doc and doc['source'] == 'memory' and self.memory_ids.get(doc['key']) == doc_id[1]:
+            del self.memory_ids[doc['key']]
+        self.bm25.remove(doc_id)
+        if self.vectors is not None:
+            self.vectors.remove(doc_id)
+
+    def text_of(self, doc_id: DocId) -> str:
+        doc = self.docs[doc_id]
+        if doc['source'] == 'memory':
+            return _memory_text(doc['key'], doc['value'], doc['category'])
+        return doc['message']
+
+
+# =============================================================================
+# SERVICE
+# =============================================================================
+
+class MemoryRetrieval:
+    """
+    Per-user retrieval indexes held in an LRU. The first search for a user
+    builds the index with two queries; later searches only pull rows added
+    or changed since (so writes from other workers are picked up), and the
+    AIMemoryService write paths update a loaded index directly.
+    """
+
+    def __init__(self, max_users: int = MAX_CACHED_USERS, embedding_model: Optional[str] = EMBEDDING_MODEL,
+                 index_dir: str = INDEX_DIR):
+        self.max_users = max_users
+        self.index_dir = index_dir
+        self.embedder = _Embedder(embedding_model)
+        self._indexes: 'OrderedDict[int, UserIndex]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    # INDEX LIFECYCLE
+    # -------------------------------------------------------------------------
+
+    def _cached(self, user_id: int) -> Optional[UserIndex]:
+        user_id = int(user_id)
+        with self._lock:
+            index = self._indexes.get(user_id)
+            if index is not None:
+                self._indexes.move_to_end(user_id)
+            return index
+
+    def index_for(self, user_id: int) -> UserIndex:
+        user_id = int(user_id)
+        index = self._cached(user_id)
+        if index is None:
+            index = self._build(user_id)
+            with self._lock:
+                index = self._indexes.setdefault(user_id, index)
+                while len(self._indexes) > self.max_users:
+                    self._indexes.popitem(last=False)
+        elif time.monotonic() - index.synced >= SYNC_INTERVAL_SECONDS:
+            self._sync(index)
+        return index
+
+    def _build(self, user_id: int) -> UserIndex:
+        index = UserIndex(user_id)
+        for memory in UserAIMemory.query.filter_by(user_id=user_id).all():
+            index.put_memory(memory)
+        for turn in UserAIConversation.query.filter_by(user_id=user_id).order_by(UserAIConversation.id).all():
+            index.put_turn(turn)
+        if self.embedder.available:
+            index.vectors = VectorStore(os.path.join(self.index_dir, str(user_id)))
+            missing = index.vectors.load({doc_id: doc['digest'] for doc_id, doc in index.docs.items()})
+            self._embed(index, missing)
+        return index
+
+    def _sync(self, index: UserIndex):
+        """Pull memories and turns written since the index last looked (by any worker)."""
+        with index.lock:
+            index.synced = time.monotonic()
+            changed = UserAIMemory.query.filter(UserAIMemory.user_id == index.user_id)
+            if index.memory_synced_at is not None:
+                changed = changed.filter(UserAIMemory.updated_at >= index.memory_synced_at)
+            touched = [doc_id for doc_id in map(index.put_memory, changed.all()) if doc_id]
+            touched += [index.put_turn(turn) for turn in UserAIConversation.query.filter(
+                UserAIConversation.user_id == index.user_id,
+                UserAIConversation.id > index.last_turn_id,
+            ).order_by(UserAIConversation.id).all()]
+
+            # Deletions leave no row to find, so compare counts and reconcile ids when they differ
+            stored = UserAIMemory.query.filter_by(user_id=index.user_id).count()
+            if stored != index.memory_count:
+                live = {row.id for row in db.session.query(UserAIMemory.id).filter_by(user_id=index.user_id)}
+                for memory_id in [i for i in index.memory_ids.values() if i not in live]:
+                    index.drop(('memory', memory_id))
+            self._embed(index, [doc_id for doc_id in touched if doc_id in index.docs])
+
+    def _embed(self, index: UserIndex, doc_ids: List[DocId]):
+        if index.vectors is None or not doc_ids or not self.embedder.available:
+            return
+        try:
+            vectors = self.embedder.encode([index.text_of(doc_id) for doc_id in doc_ids])
+        except Exception:
+            index.vectors = None
+            return
+        for doc_id, vector in zip(doc_ids, vectors):
+            index.vectors.add(doc_id, index.docs[doc_id]['digest'], vector)
+        index.vectors.flush()
+
+    # -------------------------------------------------------------------------
+    # WRITE HOOKS (called by AIMemoryService after commit)
+    # -------------------------------------------------------------------------
+
+    def memory_saved(self, memory: UserAIMemory):
+        index = self._cached(memory.user_id)
+        if index is not None:
+            with index.lock:
+                doc_id = index.put_memory(memory)
+                if doc_id:
+                    self._embed(index, [doc_id])
+
+    def memory_forgotten(self, user_id: int, key: str):
+        index = self._cached(int(user_id))
+        if index is not None:
+            with index.lock:
+                memory_id = index.memory_ids.get(key)
+                if memory_id is not None:
+                    index.drop(('memory', memory_id))
+
+    def turn_logged(self, turn: UserAIConversation):
+        index = self._cached(turn.user_id)
+        if index is not None:
+            with index.lock:
+                self._embed(index, [index.put_turn(turn)])
+
+    def evict(self, user_id: Optional[int] = None):
+        with self._lock:
+            if user_id is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(int(user_id), None)
+
+    # -------------------------------------------------------------------------
+    # SEARCH
+    # -------------------------------------------------------------------------
+
+    def search(self, user_id: int, query: str, limit: int = 10,
+               sources: Iterable[str] = ('memory', 'turn'),
+               exclude_sessions: Iterable[str] = ()) -> List[Dict]:
+        """
+        Top-k memories and/or conversation turns for a query. BM25 ranks
+        alone unless an embedding model is configured, in which case the
+        BM25 and vector rankings are fused by reciprocal rank.
+        """
+        index = self.index_for(user_id)
+        wanted, skipped = set(sources), set(exclude_sessions)
+
+        def accept(doc_id: DocId) -> bool:
+            return doc_id[0] in wanted and (
+                doc_id[0] != 'turn' or index.docs[doc_id]['session_id'] not in skipped)
+
+        pool = max(limit * 4, 20)
+        with index.lock:
+            rankings = [index.bm25.search(query, pool, accept)]
+            if index.vectors is not None and self.embedder.available:
+                try:
+                    rankings.append(index.vectors.search(self.embedder.encode([query])[0], pool, accept))
+                except Exception:
+                    pass
+
+            if len(rankings) == 1:
+                scored = rankings[0]
+            else:
+                fused: Dict[DocId, float] = {}
+                for ranking in rankings:
+                    for rank, (doc_id, _) in enumerate(ranking):
+                        fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+                scored = sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+            results = []
+            for doc_id, score in scored[:limit]:
+                doc = {k: v for k, v in index.docs[doc_id].items() if k != 'digest'}
+                doc['id'] = doc_id[1]
+                doc['score'] = round(score, 4)
+                results.append(doc)
+        return results
+
+    def stats(self) -> Dict:
+        with self._lock:
+            indexes = list(self._indexes.values())
+        return {
+            'users_cached': len(indexes),
+            'documents': sum(len(i.docs) for i in indexes),
+            'embeddings': self.embedder.available,
+            'embedding_model': self.embedder.model_name,
+        }
+
+
+# Singleton instance
+memory_retrieval = MemoryRetrieval()
@@ -0,0 +1,209 @@
+"""
+KEYSET PAGINATION
+Cursor pages over (created_at, id) that cost the same on the first page and the thousandth
+List totals come from a short-lived count cache or the planner's row estimate, not COUNT(*) per page
+"""
+
+import base64
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from sqlalchemy import DateTime, text, tuple_
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 25
+MAX_LIMIT = 200
+COUNT_TTL_SECONDS = 60
+
+
+# =============================================================================
+# CURSORS
+# =============================================================================
+
+def encode_cursor(sort_value: Any, row_id: Any) -> str:
+    """Opaque, URL-safe token for the last row of a page."""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, row_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, datetime_sort: bool = True) -> Tuple[Any, Any]:
+    """(sort value, id) from a token made by encode_cursor; ValueError if it was tampered with."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        sort_value, row_id = json.loads(raw)
+        if datetime_sort:
+            sort_value = datetime.fromisoformat(sort_value)
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise ValueError('Invalid pagination cursor')
+    return sort_value, row_id
+
+
+def clamp_limit(value: Optional[int], default: int = DEFAULT_LIMIT, maximum: int = MAX_LIMIT) -> int:
+    if not value or value < 1:
+        return default
+    return min(value, maximum)
+
+
+class KeysetPage:
+    """One page of rows plus the cursor that continues after it"""
+
+    __slots__ = ('items', 'next_cursor', 'limit')
+
+    def __init__(self, items: List[Any], next_cursor: Optional[str], limit: int):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.limit = limit
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
+
+
+# =============================================================================
+# QUERIES
+# =============================================================================
+
+def keyset_page(query, sort_column, id_column, cursor: Optional[str] = None,
+                limit: int = DEFAULT_LIMIT) -> KeysetPage:
+    """
+    Newest-first page of a query. The row comparison after the cursor is an
+    index range scan on (..., sort_column, id_column), so the cost does not
+    grow with how deep the client has scrolled.
+    """
+    query = query.order_by(None).order_by(sort_column.desc(), id_column.desc())
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor, isinstance(sort_column.type, DateTime))
+        query = query.filter(tuple_(sort_column, id_column) < tuple_(sort_value, row_id))
+
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+    return KeysetPage(rows, next_cursor, limit)
+
+
+def keyset_slice(rows: Iterable[Dict], sort_key: str, id_key: str, cursor: Optional[str] = None,
+                 limit: int = DEFAULT_LIMIT) -> KeysetPage:
+    """keyset_page for in-memory records already sorted newest first."""
+    items: List[Dict] = []
+    after = decode_cursor(cursor, datetime_sort=False) if cursor else None
+    for row in rows:
+        if after is not None and (row[sort_key], row[id_key]) >= tuple(after):
+            continue
+        items.append(row)
+        if len(items) > limit:
+            break
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1][sort_key], items[-1][id_key])
+    return KeysetPage(items, next_cursor, limit)
+
+
+# =============================================================================
+# COUNTS
+# =============================================================================
+
+class CountCache:
+    """Per-filter row counts kept for a short TTL so paging never re-counts the table"""
+
+    def __init__(self, ttl: int = COUNT_TTL_SECONDS, max_entries: int = 4096):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Tuple, Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[Hashable, ...], counter: Callable[[], int]) -> int:
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry and entry[0] > now:
+            return entry[1]
+        value = counter()
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+            self._entries[key] = (now + self.ttl, value)
+        return value
+
+    def invalidate(self, *prefix: Hashable):
+        """Drop every count whose key starts with prefix (all counts when empty)."""
+        with self._lock:
+            for key in [k for k in self._entries if k[:len(prefix)] == prefix]:
+                del self._entries[key]
+
+
+# Singleton instance
+count_cache = CountCache()
+
+
+def cached_count(key: Tuple[Hashable, ...], query) -> int:
+    """Total rows for a filtered query, recounted at most once per TTL."""
+    return count_cache.get(key, lambda: query.order_by(None).count())
+
+
+def estimated_count(session, model) -> int:
+    """
+    Whole-table row count. On PostgreSQL this reads the planner estimate from
+    pg_class, which is free; elsewhere it falls back to a cached COUNT(*).
+    """
+    table = model.__table__.name
+    if session.get_bind().dialect.name == 'postgresql':
+        estimate = session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+            {'table': table},
+        ).scalar()
+        if estimate is not None and estimate >= 0:
+            return int(estimate)
+    return cached_count((table,), session.query(model))
+
+
+# =============================================================================
+# REQUEST HELPER
+# =============================================================================
+
+def paginate(query, sort_column, id_column, args, count_key: Optional[Tuple] = None,
+             default_limit: int = DEFAULT_LIMIT, total: Optional[int] = None) -> Tuple[List[Any], Dict[str, Any]]:
+    """
+    Rows and pagination metadata for a list endpoint's query string.
+    `cursor` continues a keyset scan; the legacy `page` parameter still works
+    (offset paging) so existing clients keep their page numbers.
+    """
+    limit = clamp_limit(args.get('limit', type=int) or args.get('per_page', type=int), default_limit)
+    cursor = args.get('cursor')
+    page = args.get('page', type=int)
+
+    if total is None and count_key is not None:
+        total = cached_count(count_key, query)
+
+    if cursor or not page or page <= 1:
+        result = keyset_page(query, sort_column, id_column, cursor, limit)
+        items, next_cursor = result.items, result.next_cursor
+        page = None if cursor else 1
+    else:
+        ordered = query.order_by(None).order_by(sort_column.desc(), id_column.desc())
+        items = ordered.offset((page - 1) * limit).limit(limit + 1).all()
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor(getattr(items[-1], sort_column.key), getattr(items[-1], id_column.key))
+
+    meta = {
+        'per_page': limit,
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None,
+        'total': total,
+        'pages': (total + limit - 1) // limit if total is not None else None,
+    }
+    if page is not None:
+        meta['page'] = page
+    return items, meta
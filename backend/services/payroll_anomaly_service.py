@@ -0,0 +1,313 @@
+"""
+PAYROLL ANOMALY DETECTION
+Per-employee robust baselines (rolling median and MAD) over payroll history, held as column arrays
+A whole run is scored in one pass; a language model is only asked to explain the rows flagged here
+"""
+
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Float, cast, func, select
+
+from models import db, PayrollFact
+
+METRICS = ('gross_pay', 'net_pay', 'hours', 'total_taxes')
+METRIC_LABELS = {'gross_pay': 'Gross pay', 'net_pay': 'Net pay', 'hours': 'Hours', 'total_taxes': 'Taxes'}
+
+HISTORY_PERIODS = 12  # most recent regular checks per employee
+HISTORY_DAYS = 400
+MIN_HISTORY = 3
+
+# Modified z-score 0.6745 * |x - median| / MAD; 3.5 is the usual outlier cut-off
+MAD_SCALE = 0.6745
+THRESHOLD = 3.5
+SEVERITIES = ((8.0, 'high'), (5.0, 'medium'), (THRESHOLD, 'low'))
+
+# Salaried checks repeat to the cent (MAD 0), so the spread has a floor: a small raise is not an outlier
+MIN_SPREAD_PCT = 0.02
+MIN_SPREAD_ABS = 1.0
+
+Metrics = Tuple[float, float, float, float]
+
+
+def _median(values: Sequence[float]) -> float:
+    ordered = sorted(values)
+    mid = len(ordered) // 2
+    return ordered[mid] if len(ordered) % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+
+
+def robust_baseline(values: Sequence[float]) -> Tuple[float, float]:
+    """(median, spread) where spread is the MAD, floored"""
+    median = _median(values)
+    mad = _median([abs(v - median) for v in values])
+    return median, max(mad, abs(median) * MIN_SPREAD_PCT, MIN_SPREAD_ABS)
+
+
+def _severity(score: float) -> str:
+    for limit, label in SEVERITIES:
+        if score >= limit:
+            return label
+    return 'low'
+
+
+def _float(value) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def paycheck_metrics(paycheck: dict) -> Metrics:
+    """
+    (gross, net, hours, taxes) from a payroll-run paycheck (nested earnings and
+    taxes) or a flat paystub dict.
+    """
+    earnings = paycheck.get('earnings') if isinstance(paycheck.get('earnings'), dict) else {}
+    taxes = paycheck.get('taxes')
+    gross = earnings.get('gross_pay', paycheck.get('gross_pay'))
+    hours = paycheck.get('hours')
+    if hours is None:
+        hours = (_float(earnings.get('regular_hours', paycheck.get('regular_hours')))
+                 + _float(earnings.get('overtime_hours', paycheck.get('overtime_hours'))))
+    total_taxes = taxes.get('total') if isinstance(taxes, dict) else paycheck.get('total_taxes', taxes)
+    return _float(gross), _float(paycheck.get('net_pay')), _float(hours), _float(total_taxes)
+
+
+def _sanity_issues(values: Metrics) -> List[dict]:
+    """Checks that need no history"""
+    gross, net = values[0], values[1]
+    issues = []
+    if net < 0:
+        issues.append({'metric': 'net_pay', 'value': net, 'score': None, 'severity': 'high',
+                       'issue': 'Net pay is negative'})
+    elif net > gross + 0.005:
+        issues.append({'metric': 'net_pay', 'value': net, 'score': None, 'severity': 'high',
+                       'issue': f'Net pay ${net:,.2f} exceeds gross pay ${gross:,.2f}'})
+    return issues
+
+
+def _deviation(metric: str, value: float, median: float, spread: float) -> Optional[dict]:
+    score = MAD_SCALE * abs(value - median) / spread
+    if score < THRESHOLD:
+        return None
+    direction = 'above' if value > median else 'below'
+    change = f' ({(value - median) / median:+.0%})' if median else ''
+    return {
+        'metric': metric,
+        'value': round(value, 2),
+        'baseline': round(median, 2),
+        'score': round(score, 1),
+        'severity': _severity(score),
+        'issue': f'{METRIC_LABELS[metric]} {value:,.2f} is well {direction} the usual {median:,.2f}{change}',
+    }
+
+
+class PayrollBaselines:
+    """
+    Baselines in column form: employees maps an employee id to a row, and each
+    metric has one array of medians and one of spreads indexed by that row.
+    """
+
+    def __init__(self):
+        self.employees: Dict[str, int] = {}
+        self.history = array('i')
+        self.median = {metric: array('d') for metric in METRICS}
+        self.spread = {metric: array('d') for metric in METRICS}
+
+    def __len__(self) -> int:
+        return len(self.employees)
+
+    def add(self, employee_id: str, columns: Sequence[Sequence[float]]):
+        """One employee's history, a column of values per metric"""
+        if len(columns[0]) < MIN_HISTORY:
+            return
+        self.employees[employee_id] = len(self.history)
+        self.history.append(len(columns[0]))
+        for metric, values in zip(METRICS, columns):
+            median, spread = robust_baseline(values)
+            self.median[metric].append(median)
+            self.spread[metric].append(spread)
+
+    def issues(self, employee_id: str, values: Metrics) -> Optional[List[dict]]:
+        """Deviations for one check; None when the employee has no baseline"""
+        row = self.employees.get(employee_id)
+        if row is None:
+            return None
+        found = []
+        for metric, value in zip(METRICS, values):
+            issue = _deviation(metric, value, self.median[metric][row], self.spread[metric][row])
+            if issue:
+                found.append(issue)
+        return found
+
+
+class PayrollAnomalyDetector:
+    """
+    Statistical anomaly checks for payroll runs and paystub histories.
+    Baselines are cached per company and reused until its facts change
+    (a run processed or voided), which a count/max-id probe detects.
+    """
+
+    def __init__(self, max_cached: int = 64):
+        self.max_cached = max_cached
+        self._cache: 'OrderedDict[tuple, Tuple[tuple, PayrollBaselines]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load_baselines(self, company_id, before: Optional[date] = None,
+                       exclude_run: Optional[str] = None) -> PayrollBaselines:
+        before = before or date.today() + timedelta(days=1)
+        key = (str(company_id), before, exclude_run)
+        version = tuple(db.session.execute(
+            select(func.count(), func.max(PayrollFact.id)).where(PayrollFact.company_id == key[0])
+        ).one())
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == version:
+                self._cache.move_to_end(key)
+                return cached[1]
+
+        baselines = self._build_baselines(*key)
+        with self._lock:
+            self._cache[key] = (version, baselines)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+        return baselines
+
+    def _build_baselines(self, company_id: str, before: date, exclude_run: Optional[str]) -> PayrollBaselines:
+        """
+        One query returns each employee's last HISTORY_PERIODS regular checks as
+        bare float tuples ordered by employee, so the columns fill in one pass.
+        """
+        conditions = [
+            PayrollFact.company_id == company_id,
+            PayrollFact.pay_type == 'regular',
+            PayrollFact.pay_date >= before - timedelta(days=HISTORY_DAYS),
+            PayrollFact.pay_date < before,
+        ]
+        if exclude_run:
+            conditions.append(PayrollFact.payroll_run_id != exclude_run)
+        recent = select(
+            PayrollFact.employee_id,
+            cast(PayrollFact.gross_pay, Float).label('gross'),
+            cast(PayrollFact.net_pay, Float).label('net'),
+            cast(PayrollFact.regular_hours + PayrollFact.overtime_hours, Float).label('hours'),
+            cast(PayrollFact.total_taxes, Float).label('taxes'),
+            func.row_number().over(
+                partition_by=PayrollFact.employee_id, order_by=PayrollFact.pay_date.desc()
+            ).label('age'),
+        ).where(*conditions).subquery()
+        rows = db.session.connection().execute(
+            select(recent.c.employee_id, recent.c.gross, recent.c.net, recent.c.hours, recent.c.taxes)
+            .where(recent.c.age <= HISTORY_PERIODS)
+            .order_by(recent.c.employee_id)
+        ).fetchall()
+
+        baselines = PayrollBaselines()
+        current, columns = None, None
+        for employee_id, *values in rows:
+            if employee_id != current:
+                if current is not None:
+                    baselines.add(current, columns)
+                current, columns = employee_id, ([], [], [], [])
+            for column, value in zip(columns, values):
+                column.append(value or 0.0)
+        if current is not None:
+            baselines.add(current, columns)
+        return baselines
+
+    def check_paychecks(self, company_id, paychecks: Iterable[dict],
+                        exclude_run: Optional[str] = None) -> dict:
+        """Score every paycheck of a run against its employee's baseline"""
+        started = time.perf_counter()
+        baselines = self.load_baselines(company_id, exclude_run=exclude_run)
+        loaded = time.perf_counter()
+
+        items, checked, without_history = [], 0, 0
+        for paycheck in paychecks:
+            checked += 1
+            values = paycheck_metrics(paycheck)
+            issues = _sanity_issues(values)
+            deviations = baselines.issues(str(paycheck.get('employee_id')), values)
+            if deviations is None:
+                without_history += 1
+            else:
+                issues += deviations
+            if issues:
+                items.append({
+                    'employee_id': paycheck.get('employee_id'),
+                    'employee': (paycheck.get('employee_name') or '').strip() or None,
+                    'paycheck_id': paycheck.get('id'),
+                    'severity': _worst(issues),
+                    'issues': issues,
+                })
+
+        items.sort(key=_rank)
+        return {
+            'anomalies_detected': bool(items),
+            'risk_level': _risk_level(items, checked),
+            'checked': checked,
+            'flagged': len(items),
+            'without_history': without_history,
+            'baseline_employees': len(baselines),
+            'items': items,
+            'timing_ms': {
+                'load': round((loaded - started) * 1000, 1),
+                'score': round((time.perf_counter() - loaded) * 1000, 1),
+            },
+        }
+
+    def check_series(self, history: List[dict]) -> dict:
+        """
+        One employee's paystubs in pay order: each stub is scored against the
+        (up to HISTORY_PERIODS) stubs before it.
+        """
+        values = [paycheck_metrics(stub) for stub in history]
+        items = []
+        for i, current in enumerate(values):
+            issues = _sanity_issues(current)
+            prior = values[max(0, i - HISTORY_PERIODS):i]
+            if len(prior) >= MIN_HISTORY:
+                for m, metric in enumerate(METRICS):
+                    median, spread = robust_baseline([v[m] for v in prior])
+                    issue = _deviation(metric, current[m], median, spread)
+                    if issue:
+                        issues.append(issue)
+            items += [{'pay_period': i + 1, **issue} for issue in issues]
+
+        items.sort(key=lambda item: (_SEVERITY_ORDER[item['severity']], item['pay_period']))
+        return {
+            'anomalies_detected': bool(items),
+            'risk_level': _risk_level(items, len(values)),
+            'checked': len(values),
+            'items': items,
+        }
+
+
+_SEVERITY_ORDER = {'high': 0, 'medium': 1, 'low': 2}
+
+
+def _worst(issues: List[dict]) -> str:
+    return min((issue['severity'] for issue in issues), key=_SEVERITY_ORDER.__getitem__)
+
+
+def _rank(item: dict):
+    top = max((issue['score'] or float('inf') for issue in item['issues']), default=0)
+    return _SEVERITY_ORDER[item['severity']], -top
+
+
+def _risk_level(items: List[dict], checked: int) -> str:
+    severities = {item['severity'] for item in items}
+    if 'high' in severities:
+        return 'high'
+    if 'medium' in severities or (checked and len(items) / checked > 0.05):
+        return 'medium'
+    return 'low'
+
+
+# Singleton instance
+payroll_anomaly_detector = PayrollAnomalyDetector()
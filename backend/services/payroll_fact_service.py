@@ -0,0 +1,396 @@
+"""
+SAURELLIUS PAYROLL ANALYTICS SERVICE
+Denormalized payroll fact table with monthly and quarterly cubes
+Facts are written when a run is processed; reports aggregate in SQL
+"""
+
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Set
+
+from models import db, PayrollFact, PayrollCube, PayrollRun, Paycheck, PAYROLL_MEASURES
+
+
+ROLLUP = "*"
+GRAINS = ("month", "quarter")
+
+PRETAX_DEDUCTIONS = (
+    "health_insurance", "dental_insurance", "vision_insurance",
+    "retirement_401k", "hsa", "fsa", "other_pretax",
+)
+BENEFIT_DEDUCTIONS = ("health_insurance", "dental_insurance", "vision_insurance")
+ITEMIZED_EARNINGS = ("regular_pay", "overtime_pay", "bonus", "commission")
+# Runs loaded per backfill pass
+BACKFILL_BATCH = 200
+
+
+def _as_date(value) -> date:
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def _money(value) -> Decimal:
+    return Decimal(str(value or 0)).quantize(Decimal("0.01"))
+
+
+def period_start(day: date, grain: str) -> date:
+    if grain == "quarter":
+        return date(day.year, 3 * ((day.month - 1) // 3) + 1, 1)
+    return date(day.year, day.month, 1)
+
+
+def period_end(start: date, grain: str) -> date:
+    months = 3 if grain == "quarter" else 1
+    month = start.month + months
+    year = start.year + (month - 1) // 12
+    return date(year, (month - 1) % 12 + 1, 1) - timedelta(days=1)
+
+
+def _aligned(start: date, end: date, grain: str) -> bool:
+    return start == period_start(start, grain) and end == period_end(period_start(end, grain), grain)
+
+
+def _fact_row(company_id: str, run: dict, paycheck: dict, now: datetime) -> dict:
+    earnings = paycheck.get("earnings") or {}
+    taxes = paycheck.get("taxes") or {}
+    deductions = paycheck.get("deductions") or {}
+    employer = paycheck.get("employer_taxes") or {}
+
+    gross = _money(earnings.get("gross_pay", paycheck.get("gross_pay")))
+    itemized = sum((_money(earnings.get(k)) for k in ITEMIZED_EARNINGS), Decimal("0.00"))
+    employer_total = _money(employer.get("total"))
+
+    return {
+        "company_id": company_id,
+        "payroll_run_id": run["id"],
+        "paycheck_id": paycheck["id"],
+        "employee_id": str(paycheck["employee_id"]),
+        "department": paycheck.get("department") or "",
+        "pay_type": run.get("pay_type") or "regular",
+        "pay_date": _as_date(paycheck.get("pay_date") or run["pay_date"]),
+        "regular_hours": _money(earnings.get("regular_hours")),
+        "overtime_hours": _money(earnings.get("overtime_hours")),
+        "regular_pay": _money(earnings.get("regular_pay")),
+        "overtime_pay": _money(earnings.get("overtime_pay")),
+        "bonus": _money(earnings.get("bonus")),
+        "commission": _money(earnings.get("commission")),
+        "other_earnings": gross - itemized,
+        "gross_pay": gross,
+        "federal_tax": _money(taxes.get("federal")),
+        "state_tax": _money(taxes.get("state")),
+        "local_tax": _money(taxes.get("local")),
+        "social_security": _money(taxes.get("social_security")),
+        "medicare": _money(taxes.get("medicare")),
+        "total_taxes": _money(taxes.get("total")),
+        "pretax_deductions": sum((_money(deductions.get(k)) for k in PRETAX_DEDUCTIONS), Decimal("0.00")),
+        "benefit_deductions": sum((_money(deductions.get(k)) for k in BENEFIT_DEDUCTIONS), Decimal("0.00")),
+        "total_deductions": _money(deductions.get("total")),
+        "net_pay": _money(paycheck.get("net_pay")),
+        "employer_social_security": _money(employer.get("social_security")),
+        "employer_medicare": _money(employer.get("medicare")),
+        "futa": _money(employer.get("futa")),
+        "suta": _money(employer.get("suta")),
+        "employer_taxes": employer_total,
+        "total_cost": gross + employer_total,
+        "created_at": now,
+    }
+
+
+def _stored_paycheck(check: Paycheck) -> dict:
+    """A persisted Paycheck in the shape record_run() receives from a run"""
+    return {
+        "id": check.id,
+        "employee_id": check.employee_id,
+        "department": check.department,
+        "pay_date": check.pay_date,
+        "earnings": dict(check.earnings or {}, gross_pay=check.gross_pay),
+        "taxes": dict(check.taxes or {}, total=check.total_taxes),
+        "deductions": dict(check.deductions or {}, total=check.total_deductions),
+        "employer_taxes": dict(check.employer_taxes or {}, total=check.total_employer_taxes),
+        "net_pay": check.net_pay,
+    }
+
+
+def _aggregates(model, count_distinct: bool = True) -> list:
+    """SUM() of every measure, plus paycheck/employee/run counts"""
+    if count_distinct:
+        counts = [
+            db.func.count(model.id),
+            db.func.count(db.distinct(model.employee_id)),
+            db.func.count(db.distinct(model.payroll_run_id)),
+        ]
+    else:
+        counts = [
+            db.func.sum(model.paycheck_count),
+            db.func.max(model.employee_count),
+            db.func.sum(model.payroll_run_count),
+        ]
+    return counts + [db.func.sum(getattr(model, m)) for m in PAYROLL_MEASURES]
+
+
+def _unpack(values) -> dict:
+    paychecks, employees, runs = values[:3]
+    result = {m: float(v or 0) for m, v in zip(PAYROLL_MEASURES, values[3:])}
+    result["paycheck_count"] = int(paychecks or 0)
+    result["employee_count"] = int(employees or 0)
+    result["payroll_run_count"] = int(runs or 0)
+    return result
+
+
+class PayrollFactService:
+    """
+    Payroll fact table and pre-aggregated cubes.
+
+    record_run() replaces a run's facts and refreshes only the month and
+    quarter cells its pay dates fall in. totals() answers from quarter or
+    month cubes when the range is period-aligned and falls back to a
+    GROUP BY over the indexed fact table otherwise.
+    """
+
+    # =========================================================================
+    # LOADING
+    # =========================================================================
+
+    def record_run(self, run: dict, paychecks: List[dict]) -> dict:
+        """Replace the facts for a processed payroll run and refresh its cubes"""
+        company_id = str(run["company_id"])
+        now = datetime.utcnow()
+        rows = [_fact_row(company_id, run, p, now) for p in paychecks]
+
+        touched = self._run_dates(run["id"])
+        PayrollFact.query.filter_by(payroll_run_id=run["id"]).delete(synchronize_session=False)
+        if rows:
+            db.session.bulk_insert_mappings(PayrollFact, rows)
+        touched.update(r["pay_date"] for r in rows)
+
+        self._refresh(company_id, touched)
+        db.session.commit()
+
+        return {"payroll_run_id": run["id"], "facts": len(rows), "periods_refreshed": len(touched)}
+
+    def remove_run(self, company_id: str, run_id: str) -> dict:
+        """Drop a voided run's facts and refresh its cubes"""
+        touched = self._run_dates(run_id)
+        removed = PayrollFact.query.filter_by(payroll_run_id=run_id).delete(synchronize_session=False)
+        self._refresh(str(company_id), touched)
+        db.session.commit()
+        return {"payroll_run_id": run_id, "facts_removed": removed}
+
+    def rebuild_cubes(self, company_id: str) -> dict:
+        """Recompute every cube cell for a company from its facts"""
+        company_id = str(company_id)
+        dates = {d for (d,) in db.session.query(PayrollFact.pay_date).filter(
+            PayrollFact.company_id == company_id
+        ).distinct()}
+        PayrollCube.query.filter_by(company_id=company_id).delete(synchronize_session=False)
+        self._refresh(company_id, dates)
+        db.session.commit()
+        return {"company_id": company_id, "pay_dates": len(dates)}
+
+    def backfill(self, company_id) -> dict:
+        """
+        Load facts for a company's completed payroll runs that have none yet
+        (runs processed before the fact table existed) and refresh their cubes
+        """
+        company_id = str(company_id)
+        loaded = db.session.query(PayrollFact.payroll_run_id).filter(
+            PayrollFact.company_id == company_id
+        ).distinct()
+        run_ids = [run_id for (run_id,) in db.session.query(PayrollRun.id).filter(
+            PayrollRun.company_id == int(company_id),
+            PayrollRun.status == "completed",
+            ~PayrollRun.id.in_(loaded)
+        ).order_by(PayrollRun.pay_date)]
+
+        now = datetime.utcnow()
+        touched: Set[date] = set()
+        facts = 0
+        for i in range(0, len(run_ids), BACKFILL_BATCH):
+            batch = run_ids[i:i + BACKFILL_BATCH]
+            runs = {run.id: run for run in PayrollRun.query.filter(PayrollRun.id.in_(batch))}
+            rows = [
+                _fact_row(company_id, {
+                    "id": check.payroll_run_id,
+                    "pay_type": runs[check.payroll_run_id].pay_type,
+                    "pay_date": runs[check.payroll_run_id].pay_date,
+                }, _stored_paycheck(check), now)
+                for check in Paycheck.query.filter(Paycheck.payroll_run_id.in_(batch))
+            ]
+            if rows:
+                db.session.bulk_insert_mappings(PayrollFact, rows)
+            touched.update(r["pay_date"] for r in rows)
+            facts += len(rows)
+
+        self._refresh(company_id, touched)
+        db.session.commit()
+
+        return {"company_id": company_id, "runs_loaded": len(run_ids), "facts": facts,
+                "periods_refreshed": len(touched)}
+
+    def _run_dates(self, run_id: str) -> Set[date]:
+        return {d for (d,) in db.session.query(PayrollFact.pay_date).filter(
+            PayrollFact.payroll_run_id == run_id
+        ).distinct()}
+
+    def _refresh(self, company_id: str, pay_dates: Iterable[date]):
+        """Rebuild the cube cells for every period containing one of pay_dates"""
+        now = datetime.utcnow()
+        for grain in GRAINS:
+            for start in {period_start(d, grain) for d in pay_dates}:
+                end = period_end(start, grain)
+                PayrollCube.query.filter_by(
+                    company_id=company_id, grain=grain, period_start=start
+                ).delete(synchronize_session=False)
+
+                in_period = (
+                    PayrollFact.company_id == company_id,
+                    PayrollFact.pay_date >= start,
+                    PayrollFact.pay_date <= end,
+                )
+                cells = [(ROLLUP, ROLLUP, db.session.query(*_aggregates(PayrollFact)).filter(*in_period).one())]
+                if not cells[0][2][0]:
+                    continue
+                cells.extend(
+                    (row[0], row[1], row[2:])
+                    for row in db.session.query(
+                        PayrollFact.department, PayrollFact.pay_type, *_aggregates(PayrollFact)
+                    ).filter(*in_period).group_by(PayrollFact.department, PayrollFact.pay_type)
+                )
+
+                mappings = []
+                for department, pay_type, values in cells:
+                    mapping = {m: v or 0 for m, v in zip(PAYROLL_MEASURES, values[3:])}
+                    mapping.update({
+                        "company_id": company_id,
+                        "grain": grain,
+                        "period_start": start,
+                        "department": department or "",
+                        "pay_type": pay_type or "",
+                        "paycheck_count": values[0],
+                        "employee_count": values[1],
+                        "payroll_run_count": values[2],
+                        "refreshed_at": now,
+                    })
+                    mappings.append(mapping)
+                db.session.bulk_insert_mappings(PayrollCube, mappings)
+
+    # =========================================================================
+    # QUERIES
+    # =========================================================================
+
+    def totals(self, company_id: str, start_date: date, end_date: date,
+               by: Optional[str] = None) -> Dict[str, dict]:
+        """
+        Summed measures for [start_date, end_date], keyed by '' or by the
+        department, pay_type, month or quarter named in `by`. employee_count
+        is the distinct number of employees paid in each bucket.
+        """
+        if by not in (None, "department", "pay_type", "month", "quarter"):
+            raise ValueError(f"Unsupported grouping: {by}")
+        company_id = str(company_id)
+
+        if by in GRAINS:
+            return self._bucketed(company_id, start_date, end_date, by)
+
+        grain = next((g for g in ("quarter", "month") if _aligned(start_date, end_date, g)), None)
+        if grain is None:
+            return self._totals_from_facts(company_id, start_date, end_date, by)
+
+        results = self._totals_from_cubes(company_id, start_date, end_date, grain, by)
+        # Distinct employees don't add across cells; one indexed COUNT(DISTINCT)
+        headcount = self.headcount_by(company_id, start_date, end_date, by)
+        for key, row in results.items():
+            row["employee_count"] = headcount.get(key, 0)
+        return results
+
+    def _totals_from_cubes(self, company_id: str, start_date: date, end_date: date,
+                           grain: str, by: Optional[str]) -> Dict[str, dict]:
+        filters = [
+            PayrollCube.company_id == company_id,
+            PayrollCube.grain == grain,
+            PayrollCube.period_start >= start_date,
+            PayrollCube.period_start <= end_date,
+        ]
+        if by in ("department", "pay_type"):
+            column = getattr(PayrollCube, by)
+            filters.append(PayrollCube.department != ROLLUP)
+        else:
+            column = PayrollCube.period_start if by else None
+            filters.append(PayrollCube.department == ROLLUP)
+
+        aggregates = _aggregates(PayrollCube, count_distinct=False)
+        if column is None:
+            row = db.session.query(*aggregates).filter(*filters).one()
+            return {"": _unpack(row)} if row[0] else {}
+
+        return {
+            (row[0].isoformat() if by in GRAINS else row[0] or ""): _unpack(row[1:])
+            for row in db.session.query(column, *aggregates).filter(*filters)
+            .group_by(column).order_by(column)
+        }
+
+    def _totals_from_facts(self, company_id: str, start_date: date, end_date: date,
+                           by: Optional[str]) -> Dict[str, dict]:
+        filters = (
+            PayrollFact.company_id == company_id,
+            PayrollFact.pay_date >= start_date,
+            PayrollFact.pay_date <= end_date,
+        )
+        if by is None:
+            row = db.session.query(*_aggregates(PayrollFact)).filter(*filters).one()
+            return {"": _unpack(row)} if row[0] else {}
+
+        column = getattr(PayrollFact, by)
+        return {
+            row[0] or "": _unpack(row[1:])
+            for row in db.session.query(column, *_aggregates(PayrollFact))
+            .filter(*filters).group_by(column)
+        }
+
+    def _bucketed(self, company_id: str, start_date: date, end_date: date,
+                  grain: str) -> Dict[str, dict]:
+        """Whole periods from the cubes; partial periods at the edges from facts"""
+        inner_start = period_start(start_date, grain)
+        if inner_start < start_date:
+            inner_start = period_end(inner_start, grain) + timedelta(days=1)
+        inner_end = period_end(period_start(end_date, grain), grain)
+        if inner_end > end_date:
+            inner_end = period_start(end_date, grain) - timedelta(days=1)
+
+        if inner_start > inner_end:
+            edges = [(start_date, end_date)]
+            results: Dict[str, dict] = {}
+        else:
+            edges = [(start_date, inner_start - timedelta(days=1)),
+                     (inner_end + timedelta(days=1), end_date)]
+            results = self._totals_from_cubes(company_id, inner_start, inner_end, grain, grain)
+
+        for edge_start, edge_end in edges:
+            if edge_start > edge_end:
+                continue
+            row = self._totals_from_facts(company_id, edge_start, edge_end, None).get("")
+            if row:
+                results[period_start(edge_start, grain).isoformat()] = row
+        return dict(sorted(results.items()))
+
+    def headcount_by(self, company_id: str, start_date: date, end_date: date,
+                     by: Optional[str] = None) -> Dict[str, int]:
+        """Distinct employees paid in the range, overall or per department/pay type"""
+        filters = (
+            PayrollFact.company_id == str(company_id),
+            PayrollFact.pay_date >= start_date,
+            PayrollFact.pay_date <= end_date,
+        )
+        distinct_employees = db.func.count(db.distinct(PayrollFact.employee_id))
+        if by is None:
+            return {"": db.session.query(distinct_employees).filter(*filters).scalar() or 0}
+
+        column = getattr(PayrollFact, by)
+        return {
+            key or "": count
+            for key, count in db.session.query(column, distinct_employees)
+            .filter(*filters).group_by(column)
+        }
+
+
+# Singleton instance
+payroll_facts = PayrollFactService()
@@ -4,7 +4,7 @@ Complete gross-to-net payroll calculation with all deductions
 Production-ready payroll run workflow
 """
 
-from datetime import datetime, date, timedelta
+from datetime import datetime, date
 from typing import Dict, List, Optional, Tuple
 from decimal import Decimal, ROUND_HALF_UP
 import uuid
@@ -234,6 +234,8 @@ class PayrollProcessingService:
             'pto_pay': 0,
             'sick_hours': 0,
             'sick_pay': 0,
+            'break_premium_hours': 0,
+            'break_premium_pay': 0,
             'bonus': 0,
             'commission': 0,
             'tips': 0,
@@ -243,8 +245,9 @@ class PayrollProcessingService:
         }
         
         if pay_type == 'hourly':
-            # Regular hours (up to 40)
-            regular_hours = min(float(hours.get('regular', 0)), 40)
+            # Regular hours (up to 40 per workweek)
+            weeks = int(hours.get('weeks_in_period', 1)) or 1
+            regular_hours = min(float(hours.get('regular', 0)), 40 * weeks)
             earnings['regular_hours'] = regular_hours
             earnings['regular_pay'] = round(regular_hours * pay_rate, 2)
             
@@ -263,6 +266,11 @@ class PayrollProcessingService:
             earnings['holiday_hours'] = holiday_hours
             earnings['holiday_pay'] = round(holiday_hours * pay_rate * 1.5, 2)
             
+            # Meal/rest break premiums (one hour at regular rate each)
+            premium_hours = float(hours.get('break_premium', 0))
+            earnings['break_premium_hours'] = premium_hours
+            earnings['break_premium_pay'] = round(premium_hours * pay_rate, 2)
+            
         elif pay_type == 'salary':
             # Salary per pay period
             pay_periods = self.tax_engine._get_pay_periods(employee.get('pay_frequency', 'biweekly'))
@@ -291,6 +299,7 @@ class PayrollProcessingService:
             earnings['overtime_pay'] +
             earnings['double_time_pay'] +
             earnings['holiday_pay'] +
+            earnings['break_premium_pay'] +
             earnings['pto_pay'] +
             earnings['sick_pay'] +
             earnings['bonus'] +
@@ -302,6 +311,40 @@ class PayrollProcessingService:
         
         return earnings
     
+    def calculate_period_gross_wages(
+        self,
+        employees: List[Dict],
+        time_entries: List[Dict],
+        period_start: date,
+        period_end: date,
+        other_hours: Optional[Dict[str, Dict]] = None
+    ) -> Dict[str, Dict]:
+        """
+        Calculate gross wages for a whole pay period from raw time entries.
+        Hours are split by TimeComplianceEngine in one pass for all employees;
+        `other_hours` carries per-employee PTO, holiday and supplemental pay.
+        """
+        from services.time_compliance_service import time_compliance_engine
+        
+        other_hours = other_hours or {}
+        employee_states = {
+            str(emp.get('id')): emp.get('work_state', 'DEFAULT') for emp in employees
+        }
+        hour_results = time_compliance_engine.calculate_period(
+            time_entries, period_start, period_end, employee_states=employee_states
+        )
+        
+        results = {}
+        for employee in employees:
+            employee_id = str(employee.get('id'))
+            extra = other_hours.get(employee_id, {})
+            if employee_id in hour_results:
+                hours_data = time_compliance_engine.to_hours_data(hour_results[employee_id], extra)
+            else:
+                hours_data = dict(extra)
+            results[employee_id] = self._calculate_gross_wages(employee, hours_data)
+        return results
+    
     def _calculate_pretax_deductions(
         self,
         gross_pay: float,
@@ -614,6 +657,25 @@ class PayrollProcessingService:
         quarter = (pay_date_obj.month - 1) // 3 + 1
         tax_period = f"{pay_date_obj.year}-Q{quarter}"
         
+        deposit_action = {
+            'type': 'eftps_deposit',
+            'amount': round(federal_liability, 2),
+            'tax_type': '941',
+            'status': 'pending'
+        }
+        deposit_due = self._calculate_deposit_due_date(pay_date)
+        
+        # Accrue into the EIN's deposit obligation queue when the company is on file
+        obligation = self._queue_federal_deposit(company_id, federal_liability, pay_date_obj)
+        if obligation:
+            deposit_due = obligation['due_date']
+            deposit_action.update({
+                'status': 'queued',
+                'obligation_id': obligation['id'],
+                'deposit_schedule': obligation['schedule'],
+                'due_date': obligation['due_date']
+            })
+        
         return {
             'federal_liability': round(federal_liability, 2),
             'futa_liability': round(tax_summary.get('futa', 0), 2),
@@ -621,36 +683,41 @@ class PayrollProcessingService:
             'suta_liabilities': tax_summary.get('suta', {}),
             'tax_period': tax_period,
             'pay_date': pay_date,
-            'deposit_due': self._calculate_deposit_due_date(pay_date),
-            'filing_actions': [
-                {
-                    'type': 'eftps_deposit',
-                    'amount': round(federal_liability, 2),
-                    'tax_type': '941',
-                    'status': 'pending'
-                }
-            ]
+            'deposit_due': deposit_due,
+            'filing_actions': [deposit_action]
         }
     
+    def _queue_federal_deposit(self, company_id, federal_liability: float, pay_date_obj) -> Optional[Dict]:
+        """Record the run's 941 liability with the deposit scheduler."""
+        from flask import has_app_context
+        
+        if federal_liability <= 0 or not has_app_context() or not str(company_id).isdigit():
+            return None
+        
+        from models import Company
+        from services.deposit_scheduler_service import deposit_scheduler
+        
+        company = Company.query.get(int(company_id))
+        if not company or not company.ein:
+            return None
+        return deposit_scheduler.record_liability(
+            company_id=company_id,
+            ein=company.ein,
+            amount=federal_liability,
+            liability_date=pay_date_obj
+        )
+    
     def _calculate_deposit_due_date(self, pay_date: str) -> str:
         """Calculate EFTPS deposit due date based on deposit schedule."""
+        from services.deposit_scheduler_service import semiweekly_due_date
+        
         pay_date_obj = datetime.fromisoformat(pay_date) if isinstance(pay_date, str) else pay_date
         
-        # Default to semi-weekly (3 business days)
+        # Default to semi-weekly (3 business days after the period closes)
         # Wednesday, Thursday, Friday paydays: Due following Wednesday
         # Saturday, Sunday, Monday, Tuesday paydays: Due following Friday
-        
-        weekday = pay_date_obj.weekday()
-        if weekday in [2, 3, 4]:  # Wed, Thu, Fri
-            days_until_wed = (2 - weekday + 7) % 7
-            if days_until_wed == 0:
-                days_until_wed = 7
-            due_date = pay_date_obj + timedelta(days=days_until_wed)
-        else:  # Sat, Sun, Mon, Tue
-            days_until_fri = (4 - weekday + 7) % 7
-            if days_until_fri == 0:
-                days_until_fri = 7
-            due_date = pay_date_obj + timedelta(days=days_until_fri)
+        # Federal holidays push the due date out a business day
+        due_date = semiweekly_due_date(pay_date_obj.date() if isinstance(pay_date_obj, datetime) else pay_date_obj)
         
         return due_date.strftime('%Y-%m-%d')
     
@@ -0,0 +1,342 @@
+"""
+PAYROLL RUN CALCULATOR
+Calculates every employee in a payroll run at once: pay inputs, W-4s, garnishments and YTD loaded in bulk
+Chunks fan out over a process pool; paychecks merge back in employee order, whatever order chunks finish in
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import or_
+
+from models import db, Employee, FederalW4Form, Garnishment
+from services.payroll_run_service import SaurelliusPayrollRun, payroll_run_service
+from services.ytd_service import BATCH_SIZE, ytd_accumulators
+
+logger = logging.getLogger(__name__)
+
+# Runs smaller than this are not worth shipping to other processes
+MIN_PARALLEL_EMPLOYEES = 500
+MIN_CHUNK, MAX_CHUNK = 100, 1000
+CHUNKS_PER_WORKER = 4
+
+# W-4 (2020+) filing status -> the engine's bracket choice
+W4_FILING_STATUS = {
+    'single': 'single',
+    'married_separately': 'single',
+    'married_jointly': 'married',
+    'qualifying_surviving_spouse': 'married',
+    'head_of_household': 'head_of_household',
+}
+
+EmployeeInputs = Tuple[int, dict]
+
+
+# =============================================================================
+# WORKER FUNCTIONS (run in the pool processes)
+# =============================================================================
+
+_engine: Optional[SaurelliusPayrollRun] = None
+
+
+def _calculate_chunk(run: dict, chunk: List[EmployeeInputs]) -> List[Tuple[int, Optional[dict], Optional[str]]]:
+    """(index, paycheck, error) per employee; one bad record never sinks its chunk"""
+    global _engine
+    if _engine is None:
+        _engine = SaurelliusPayrollRun(run["company_id"])
+    results = []
+    for index, employee_data in chunk:
+        try:
+            results.append((index, _engine.calculate_paycheck(run, employee_data), None))
+        except Exception as e:
+            results.append((index, None, f"{type(e).__name__}: {e}"))
+    return results
+
+
+# =============================================================================
+# CALCULATOR
+# =============================================================================
+
+class PayrollRunCalculator:
+    """
+    Whole-run gross-to-net. Inputs for every selected employee are read in a
+    handful of batched queries, the pure per-employee calculation runs on
+    `workers` processes, and the merged paychecks replace the run's existing
+    ones for those employees. Progress is kept per run for polling.
+    With workers=0 (or a small run) the calculation runs inline.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        if workers is None:
+            workers = int(os.environ.get('PAYROLL_CALC_WORKERS', os.cpu_count() or 1))
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_pid: Optional[int] = None
+        self._progress: Dict[str, dict] = {}
+
+    def _executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers < 2:
+            return None
+        # Pools do not survive a fork, so each gunicorn worker starts its own on first use
+        if self._pool is None or self._pool_pid != os.getpid():
+            with self._lock:
+                if self._pool is None or self._pool_pid != os.getpid():
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                    self._pool_pid = os.getpid()
+        return self._pool
+
+    # -------------------------------------------------------------------------
+    # RUNNING
+    # -------------------------------------------------------------------------
+
+    def calculate(self, run_id: str, user_id: int, defaults: Optional[dict] = None,
+                  inputs: Optional[Dict[str, dict]] = None) -> dict:
+        """
+        Calculate every employee the run selects. defaults apply to all
+        employees and inputs ({employee_id: {...}}, e.g. hours) to one each,
+        both over what is on file.
+        """
+        payroll_run_service.get_editable_run(run_id)
+        return self._calculate(run_id, user_id, defaults, inputs, self._start(run_id))
+
+    def start_background(self, app, run_id: str, user_id: int, defaults: Optional[dict] = None,
+                         inputs: Optional[Dict[str, dict]] = None) -> dict:
+        """Validate the run now and calculate it on a background thread"""
+        payroll_run_service.get_editable_run(run_id)
+        progress = self._start(run_id)
+
+        def work():
+            with app.app_context():
+                try:
+                    self._calculate(run_id, user_id, defaults, inputs, progress)
+                except Exception:
+                    logger.exception("Payroll run %s calculation failed", run_id)  # also recorded in its progress
+                finally:
+                    db.session.remove()
+
+        threading.Thread(target=work, daemon=True).start()
+        return dict(progress)
+
+    def get_progress(self, run_id: str) -> Optional[dict]:
+        progress = self._progress.get(run_id)
+        return dict(progress) if progress is not None else None
+
+    def _start(self, run_id: str) -> dict:
+        with self._lock:
+            if self._progress.get(run_id, {}).get('status') == 'running':
+                raise ValueError(f"Payroll run {run_id} is already being calculated")
+            progress = {
+                'run_id': run_id,
+                'status': 'running',
+                'total': None,
+                'calculated': 0,
+                'failed': 0,
+                'workers': 0,
+                'errors': [],
+                'started_at': datetime.now().isoformat(),
+                'finished_at': None,
+            }
+            self._progress[run_id] = progress
+        return progress
+
+    def _calculate(self, run_id: str, user_id: int, defaults: Optional[dict],
+                   inputs: Optional[Dict[str, dict]], progress: dict) -> dict:
+        try:
+            run = payroll_run_service.get_editable_run(run_id)
+            started = time.perf_counter()
+            employees = self.load_inputs(run, user_id, defaults, inputs)
+            loaded = time.perf_counter()
+            progress['total'] = len(employees)
+
+            paychecks, errors = self._calculate_all(run, employees, progress)
+            calculated = time.perf_counter()
+            summary = payroll_run_service.replace_paychecks(run_id, paychecks)
+            finished = time.perf_counter()
+        except Exception as e:
+            progress.update(status='failed', error=str(e), finished_at=datetime.now().isoformat())
+            raise
+
+        progress.update(
+            status='completed',
+            errors=errors,
+            finished_at=datetime.now().isoformat(),
+            timing_ms={
+                'load': round((loaded - started) * 1000, 1),
+                'calculate': round((calculated - loaded) * 1000, 1),
+                'merge': round((finished - calculated) * 1000, 1),
+            },
+        )
+        return {'payroll_run': summary, 'progress': dict(progress)}
+
+    def _calculate_all(self, run: dict, employees: List[dict], progress: dict) -> Tuple[List[dict], List[dict]]:
+        """Paychecks in employee order, plus {employee_id, error} for each failure"""
+        indexed = list(enumerate(employees))
+        pool = self._executor() if len(employees) >= MIN_PARALLEL_EMPLOYEES else None
+        size = max(MIN_CHUNK, min(MAX_CHUNK, len(indexed) // (max(self.workers, 1) * CHUNKS_PER_WORKER) or 1))
+        chunks = [indexed[i:i + size] for i in range(0, len(indexed), size)]
+        progress['workers'] = self.workers if pool else 1
+
+        results: List[Optional[tuple]] = [None] * len(employees)
+
+        def collect(chunk_results):
+            for index, paycheck, error in chunk_results:
+                results[index] = (paycheck, error)
+            progress['calculated'] += sum(1 for _, p, _ in chunk_results if p is not None)
+            progress['failed'] += sum(1 for _, p, _ in chunk_results if p is None)
+
+        pending = chunks
+        if pool is not None:
+            try:
+                futures = [pool.submit(_calculate_chunk, run, chunk) for chunk in chunks]
+                for future in as_completed(futures):
+                    collect(future.result())
+                pending = []
+            except BrokenProcessPool:
+                logger.error("Payroll calculation pool died; restarting it and finishing this run inline")
+                with self._lock:
+                    self._pool = None
+                pending = [chunk for chunk in chunks if results[chunk[0][0]] is None]
+        for chunk in pending:
+            collect(_calculate_chunk(run, chunk))
+
+        paychecks, errors = [], []
+        for employee_data, (paycheck, error) in zip(employees, results):
+            if paycheck is not None:
+                paychecks.append(paycheck)
+            else:
+                errors.append({'employee_id': employee_data['employee_id'], 'error': error})
+        return paychecks, errors
+
+    # -------------------------------------------------------------------------
+    # BULK INPUTS
+    # -------------------------------------------------------------------------
+
+    def load_inputs(self, run: dict, user_id: int, defaults: Optional[dict] = None,
+                    inputs: Optional[Dict[str, dict]] = None) -> List[dict]:
+        """employee_data for every employee the run selects, ordered by employee id"""
+        pay_date = date.fromisoformat(run["pay_date"])
+        employees = self._load_employees(run, user_id)
+        ids = [e["employee_id"] for e in employees]
+
+        w4s = self._load_w4s(ids, pay_date)
+        garnishments = self._load_garnishments(ids, pay_date)
+        # Posted accumulators only: the Employee ytd_* columns carry no tax year
+        ytd = ytd_accumulators.bulk_tax_inputs(
+            run["company_id"], {e["employee_id"]: e.get("work_state") for e in employees}, pay_date.year
+        )
+
+        defaults = defaults or {}
+        inputs = {str(k): v for k, v in (inputs or {}).items()}
+        for employee in employees:
+            employee_id = employee["employee_id"]
+            employee.update(w4s.get(employee_id, {}))
+            employee.update(ytd.get(str(employee_id), {}))
+            if employee_id in garnishments:
+                employee["garnishment_orders"] = garnishments[employee_id]
+            employee.update(defaults)
+            employee.update(inputs.get(str(employee_id), {}))
+        return employees
+
+    def _load_employees(self, run: dict, user_id: int) -> List[dict]:
+        query = db.session.query(
+            Employee.id, Employee.first_name, Employee.last_name, Employee.department,
+            Employee.pay_rate, Employee.pay_type, Employee.filing_status, Employee.allowances,
+            Employee.additional_withholding, Employee.work_state
+        ).filter(Employee.is_active.is_(True))
+        # YTD is keyed by the run's company, so only that company's employees belong in it
+        if str(run["company_id"]).isdigit():
+            query = query.filter(Employee.company_id == int(run["company_id"]))
+        else:
+            query = query.filter(Employee.user_id == int(user_id))
+
+        if run.get("include_all_employees", True):
+            rows = query.order_by(Employee.id).all()
+        else:
+            selected = sorted({int(e) for e in run.get("employee_ids", [])})
+            rows = []
+            for start in range(0, len(selected), BATCH_SIZE):
+                rows += query.filter(Employee.id.in_(selected[start:start + BATCH_SIZE])).all()
+            rows.sort(key=lambda row: row.id)
+
+        excluded = {str(e) for e in run.get("exclude_employee_ids", [])}
+        employees = []
+        for row in rows:
+            if str(row.id) in excluded:
+                continue
+            employee = {
+                "employee_id": row.id,
+                "first_name": row.first_name,
+                "last_name": row.last_name,
+                "department": row.department,
+                "pay_rate": row.pay_rate or 0,
+                "pay_type": row.pay_type or "hourly",
+                "filing_status": row.filing_status or "single",
+                "allowances": row.allowances or 0,
+                "additional_withholding": row.additional_withholding or 0,
+            }
+            if row.work_state:
+                employee["work_state"] = row.work_state
+            employees.append(employee)
+        return employees
+
+    def _load_w4s(self, ids: List[int], pay_date: date) -> Dict[int, dict]:
+        """Withholding inputs from each employee's active W-4 in effect on the pay date"""
+        w4s = {}
+        for start in range(0, len(ids), BATCH_SIZE):
+            rows = db.session.query(
+                FederalW4Form.employee_id, FederalW4Form.filing_status, FederalW4Form.extra_withholding,
+                FederalW4Form.claim_exempt, FederalW4Form.exempt_expiration
+            ).filter(
+                FederalW4Form.employee_id.in_(ids[start:start + BATCH_SIZE]),
+                FederalW4Form.status == 'active',
+                FederalW4Form.effective_date <= pay_date
+            ).order_by(FederalW4Form.effective_date, FederalW4Form.id)
+            for employee_id, filing_status, extra, exempt, expires in rows:
+                w4s[employee_id] = {
+                    "filing_status": W4_FILING_STATUS.get(filing_status, 'single'),
+                    "allowances": 0,  # the 2020 W-4 has none
+                    "additional_withholding": extra or 0,
+                    "claim_exempt": bool(exempt) and (expires is None or expires >= pay_date),
+                }
+        return w4s
+
+    def _load_garnishments(self, ids: List[int], pay_date: date) -> Dict[int, List[dict]]:
+        """Active orders per employee, capped at what is still owed"""
+        orders: Dict[int, List[dict]] = {}
+        for start in range(0, len(ids), BATCH_SIZE):
+            rows = Garnishment.query.filter(
+                Garnishment.employee_id.in_(ids[start:start + BATCH_SIZE]),
+                Garnishment.status == 'active',
+                or_(Garnishment.start_date.is_(None), Garnishment.start_date <= pay_date),
+                or_(Garnishment.end_date.is_(None), Garnishment.end_date >= pay_date)
+            ).order_by(Garnishment.priority, Garnishment.id)
+            for g in rows:
+                amount = g.amount
+                owed = None
+                if g.total_required:
+                    owed = g.total_required - (g.total_withheld or 0)
+                    if owed <= 0:
+                        continue
+                    if g.amount_type != 'percentage':
+                        amount = min(amount, owed)
+                orders.setdefault(g.employee_id, []).append({
+                    "type": g.garnishment_type,
+                    "amount_type": g.amount_type or 'fixed',
+                    "amount": amount,
+                    "max_percent_disposable": g.max_percent_disposable,
+                    "priority": g.priority,
+                    # A percentage order's amount is only known against disposable pay
+                    "remaining_balance": owed,
+                })
+        return orders
+
+
+# Singleton instance
+payroll_run_calculator = PayrollRunCalculator()
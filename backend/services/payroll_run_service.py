@@ -10,6 +10,8 @@ from typing import Dict, List, Optional, Tuple
 from enum import Enum
 import uuid
 
+from flask import has_app_context
+
 
 class PayrollStatus(Enum):
     DRAFT = "draft"
@@ -19,6 +21,7 @@ class PayrollStatus(Enum):
     COMPLETED = "completed"
     CANCELLED = "cancelled"
     FAILED = "failed"
+    VOIDED = "voided"
 
 
 class PayFrequency(Enum):
@@ -37,6 +40,11 @@ class PayType(Enum):
     CORRECTION = "correction"
 
 
+def _employer_tax_amounts(paycheck: dict) -> dict:
+    """A paycheck's employer taxes without the total, as _update_run_totals expects"""
+    return {k: v for k, v in paycheck["employer_taxes"].items() if k != "total"}
+
+
 class SaurelliusPayrollRun:
     """Complete payroll processing engine"""
     
@@ -53,8 +61,11 @@ class SaurelliusPayrollRun:
             "additional_medicare_rate": Decimal("0.009"),
             "additional_medicare_threshold": Decimal("200000"),
             "futa_rate": Decimal("0.006"),
-            "futa_wage_base": Decimal("7000")
+            "futa_wage_base": Decimal("7000"),
+            "sdi_wage_base": Decimal("153164")  # CA 2024
         }
+        self.SDI_RATES = {"CA": Decimal("0.009"), "NJ": Decimal("0.0014"),
+                          "NY": Decimal("0.005"), "RI": Decimal("0.011"), "HI": Decimal("0.005")}
         
         # Federal tax brackets 2024 (Single)
         self.FEDERAL_BRACKETS_SINGLE = [
@@ -84,7 +95,8 @@ class SaurelliusPayrollRun:
         
         payroll_run = {
             "id": run_id,
-            "company_id": self.company_id,
+            # The company's own id, which YTD, payroll facts and W-2s are keyed by
+            "company_id": str(data.get("company_id") or self.company_id),
             "run_number": len(self.payroll_runs) + 1,
             
             # Pay Period
@@ -121,6 +133,7 @@ class SaurelliusPayrollRun:
                 "local_withheld": Decimal("0.00"),
                 "employee_ss": Decimal("0.00"),
                 "employee_medicare": Decimal("0.00"),
+                "additional_medicare": Decimal("0.00"),
                 "employer_ss": Decimal("0.00"),
                 "employer_medicare": Decimal("0.00"),
                 "futa": Decimal("0.00"),
@@ -152,17 +165,45 @@ class SaurelliusPayrollRun:
         
         return safe
     
-    def add_employee_to_payroll(self, run_id: str, employee_data: dict) -> dict:
-        """Add an employee to the payroll run and calculate their pay"""
+    def get_editable_run(self, run_id: str) -> dict:
+        """Payroll run that still accepts paychecks"""
         if run_id not in self.payroll_runs:
             raise ValueError(f"Payroll run {run_id} not found")
         
         payroll_run = self.payroll_runs[run_id]
         if payroll_run["status"] not in [PayrollStatus.DRAFT.value, PayrollStatus.PENDING_APPROVAL.value]:
             raise ValueError(f"Cannot modify payroll in status: {payroll_run['status']}")
+        return payroll_run
+    
+    def add_employee_to_payroll(self, run_id: str, employee_data: dict) -> dict:
+        """Add an employee to the payroll run and calculate their pay"""
+        payroll_run = self.get_editable_run(run_id)
+        
+        # Posted YTD backs any ytd_* value the caller did not supply
+        if has_app_context():
+            from services.ytd_service import ytd_accumulators
+            posted = ytd_accumulators.tax_inputs(
+                payroll_run["company_id"], employee_data["employee_id"], date.fromisoformat(payroll_run["pay_date"]).year,
+                employee_data.get("work_state", "CA")
+            )
+            employee_data = {**posted, **employee_data}
+        
+        paycheck = self.calculate_paycheck(payroll_run, employee_data)
+        self.employee_paychecks.append(paycheck)
+        
+        # Update payroll run totals
+        self._update_run_totals(run_id, paycheck, _employer_tax_amounts(paycheck))
         
+        return paycheck
+    
+    def calculate_paycheck(self, payroll_run: dict, employee_data: dict) -> dict:
+        """
+        Gross-to-net for one employee. Pure: reads only its arguments and
+        leaves the run untouched, so it can run in a worker process.
+        """
         paycheck_id = str(uuid.uuid4())
         employee_id = employee_data["employee_id"]
+        run_id = payroll_run["id"]
         
         # Calculate earnings
         earnings = self._calculate_earnings(employee_data, payroll_run["pay_frequency"])
@@ -171,6 +212,12 @@ class SaurelliusPayrollRun:
         # Calculate taxes
         taxes = self._calculate_taxes(employee_data, gross_pay, payroll_run)
         
+        # Garnishment orders are sized against disposable earnings, so they follow taxes
+        if employee_data.get("garnishment_orders"):
+            employee_data = {**employee_data,
+                             **self._calculate_garnishments(employee_data["garnishment_orders"],
+                                                            gross_pay - sum(taxes.values()))}
+        
         # Calculate deductions
         deductions = self._calculate_deductions(employee_data, gross_pay)
         
@@ -181,18 +228,21 @@ class SaurelliusPayrollRun:
         
         # Calculate employer costs
         employer_taxes = self._calculate_employer_taxes(employee_data, gross_pay)
+        taxable_wages = self._taxable_wages(employee_data, gross_pay)
         
         paycheck = {
             "id": paycheck_id,
             "payroll_run_id": run_id,
             "employee_id": employee_id,
-            "company_id": self.company_id,
+            "company_id": payroll_run["company_id"],
             
             # Employee Info
             "employee_name": f"{employee_data.get('first_name', '')} {employee_data.get('last_name', '')}",
             "department": employee_data.get("department"),
             "pay_rate": float(employee_data.get("pay_rate", 0)),
             "pay_type": employee_data.get("pay_type", "hourly"),
+            "work_state": employee_data.get("work_state", "CA"),
+            "local_jurisdiction": employee_data.get("local_jurisdiction"),
             
             # Pay Period
             "pay_period_start": payroll_run["pay_period_start"],
@@ -256,6 +306,9 @@ class SaurelliusPayrollRun:
                 "total": float(total_deductions)
             },
             
+            # Wages subject to each tax after wage-base caps
+            "taxable_wages": {k: float(v) for k, v in taxable_wages.items()},
+            
             # Employer Taxes
             "employer_taxes": {
                 "social_security": float(employer_taxes.get("social_security", 0)),
@@ -287,11 +340,6 @@ class SaurelliusPayrollRun:
             "created_at": datetime.now().isoformat()
         }
         
-        self.employee_paychecks.append(paycheck)
-        
-        # Update payroll run totals
-        self._update_run_totals(run_id, paycheck, employer_taxes)
-        
         return paycheck
     
     def _calculate_earnings(self, employee_data: dict, pay_frequency: str) -> dict:
@@ -382,13 +430,14 @@ class SaurelliusPayrollRun:
         additional_withholding = Decimal(str(employee_data.get("additional_withholding", 0)))
         
         # Pre-tax deductions reduce taxable income
-        pretax_deductions = Decimal(str(employee_data.get("pretax_deductions", 0)))
-        taxable_income = gross_pay - pretax_deductions
+        wages = self._taxable_wages(employee_data, gross_pay)
+        taxable_income = wages["federal"]
         
-        # Federal Income Tax (using percentage method)
-        taxes["federal"] = self._calculate_federal_tax(
-            taxable_income, filing_status, allowances, payroll_run["pay_frequency"]
-        ) + additional_withholding
+        # Federal Income Tax (using percentage method); none for a W-4 claiming exemption
+        if not employee_data.get("claim_exempt"):
+            taxes["federal"] = self._calculate_federal_tax(
+                taxable_income, filing_status, allowances, payroll_run["pay_frequency"]
+            ) + additional_withholding
         
         # State Income Tax
         state = employee_data.get("work_state", "CA")
@@ -396,14 +445,10 @@ class SaurelliusPayrollRun:
         
         # Local Tax
         if employee_data.get("local_tax_rate"):
-            taxes["local"] = (taxable_income * Decimal(str(employee_data["local_tax_rate"]))).quantize(Decimal("0.01"))
+            taxes["local"] = (wages["local"] * Decimal(str(employee_data["local_tax_rate"]))).quantize(Decimal("0.01"))
         
         # Social Security (6.2% up to wage base)
-        ytd_ss_wages = Decimal(str(employee_data.get("ytd_ss_wages", 0)))
-        remaining_ss_wages = max(Decimal("0.00"), 
-                                self.TAX_RATES["social_security_wage_base"] - ytd_ss_wages)
-        ss_wages = min(gross_pay, remaining_ss_wages)
-        taxes["social_security"] = (ss_wages * self.TAX_RATES["social_security_rate"]).quantize(Decimal("0.01"))
+        taxes["social_security"] = (wages["social_security"] * self.TAX_RATES["social_security_rate"]).quantize(Decimal("0.01"))
         
         # Medicare (1.45%)
         taxes["medicare"] = (gross_pay * self.TAX_RATES["medicare_rate"]).quantize(Decimal("0.01"))
@@ -417,17 +462,33 @@ class SaurelliusPayrollRun:
             taxes["additional_medicare"] = (additional_wages * self.TAX_RATES["additional_medicare_rate"]).quantize(Decimal("0.01"))
         
         # State Disability Insurance (if applicable)
-        if state in ["CA", "NJ", "NY", "RI", "HI"]:
-            sdi_rates = {"CA": Decimal("0.009"), "NJ": Decimal("0.0014"), 
-                        "NY": Decimal("0.005"), "RI": Decimal("0.011"), "HI": Decimal("0.005")}
-            sdi_wage_base = Decimal("153164")  # CA 2024
-            ytd_sdi_wages = Decimal(str(employee_data.get("ytd_sdi_wages", 0)))
-            remaining_sdi = max(Decimal("0.00"), sdi_wage_base - ytd_sdi_wages)
-            sdi_wages = min(gross_pay, remaining_sdi)
-            taxes["state_disability"] = (sdi_wages * sdi_rates.get(state, Decimal("0"))).quantize(Decimal("0.01"))
+        if state in self.SDI_RATES:
+            taxes["state_disability"] = (wages["state_disability"] * self.SDI_RATES[state]).quantize(Decimal("0.01"))
         
         return taxes
     
+    def _taxable_wages(self, employee_data: dict, gross_pay: Decimal) -> dict:
+        """Wages subject to each tax this period, capped by the remaining wage base"""
+        def capped(wage_base: Decimal, ytd_key: str) -> Decimal:
+            remaining = max(Decimal("0.00"), wage_base - Decimal(str(employee_data.get(ytd_key, 0))))
+            return min(gross_pay, remaining)
+        
+        pretax_deductions = Decimal(str(employee_data.get("pretax_deductions", 0)))
+        taxable_income = gross_pay - pretax_deductions
+        state = employee_data.get("work_state", "CA")
+        
+        return {
+            "federal": taxable_income,
+            "state": taxable_income,
+            "local": taxable_income if employee_data.get("local_tax_rate") else Decimal("0.00"),
+            "social_security": capped(self.TAX_RATES["social_security_wage_base"], "ytd_ss_wages"),
+            "medicare": gross_pay,
+            "state_disability": (capped(self.TAX_RATES["sdi_wage_base"], "ytd_sdi_wages")
+                                 if state in self.SDI_RATES else Decimal("0.00")),
+            "futa": capped(self.TAX_RATES["futa_wage_base"], "ytd_futa_wages"),
+            "suta": capped(Decimal(str(employee_data.get("suta_wage_base", 7000))), "ytd_suta_wages")
+        }
+    
     def _calculate_federal_tax(self, taxable_income: Decimal, filing_status: str,
                               allowances: int, pay_frequency: str) -> Decimal:
         """Calculate federal income tax withholding"""
@@ -543,6 +604,29 @@ class SaurelliusPayrollRun:
         
         return deductions
     
+    def _calculate_garnishments(self, orders: List[dict], disposable: Decimal) -> dict:
+        """Withhold garnishment orders in priority order out of disposable earnings"""
+        withheld = {"child_support": Decimal("0.00"), "garnishments": Decimal("0.00")}
+        remaining = max(Decimal("0.00"), disposable)
+        
+        for order in sorted(orders, key=lambda o: o.get("priority") or 99):
+            amount = Decimal(str(order.get("amount") or 0))
+            if order.get("amount_type") == "percentage":
+                amount = disposable * amount / 100
+            if order.get("max_percent_disposable"):
+                amount = min(amount, disposable * Decimal(str(order["max_percent_disposable"])) / 100)
+            if order.get("remaining_balance") is not None:
+                amount = min(amount, Decimal(str(order["remaining_balance"])))
+            amount = min(amount, remaining).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+            if amount <= 0:
+                continue
+            
+            key = "child_support" if order.get("type") == "child_support" else "garnishments"
+            withheld[key] += amount
+            remaining -= amount
+        
+        return withheld
+    
     def _calculate_employer_taxes(self, employee_data: dict, gross_pay: Decimal) -> dict:
         """Calculate employer-paid taxes"""
         employer_taxes = {
@@ -552,30 +636,20 @@ class SaurelliusPayrollRun:
             "suta": Decimal("0.00")
         }
         
+        wages = self._taxable_wages(employee_data, gross_pay)
+        
         # Employer Social Security (matching)
-        ytd_ss_wages = Decimal(str(employee_data.get("ytd_ss_wages", 0)))
-        remaining_ss = max(Decimal("0.00"), 
-                         self.TAX_RATES["social_security_wage_base"] - ytd_ss_wages)
-        ss_wages = min(gross_pay, remaining_ss)
-        employer_taxes["social_security"] = (ss_wages * self.TAX_RATES["social_security_rate"]).quantize(Decimal("0.01"))
+        employer_taxes["social_security"] = (wages["social_security"] * self.TAX_RATES["social_security_rate"]).quantize(Decimal("0.01"))
         
         # Employer Medicare (matching)
         employer_taxes["medicare"] = (gross_pay * self.TAX_RATES["medicare_rate"]).quantize(Decimal("0.01"))
         
         # FUTA (6% on first $7,000, but 5.4% credit typically)
-        ytd_futa_wages = Decimal(str(employee_data.get("ytd_futa_wages", 0)))
-        remaining_futa = max(Decimal("0.00"),
-                           self.TAX_RATES["futa_wage_base"] - ytd_futa_wages)
-        futa_wages = min(gross_pay, remaining_futa)
-        employer_taxes["futa"] = (futa_wages * self.TAX_RATES["futa_rate"]).quantize(Decimal("0.01"))
+        employer_taxes["futa"] = (wages["futa"] * self.TAX_RATES["futa_rate"]).quantize(Decimal("0.01"))
         
         # SUTA (varies by state and employer experience rate)
         suta_rate = Decimal(str(employee_data.get("suta_rate", 0.027)))  # Default 2.7%
-        suta_wage_base = Decimal(str(employee_data.get("suta_wage_base", 7000)))
-        ytd_suta_wages = Decimal(str(employee_data.get("ytd_suta_wages", 0)))
-        remaining_suta = max(Decimal("0.00"), suta_wage_base - ytd_suta_wages)
-        suta_wages = min(gross_pay, remaining_suta)
-        employer_taxes["suta"] = (suta_wages * suta_rate).quantize(Decimal("0.01"))
+        employer_taxes["suta"] = (wages["suta"] * suta_rate).quantize(Decimal("0.01"))
         
         return employer_taxes
     
@@ -598,11 +672,33 @@ class SaurelliusPayrollRun:
         run["tax_totals"]["local_withheld"] += Decimal(str(paycheck["taxes"]["local"]))
         run["tax_totals"]["employee_ss"] += Decimal(str(paycheck["taxes"]["social_security"]))
         run["tax_totals"]["employee_medicare"] += Decimal(str(paycheck["taxes"]["medicare"]))
+        run["tax_totals"]["additional_medicare"] += Decimal(str(paycheck["taxes"].get("additional_medicare", 0)))
         run["tax_totals"]["employer_ss"] += Decimal(str(employer_taxes.get("social_security", 0)))
         run["tax_totals"]["employer_medicare"] += Decimal(str(employer_taxes.get("medicare", 0)))
         run["tax_totals"]["futa"] += Decimal(str(employer_taxes.get("futa", 0)))
         run["tax_totals"]["suta"] += Decimal(str(employer_taxes.get("suta", 0)))
     
+    def replace_paychecks(self, run_id: str, paychecks: List[dict]) -> dict:
+        """
+        Swap in freshly calculated paychecks: any the run already holds for the
+        same employees are dropped, then the totals are rebuilt in paycheck order.
+        """
+        run = self.get_editable_run(run_id)
+        replaced = {str(p["employee_id"]) for p in paychecks}
+        self.employee_paychecks = [
+            p for p in self.employee_paychecks
+            if p["payroll_run_id"] != run_id or str(p["employee_id"]) not in replaced
+        ] + paychecks
+        
+        for totals in (run["totals"], run["tax_totals"]):
+            for key in totals:
+                totals[key] = 0 if key == "employee_count" else Decimal("0.00")
+        for paycheck in self.get_paychecks_for_run(run_id):
+            self._update_run_totals(run_id, paycheck, _employer_tax_amounts(paycheck))
+        run["updated_at"] = datetime.now().isoformat()
+        
+        return self._sanitize_payroll_run(run)
+    
     def get_payroll_run(self, run_id: str) -> Optional[dict]:
         """Get payroll run by ID"""
         run = self.payroll_runs.get(run_id)
@@ -644,8 +740,26 @@ class SaurelliusPayrollRun:
         run["status"] = PayrollStatus.PENDING_APPROVAL.value
         run["updated_at"] = datetime.now().isoformat()
         
+        # Pre-approval check: the approver sees flagged paychecks alongside the totals
+        if has_app_context():
+            run["anomaly_check"] = self.check_anomalies(run_id)
+        
         return self._sanitize_payroll_run(run)
     
+    def check_anomalies(self, run_id: str) -> dict:
+        """Score each paycheck in the run against the employee's pay history"""
+        if run_id not in self.payroll_runs:
+            raise ValueError(f"Payroll run {run_id} not found")
+        
+        from services.payroll_anomaly_service import payroll_anomaly_detector
+        run = self.payroll_runs[run_id]
+        # Only a processed run has facts of its own to keep out of the baselines
+        processed = run["status"] in (PayrollStatus.COMPLETED.value, PayrollStatus.VOIDED.value)
+        return payroll_anomaly_detector.check_paychecks(
+            run["company_id"], self.get_paychecks_for_run(run_id),
+            exclude_run=run_id if processed else None
+        )
+    
     def approve_payroll(self, run_id: str, approver_id: str) -> dict:
         """Approve payroll for processing"""
         if run_id not in self.payroll_runs:
@@ -676,12 +790,91 @@ class SaurelliusPayrollRun:
         # In production, this would:
         # 1. Generate ACH file
         # 2. Create paystubs
-        # 3. Update employee YTD totals
-        # 4. Record tax liabilities
-        # 5. Send notifications
+        # 3. Record tax liabilities
+        # 4. Send notifications
+        
+        # YTD accumulators and reporting facts commit together; record_run commits
+        from models import db
+        from services.payroll_fact_service import payroll_facts
+        from services.ytd_service import ytd_accumulators
+        paychecks = self.get_paychecks_for_run(run_id)
+        try:
+            ytd_accumulators.post_run(run, paychecks, commit=False)
+            obligation = self._record_deposit_liability(run)
+            payroll_facts.record_run(run, paychecks)
+        except Exception:
+            db.session.rollback()
+            run["status"] = PayrollStatus.FAILED.value
+            raise
         
         run["status"] = PayrollStatus.COMPLETED.value
         run["processed_at"] = datetime.now().isoformat()
+        run["deposit_obligation_id"] = obligation["id"] if obligation else None
+        
+        return self._sanitize_payroll_run(run)
+    
+    def _deposit_liability(self, run: dict) -> Decimal:
+        """Federal withholding plus both halves of Social Security and Medicare"""
+        taxes = run["tax_totals"]
+        return sum(Decimal(str(taxes.get(key, 0))) for key in (
+            "federal_withheld", "employee_ss", "employee_medicare", "additional_medicare",
+            "employer_ss", "employer_medicare"
+        ))
+    
+    def _record_deposit_liability(self, run: dict) -> Optional[dict]:
+        """Accrue the run's 941 liability into its EIN's EFTPS deposit queue (uncommitted)"""
+        from models import Company
+        from services.deposit_scheduler_service import deposit_scheduler
+        
+        liability = self._deposit_liability(run)
+        company_id = str(run["company_id"])
+        if liability <= 0 or not company_id.isdigit():
+            return None
+        
+        company = Company.query.get(int(company_id))
+        if not company or not company.ein:
+            return None
+        return deposit_scheduler.record_liability(
+            company_id=company_id,
+            ein=company.ein,
+            amount=liability,
+            liability_date=run["pay_date"],
+            commit=False
+        )
+    
+    def void_payroll(self, run_id: str, reason: str) -> dict:
+        """
+        Void a completed payroll run, backing it out of YTD, its tax deposit
+        and reporting. Refused once the deposit has been submitted to EFTPS.
+        """
+        if run_id not in self.payroll_runs:
+            raise ValueError(f"Payroll run {run_id} not found")
+        
+        run = self.payroll_runs[run_id]
+        if run["status"] != PayrollStatus.COMPLETED.value:
+            raise ValueError("Can only void completed payrolls")
+        
+        from models import db
+        from services.deposit_scheduler_service import deposit_scheduler
+        from services.payroll_fact_service import payroll_facts
+        from services.ytd_service import ytd_accumulators
+        try:
+            if run.get("deposit_obligation_id"):
+                deposit_scheduler.reverse_liability(
+                    run["deposit_obligation_id"], self._deposit_liability(run), run["pay_date"], commit=False
+                )
+            ytd_accumulators.reverse_run(run["company_id"], run_id, commit=False)
+            payroll_facts.remove_run(run["company_id"], run_id)
+        except Exception:
+            db.session.rollback()
+            raise
+        
+        run["status"] = PayrollStatus.VOIDED.value
+        run["void_reason"] = reason
+        run["voided_at"] = datetime.now().isoformat()
+        run["updated_at"] = datetime.now().isoformat()
+        for paycheck in self.get_paychecks_for_run(run_id):
+            paycheck["status"] = "voided"
         
         return self._sanitize_payroll_run(run)
     
@@ -691,7 +884,8 @@ class SaurelliusPayrollRun:
             raise ValueError(f"Payroll run {run_id} not found")
         
         run = self.payroll_runs[run_id]
-        if run["status"] in [PayrollStatus.COMPLETED.value, PayrollStatus.CANCELLED.value]:
+        if run["status"] in [PayrollStatus.COMPLETED.value, PayrollStatus.CANCELLED.value,
+                             PayrollStatus.VOIDED.value]:
             raise ValueError(f"Cannot cancel payroll with status: {run['status']}")
         
         run["status"] = PayrollStatus.CANCELLED.value
@@ -1,6 +1,6 @@
 """
 SAURELLIUS PAYSTUB GENERATOR SERVICE
-Bank-Grade Security | Snappt Compliant | Playwright-Powered | 25 Color Themes
+Bank-Grade Security | Snappt Compliant | Playwright or Native PDF | 25 Color Themes
 
 Complete paystub generation engine with:
 - 25 Professional Color Themes
@@ -10,6 +10,7 @@ Complete paystub generation engine with:
 - Security Watermarks
 - Microtext Security
 - HMAC-based Tamper-Proof Seals
+- Chromium (HTML) or native ReportLab PDF backend per request
 
 Author: Saurellius Platform
 Version: 2.1.0
@@ -26,7 +27,7 @@ import io
 import logging
 from datetime import datetime, timezone
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Sequence
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +47,15 @@ except ImportError:
     HAS_QR = False
     logger.warning("QR code generation unavailable. Install with: pip install qrcode pillow")
 
+from services.paystub_pdf_renderer import HAS_REPORTLAB, native_renderer
+from services.paystub_templates import paystub_templates
+
+# PDF backends: 'chromium' prints the HTML template, 'native' draws it with ReportLab
+PDF_BACKENDS = ('chromium', 'native')
+
+# Prefix of the signed token carried by the verification QR code
+VERIFICATION_TOKEN_PREFIX = 'SAU1'
+
 
 # =============================================================================
 # 25 PROFESSIONAL COLOR THEMES
@@ -301,6 +311,97 @@ class AntiTamperEngine:
         """Verify document hasn't been tampered with"""
         expected_seal = AntiTamperEngine.create_tamper_proof_seal(document_data)
         return hmac.compare_digest(expected_seal, seal)
+    
+    @staticmethod
+    def _token_signature(body: str) -> str:
+        secret_key = os.environ.get('SAURELLIUS_SECRET_KEY', 'saurellius-2025-secure').encode()
+        digest = hmac.new(secret_key, body.encode(), hashlib.sha256).digest()
+        return base64.b32encode(digest[:10]).decode()
+    
+    @staticmethod
+    def create_verification_token(paystub_data: Dict, verification_id: str) -> str:
+        """
+        Signed token for the verification QR code:
+        SAU1.<verification id>.<pay date>.<net cents>.<gross cents>.<signature>
+        Uppercase letters, digits and dots only, so the QR uses alphanumeric mode.
+        """
+        totals = paystub_data['totals']
+        body = '.'.join((
+            VERIFICATION_TOKEN_PREFIX,
+            verification_id.upper(),
+            str(paystub_data['pay_info']['pay_date'])[:10].replace('-', ''),
+            str(_cents(totals['net_pay'])),
+            str(_cents(totals['gross_pay'])),
+        ))
+        return f"{body}.{AntiTamperEngine._token_signature(body)}"
+    
+    @staticmethod
+    def verify_verification_token(token: str) -> Optional[Dict]:
+        """Fields of a token made by create_verification_token, or None if it is forged or malformed"""
+        body, _, signature = token.strip().upper().rpartition('.')
+        parts = body.split('.')
+        if len(parts) != 5 or parts[0] != VERIFICATION_TOKEN_PREFIX:
+            return None
+        if not hmac.compare_digest(AntiTamperEngine._token_signature(body), signature):
+            return None
+        _, verification_id, pay_date, net_cents, gross_cents = parts
+        try:
+            return {
+                'verification_id': verification_id,
+                'pay_date': f"{pay_date[:4]}-{pay_date[4:6]}-{pay_date[6:8]}",
+                'net_pay': float(Decimal(int(net_cents)) / 100),
+                'gross_pay': float(Decimal(int(gross_cents)) / 100),
+            }
+        except ValueError:
+            return None
+
+
+class VerificationSeal:
+    """Verification id, signed token and QR matrix for one document, shared by every theme rendered from it"""
+    
+    __slots__ = ('verification_id', 'document_hash', 'token', 'qr_matrix', '_svg')
+    
+    def __init__(self, verification_id: str, document_hash: str, token: str,
+                 qr_matrix: Optional[List[List[bool]]]):
+        self.verification_id = verification_id
+        self.document_hash = document_hash
+        self.token = token
+        self.qr_matrix = qr_matrix
+        self._svg = None
+    
+    @property
+    def svg(self) -> str:
+        """Inline SVG seal for the HTML template (empty when qrcode is not installed)"""
+        if self._svg is None:
+            self._svg = qr_svg(self.qr_matrix) if self.qr_matrix else ''
+        return self._svg
+
+
+def qr_svg(matrix: Sequence[Sequence[bool]], css_class: str = 'qr-code') -> str:
+    """
+    Inline SVG for a QR module matrix (quiet zone included). Each row's dark
+    runs become one subpath, so the seal is a single <path> with no raster
+    image or base64 step.
+    """
+    size = len(matrix)
+    runs: List[str] = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < size:
+            if row[x]:
+                start = x
+                while x < size and row[x]:
+                    x += 1
+                runs.append(f'M{start} {y}h{x - start}v1h{start - x}z')
+            else:
+                x += 1
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {size}" class="{css_class}" '
+            f'shape-rendering="crispEdges" role="img" aria-label="Verification QR">'
+            f'<rect width="{size}" height="{size}" fill="#fff"/><path d="{"".join(runs)}" fill="#000"/></svg>')
+
+
+def _cents(amount) -> int:
+    return int((Decimal(str(amount)) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
 
 
 # =============================================================================
@@ -385,926 +486,82 @@ class PaystubGenerator:
     """
     
     def __init__(self):
-        if not HAS_PLAYWRIGHT:
-            logger.warning("Playwright not available - PDF generation will fail")
+        if not HAS_PLAYWRIGHT and not HAS_REPORTLAB:
+            logger.warning("Neither Playwright nor ReportLab available - PDF generation will fail")
         
         self.anti_tamper = AntiTamperEngine()
         self.version = "2.1.0"
+        self.default_backend = os.environ.get('PAYSTUB_PDF_BACKEND') or (
+            'chromium' if HAS_PLAYWRIGHT or not HAS_REPORTLAB else 'native'
+        )
+    
+    def backend_available(self, backend: str) -> bool:
+        return {'chromium': HAS_PLAYWRIGHT, 'native': HAS_REPORTLAB}.get(backend, False)
     
     def get_available_themes(self) -> Dict[str, Dict]:
         """Get all available color themes"""
         return {key: {"name": theme["name"], "primary": theme["primary"], "secondary": theme["secondary"]} 
                 for key, theme in COLOR_THEMES.items()}
     
-    def generate_verification_qr(self, paystub_data: Dict, verification_id: str) -> str:
-        """Generate bank-grade verification QR code"""
-        if not HAS_QR:
-            return ""
-        
-        verification_data = {
-            'employee': paystub_data['employee']['name'],
-            'employer': paystub_data['company']['name'],
-            'pay_date': paystub_data['pay_info']['pay_date'],
-            'net_pay': str(paystub_data['totals']['net_pay']),
-            'gross_pay': str(paystub_data['totals']['gross_pay']),
-            'verification_id': verification_id[:8].upper(),
-            'timestamp': datetime.now().isoformat(),
-            'issuer': 'SAURELLIUS_VERIFIED',
-            'security_hash': hashlib.sha256(
-                f"{paystub_data['employee']['name']}{paystub_data['totals']['net_pay']}{paystub_data['pay_info']['pay_date']}".encode()
-            ).hexdigest()[:16].upper()
-        }
-        
-        qr_string = json.dumps(verification_data, separators=(',', ':'))
-        
+    def _verification_qr_code(self, token: str):
         qr = qrcode.QRCode(
-            version=3,
             error_correction=qrcode.constants.ERROR_CORRECT_H,
             box_size=8,
             border=2,
         )
-        qr.add_data(qr_string)
+        qr.add_data(token)
         qr.make(fit=True)
+        return qr
+    
+    def create_verification_seal(self, paystub_data: Dict) -> VerificationSeal:
+        """New verification id, fingerprint, token and QR matrix for one document"""
+        verification_id = self.anti_tamper.generate_verification_id()
+        document_hash = self.anti_tamper.generate_document_fingerprint(paystub_data)[:12].upper()
+        token = self.anti_tamper.create_verification_token(paystub_data, verification_id)
+        qr_matrix = self._verification_qr_code(token).get_matrix() if HAS_QR else None
+        return VerificationSeal(verification_id, document_hash, token, qr_matrix)
+    
+    def generate_verification_qr(self, paystub_data: Dict, verification_id: str) -> str:
+        """Base64 PNG of the verification QR code, for callers that need a raster image"""
+        if not HAS_QR:
+            return ""
         
-        img = qr.make_image(fill_color="black", back_color="white")
+        token = self.anti_tamper.create_verification_token(paystub_data, verification_id)
+        img = self._verification_qr_code(token).make_image(fill_color="black", back_color="white")
         buffer = io.BytesIO()
         img.save(buffer, format='PNG')
         buffer.seek(0)
         
         return base64.b64encode(buffer.getvalue()).decode()
     
-    def generate_html(self, paystub_data: Dict, theme_name: str, qr_base64: str,
+    def generate_html(self, paystub_data: Dict, theme_name: str, qr_markup: str,
                      verification_id: str, document_hash: str) -> str:
-        """Generate secure HTML paystub with all security features"""
-        
-        import html as html_module
-        
-        theme = COLOR_THEMES[theme_name]
-        doc_serial = f"SAU{datetime.now().strftime('%Y%m%d')}{verification_id[:8]}"
-        
-        # Build earnings rows
-        earnings_html = ""
-        for earning in paystub_data['earnings']:
-            earnings_html += f"""
-                                <tr>
-                                    <td>{html_module.escape(str(earning['description']))}</td>
-                                    <td>{html_module.escape(str(earning['rate']))}</td>
-                                    <td>{html_module.escape(str(earning['hours']))}</td>
-                                    <td>${earning['current']:,.2f}</td>
-                                    <td>${earning['ytd']:,.2f}</td>
-                                </tr>"""
-        
-        # Build deductions rows
-        deductions_html = ""
-        for deduction in paystub_data['deductions']:
-            deductions_html += f"""
-                                <tr>
-                                    <td>{html_module.escape(str(deduction['description']))}</td>
-                                    <td>{html_module.escape(str(deduction['type']))}</td>
-                                    <td>-${deduction['current']:,.2f}</td>
-                                    <td>-${deduction['ytd']:,.2f}</td>
-                                </tr>"""
-        
-        # Complete HTML template with all security features
-        return f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <style>
-        @page {{
-            size: 8.5in 11in;
-            margin: 0.3in;
-        }}
-        
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: 'Arial', sans-serif;
-            font-size: 10px;
-            line-height: 1.3;
-            margin: 0;
-            padding: 0;
-            color: #111827;
-            -webkit-print-color-adjust: exact !important;
-            print-color-adjust: exact !important;
-        }}
-        
-        .snappt-verification {{
-            position: absolute;
-            top: 5px;
-            right: 5px;
-            font-size: 6px;
-            color: #666;
-            opacity: 0.8;
-        }}
-        
-        .document-integrity {{
-            position: absolute;
-            bottom: 5px;
-            left: 5px;
-            font-size: 6px;
-            color: #666;
-            opacity: 0.8;
-        }}
-        
-        .security-thread {{
-            position: absolute;
-            left: 0;
-            top: 0;
-            bottom: 0;
-            width: 2px;
-            background: repeating-linear-gradient(
-                to bottom,
-                {theme['primary']} 0px,
-                {theme['primary']} 3px,
-                {theme['secondary']} 3px,
-                {theme['secondary']} 6px
-            );
-            opacity: 0.3;
-        }}
-        
-        .anti-copy-pattern {{
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            bottom: 0;
-            background-image: 
-                radial-gradient(circle at 25% 25%, rgba(20, 115, 255, 0.02) 0%, transparent 50%),
-                radial-gradient(circle at 75% 75%, rgba(190, 1, 255, 0.02) 0%, transparent 50%);
-            pointer-events: none;
-            z-index: -1;
-        }}
-        
-        .microtext-security {{
-            font-size: 4px;
-            line-height: 4px;
-            color: #999;
-            letter-spacing: 0.2px;
-            opacity: 0.6;
-        }}
-        
-        .container {{
-            width: 7.5in;
-            margin: 0 auto;
-            position: relative;
-            background: white;
-        }}
-        
-        .header {{
-            background: linear-gradient(135deg, {theme['gradient_start']} 0%, {theme['gradient_end']} 100%);
-            color: white;
-            padding: 16px 20px;
-            border-radius: 12px;
-            margin-bottom: 12px;
-            position: relative;
-            overflow: hidden;
-        }}
-        
-        .header::before {{
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            bottom: 0;
-            background: repeating-linear-gradient(
-                45deg,
-                transparent,
-                transparent 10px,
-                rgba(255, 255, 255, 0.05) 10px,
-                rgba(255, 255, 255, 0.05) 20px
-            );
-            pointer-events: none;
-        }}
-        
-        .header-content {{
-            display: table;
-            width: 100%;
-            position: relative;
-            z-index: 2;
-        }}
-        
-        .header-left {{
-            display: table-cell;
-            vertical-align: middle;
-            width: 50%;
-        }}
-        
-        .header-center {{
-            display: table-cell;
-            vertical-align: middle;
-            width: 30%;
-            text-align: center;
-        }}
-        
-        .header-right {{
-            display: table-cell;
-            vertical-align: middle;
-            width: 20%;
-            text-align: right;
-        }}
-        
-        .company-name {{
-            font-size: 18px;
-            font-weight: bold;
-            margin-bottom: 4px;
-            text-shadow: 0 1px 2px rgba(0, 0, 0, 0.2);
-        }}
-        
-        .company-address {{
-            font-size: 11px;
-            opacity: 0.95;
-        }}
-        
-        .earnings-statement {{
-            font-size: 14px;
-            font-weight: bold;
-            margin-bottom: 8px;
-        }}
-        
-        .period-info {{
-            font-size: 10px;
-            line-height: 1.4;
-        }}
-        
-        .qr-container {{
-            width: 80px;
-            height: 80px;
-            background: white;
-            border-radius: 8px;
-            padding: 4px;
-            box-shadow: 0 2px 8px rgba(0, 0, 0, 0.2);
-            position: relative;
-        }}
-        
-        .qr-container::before {{
-            content: '';
-            position: absolute;
-            top: -2px;
-            left: -2px;
-            right: -2px;
-            bottom: -2px;
-            background: linear-gradient(45deg, {theme['primary']}, {theme['secondary']});
-            border-radius: 10px;
-            z-index: -1;
-        }}
-        
-        .qr-code {{
-            width: 100%;
-            height: 100%;
-            border-radius: 4px;
-        }}
-        
-        .employee-bar {{
-            background: linear-gradient(135deg, #06b6d4 0%, #3b82f6 100%);
-            color: white;
-            padding: 12px 20px;
-            border-radius: 12px;
-            margin-bottom: 16px;
-            position: relative;
-            display: table;
-            width: calc(100% - 8px);
-            max-width: 7.3in;
-            margin-left: auto;
-            margin-right: auto;
-        }}
-        
-        .employee-name {{
-            display: table-cell;
-            vertical-align: middle;
-            font-size: 16px;
-            font-weight: bold;
-            text-shadow: 0 1px 2px rgba(0, 0, 0, 0.2);
-        }}
-        
-        .state-badge {{
-            display: table-cell;
-            vertical-align: middle;
-            text-align: right;
-            width: 60px;
-        }}
-        
-        .state-indicator {{
-            background: rgba(255, 255, 255, 0.25);
-            color: white;
-            padding: 6px 12px;
-            border-radius: 8px;
-            font-weight: bold;
-            font-size: 14px;
-            backdrop-filter: blur(10px);
-            border: 1px solid rgba(255, 255, 255, 0.3);
-        }}
-        
-        .main-content {{
-            display: table;
-            width: 100%;
-            margin-bottom: 16px;
-        }}
-        
-        .left-column {{
-            display: table-cell;
-            width: 60%;
-            vertical-align: top;
-            padding-right: 12px;
-        }}
-        
-        .right-column {{
-            display: table-cell;
-            width: 40%;
-            vertical-align: top;
-            padding-left: 12px;
-        }}
-        
-        .card {{
-            background: #ffffff;
-            border: 2px solid #e5e7eb;
-            border-radius: 12px;
-            margin-bottom: 16px;
-            overflow: hidden;
-            position: relative;
-        }}
-        
-        .card::before {{
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            height: 2px;
-            background: linear-gradient(90deg, {theme['primary']} 0%, {theme['secondary']} 100%);
-        }}
-        
-        .card-header {{
-            background: #f8fafc;
-            padding: 12px 16px;
-            border-bottom: 1px solid #e5e7eb;
-            display: flex;
-            align-items: center;
-            gap: 8px;
-        }}
-        
-        .card-icon {{
-            width: 20px;
-            height: 20px;
-            border-radius: 50%;
-            background: linear-gradient(135deg, {theme['primary']} 0%, {theme['secondary']} 100%);
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            color: white;
-            font-weight: bold;
-            font-size: 12px;
-        }}
-        
-        .card-title {{
-            font-weight: bold;
-            font-size: 12px;
-            color: #374151;
-        }}
-        
-        .table {{
-            width: 100%;
-            border-collapse: collapse;
-        }}
-        
-        .table th {{
-            background: #f1f5f9;
-            padding: 8px 12px;
-            text-align: left;
-            font-weight: 600;
-            font-size: 9px;
-            color: #475569;
-            border-bottom: 2px solid #e2e8f0;
-            text-transform: uppercase;
-            letter-spacing: 0.5px;
-        }}
-        
-        .table td {{
-            padding: 8px 12px;
-            border-bottom: 1px solid #f1f5f9;
-            font-size: 10px;
-            color: #374151;
-        }}
-        
-        .table tr:hover {{
-            background: #f8fafc;
-        }}
-        
-        .total-row {{
-            background: linear-gradient(135deg, {theme['gradient_start']} 0%, {theme['gradient_end']} 100%) !important;
-            color: white !important;
-            font-weight: bold !important;
-        }}
-        
-        .total-row td {{
-            border-bottom: none !important;
-            padding: 10px 12px !important;
-            text-shadow: 0 1px 2px rgba(0, 0, 0, 0.2);
-        }}
-        
-        .perforation {{
-            margin: 20px 0;
-            text-align: center;
-            position: relative;
-        }}
-        
-        .perforation::before {{
-            content: '';
-            position: absolute;
-            top: 50%;
-            left: 0;
-            right: 0;
-            height: 1px;
-            background: repeating-linear-gradient(
-                to right,
-                #d1d5db 0px,
-                #d1d5db 8px,
-                transparent 8px,
-                transparent 16px
-            );
-        }}
-        
-        .perforation-text {{
-            background: white;
-            padding: 0 16px;
-            color: #9ca3af;
-            font-size: 8px;
-            font-weight: 500;
-            letter-spacing: 2px;
-            text-transform: uppercase;
-        }}
-        
-        .stub-section {{
-            background: #ffffff;
-            border: 2px solid #e5e7eb;
-            border-radius: 16px;
-            overflow: hidden;
-            position: relative;
-            margin-top: 20px;
-        }}
-        
-        .security-band {{
-            background: repeating-linear-gradient(
-                45deg,
-                {theme['primary']} 0px,
-                {theme['primary']} 2px,
-                {theme['secondary']} 2px,
-                {theme['secondary']} 4px,
-                {theme['primary']} 4px,
-                {theme['primary']} 6px,
-                transparent 6px,
-                transparent 8px
-            );
-            padding: 4px 8px;
-            text-align: center;
-            position: relative;
-            overflow: hidden;
-        }}
-        
-        .security-band-top {{
-            border-radius: 14px 14px 0 0;
-            margin: 4px 4px 0 4px;
-        }}
-        
-        .security-band-bottom {{
-            border-radius: 0 0 14px 14px;
-            margin: 0 4px 4px 4px;
-        }}
-        
-        .security-text {{
-            color: white;
-            font-size: 6px;
-            font-weight: bold;
-            text-shadow: 0 1px 2px rgba(0, 0, 0, 0.5);
-            letter-spacing: 1px;
-            position: relative;
-            z-index: 2;
-        }}
-        
-        .stub-body {{
-            padding: 16px 20px;
-            background: white;
-            border-radius: 0 0 14px 14px;
-            margin: 0 4px 4px 4px;
-            position: relative;
-        }}
-        
-        .stub-header {{
-            display: table;
-            width: 100%;
-            margin-bottom: 16px;
-            font-size: 8px;
-            color: #374151;
-        }}
-        
-        .stub-header-left {{
-            display: table-cell;
-            width: 50%;
-            vertical-align: middle;
-            padding-right: 20px;
-        }}
-        
-        .stub-header-right {{
-            display: table-cell;
-            width: 50%;
-            vertical-align: middle;
-            text-align: right;
-            padding-right: 30px;
-        }}
-        
-        .check-info {{
-            margin-bottom: 20px;
-        }}
-        
-        .pay-to-order {{
-            font-size: 10px;
-            color: #6b7280;
-            margin-bottom: 4px;
-        }}
-        
-        .payee-name {{
-            font-size: 16px;
-            font-weight: bold;
-            color: #111827;
-            margin-bottom: 12px;
-        }}
-        
-        .amount-words {{
-            font-size: 11px;
-            color: #374151;
-            margin-bottom: 16px;
-            font-style: italic;
-        }}
-        
-        .amount-display {{
-            position: absolute;
-            top: 80px;
-            right: 20px;
-            text-align: right;
-        }}
-        
-        .amount-value {{
-            font-size: 24px;
-            font-weight: bold;
-            color: {theme['primary']};
-            text-shadow: 0 1px 2px rgba(0, 0, 0, 0.1);
-        }}
-        
-        .signature-section {{
-            display: table;
-            width: 100%;
-            margin-top: 20px;
-        }}
-        
-        .signature-left {{
-            display: table-cell;
-            width: 50%;
-            vertical-align: bottom;
-            padding-right: 20px;
-        }}
-        
-        .signature-right {{
-            display: table-cell;
-            width: 50%;
-            vertical-align: bottom;
-            padding-left: 20px;
-        }}
-        
-        .signature-line {{
-            border-bottom: 1px solid #d1d5db;
-            height: 40px;
-            margin-bottom: 8px;
-            position: relative;
-            background: linear-gradient(135deg, rgba(20, 115, 255, 0.03) 0%, rgba(190, 1, 255, 0.03) 100%);
-            border-radius: 12px;
-            padding: 8px 12px;
-        }}
-        
-        .signature-line::before {{
-            content: '';
-            position: absolute;
-            bottom: 8px;
-            left: 12px;
-            right: 12px;
-            height: 1px;
-            background: linear-gradient(90deg, {theme['primary']} 0%, {theme['secondary']} 100%);
-            opacity: 0.3;
-        }}
-        
-        .signature-label {{
-            font-size: 8px;
-            color: #6b7280;
-            text-align: center;
-            margin-top: 4px;
-        }}
-        
-        .hologram-seal {{
-            position: absolute;
-            bottom: 60px;
-            right: 20px;
-            width: 60px;
-            height: 60px;
-            border-radius: 50%;
-            background: radial-gradient(circle at 30% 30%, 
-                rgba(255, 255, 255, 0.8) 0%,
-                {theme['primary']}4D 25%,
-                {theme['secondary']}4D 50%,
-                {theme['primary']}80 75%,
-                {theme['secondary']}B3 100%
-            );
-            border: 2px solid {theme['primary']}66;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            font-size: 8px;
-            font-weight: bold;
-            color: {theme['primary']};
-            text-align: center;
-            line-height: 1.2;
-            box-shadow: 0 0 20px {theme['primary']}4D;
-        }}
-        
-        .security-watermark {{
-            position: absolute;
-            bottom: 20px;
-            left: 20px;
-            right: 100px;
-            font-size: 6px;
-            color: #9ca3af;
-            opacity: 0.7;
-            text-align: center;
-            background: linear-gradient(90deg, transparent 0%, rgba(20, 115, 255, 0.05) 50%, transparent 100%);
-            padding: 4px 8px;
-            border-radius: 8px 8px 0 0;
-        }}
-        
-        .disclaimer {{
-            background: linear-gradient(135deg, #fef3c7 0%, #fde68a 100%);
-            border: 1px solid #f59e0b;
-            border-radius: 12px;
-            padding: 8px 12px;
-            margin: 16px 4px 4px 4px;
-            text-align: center;
-            font-size: 7px;
-            color: #92400e;
-            font-weight: 500;
-            position: relative;
-        }}
-        
-        .void-pattern {{
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            bottom: 0;
-            background-image: 
-                repeating-linear-gradient(45deg, transparent, transparent 35px, rgba(220, 38, 38, 0.03) 35px, rgba(220, 38, 38, 0.03) 70px),
-                repeating-linear-gradient(-45deg, transparent, transparent 35px, rgba(220, 38, 38, 0.03) 35px, rgba(220, 38, 38, 0.03) 70px);
-            pointer-events: none;
-            z-index: 1;
-        }}
-        
-        .secure-document-text {{
-            position: absolute;
-            bottom: 100px;
-            right: 30px;
-            transform: rotate(-15deg);
-            font-size: 8px;
-            font-weight: bold;
-            color: {theme['primary']}66;
-            letter-spacing: 1px;
-            z-index: 3;
-        }}
-        
-        @media print {{
-            body {{
-                -webkit-print-color-adjust: exact !important;
-                print-color-adjust: exact !important;
-            }}
-        }}
-    </style>
-</head>
-<body>
-    <div class="snappt-verification">
-        SNAPPT VERIFIED - DOC: {doc_serial} - HASH: {document_hash}
-    </div>
-    
-    <div class="document-integrity">
-        SAURELLIUS SECURE - VER: {verification_id[:8]} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-    </div>
-    
-    <div class="security-thread"></div>
-    <div class="anti-copy-pattern"></div>
-    
-    <div class="container">
-        <div class="header">
-            <div class="header-content">
-                <div class="header-left">
-                    <div class="company-name">{html_module.escape(str(paystub_data['company']['name']))}</div>
-                    <div class="company-address">{html_module.escape(str(paystub_data['company']['address']))}</div>
-                </div>
-                <div class="header-center">
-                    <div class="earnings-statement">Earnings Statement</div>
-                    <div class="period-info">
-                        Period Start: {html_module.escape(str(paystub_data['pay_info']['period_start']))}<br>
-                        Period Ending: {html_module.escape(str(paystub_data['pay_info']['period_end']))}<br>
-                        Pay Date: {html_module.escape(str(paystub_data['pay_info']['pay_date']))}
-                    </div>
-                </div>
-                <div class="header-right">
-                    <div class="qr-container">
-                        <img src="data:image/png;base64,{qr_base64}" alt="Verification QR" class="qr-code">
-                    </div>
-                </div>
-            </div>
-        </div>
-        
-        <div class="employee-bar">
-            <div class="employee-name">{html_module.escape(str(paystub_data['employee']['name']))}</div>
-            <div class="state-badge">
-                <div class="state-indicator">{html_module.escape(str(paystub_data['employee']['state']))}</div>
-            </div>
-        </div>
-        
-        <div class="main-content">
-            <div class="left-column">
-                <div class="card">
-                    <div class="card-header">
-                        <div class="card-icon">$</div>
-                        <div class="card-title">Earnings</div>
-                    </div>
-                    <table class="table">
-                        <thead>
-                            <tr>
-                                <th>EARNINGS</th>
-                                <th>RATE</th>
-                                <th>HOURS</th>
-                                <th>THIS PERIOD</th>
-                                <th>YEAR TO DATE</th>
-                            </tr>
-                        </thead>
-                        <tbody>
-                            {earnings_html}
-                            <tr class="total-row">
-                                <td colspan="3"><strong>Gross Pay</strong></td>
-                                <td><strong>${paystub_data['totals']['gross_pay']:,.2f}</strong></td>
-                                <td><strong>${paystub_data['totals']['gross_pay_ytd']:,.2f}</strong></td>
-                            </tr>
-                        </tbody>
-                    </table>
-                </div>
-                
-                <div class="card">
-                    <div class="card-header">
-                        <div class="card-icon">-</div>
-                        <div class="card-title">Deductions</div>
-                    </div>
-                    <table class="table">
-                        <thead>
-                            <tr>
-                                <th>DESCRIPTION</th>
-                                <th>TYPE</th>
-                                <th>THIS PERIOD</th>
-                                <th>YEAR TO DATE</th>
-                            </tr>
-                        </thead>
-                        <tbody>
-                            {deductions_html}
-                            <tr class="total-row">
-                                <td colspan="2"><strong>Net Pay</strong></td>
-                                <td><strong>${paystub_data['totals']['net_pay']:,.2f}</strong></td>
-                                <td><strong>${paystub_data['totals']['net_pay_ytd']:,.2f}</strong></td>
-                            </tr>
-                        </tbody>
-                    </table>
-                </div>
-            </div>
-            
-            <div class="right-column">
-                <div class="card">
-                    <div class="card-header">
-                        <div class="card-icon">+</div>
-                        <div class="card-title">Other Benefits & Information</div>
-                    </div>
-                    <div style="padding: 16px;">
-                        <div style="margin-bottom: 12px;">
-                            <strong>401(k)</strong>
-                        </div>
-                        <div style="margin-bottom: 12px;">
-                            Health Insurance
-                        </div>
-                        <div style="margin-bottom: 12px;">
-                            Dental Insurance
-                        </div>
-                    </div>
-                </div>
-                
-                <div class="card">
-                    <div class="card-header">
-                        <div class="card-icon">i</div>
-                        <div class="card-title">Important Notes</div>
-                    </div>
-                    <div style="padding: 16px;">
-                        <div style="margin-bottom: 8px; font-size: 9px;">
-                            Performance bonus included
-                        </div>
-                        <div style="font-size: 9px;">
-                            401(k) contribution increased
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-        
-        <div class="perforation">
-            <div class="perforation-text microtext-security">
-                TEAR ALONG PERFORATION - SECURE DOCUMENT - AUTHORIZED PERSONNEL ONLY
-            </div>
-        </div>
-        
-        <div class="stub-section">
-            <div class="security-band security-band-top">
-                <div class="security-text microtext-security">
-                    SECURE DOCUMENT - DO NOT DUPLICATE - VALID ONLY FOR PAYEE - AUTHORIZED PERSONNEL ONLY
-                </div>
-            </div>
-            
-            <div class="stub-body">
-                <div class="void-pattern"></div>
-                
-                <div class="stub-header">
-                    <div class="stub-header-left">
-                        <strong>Payroll check number: {html_module.escape(str(paystub_data['check_info']['number']))}</strong>
-                    </div>
-                    <div class="stub-header-right">
-                        <strong>Pay date: {html_module.escape(str(paystub_data['pay_info']['pay_date']))} - SSN: {html_module.escape(str(paystub_data['employee']['ssn_masked']))}</strong>
-                    </div>
-                </div>
-                
-                <div class="check-info">
-                    <div class="pay-to-order">Pay to the order of</div>
-                    <div class="payee-name">{html_module.escape(str(paystub_data['employee']['name']))}</div>
-                    <div class="amount-words">{html_module.escape(str(paystub_data['totals']['amount_words']))}</div>
-                </div>
-                
-                <div class="amount-display">
-                    <div class="amount-value">${paystub_data['totals']['net_pay']:,.2f}</div>
-                </div>
-                
-                <div class="signature-section">
-                    <div class="signature-left">
-                        <div class="signature-line"></div>
-                        <div class="signature-label">Authorized Signature</div>
-                        <div style="margin-top: 8px; font-size: 7px; color: #6b7280;">
-                            Valid after 90 days
-                        </div>
-                    </div>
-                    <div class="signature-right">
-                        <div class="signature-line"></div>
-                        <div class="signature-label">Manager/Supervisor Signature</div>
-                    </div>
-                </div>
-                
-                <div class="hologram-seal">
-                    AUTHENTIC
-                </div>
-                
-                <div class="secure-document-text">
-                    SECUREPAYROLLDOCUMENT
-                </div>
-                
-                <div class="security-watermark">
-                    THE ORIGINAL DOCUMENT HAS WATERMARKS - HOLD AT AN ANGLE TO VIEW - SAURELLIUS SECURE
-                </div>
-            </div>
-            
-            <div class="security-band security-band-bottom">
-                <div class="security-text microtext-security">
-                    AUTHORIZED PAYROLL INSTRUMENT - NON-NEGOTIABLE - VOID IF ALTERED - SAURELLIUS CONFIDENTIAL
-                </div>
-            </div>
-            
-            <div class="disclaimer">
-                <strong>THIS IS NOT A CHECK - NON-NEGOTIABLE - VOID AFTER 180 DAYS</strong>
-            </div>
-        </div>
-    </div>
-</body>
-</html>"""
+        """Generate secure HTML paystub with all security features (qr_markup is the seal's inline SVG)"""
+        return paystub_templates.render(paystub_data, theme_name, COLOR_THEMES[theme_name], qr_markup,
+                                        verification_id, document_hash)
     
     def generate_paystub_pdf(self, paystub_data: Dict, output_path: str, 
-                            theme: str = "diego_original") -> Dict:
-        """Generate Snappt-compliant paystub PDF with all security features"""
+                            theme: str = "diego_original", backend: Optional[str] = None,
+                            seal: Optional[VerificationSeal] = None) -> Dict:
+        """
+        Generate Snappt-compliant paystub PDF with all security features.
+        Pass a seal from create_verification_seal to reuse one verification id
+        and QR code across several renders of the same document.
+        """
+        
+        backend = (backend or self.default_backend).lower()
+        if backend not in PDF_BACKENDS:
+            return {
+                'success': False,
+                'error': f"Invalid PDF backend '{backend}'. Available: {', '.join(PDF_BACKENDS)}"
+            }
         
-        if not HAS_PLAYWRIGHT:
+        if not self.backend_available(backend):
             return {
                 'success': False,
-                'error': 'Playwright not available. Install with: pip install playwright && playwright install chromium'
+                'error': ('Playwright not available. Install with: pip install playwright && playwright install chromium'
+                          if backend == 'chromium' else
+                          'ReportLab not available. Install with: pip install reportlab')
             }
         
         if theme not in COLOR_THEMES:
@@ -1313,39 +570,19 @@ class PaystubGenerator:
                 'error': f"Invalid theme '{theme}'. Available: {', '.join(COLOR_THEMES.keys())}"
             }
         
-        logger.info(f"Generating paystub with theme: {COLOR_THEMES[theme]['name']}")
-        
-        # Generate verification credentials
-        verification_id = self.anti_tamper.generate_verification_id()
-        document_hash = self.anti_tamper.generate_document_fingerprint(paystub_data)[:12].upper()
+        logger.info(f"Generating paystub with theme: {COLOR_THEMES[theme]['name']} ({backend})")
         
-        # Generate QR code
-        qr_base64 = self.generate_verification_qr(paystub_data, verification_id)
-        
-        # Generate HTML
-        html_content = self.generate_html(paystub_data, theme, qr_base64, 
-                                         verification_id, document_hash)
-        
-        # Generate PDF with Playwright
         try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(
-                    headless=True,
-                    args=['--disable-web-security', '--no-sandbox']
-                )
-                
-                page = browser.new_page()
-                page.set_content(html_content, wait_until='networkidle')
-                
-                page.pdf(
-                    path=output_path,
-                    format='Letter',
-                    print_background=True,
-                    prefer_css_page_size=True,
-                    margin={'top': '0.3in', 'right': '0.3in', 'bottom': '0.3in', 'left': '0.3in'}
+            seal = seal or self.create_verification_seal(paystub_data)
+            verification_id, document_hash = seal.verification_id, seal.document_hash
+            
+            if backend == 'native':
+                native_renderer.render(
+                    paystub_data, output_path, theme, COLOR_THEMES[theme],
+                    verification_id, document_hash, seal.qr_matrix
                 )
-                
-                browser.close()
+            else:
+                self._render_chromium(paystub_data, output_path, theme, seal)
             
             file_size = os.path.getsize(output_path)
             
@@ -1366,9 +603,11 @@ class PaystubGenerator:
                 'verification_id': verification_id,
                 'document_hash': document_hash,
                 'tamper_seal': tamper_seal,
+                'verification_token': seal.token,
                 'theme': COLOR_THEMES[theme]['name'],
                 'theme_key': theme,
                 'file_size': file_size,
+                'backend': backend,
                 'generator': f'Saurellius v{self.version}',
                 'snappt_compliant': True,
                 'generated_at': datetime.now().isoformat()
@@ -1378,15 +617,44 @@ class PaystubGenerator:
             logger.error(f"Paystub generation failed: {str(e)}")
             return {'success': False, 'error': str(e)}
     
-    def generate_all_themes(self, paystub_data: Dict, output_dir: str) -> List[Dict]:
-        """Generate paystubs in all 25 color themes"""
+    def _render_chromium(self, paystub_data: Dict, output_path: str, theme: str, seal: VerificationSeal):
+        """Print the HTML template to PDF with headless Chromium"""
+        html_content = self.generate_html(paystub_data, theme, seal.svg,
+                                         seal.verification_id, seal.document_hash)
+        
+        with sync_playwright() as p:
+            browser = p.chromium.launch(
+                headless=True,
+                args=['--disable-web-security', '--no-sandbox']
+            )
+            
+            page = browser.new_page()
+            page.set_content(html_content, wait_until='networkidle')
+            
+            page.pdf(
+                path=output_path,
+                format='Letter',
+                print_background=True,
+                prefer_css_page_size=True,
+                margin={'top': '0.3in', 'right': '0.3in', 'bottom': '0.3in', 'left': '0.3in'}
+            )
+            
+            browser.close()
+    
+    def generate_all_themes(self, paystub_data: Dict, output_dir: str,
+                            backend: Optional[str] = None) -> List[Dict]:
+        """
+        Generate paystubs in all 25 color themes with one PDF backend for the whole batch.
+        The themes are variants of one document, so they share a verification seal.
+        """
         
         os.makedirs(output_dir, exist_ok=True)
         results = []
+        seal = self.create_verification_seal(paystub_data)
         
         for theme_key in COLOR_THEMES.keys():
             output_path = os.path.join(output_dir, f"paystub_{theme_key}.pdf")
-            result = self.generate_paystub_pdf(paystub_data, output_path, theme_key)
+            result = self.generate_paystub_pdf(paystub_data, output_path, theme_key, backend, seal)
             results.append(result)
         
         successful = sum(1 for r in results if r['success'])
@@ -0,0 +1,553 @@
+"""
+NATIVE PAYSTUB PDF RENDERER
+Draws the paystub layout straight to PDF with ReportLab - no browser process per stub
+Mirrors the Chromium template: themed header, earnings/deductions tables, QR seal, watermark and microtext
+"""
+
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+try:
+    from reportlab.lib.colors import Color, HexColor, white
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    from reportlab.pdfgen import canvas as pdf_canvas
+    from reportlab import rl_config
+    # Binary (zlib-only) streams: ASCII85 inflates every page by a quarter and is slow in pure Python
+    rl_config.useA85 = 0
+    HAS_REPORTLAB = True
+except ImportError:
+    HAS_REPORTLAB = False
+    logger.warning("Native paystub PDF rendering unavailable. Install with: pip install reportlab")
+
+
+# CSS pixels (96 dpi) to PDF points, so sizes read like the HTML template's
+PX = 0.75
+
+PAGE_MARGIN = 0.3 * 72
+CONTENT_WIDTH = 7.5 * 72
+
+# Base-14 fonts: Helvetica is metric-compatible with the template's Arial and needs no embedding
+FONT = 'Helvetica'
+FONT_BOLD = 'Helvetica-Bold'
+FONT_ITALIC = 'Helvetica-Oblique'
+
+GRAY_900 = '#111827'
+GRAY_700 = '#374151'
+GRAY_600 = '#475569'
+GRAY_500 = '#6b7280'
+GRAY_400 = '#9ca3af'
+GRAY_300 = '#d1d5db'
+BORDER = '#e5e7eb'
+HEADER_BG = '#f8fafc'
+TH_BG = '#f1f5f9'
+TH_RULE = '#e2e8f0'
+
+
+def _color(hex_value: str, alpha: float = 1.0) -> 'Color':
+    c = HexColor(hex_value)
+    return Color(c.red, c.green, c.blue, alpha)
+
+
+def _over_white(color: 'Color') -> 'Color':
+    """Opaque equivalent of a translucent color on the white page (PDF shadings ignore alpha)."""
+    a = color.alpha
+    return Color(1 - a + a * color.red, 1 - a + a * color.green, 1 - a + a * color.blue)
+
+
+class ThemePalette:
+    """ReportLab colors for one theme, built once and reused for every stub"""
+
+    __slots__ = ('primary', 'secondary', 'gradient', 'primary_40', 'primary_30',
+                 'secondary_30', 'seal_fill', 'employee_gradient')
+
+    def __init__(self, theme: Dict[str, str]):
+        self.primary = _color(theme['primary'])
+        self.secondary = _color(theme['secondary'])
+        self.gradient = (_color(theme['gradient_start']), _color(theme['gradient_end']))
+        self.primary_40 = _color(theme['primary'], 0.4)
+        self.primary_30 = _color(theme['primary'], 0.3)
+        self.secondary_30 = _color(theme['secondary'], 0.3)
+        self.seal_fill = tuple(_over_white(stop) for stop in (
+            Color(1, 1, 1, 0.8), _color(theme['primary'], 0.3), _color(theme['secondary'], 0.3),
+            _color(theme['primary'], 0.5), _color(theme['secondary'], 0.7),
+        ))
+        self.employee_gradient = (_color('#06b6d4'), _color('#3b82f6'))
+
+
+class _Page:
+    """Canvas wrapper that takes CSS-style top-left coordinates"""
+
+    def __init__(self, c, height: float):
+        self.c = c
+        self.height = height
+
+    def y(self, top: float) -> float:
+        return self.height - top
+
+    def rounded_path(self, x: float, top: float, w: float, h: float, r: float):
+        path = self.c.beginPath()
+        path.roundRect(x, self.y(top + h), w, h, r)
+        return path
+
+    def fill_rounded(self, x, top, w, h, r, fill, stroke=None, line_width=1.0):
+        c = self.c
+        c.setFillColor(fill)
+        if stroke is not None:
+            c.setStrokeColor(stroke)
+            c.setLineWidth(line_width)
+        c.roundRect(x, self.y(top + h), w, h, r, stroke=1 if stroke is not None else 0, fill=1)
+
+    def gradient_rounded(self, x, top, w, h, r, stops, diagonal=True):
+        """CSS linear-gradient(135deg | 90deg, ...) clipped to a rounded box."""
+        c = self.c
+        stops = [_over_white(stop) for stop in stops]
+        c.saveState()
+        c.clipPath(self.rounded_path(x, top, w, h, r), stroke=0, fill=0)
+        if diagonal:
+            c.linearGradient(x, self.y(top), x + w, self.y(top + h), stops, extend=True)
+        else:
+            c.linearGradient(x, self.y(top), x + w, self.y(top), stops, extend=True)
+        c.restoreState()
+
+    def stripes(self, x, top, w, h, colors_, period: float, band: float, r: float = 0):
+        """
+        45-degree repeating stripes clipped to a box; colors_ cycle, one per band.
+        Each color is a single path, and fully transparent bands are skipped.
+        """
+        c = self.c
+        c.saveState()
+        c.clipPath(self.rounded_path(x, top, w, h, r), stroke=0, fill=0)
+        c.setLineWidth(band)
+        bottom = self.y(top + h)
+        step = period / len(colors_)
+        paths = [c.beginPath() if color.alpha > 0 else None for color in colors_]
+        i = 0
+        offset = -h
+        while offset < w + h:
+            path = paths[i % len(colors_)]
+            if path is not None:
+                path.moveTo(x + offset, bottom)
+                path.lineTo(x + offset + h, bottom + h)
+            offset += step
+            i += 1
+        for color, path in zip(colors_, paths):
+            if path is not None:
+                c.setStrokeColor(color)
+                c.drawPath(path, stroke=1, fill=0)
+        c.restoreState()
+
+    def text(self, x, top, s, font, size, color, align='left', char_space=0.0):
+        c = self.c
+        c.setFillColor(color)
+        baseline = self.y(top + size * 0.85)
+        if align == 'left' and not char_space:
+            c.setFont(font, size)
+            c.drawString(x, baseline, s)
+            return
+        width = stringWidth(s, font, size) + char_space * max(len(s) - 1, 0)
+        if align == 'center':
+            x -= width / 2
+        elif align == 'right':
+            x -= width
+        t = c.beginText(x, baseline)
+        t.setFont(font, size)
+        t.setCharSpace(char_space)
+        t.textOut(s)
+        t.setCharSpace(0)  # Tc outlives the text object
+        c.drawText(t)
+
+
+def _fit(s: str, font: str, size: float, width: float) -> str:
+    """Trim text with an ellipsis so a table cell never overflows."""
+    if stringWidth(s, font, size) <= width:
+        return s
+    while s and stringWidth(s + '...', font, size) > width:
+        s = s[:-1]
+    return s + '...'
+
+
+def _money(value, sign: str = '') -> str:
+    return f"{sign}${float(value):,.2f}"
+
+
+class NativePaystubRenderer:
+    """
+    Renders paystubs to PDF in-process. Theme palettes are cached per theme,
+    the QR seal is drawn as vector modules from the code matrix, and only
+    the base-14 fonts are used, so nothing is loaded or embedded per stub.
+    """
+
+    def __init__(self):
+        self._palettes: Dict[str, ThemePalette] = {}
+        self._lock = threading.Lock()
+
+    def palette(self, theme_key: str, theme: Dict[str, str]) -> ThemePalette:
+        palette = self._palettes.get(theme_key)
+        if palette is None:
+            with self._lock:
+                palette = self._palettes.setdefault(theme_key, ThemePalette(theme))
+        return palette
+
+    def render(self, paystub_data: Dict, output_path: str, theme_key: str, theme: Dict[str, str],
+               verification_id: str, document_hash: str,
+               qr_matrix: Optional[Sequence[Sequence[bool]]] = None) -> str:
+        if not HAS_REPORTLAB:
+            raise RuntimeError('ReportLab not available. Install with: pip install reportlab')
+
+        palette = self.palette(theme_key, theme)
+        width, height = letter
+        c = pdf_canvas.Canvas(output_path, pagesize=letter, pageCompression=1)
+        c.setTitle(f"Earnings Statement - {paystub_data['employee']['name']}")
+        c.setAuthor(str(paystub_data['company']['name']))
+        c.setCreator('Saurellius Paystub Generator')
+
+        page = _Page(c, height)
+        now = datetime.now()
+        doc_serial = f"SAU{now.strftime('%Y%m%d')}{verification_id[:8]}"
+        stamps = (
+            f"SNAPPT VERIFIED - DOC: {doc_serial} - HASH: {document_hash}",
+            f"SAURELLIUS SECURE - VER: {verification_id[:8]} - {now.strftime('%Y-%m-%d %H:%M:%S')}",
+        )
+        self._page_chrome(page, palette, width, height, stamps)
+
+        x0 = (width - CONTENT_WIDTH) / 2
+        top = PAGE_MARGIN
+        top = self._header(page, palette, paystub_data, x0, top, qr_matrix)
+        top = self._employee_bar(page, palette, paystub_data, x0, top)
+        top = self._main_content(page, palette, paystub_data, x0, top)
+
+        stub_height = 262
+        if top + 38 + stub_height > height - PAGE_MARGIN:
+            c.showPage()
+            self._page_chrome(page, palette, width, height, stamps)
+            top = PAGE_MARGIN
+        top = self._perforation(page, x0, top)
+        self._stub(page, palette, paystub_data, x0, top, stub_height)
+
+        c.showPage()
+        c.save()
+        return output_path
+
+    # =========================================================================
+    # SECTIONS
+    # =========================================================================
+
+    def _page_chrome(self, page: _Page, palette: ThemePalette, width, height, stamps):
+        c = page.c
+        # Security thread down the left edge
+        c.setLineWidth(2 * PX)
+        for color, phase in ((palette.primary_30, 0), (palette.secondary_30, 3 * PX)):
+            c.setDash([3 * PX, 3 * PX], phase)
+            c.setStrokeColor(color)
+            c.line(PX, 0, PX, height)
+        c.setDash()
+        grey = _color('#666666', 0.8)
+        page.text(width - 4, 4, stamps[0], FONT, 6 * PX, grey, align='right')
+        page.text(4, height - 4 - 6 * PX, stamps[1], FONT, 6 * PX, grey)
+
+    def _header(self, page: _Page, palette: ThemePalette, data: Dict, x0, top, qr_matrix) -> float:
+        h = 84
+        page.gradient_rounded(x0, top, CONTENT_WIDTH, h, 12 * PX, palette.gradient)
+        page.stripes(x0, top, CONTENT_WIDTH, h, (Color(1, 1, 1, 0), Color(1, 1, 1, 0.05)),
+                     period=20 * PX * 1.414, band=10 * PX, r=12 * PX)
+
+        pad = 20 * PX
+        company = _fit(str(data['company']['name']), FONT_BOLD, 18 * PX, CONTENT_WIDTH * 0.5 - pad)
+        address = _fit(str(data['company']['address']), FONT, 11 * PX, CONTENT_WIDTH * 0.5 - pad)
+        page.text(x0 + pad, top + h / 2 - 16, company, FONT_BOLD, 18 * PX, white)
+        page.text(x0 + pad, top + h / 2 + 2, address, FONT, 11 * PX, _color('#ffffff', 0.95))
+
+        center = x0 + CONTENT_WIDTH * 0.65
+        pay_info = data['pay_info']
+        page.text(center, top + 14, 'Earnings Statement', FONT_BOLD, 14 * PX, white, align='center')
+        for i, line in enumerate((f"Period Start: {pay_info['period_start']}",
+                                  f"Period Ending: {pay_info['period_end']}",
+                                  f"Pay Date: {pay_info['pay_date']}")):
+            page.text(center, top + 34 + i * 10.5, line, FONT, 10 * PX, white, align='center')
+
+        qr_size = 80 * PX
+        qx = x0 + CONTENT_WIDTH - pad - qr_size
+        qtop = top + (h - qr_size) / 2
+        page.gradient_rounded(qx - 1.5, qtop - 1.5, qr_size + 3, qr_size + 3, 10 * PX,
+                              (palette.primary, palette.secondary))
+        page.fill_rounded(qx, qtop, qr_size, qr_size, 8 * PX, white)
+        if qr_matrix:
+            self._qr(page, qr_matrix, qx + 4 * PX, qtop + 4 * PX, qr_size - 8 * PX)
+        return top + h + 12 * PX
+
+    def _qr(self, page: _Page, matrix: Sequence[Sequence[bool]], x, top, size):
+        """Vector QR: one path with a rectangle per horizontal run of dark modules."""
+        c = page.c
+        module = size / len(matrix)
+        path = c.beginPath()
+        for row_index, row in enumerate(matrix):
+            y = page.y(top + (row_index + 1) * module)
+            run_start = None
+            for col, dark in enumerate(list(row) + [False]):
+                if dark and run_start is None:
+                    run_start = col
+                elif not dark and run_start is not None:
+                    path.rect(x + run_start * module, y, (col - run_start) * module, module)
+                    run_start = None
+        c.setFillColorRGB(0, 0, 0)
+        c.drawPath(path, stroke=0, fill=1)
+
+    def _employee_bar(self, page: _Page, palette: ThemePalette, data: Dict, x0, top) -> float:
+        h = 34
+        x = x0 + 4 * PX
+        w = CONTENT_WIDTH - 8 * PX
+        page.gradient_rounded(x, top, w, h, 12 * PX, palette.employee_gradient)
+        name = _fit(str(data['employee']['name']), FONT_BOLD, 16 * PX, w - 90)
+        page.text(x + 15, top + (h - 12) / 2, name, FONT_BOLD, 16 * PX, white)
+
+        state = str(data['employee']['state'])
+        badge_w = max(stringWidth(state, FONT_BOLD, 14 * PX) + 18, 36)
+        bx = x + w - 15 - badge_w
+        page.fill_rounded(bx, top + 6, badge_w, h - 12, 8 * PX, Color(1, 1, 1, 0.25),
+                          stroke=Color(1, 1, 1, 0.3), line_width=0.75)
+        page.text(bx + badge_w / 2, top + (h - 10.5) / 2, state, FONT_BOLD, 14 * PX, white, align='center')
+        return top + h + 16 * PX
+
+    def _card(self, page: _Page, palette: ThemePalette, x, top, w, h, icon: str, title: str) -> float:
+        """Card frame with its header; returns the top of the card body."""
+        radius = 12 * PX
+        page.fill_rounded(x, top, w, h, radius, white, stroke=_color(BORDER), line_width=2 * PX)
+        c = page.c
+        c.saveState()
+        c.clipPath(page.rounded_path(x, top, w, h, radius), stroke=0, fill=0)
+        c.setFillColor(_color(HEADER_BG))
+        c.rect(x, page.y(top + 33), w, 33, stroke=0, fill=1)
+        c.restoreState()
+        page.gradient_rounded(x + 1, top + 0.5, w - 2, 2 * PX, 0, (palette.primary, palette.secondary), diagonal=False)
+        c.setStrokeColor(_color(BORDER))
+        c.setLineWidth(0.75)
+        c.line(x + 1, page.y(top + 33), x + w - 1, page.y(top + 33))
+
+        icon_r = 7.5
+        cx, cy = x + 12 + icon_r, top + 16.5
+        c.saveState()
+        circle = c.beginPath()
+        circle.circle(cx, page.y(cy), icon_r)
+        c.clipPath(circle, stroke=0, fill=0)
+        c.linearGradient(cx - icon_r, page.y(cy - icon_r), cx + icon_r, page.y(cy + icon_r),
+                         (palette.primary, palette.secondary), extend=True)
+        c.restoreState()
+        page.text(cx, cy - 4.5, icon, FONT_BOLD, 12 * PX, white, align='center')
+        page.text(cx + icon_r + 6, cy - 4.5, title, FONT_BOLD, 12 * PX, _color(GRAY_700))
+        return top + 33
+
+    def _table(self, page: _Page, palette: ThemePalette, x, top, w, headers: List[str],
+               widths: List[float], rows: List[List[str]], total: List[str]) -> float:
+        """Header row, body rows and the gradient total row; returns the bottom edge."""
+        c = page.c
+        pad = 12 * PX
+        th_h, td_h, total_h = 21, 22, 24
+        c.setFillColor(_color(TH_BG))
+        c.rect(x, page.y(top + th_h), w, th_h, stroke=0, fill=1)
+        c.setStrokeColor(_color(TH_RULE))
+        c.setLineWidth(2 * PX)
+        c.line(x, page.y(top + th_h), x + w, page.y(top + th_h))
+
+        col_x = [x]
+        for frac in widths[:-1]:
+            col_x.append(col_x[-1] + w * frac)
+        for cx, label in zip(col_x, headers):
+            page.text(cx + pad, top + (th_h - 6.75) / 2, label, FONT_BOLD, 9 * PX, _color(GRAY_600), char_space=0.375)
+
+        row_top = top + th_h
+        rule = _color(TH_BG)
+        for row in rows:
+            for i, (cx, cell) in enumerate(zip(col_x, row)):
+                cell_w = w * widths[i] - 2 * pad
+                page.text(cx + pad, row_top + (td_h - 7.5) / 2, _fit(cell, FONT, 10 * PX, cell_w),
+                          FONT, 10 * PX, _color(GRAY_700))
+            row_top += td_h
+            c.setStrokeColor(rule)
+            c.setLineWidth(PX)
+            c.line(x, page.y(row_top), x + w, page.y(row_top))
+
+        c.saveState()
+        box = c.beginPath()
+        box.rect(x, page.y(row_top + total_h), w, total_h)
+        c.clipPath(box, stroke=0, fill=0)
+        c.linearGradient(x, page.y(row_top), x + w, page.y(row_top + total_h), palette.gradient, extend=True)
+        c.restoreState()
+        label, *amounts = total
+        page.text(x + pad, row_top + (total_h - 7.5) / 2, label, FONT_BOLD, 10 * PX, white)
+        amount_x = col_x[len(col_x) - len(amounts):]
+        for cx, amount in zip(amount_x, amounts):
+            page.text(cx + pad, row_top + (total_h - 7.5) / 2, amount, FONT_BOLD, 10 * PX, white)
+        return row_top + total_h
+
+    def _main_content(self, page: _Page, palette: ThemePalette, data: Dict, x0, top) -> float:
+        gutter = 12 * PX
+        left_w = CONTENT_WIDTH * 0.6 - gutter
+        right_x = x0 + CONTENT_WIDTH * 0.6 + gutter
+        right_w = CONTENT_WIDTH * 0.4 - gutter
+        totals = data['totals']
+
+        earnings = [[str(e['description']), str(e['rate']), str(e['hours']),
+                     _money(e['current']), _money(e['ytd'])] for e in data['earnings']]
+        h = 33 + 21 + 22 * len(earnings) + 24 + 2
+        body = self._card(page, palette, x0, top, left_w, h, '$', 'Earnings')
+        self._table(page, palette, x0 + 1.5, body, left_w - 3,
+                    ['EARNINGS', 'RATE', 'HOURS', 'THIS PERIOD', 'YEAR TO DATE'],
+                    [0.26, 0.14, 0.14, 0.22, 0.24], earnings,
+                    ['Gross Pay', _money(totals['gross_pay']), _money(totals['gross_pay_ytd'])])
+        left_top = top + h + 16 * PX
+
+        deductions = [[str(d['description']), str(d['type']),
+                       _money(d['current'], '-'), _money(d['ytd'], '-')] for d in data['deductions']]
+        h = 33 + 21 + 22 * len(deductions) + 24 + 2
+        body = self._card(page, palette, x0, left_top, left_w, h, '-', 'Deductions')
+        self._table(page, palette, x0 + 1.5, body, left_w - 3,
+                    ['DESCRIPTION', 'TYPE', 'THIS PERIOD', 'YEAR TO DATE'],
+                    [0.32, 0.2, 0.23, 0.25], deductions,
+                    ['Net Pay', _money(totals['net_pay']), _money(totals['net_pay_ytd'])])
+        left_top += h + 16 * PX
+
+        h = 33 + 12 + 3 * 19 + 6
+        body = self._card(page, palette, right_x, top, right_w, h, '+', 'Other Benefits & Information')
+        for i, (label, font) in enumerate((('401(k)', FONT_BOLD), ('Health Insurance', FONT),
+                                           ('Dental Insurance', FONT))):
+            page.text(right_x + 12, body + 12 + i * 19, label, font, 10 * PX, _color(GRAY_900))
+        right_top = top + h + 16 * PX
+
+        h = 33 + 12 + 2 * 14 + 10
+        body = self._card(page, palette, right_x, right_top, right_w, h, 'i', 'Important Notes')
+        for i, note in enumerate(('Performance bonus included', '401(k) contribution increased')):
+            page.text(right_x + 12, body + 12 + i * 14, note, FONT, 9 * PX, _color(GRAY_900))
+        right_top += h + 16 * PX
+
+        return max(left_top, right_top)
+
+    def _perforation(self, page: _Page, x0, top) -> float:
+        c = page.c
+        mid = top + 15 + 4
+        c.setStrokeColor(_color(GRAY_300))
+        c.setLineWidth(PX)
+        c.setDash([8 * PX, 8 * PX], 0)
+        c.line(x0, page.y(mid), x0 + CONTENT_WIDTH, page.y(mid))
+        c.setDash()
+        text = 'TEAR ALONG PERFORATION - SECURE DOCUMENT - AUTHORIZED PERSONNEL ONLY'
+        size, spacing = 8 * PX, 2 * PX
+        text_w = stringWidth(text, FONT, size) + spacing * (len(text) - 1)
+        c.setFillColor(white)
+        c.rect(x0 + (CONTENT_WIDTH - text_w) / 2 - 12, page.y(mid + 4), text_w + 24, 8, stroke=0, fill=1)
+        page.text(x0 + CONTENT_WIDTH / 2, mid - size / 2, text, FONT, size, _over_white(_color(GRAY_400, 0.6)),
+                  align='center', char_space=spacing)
+        return mid + 4 + 15
+
+    def _security_band(self, page: _Page, palette: ThemePalette, x, top, w, text: str):
+        h = 9
+        clear = Color(1, 1, 1, 0)
+        page.stripes(x, top, w, h, (palette.primary, palette.secondary, palette.primary, clear),
+                     period=8 * PX * 1.414, band=2 * PX, r=3)
+        page.text(x + w / 2, top + (h - 4.5) / 2, text, FONT_BOLD, 6 * PX, white, align='center', char_space=PX)
+
+    def _stub(self, page: _Page, palette: ThemePalette, data: Dict, x0, top, h):
+        c = page.c
+        inset = 4 * PX
+        page.fill_rounded(x0, top, CONTENT_WIDTH, h, 16 * PX, white, stroke=_color(BORDER), line_width=2 * PX)
+        band_x, band_w = x0 + inset, CONTENT_WIDTH - 2 * inset
+        self._security_band(page, palette, band_x, top + inset, band_w,
+                            'SECURE DOCUMENT - DO NOT DUPLICATE - VALID ONLY FOR PAYEE - AUTHORIZED PERSONNEL ONLY')
+
+        body_top = top + inset + 9
+        body_h = 186
+        # VOID pantograph: faint red crosshatch behind the check body
+        void = _color('#dc2626', 0.03)
+        page.stripes(band_x, body_top, band_w, body_h, (Color(1, 1, 1, 0), void), period=70 * PX, band=35 * PX)
+        c.saveState()
+        c.translate(band_x + band_w, 0)
+        c.scale(-1, 1)
+        page.stripes(0, body_top, band_w, body_h, (Color(1, 1, 1, 0), void), period=70 * PX, band=35 * PX)
+        c.restoreState()
+
+        pad_x = band_x + 20 * PX
+        right = band_x + band_w - 20 * PX
+        text_top = body_top + 12
+        employee, totals = data['employee'], data['totals']
+        page.text(pad_x, text_top, f"Payroll check number: {data['check_info']['number']}",
+                  FONT_BOLD, 8 * PX, _color(GRAY_700))
+        page.text(right - 22, text_top,
+                  f"Pay date: {data['pay_info']['pay_date']} - SSN: {employee['ssn_masked']}",
+                  FONT_BOLD, 8 * PX, _color(GRAY_700), align='right')
+
+        page.text(pad_x, text_top + 18, 'Pay to the order of', FONT, 10 * PX, _color(GRAY_500))
+        page.text(pad_x, text_top + 29, _fit(str(employee['name']), FONT_BOLD, 16 * PX, band_w * 0.6),
+                  FONT_BOLD, 16 * PX, _color(GRAY_900))
+        page.text(pad_x, text_top + 50, _fit(str(totals['amount_words']), FONT_ITALIC, 11 * PX, band_w * 0.7),
+                  FONT_ITALIC, 11 * PX, _color(GRAY_700))
+        page.text(right, body_top + 80 * PX, _money(totals['net_pay']), FONT_BOLD, 24 * PX, palette.primary,
+                  align='right')
+
+        # Signature lines
+        sig_top = text_top + 84
+        sig_w = (band_w - 40 * PX) / 2 - 15
+        for i, label in enumerate(('Authorized Signature', 'Manager/Supervisor Signature')):
+            sx = pad_x + i * (sig_w + 30)
+            page.gradient_rounded(sx, sig_top, sig_w, 30, 12 * PX,
+                                  (_color('#1473FF', 0.03), _color('#BE01FF', 0.03)))
+            c.setStrokeColor(_color(GRAY_300))
+            c.setLineWidth(PX)
+            c.line(sx, page.y(sig_top + 30), sx + sig_w, page.y(sig_top + 30))
+            page.gradient_rounded(sx + 9, sig_top + 23, sig_w - 18, PX, 0,
+                                  (palette.primary_30, palette.secondary_30), diagonal=False)
+            page.text(sx + sig_w / 2, sig_top + 39, label, FONT, 8 * PX, _color(GRAY_500), align='center')
+        page.text(pad_x + sig_w / 2, sig_top + 51, 'Valid after 90 days', FONT, 7 * PX, _color(GRAY_500),
+                  align='center')
+
+        # Hologram seal
+        seal_r = 30 * PX
+        scx, scy = band_x + band_w - 20 * PX - seal_r, body_top + body_h - 60 * PX - seal_r
+        c.saveState()
+        disc = c.beginPath()
+        disc.circle(scx, page.y(scy), seal_r)
+        c.clipPath(disc, stroke=0, fill=0)
+        c.radialGradient(scx - seal_r * 0.4, page.y(scy - seal_r * 0.4), seal_r * 1.6,
+                         palette.seal_fill, positions=(0, 0.25, 0.5, 0.75, 1), extend=True)
+        c.restoreState()
+        c.setStrokeColor(palette.primary_40)
+        c.setLineWidth(2 * PX)
+        c.circle(scx, page.y(scy), seal_r, stroke=1, fill=0)
+        page.text(scx, scy - 3, 'AUTHENTIC', FONT_BOLD, 8 * PX, palette.primary, align='center')
+
+        # Rotated "secure document" watermark
+        c.saveState()
+        c.translate(band_x + band_w - 30 * PX, page.y(body_top + body_h - 100 * PX))
+        c.rotate(15)
+        c.setFillColor(palette.primary_40)
+        t = c.beginText(-stringWidth('SECUREPAYROLLDOCUMENT', FONT_BOLD, 8 * PX) - 20, 0)
+        t.setFont(FONT_BOLD, 8 * PX)
+        t.setCharSpace(PX)
+        t.textOut('SECUREPAYROLLDOCUMENT')
+        t.setCharSpace(0)
+        c.drawText(t)
+        c.restoreState()
+
+        page.text(band_x + (band_w - 80 * PX) / 2, body_top + body_h - 20 * PX - 6,
+                  'THE ORIGINAL DOCUMENT HAS WATERMARKS - HOLD AT AN ANGLE TO VIEW - SAURELLIUS SECURE',
+                  FONT, 6 * PX, _color(GRAY_400, 0.7), align='center')
+
+        self._security_band(page, palette, band_x, body_top + body_h, band_w,
+                            'AUTHORIZED PAYROLL INSTRUMENT - NON-NEGOTIABLE - VOID IF ALTERED - SAURELLIUS CONFIDENTIAL')
+
+        disc_top = body_top + body_h + 9 + 12
+        disc_h = h - (disc_top - top) - inset
+        page.gradient_rounded(band_x, disc_top, band_w, disc_h, 12 * PX, (_color('#fef3c7'), _color('#fde68a')))
+        c.setStrokeColor(_color('#f59e0b'))
+        c.setLineWidth(PX)
+        c.roundRect(band_x, page.y(disc_top + disc_h), band_w, disc_h, 12 * PX, stroke=1, fill=0)
+        page.text(band_x + band_w / 2, disc_top + (disc_h - 5.25) / 2,
+                  'THIS IS NOT A CHECK - NON-NEGOTIABLE - VOID AFTER 180 DAYS',
+                  FONT_BOLD, 7 * PX, _color('#92400e'), align='center')
+
+
+# Singleton instance
+native_renderer = NativePaystubRenderer()
@@ -0,0 +1,913 @@
+"""
+PAYSTUB TEMPLATES
+HTML for the Chromium paystub backend: each theme's <head> and stylesheet is rendered once and cached
+Each row section is joined once and the body is one compiled f-string, so a stub is a single string build
+"""
+
+import html
+import threading
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+
+
+# Document head with the full stylesheet; str.format fields are the theme colors
+PAYSTUB_HEAD = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <style>
+        @page {{
+            size: 8.5in 11in;
+            margin: 0.3in;
+        }}
+        
+        * {{
+            margin: 0;
+            padding: 0;
+            box-sizing: border-box;
+        }}
+        
+        body {{
+            font-family: 'Arial', sans-serif;
+            font-size: 10px;
+            line-height: 1.3;
+            margin: 0;
+            padding: 0;
+            color: #111827;
+            -webkit-print-color-adjust: exact !important;
+            print-color-adjust: exact !important;
+        }}
+        
+        .snappt-verification {{
+            position: absolute;
+            top: 5px;
+            right: 5px;
+            font-size: 6px;
+            color: #666;
+            opacity: 0.8;
+        }}
+        
+        .document-integrity {{
+            position: absolute;
+            bottom: 5px;
+            left: 5px;
+            font-size: 6px;
+            color: #666;
+            opacity: 0.8;
+        }}
+        
+        .security-thread {{
+            position: absolute;
+            left: 0;
+            top: 0;
+            bottom: 0;
+            width: 2px;
+            background: repeating-linear-gradient(
+                to bottom,
+                {primary} 0px,
+                {primary} 3px,
+                {secondary} 3px,
+                {secondary} 6px
+            );
+            opacity: 0.3;
+        }}
+        
+        .anti-copy-pattern {{
+            position: absolute;
+            top: 0;
+            left: 0;
+            right: 0;
+            bottom: 0;
+            background-image: 
+                radial-gradient(circle at 25% 25%, rgba(20, 115, 255, 0.02) 0%, transparent 50%),
+                radial-gradient(circle at 75% 75%, rgba(190, 1, 255, 0.02) 0%, transparent 50%);
+            pointer-events: none;
+            z-index: -1;
+        }}
+        
+        .microtext-security {{
+            font-size: 4px;
+            line-height: 4px;
+            color: #999;
+            letter-spacing: 0.2px;
+            opacity: 0.6;
+        }}
+        
+        .container {{
+            width: 7.5in;
+            margin: 0 auto;
+            position: relative;
+            background: white;
+        }}
+        
+        .header {{
+            background: linear-gradient(135deg, {gradient_start} 0%, {gradient_end} 100%);
+            color: white;
+            padding: 16px 20px;
+            border-radius: 12px;
+            margin-bottom: 12px;
+            position: relative;
+            overflow: hidden;
+        }}
+        
+        .header::before {{
+            content: '';
+            position: absolute;
+            top: 0;
+            left: 0;
+            right: 0;
+            bottom: 0;
+            background: repeating-linear-gradient(
+                45deg,
+                transparent,
+                transparent 10px,
+                rgba(255, 255, 255, 0.05) 10px,
+                rgba(255, 255, 255, 0.05) 20px
+            );
+            pointer-events: none;
+        }}
+        
+        .header-content {{
+            display: table;
+            width: 100%;
+            position: relative;
+            z-index: 2;
+        }}
+        
+        .header-left {{
+            display: table-cell;
+            vertical-align: middle;
+            width: 50%;
+        }}
+        
+        .header-center {{
+            display: table-cell;
+            vertical-align: middle;
+            width: 30%;
+            text-align: center;
+        }}
+        
+        .header-right {{
+            display: table-cell;
+            vertical-align: middle;
+            width: 20%;
+            text-align: right;
+        }}
+        
+        .company-name {{
+            font-size: 18px;
+            font-weight: bold;
+            margin-bottom: 4px;
+            text-shadow: 0 1px 2px rgba(0, 0, 0, 0.2);
+        }}
+        
+        .company-address {{
+            font-size: 11px;
+            opacity: 0.95;
+        }}
+        
+        .earnings-statement {{
+            font-size: 14px;
+            font-weight: bold;
+            margin-bottom: 8px;
+        }}
+        
+        .period-info {{
+            font-size: 10px;
+            line-height: 1.4;
+        }}
+        
+        .qr-container {{
+            width: 80px;
+            height: 80px;
+            background: white;
+            border-radius: 8px;
+            padding: 4px;
+            box-shadow: 0 2px 8px rgba(0, 0, 0, 0.2);
+            position: relative;
+        }}
+        
+        .qr-container::before {{
+            content: '';
+            position: absolute;
+            top: -2px;
+            left: -2px;
+            right: -2px;
+            bottom: -2px;
+            background: linear-gradient(45deg, {primary}, {secondary});
+            border-radius: 10px;
+            z-index: -1;
+        }}
+        
+        .qr-code {{
+            width: 100%;
+            height: 100%;
+            border-radius: 4px;
+        }}
+        
+        .employee-bar {{
+            background: linear-gradient(135deg, #06b6d4 0%, #3b82f6 100%);
+            color: white;
+            padding: 12px 20px;
+            border-radius: 12px;
+            margin-bottom: 16px;
+            position: relative;
+            display: table;
+            width: calc(100% - 8px);
+            max-width: 7.3in;
+            margin-left: auto;
+            margin-right: auto;
+        }}
+        
+        .employee-name {{
+            display: table-cell;
+            vertical-align: middle;
+            font-size: 16px;
+            font-weight: bold;
+            text-shadow: 0 1px 2px rgba(0, 0, 0, 0.2);
+        }}
+        
+        .state-badge {{
+            display: table-cell;
+            vertical-align: middle;
+            text-align: right;
+            width: 60px;
+        }}
+        
+        .state-indicator {{
+            background: rgba(255, 255, 255, 0.25);
+            color: white;
+            padding: 6px 12px;
+            border-radius: 8px;
+            font-weight: bold;
+            font-size: 14px;
+            backdrop-filter: blur(10px);
+            border: 1px solid rgba(255, 255, 255, 0.3);
+        }}
+        
+        .main-content {{
+            display: table;
+            width: 100%;
+            margin-bottom: 16px;
+        }}
+        
+        .left-column {{
+            display: table-cell;
+            width: 60%;
+            vertical-align: top;
+            padding-right: 12px;
+        }}
+        
+        .right-column {{
+            display: table-cell;
+            width: 40%;
+            vertical-align: top;
+            padding-left: 12px;
+        }}
+        
+        .card {{
+            background: #ffffff;
+            border: 2px solid #e5e7eb;
+            border-radius: 12px;
+            margin-bottom: 16px;
+            overflow: hidden;
+            position: relative;
+        }}
+        
+        .card::before {{
+            content: '';
+            position: absolute;
+            top: 0;
+            left: 0;
+            right: 0;
+            height: 2px;
+            background: linear-gradient(90deg, {primary} 0%, {secondary} 100%);
+        }}
+        
+        .card-header {{
+            background: #f8fafc;
+            padding: 12px 16px;
+            border-bottom: 1px solid #e5e7eb;
+            display: flex;
+            align-items: center;
+            gap: 8px;
+        }}
+        
+        .card-icon {{
+            width: 20px;
+            height: 20px;
+            border-radius: 50%;
+            background: linear-gradient(135deg, {primary} 0%, {secondary} 100%);
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            color: white;
+            font-weight: bold;
+            font-size: 12px;
+        }}
+        
+        .card-title {{
+            font-weight: bold;
+            font-size: 12px;
+            color: #374151;
+        }}
+        
+        .table {{
+            width: 100%;
+            border-collapse: collapse;
+        }}
+        
+        .table th {{
+            background: #f1f5f9;
+            padding: 8px 12px;
+            text-align: left;
+            font-weight: 600;
+            font-size: 9px;
+            color: #475569;
+            border-bottom: 2px solid #e2e8f0;
+            text-transform: uppercase;
+            letter-spacing: 0.5px;
+        }}
+        
+        .table td {{
+            padding: 8px 12px;
+            border-bottom: 1px solid #f1f5f9;
+            font-size: 10px;
+            color: #374151;
+        }}
+        
+        .table tr:hover {{
+            background: #f8fafc;
+        }}
+        
+        .total-row {{
+            background: linear-gradient(135deg, {gradient_start} 0%, {gradient_end} 100%) !important;
+            color: white !important;
+            font-weight: bold !important;
+        }}
+        
+        .total-row td {{
+            border-bottom: none !important;
+            padding: 10px 12px !important;
+            text-shadow: 0 1px 2px rgba(0, 0, 0, 0.2);
+        }}
+        
+        .perforation {{
+            margin: 20px 0;
+            text-align: center;
+            position: relative;
+        }}
+        
+        .perforation::before {{
+            content: '';
+            position: absolute;
+            top: 50%;
+            left: 0;
+            right: 0;
+            height: 1px;
+            background: repeating-linear-gradient(
+                to right,
+                #d1d5db 0px,
+                #d1d5db 8px,
+                transparent 8px,
+                transparent 16px
+            );
+        }}
+        
+        .perforation-text {{
+            background: white;
+            padding: 0 16px;
+            color: #9ca3af;
+            font-size: 8px;
+            font-weight: 500;
+            letter-spacing: 2px;
+            text-transform: uppercase;
+        }}
+        
+        .stub-section {{
+            background: #ffffff;
+            border: 2px solid #e5e7eb;
+            border-radius: 16px;
+            overflow: hidden;
+            position: relative;
+            margin-top: 20px;
+        }}
+        
+        .security-band {{
+            background: repeating-linear-gradient(
+                45deg,
+                {primary} 0px,
+                {primary} 2px,
+                {secondary} 2px,
+                {secondary} 4px,
+                {primary} 4px,
+                {primary} 6px,
+                transparent 6px,
+                transparent 8px
+            );
+            padding: 4px 8px;
+            text-align: center;
+            position: relative;
+            overflow: hidden;
+        }}
+        
+        .security-band-top {{
+            border-radius: 14px 14px 0 0;
+            margin: 4px 4px 0 4px;
+        }}
+        
+        .security-band-bottom {{
+            border-radius: 0 0 14px 14px;
+            margin: 0 4px 4px 4px;
+        }}
+        
+        .security-text {{
+            color: white;
+            font-size: 6px;
+            font-weight: bold;
+            text-shadow: 0 1px 2px rgba(0, 0, 0, 0.5);
+            letter-spacing: 1px;
+            position: relative;
+            z-index: 2;
+        }}
+        
+        .stub-body {{
+            padding: 16px 20px;
+            background: white;
+            border-radius: 0 0 14px 14px;
+            margin: 0 4px 4px 4px;
+            position: relative;
+        }}
+        
+        .stub-header {{
+            display: table;
+            width: 100%;
+            margin-bottom: 16px;
+            font-size: 8px;
+            color: #374151;
+        }}
+        
+        .stub-header-left {{
+            display: table-cell;
+            width: 50%;
+            vertical-align: middle;
+            padding-right: 20px;
+        }}
+        
+        .stub-header-right {{
+            display: table-cell;
+            width: 50%;
+            vertical-align: middle;
+            text-align: right;
+            padding-right: 30px;
+        }}
+        
+        .check-info {{
+            margin-bottom: 20px;
+        }}
+        
+        .pay-to-order {{
+            font-size: 10px;
+            color: #6b7280;
+            margin-bottom: 4px;
+        }}
+        
+        .payee-name {{
+            font-size: 16px;
+            font-weight: bold;
+            color: #111827;
+            margin-bottom: 12px;
+        }}
+        
+        .amount-words {{
+            font-size: 11px;
+            color: #374151;
+            margin-bottom: 16px;
+            font-style: italic;
+        }}
+        
+        .amount-display {{
+            position: absolute;
+            top: 80px;
+            right: 20px;
+            text-align: right;
+        }}
+        
+        .amount-value {{
+            font-size: 24px;
+            font-weight: bold;
+            color: {primary};
+            text-shadow: 0 1px 2px rgba(0, 0, 0, 0.1);
+        }}
+        
+        .signature-section {{
+            display: table;
+            width: 100%;
+            margin-top: 20px;
+        }}
+        
+        .signature-left {{
+            display: table-cell;
+            width: 50%;
+            vertical-align: bottom;
+            padding-right: 20px;
+        }}
+        
+        .signature-right {{
+            display: table-cell;
+            width: 50%;
+            vertical-align: bottom;
+            padding-left: 20px;
+        }}
+        
+        .signature-line {{
+            border-bottom: 1px solid #d1d5db;
+            height: 40px;
+            margin-bottom: 8px;
+            position: relative;
+            background: linear-gradient(135deg, rgba(20, 115, 255, 0.03) 0%, rgba(190, 1, 255, 0.03) 100%);
+            border-radius: 12px;
+            padding: 8px 12px;
+        }}
+        
+        .signature-line::before {{
+            content: '';
+            position: absolute;
+            bottom: 8px;
+            left: 12px;
+            right: 12px;
+            height: 1px;
+            background: linear-gradient(90deg, {primary} 0%, {secondary} 100%);
+            opacity: 0.3;
+        }}
+        
+        .signature-label {{
+            font-size: 8px;
+            color: #6b7280;
+            text-align: center;
+            margin-top: 4px;
+        }}
+        
+        .hologram-seal {{
+            position: absolute;
+            bottom: 60px;
+            right: 20px;
+            width: 60px;
+            height: 60px;
+            border-radius: 50%;
+            background: radial-gradient(circle at 30% 30%, 
+                rgba(255, 255, 255, 0.8) 0%,
+                {primary}4D 25%,
+                {secondary}4D 50%,
+                {primary}80 75%,
+                {secondary}B3 100%
+            );
+            border: 2px solid {primary}66;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            font-size: 8px;
+            font-weight: bold;
+            color: {primary};
+            text-align: center;
+            line-height: 1.2;
+            box-shadow: 0 0 20px {primary}4D;
+        }}
+        
+        .security-watermark {{
+            position: absolute;
+            bottom: 20px;
+            left: 20px;
+            right: 100px;
+            font-size: 6px;
+            color: #9ca3af;
+            opacity: 0.7;
+            text-align: center;
+            background: linear-gradient(90deg, transparent 0%, rgba(20, 115, 255, 0.05) 50%, transparent 100%);
+            padding: 4px 8px;
+            border-radius: 8px 8px 0 0;
+        }}
+        
+        .disclaimer {{
+            background: linear-gradient(135deg, #fef3c7 0%, #fde68a 100%);
+            border: 1px solid #f59e0b;
+            border-radius: 12px;
+            padding: 8px 12px;
+            margin: 16px 4px 4px 4px;
+            text-align: center;
+            font-size: 7px;
+            color: #92400e;
+            font-weight: 500;
+            position: relative;
+        }}
+        
+        .void-pattern {{
+            position: absolute;
+            top: 0;
+            left: 0;
+            right: 0;
+            bottom: 0;
+            background-image: 
+                repeating-linear-gradient(45deg, transparent, transparent 35px, rgba(220, 38, 38, 0.03) 35px, rgba(220, 38, 38, 0.03) 70px),
+                repeating-linear-gradient(-45deg, transparent, transparent 35px, rgba(220, 38, 38, 0.03) 35px, rgba(220, 38, 38, 0.03) 70px);
+            pointer-events: none;
+            z-index: 1;
+        }}
+        
+        .secure-document-text {{
+            position: absolute;
+            bottom: 100px;
+            right: 30px;
+            transform: rotate(-15deg);
+            font-size: 8px;
+            font-weight: bold;
+            color: {primary}66;
+            letter-spacing: 1px;
+            z-index: 3;
+        }}
+        
+        @media print {{
+            body {{
+                -webkit-print-color-adjust: exact !important;
+                print-color-adjust: exact !important;
+            }}
+        }}
+    </style>
+</head>
+"""
+
+
+@lru_cache(maxsize=4096)
+def _escape(value) -> str:
+    # Row labels, company and state names repeat across a batch; escape each once
+    return html.escape(str(value))
+
+
+def earning_rows(earnings: Iterable[Dict]) -> str:
+    """Earnings table rows, built in one join"""
+    return ''.join([f"""
+                                <tr>
+                                    <td>{_escape(earning['description'])}</td>
+                                    <td>{_escape(earning['rate'])}</td>
+                                    <td>{_escape(earning['hours'])}</td>
+                                    <td>${earning['current']:,.2f}</td>
+                                    <td>${earning['ytd']:,.2f}</td>
+                                </tr>""" for earning in earnings])
+
+
+def deduction_rows(deductions: Iterable[Dict]) -> str:
+    """Deduction table rows, built in one join"""
+    return ''.join([f"""
+                                <tr>
+                                    <td>{_escape(deduction['description'])}</td>
+                                    <td>{_escape(deduction['type'])}</td>
+                                    <td>-${deduction['current']:,.2f}</td>
+                                    <td>-${deduction['ytd']:,.2f}</td>
+                                </tr>""" for deduction in deductions])
+
+
+def compile_theme_head(theme: Dict[str, str]) -> str:
+    """The <head> block for one theme (what the cache stores)."""
+    return PAYSTUB_HEAD.format(**theme)
+
+
+class PaystubTemplates:
+    """Per-theme head cache shared by every render"""
+
+    def __init__(self):
+        self._heads: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def head(self, theme_key: str, theme: Dict[str, str]) -> str:
+        head = self._heads.get(theme_key)
+        if head is None:
+            with self._lock:
+                head = self._heads.setdefault(theme_key, compile_theme_head(theme))
+        return head
+
+    def clear(self):
+        with self._lock:
+            self._heads.clear()
+
+    def render(self, paystub_data: Dict, theme_key: str, theme: Dict[str, str], qr_markup: str,
+               verification_id: str, document_hash: str, now: Optional[datetime] = None) -> str:
+        """The complete document: cached head, then the body filled from this stub"""
+        # One clock read for the serial and the footer, so both carry the same date
+        generated_at = (now or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')
+        doc_serial = f"SAU{generated_at[:10].replace('-', '')}{verification_id[:8]}"
+        head = self.head(theme_key, theme)
+        earnings_html = earning_rows(paystub_data['earnings'])
+        deductions_html = deduction_rows(paystub_data['deductions'])
+
+        return f"""{head}<body>
+    <div class="snappt-verification">
+        SNAPPT VERIFIED - DOC: {doc_serial} - HASH: {document_hash}
+    </div>
+    
+    <div class="document-integrity">
+        SAURELLIUS SECURE - VER: {verification_id[:8]} - {generated_at}
+    </div>
+    
+    <div class="security-thread"></div>
+    <div class="anti-copy-pattern"></div>
+    
+    <div class="container">
+        <div class="header">
+            <div class="header-content">
+                <div class="header-left">
+                    <div class="company-name">{_escape(paystub_data['company']['name'])}</div>
+                    <div class="company-address">{_escape(paystub_data['company']['address'])}</div>
+                </div>
+                <div class="header-center">
+                    <div class="earnings-statement">Earnings Statement</div>
+                    <div class="period-info">
+                        Period Start: {_escape(paystub_data['pay_info']['period_start'])}<br>
+                        Period Ending: {_escape(paystub_data['pay_info']['period_end'])}<br>
+                        Pay Date: {_escape(paystub_data['pay_info']['pay_date'])}
+                    </div>
+                </div>
+                <div class="header-right">
+                    <div class="qr-container">
+                        {qr_markup}
+                    </div>
+                </div>
+            </div>
+        </div>
+        
+        <div class="employee-bar">
+            <div class="employee-name">{_escape(paystub_data['employee']['name'])}</div>
+            <div class="state-badge">
+                <div class="state-indicator">{_escape(paystub_data['employee']['state'])}</div>
+            </div>
+        </div>
+        
+        <div class="main-content">
+            <div class="left-column">
+                <div class="card">
+                    <div class="card-header">
+                        <div class="card-icon">$</div>
+                        <div class="card-title">Earnings</div>
+                    </div>
+                    <table class="table">
+                        <thead>
+                            <tr>
+                                <th>EARNINGS</th>
+                                <th>RATE</th>
+                                <th>HOURS</th>
+                                <th>THIS PERIOD</th>
+                                <th>YEAR TO DATE</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+                            {earnings_html}
+                            <tr class="total-row">
+                                <td colspan="3"><strong>Gross Pay</strong></td>
+                                <td><strong>${paystub_data['totals']['gross_pay']:,.2f}</strong></td>
+                                <td><strong>${paystub_data['totals']['gross_pay_ytd']:,.2f}</strong></td>
+                            </tr>
+                        </tbody>
+                    </table>
+                </div>
+                
+                <div class="card">
+                    <div class="card-header">
+                        <div class="card-icon">-</div>
+                        <div class="card-title">Deductions</div>
+                    </div>
+                    <table class="table">
+                        <thead>
+                            <tr>
+                                <th>DESCRIPTION</th>
+                                <th>TYPE</th>
+                                <th>THIS PERIOD</th>
+                                <th>YEAR TO DATE</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+                            {deductions_html}
+                            <tr class="total-row">
+                                <td colspan="2"><strong>Net Pay</strong></td>
+                                <td><strong>${paystub_data['totals']['net_pay']:,.2f}</strong></td>
+                                <td><strong>${paystub_data['totals']['net_pay_ytd']:,.2f}</strong></td>
+                            </tr>
+                        </tbody>
+                    </table>
+                </div>
+            </div>
+            
+            <div class="right-column">
+                <div class="card">
+                    <div class="card-header">
+                        <div class="card-icon">+</div>
+                        <div class="card-title">Other Benefits & Information</div>
+                    </div>
+                    <div style="padding: 16px;">
+                        <div style="margin-bottom: 12px;">
+                            <strong>401(k)</strong>
+                        </div>
+                        <div style="margin-bottom: 12px;">
+                            Health Insurance
+                        </div>
+                        <div style="margin-bottom: 12px;">
+                            Dental Insurance
+                        </div>
+                    </div>
+                </div>
+                
+                <div class="card">
+                    <div class="card-header">
+                        <div class="card-icon">i</div>
+                        <div class="card-title">Important Notes</div>
+                    </div>
+                    <div style="padding: 16px;">
+                        <div style="margin-bottom: 8px; font-size: 9px;">
+                            Performance bonus included
+                        </div>
+                        <div style="font-size: 9px;">
+                            401(k) contribution increased
+                        </div>
+                    </div>
+                </div>
+            </div>
+        </div>
+        
+        <div class="perforation">
+            <div class="perforation-text microtext-security">
+                TEAR ALONG PERFORATION - SECURE DOCUMENT - AUTHORIZED PERSONNEL ONLY
+            </div>
+        </div>
+        
+        <div class="stub-section">
+            <div class="security-band security-band-top">
+                <div class="security-text microtext-security">
+                    SECURE DOCUMENT - DO NOT DUPLICATE - VALID ONLY FOR PAYEE - AUTHORIZED PERSONNEL ONLY
+                </div>
+            </div>
+            
+            <div class="stub-body">
+                <div class="void-pattern"></div>
+                
+                <div class="stub-header">
+                    <div class="stub-header-left">
+                        <strong>Payroll check number: {_escape(paystub_data['check_info']['number'])}</strong>
+                    </div>
+                    <div class="stub-header-right">
+                        <strong>Pay date: {_escape(paystub_data['pay_info']['pay_date'])} - SSN: {_escape(paystub_data['employee']['ssn_masked'])}</strong>
+                    </div>
+                </div>
+                
+                <div class="check-info">
+                    <div class="pay-to-order">Pay to the order of</div>
+                    <div class="payee-name">{_escape(paystub_data['employee']['name'])}</div>
+                    <div class="amount-words">{_escape(paystub_data['totals']['amount_words'])}</div>
+                </div>
+                
+                <div class="amount-display">
+                    <div class="amount-value">${paystub_data['totals']['net_pay']:,.2f}</div>
+                </div>
+                
+                <div class="signature-section">
+                    <div class="signature-left">
+                        <div class="signature-line"></div>
+                        <div class="signature-label">Authorized Signature</div>
+                        <div style="margin-top: 8px; font-size: 7px; color: #6b7280;">
+                            Valid after 90 days
+                        </div>
+                    </div>
+                    <div class="signature-right">
+                        <div class="signature-line"></div>
+                        <div class="signature-label">Manager/Supervisor Signature</div>
+                    </div>
+                </div>
+                
+                <div class="hologram-seal">
+                    AUTHENTIC
+                </div>
+                
+                <div class="secure-document-text">
+                    SECUREPAYROLLDOCUMENT
+                </div>
+                
+                <div class="security-watermark">
+                    THE ORIGINAL DOCUMENT HAS WATERMARKS - HOLD AT AN ANGLE TO VIEW - SAURELLIUS SECURE
+                </div>
+            </div>
+            
+            <div class="security-band security-band-bottom">
+                <div class="security-text microtext-security">
+                    AUTHORIZED PAYROLL INSTRUMENT - NON-NEGOTIABLE - VOID IF ALTERED - SAURELLIUS CONFIDENTIAL
+                </div>
+            </div>
+            
+            <div class="disclaimer">
+                <strong>THIS IS NOT A CHECK - NON-NEGOTIABLE - VOID AFTER 180 DAYS</strong>
+            </div>
+        </div>
+    </div>
+</body>
+</html>"""
+
+
+# Singleton instance
+paystub_templates = PaystubTemplates()
@@ -0,0 +1,713 @@
+"""
+SAURELLIUS PTO LEDGER SERVICE
+Persistent PTO accrual ledger, balance snapshots and leave requests
+Batched per-payroll accrual processing with caps and year-end carryover
+"""
+
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional
+import uuid
+
+from models import db, PTOBalance, PTOLedgerEntry, PTOLeaveRequest
+from services.pto_service import pto_service, RequestStatus
+
+
+ZERO = Decimal("0.00")
+
+
+def _dec(value) -> Decimal:
+    return Decimal(str(value or 0)).quantize(Decimal("0.01"))
+
+
+class PTOLedgerService:
+    """
+    DB-backed PTO ledger.
+
+    Every balance change is an append-only PTOLedgerEntry; PTOBalance holds the
+    running snapshot per (employee, policy) so balance, calendar and liability
+    reads never replay the ledger. Policies and accrual math come from
+    SaurelliusPTO.
+    """
+
+    def __init__(self, policy_source=pto_service):
+        self.policy_source = policy_source
+
+    # =========================================================================
+    # ENROLLMENT & BALANCES
+    # =========================================================================
+
+    def enroll_employee(self, company_id: str, employee_id: str, hire_date: str,
+                        policy_ids: Optional[List[str]] = None) -> dict:
+        """Enroll employee in PTO policies (idempotent per policy)"""
+        policies = self.policy_source.policies
+        if not policy_ids:
+            policy_ids = [p["id"] for p in policies.values() if p.get("is_active")]
+
+        hire = date.fromisoformat(hire_date)
+        existing = {
+            b.policy_id: b for b in PTOBalance.query.filter_by(employee_id=employee_id).all()
+        }
+        for policy_id in policy_ids:
+            if policy_id not in policies:
+                continue
+            balance = existing.get(policy_id)
+            if balance:
+                balance.is_active = True
+                balance.hire_date = hire
+            else:
+                db.session.add(PTOBalance(
+                    company_id=company_id,
+                    employee_id=employee_id,
+                    policy_id=policy_id,
+                    hire_date=hire,
+                ))
+        db.session.commit()
+
+        return self.get_employee_balances(employee_id)
+
+    def get_employee_balances(self, employee_id: str) -> dict:
+        """Get all PTO balances for an employee from the snapshot table"""
+        rows = PTOBalance.query.filter_by(employee_id=employee_id, is_active=True).all()
+        if not rows:
+            raise ValueError(f"Employee {employee_id} not found")
+
+        policies = self.policy_source.policies
+        balances = {}
+        for row in rows:
+            policy = policies.get(row.policy_id, {})
+            entry = row.to_dict()
+            entry["policy_name"] = policy.get("name")
+            entry["leave_type"] = policy.get("leave_type")
+            balances[row.policy_id] = entry
+
+        return {
+            "employee_id": employee_id,
+            "company_id": rows[0].company_id,
+            "hire_date": rows[0].hire_date.isoformat(),
+            "enrolled_policies": list(balances.keys()),
+            "balances": balances,
+        }
+
+    def get_ledger(self, employee_id: str, policy_id: Optional[str] = None,
+                   limit: int = 100) -> List[dict]:
+        """Most recent ledger entries for an employee"""
+        query = PTOLedgerEntry.query.filter_by(employee_id=employee_id)
+        if policy_id:
+            query = query.filter_by(policy_id=policy_id)
+        entries = query.order_by(
+            PTOLedgerEntry.effective_date.desc(), PTOLedgerEntry.id.desc()
+        ).limit(limit).all()
+        return [e.to_dict() for e in entries]
+
+    def rebuild_snapshot(self, employee_id: str, policy_id: str) -> dict:
+        """Recompute a balance snapshot by replaying its ledger entries"""
+        balance = self._get_balance(employee_id, policy_id)
+        self._replay(balance)
+        db.session.commit()
+        return balance.to_dict()
+
+    def _replay(self, balance: PTOBalance):
+        entries = PTOLedgerEntry.query.filter_by(
+            employee_id=balance.employee_id, policy_id=balance.policy_id
+        ).order_by(PTOLedgerEntry.id).all()
+
+        available = carryover = used = accrued_ytd = ZERO
+        current_year = date.today().year
+        last_accrual = None
+        for entry in entries:
+            hours = _dec(entry.hours)
+            if entry.entry_type == "accrual":
+                available += hours
+                if entry.effective_date.year == current_year:
+                    accrued_ytd += hours
+                last_accrual = entry.effective_date
+            elif entry.entry_type == "usage":
+                # Usage is posted as two entries when it spans buckets
+                if entry.source_key and entry.source_key.endswith(":carryover"):
+                    carryover += hours
+                else:
+                    available += hours
+                used += -hours
+            elif entry.entry_type == "unpaid":
+                used += -hours
+            elif entry.entry_type == "carryover":
+                carryover = hours
+                available = ZERO
+                used = ZERO
+            elif entry.entry_type == "forfeiture":
+                pass
+            else:
+                available += hours
+
+        pending = sum(
+            (_dec(r.hours) for r in PTOLeaveRequest.query.filter_by(
+                employee_id=balance.employee_id, policy_id=balance.policy_id,
+                status=RequestStatus.PENDING.value
+            )),
+            ZERO
+        )
+
+        balance.available = max(available, ZERO)
+        balance.carryover = max(carryover, ZERO)
+        balance.used = used
+        balance.accrued_ytd = accrued_ytd
+        balance.pending = pending
+        balance.last_accrual_date = last_accrual
+        balance.last_ledger_entry_id = entries[-1].id if entries else None
+
+    def backfill(self, company_id: Optional[str] = None) -> dict:
+        """
+        Bring existing leave history into the ledger and replay every
+        snapshot: balances and requests still held by the in-memory policy
+        service are imported once (keyed legacy:*), then each balance is
+        rebuilt from its entries.
+        """
+        imported = self._import_legacy(company_id)
+
+        query = PTOBalance.query
+        if company_id:
+            query = query.filter(PTOBalance.company_id == company_id)
+        rebuilt = 0
+        for balance in query.order_by(PTOBalance.id).all():
+            self._replay(balance)
+            rebuilt += 1
+        db.session.commit()
+        return {**imported, "balances_rebuilt": rebuilt}
+
+    def _import_legacy(self, company_id: Optional[str]) -> dict:
+        source = self.policy_source
+        balances = requests = 0
+        today = date.today()
+        for employee_id, employee in source.employee_balances.items():
+            employee_company = str(employee.get("company_id") or source.company_id)
+            if company_id and employee_company != company_id:
+                continue
+            for policy_id, legacy in employee["balances"].items():
+                balance = PTOBalance.query.filter_by(employee_id=employee_id, policy_id=policy_id).first()
+                if balance is None:
+                    balance = PTOBalance(company_id=employee_company, employee_id=employee_id,
+                                         policy_id=policy_id,
+                                         hire_date=date.fromisoformat(employee["hire_date"]))
+                    db.session.add(balance)
+                elif PTOLedgerEntry.query.filter(
+                    PTOLedgerEntry.employee_id == employee_id, PTOLedgerEntry.policy_id == policy_id,
+                    PTOLedgerEntry.source_key.like("legacy:%")
+                ).first():
+                    continue
+
+                # Opening entries in replay order: carryover resets the buckets, the
+                # year's accruals and any other balance follow, then hours already used
+                carryover = _dec(legacy.get("carryover"))
+                used = _dec(legacy.get("used"))
+                accrued = _dec(legacy.get("accrued_ytd"))
+                opening = _dec(legacy.get("available")) + used - accrued
+                as_of = date.fromisoformat(legacy["last_accrual_date"]) if legacy.get("last_accrual_date") else today
+                self._post(balance, "carryover", carryover, as_of, carryover,
+                           source_key="legacy:carryover", created_by="backfill")
+                running = carryover
+                for entry_type, hours, key in (("accrual", accrued, "accrued_ytd"),
+                                               ("adjustment", opening, "opening"),
+                                               ("usage", -used, "used")):
+                    if hours:
+                        running += hours
+                        self._post(balance, entry_type, hours, as_of, running,
+                                   source_key=f"legacy:{key}", created_by="backfill")
+                balances += 1
+
+        known = {r for (r,) in db.session.query(PTOLeaveRequest.id)}
+        for legacy in source.leave_requests:
+            if legacy["id"] in known or (company_id and str(legacy.get("company_id")) != company_id):
+                continue
+            db.session.add(PTOLeaveRequest(
+                id=legacy["id"],
+                company_id=str(legacy.get("company_id") or source.company_id),
+                employee_id=legacy["employee_id"],
+                policy_id=legacy["policy_id"],
+                leave_type=legacy.get("leave_type"),
+                start_date=date.fromisoformat(legacy["start_date"]),
+                end_date=date.fromisoformat(legacy["end_date"]),
+                hours=_dec(legacy.get("hours")),
+                reason=legacy.get("reason", ""),
+                notes=legacy.get("notes", ""),
+                is_partial_day=legacy.get("is_partial_day", False),
+                partial_day_hours=legacy.get("partial_day_hours"),
+                status=legacy.get("status", RequestStatus.PENDING.value),
+                reviewed_by=legacy.get("reviewed_by"),
+                denial_reason=legacy.get("denial_reason"),
+            ))
+            requests += 1
+        db.session.flush()
+        return {"balances_imported": balances, "requests_imported": requests}
+
+    def _get_balance(self, employee_id: str, policy_id: str, lock: bool = False) -> PTOBalance:
+        query = PTOBalance.query.filter_by(employee_id=employee_id, policy_id=policy_id)
+        if lock:
+            query = query.with_for_update()
+        balance = query.first()
+        if not balance:
+            raise ValueError(f"Employee {employee_id} not enrolled in policy {policy_id}")
+        return balance
+
+    def _post(self, balance: PTOBalance, entry_type: str, hours: Decimal,
+              effective_date: date, balance_after: Decimal, **fields) -> PTOLedgerEntry:
+        entry = PTOLedgerEntry(
+            company_id=balance.company_id,
+            employee_id=balance.employee_id,
+            policy_id=balance.policy_id,
+            entry_type=entry_type,
+            hours=hours,
+            balance_after=balance_after,
+            effective_date=effective_date,
+            **fields
+        )
+        db.session.add(entry)
+        db.session.flush()
+        balance.last_ledger_entry_id = entry.id
+        return entry
+
+    # =========================================================================
+    # ACCRUALS
+    # =========================================================================
+
+    def process_accrual(self, employee_id: str, policy_id: str,
+                        pay_period_end: date, hours_worked: Optional[float] = None) -> dict:
+        """Process and post accrual for a single employee and policy"""
+        policy = self.policy_source.get_policy(policy_id)
+        if not policy:
+            raise ValueError(f"Policy {policy_id} not found")
+
+        balance = self._get_balance(employee_id, policy_id, lock=True)
+        source_key = f"accrual:{pay_period_end.isoformat()}"
+        if PTOLedgerEntry.query.filter_by(
+            employee_id=employee_id, policy_id=policy_id, source_key=source_key
+        ).first():
+            return {"accrued": 0, "message": "Accrual already posted for this pay period"}
+
+        accrual = self.policy_source.accrual_for_policy(
+            policy, balance.hire_date, pay_period_end, hours_worked
+        )
+        accrual = self.policy_source.cap_accrual(
+            policy, accrual, _dec(balance.available) + _dec(balance.carryover)
+        )
+        if accrual <= 0:
+            return {"accrued": 0, "message": "No accrual applied"}
+
+        balance.available = _dec(balance.available) + accrual
+        balance.accrued_ytd = _dec(balance.accrued_ytd) + accrual
+        balance.last_accrual_date = pay_period_end
+        entry = self._post(balance, "accrual", accrual, pay_period_end,
+                           balance.available, source_key=source_key)
+        db.session.commit()
+
+        return {
+            "accrued": float(accrual),
+            "new_balance": float(balance.available),
+            "accrual_record": entry.to_dict()
+        }
+
+    def run_payroll_accruals(self, company_id: str, pay_period_end: date,
+                             hours_worked: Optional[Dict[str, float]] = None,
+                             payroll_run_id: Optional[str] = None) -> dict:
+        """
+        Post accruals for every enrolled employee of a company for one pay
+        period. Reads all snapshots and already-posted keys in two queries,
+        computes capped accruals in memory and writes ledger rows and snapshot
+        updates in bulk within one transaction. Re-running the same period
+        only posts what is missing.
+        """
+        hours_worked = hours_worked or {}
+        policies = self.policy_source.policies
+        source_key = f"accrual:{pay_period_end.isoformat()}"
+
+        balances = PTOBalance.query.filter_by(
+            company_id=company_id, is_active=True
+        ).with_for_update().all()
+        already_posted = {
+            (employee_id, policy_id)
+            for employee_id, policy_id in db.session.query(
+                PTOLedgerEntry.employee_id, PTOLedgerEntry.policy_id
+            ).filter(
+                PTOLedgerEntry.company_id == company_id,
+                PTOLedgerEntry.effective_date == pay_period_end,
+                PTOLedgerEntry.source_key == source_key
+            )
+        }
+
+        ledger_rows = []
+        snapshot_rows = []
+        skipped = 0
+        capped = 0
+        total_hours = ZERO
+
+        for balance in balances:
+            policy = policies.get(balance.policy_id)
+            if not policy or not policy.get("accrual_method"):
+                continue
+            if (balance.employee_id, balance.policy_id) in already_posted:
+                skipped += 1
+                continue
+
+            raw = self.policy_source.accrual_for_policy(
+                policy, balance.hire_date, pay_period_end,
+                hours_worked.get(balance.employee_id)
+            )
+            accrual = self.policy_source.cap_accrual(
+                policy, raw, _dec(balance.available) + _dec(balance.carryover)
+            )
+            if accrual < raw:
+                capped += 1
+            if accrual <= 0:
+                continue
+
+            available = _dec(balance.available) + accrual
+            ledger_rows.append({
+                "company_id": company_id,
+                "employee_id": balance.employee_id,
+                "policy_id": balance.policy_id,
+                "entry_type": "accrual",
+                "hours": accrual,
+                "balance_after": available,
+                "effective_date": pay_period_end,
+                "payroll_run_id": payroll_run_id,
+                "source_key": source_key,
+                "created_at": datetime.utcnow(),
+            })
+            snapshot_rows.append({
+                "id": balance.id,
+                "available": available,
+                "accrued_ytd": _dec(balance.accrued_ytd) + accrual,
+                "last_accrual_date": pay_period_end,
+                "updated_at": datetime.utcnow(),
+            })
+            total_hours += accrual
+
+        if ledger_rows:
+            db.session.bulk_insert_mappings(PTOLedgerEntry, ledger_rows)
+            db.session.bulk_update_mappings(PTOBalance, snapshot_rows)
+        db.session.commit()
+
+        return {
+            "company_id": company_id,
+            "pay_period_end": pay_period_end.isoformat(),
+            "payroll_run_id": payroll_run_id,
+            "employees_processed": len({r["employee_id"] for r in ledger_rows}),
+            "entries_posted": len(ledger_rows),
+            "entries_skipped": skipped,
+            "entries_capped": capped,
+            "total_hours_accrued": float(total_hours),
+        }
+
+    def run_year_end_carryover(self, company_id: str, year: int,
+                               employee_id: Optional[str] = None) -> dict:
+        """Apply carryover limits to every balance of a company in one pass"""
+        policies = self.policy_source.policies
+        year_end = date(year, 12, 31)
+        source_key = f"carryover:{year}"
+
+        query = PTOBalance.query.filter_by(company_id=company_id, is_active=True)
+        if employee_id:
+            query = query.filter_by(employee_id=employee_id)
+        balances = query.with_for_update().all()
+
+        done = {
+            (e, p) for e, p in db.session.query(
+                PTOLedgerEntry.employee_id, PTOLedgerEntry.policy_id
+            ).filter(
+                PTOLedgerEntry.company_id == company_id,
+                PTOLedgerEntry.source_key == source_key
+            )
+        }
+
+        ledger_rows = []
+        snapshot_rows = []
+        results = []
+        now = datetime.utcnow()
+
+        for balance in balances:
+            policy = policies.get(balance.policy_id)
+            if not policy or (balance.employee_id, balance.policy_id) in done:
+                continue
+
+            current = _dec(balance.available) + _dec(balance.carryover)
+            limit = policy.get("carryover_limit")
+            carryover = min(current, _dec(limit)) if limit is not None else current
+            forfeited = current - carryover
+
+            base = {
+                "company_id": company_id,
+                "employee_id": balance.employee_id,
+                "policy_id": balance.policy_id,
+                "effective_date": year_end,
+                "created_at": now,
+            }
+            ledger_rows.append(dict(base, entry_type="carryover", hours=carryover,
+                                    balance_after=carryover, source_key=source_key))
+            if forfeited > 0:
+                ledger_rows.append(dict(base, entry_type="forfeiture", hours=-forfeited,
+                                        balance_after=carryover,
+                                        source_key=f"forfeiture:{year}"))
+            snapshot_rows.append({
+                "id": balance.id,
+                "available": ZERO,
+                "carryover": carryover,
+                "accrued_ytd": ZERO,
+                "used": ZERO,
+                "updated_at": now,
+            })
+            results.append({
+                "employee_id": balance.employee_id,
+                "policy_id": balance.policy_id,
+                "policy_name": policy["name"],
+                "previous_balance": float(current),
+                "carryover": float(carryover),
+                "forfeited": float(forfeited)
+            })
+
+        if ledger_rows:
+            db.session.bulk_insert_mappings(PTOLedgerEntry, ledger_rows)
+            db.session.bulk_update_mappings(PTOBalance, snapshot_rows)
+        db.session.commit()
+
+        return {
+            "company_id": company_id,
+            "year": year,
+            "processed_at": now.isoformat(),
+            "results": results
+        }
+
+    # =========================================================================
+    # LEAVE REQUESTS
+    # =========================================================================
+
+    def submit_leave_request(self, employee_id: str, data: dict) -> dict:
+        """Submit a leave request against the employee's snapshot balance"""
+        policy_id = data["policy_id"]
+        policy = self.policy_source.get_policy(policy_id)
+        if not policy:
+            raise ValueError(f"Policy {policy_id} not found")
+
+        balance = self._get_balance(employee_id, policy_id, lock=True)
+        start_date = date.fromisoformat(data["start_date"])
+        end_date = date.fromisoformat(data["end_date"])
+
+        hours = _dec(data.get("hours", 0))
+        if hours == 0:
+            hours = _dec(self.policy_source._count_work_days(start_date, end_date) * 8)
+
+        available = _dec(balance.available) + _dec(balance.carryover)
+        if hours > available and policy.get("is_paid", True):
+            raise ValueError(f"Insufficient balance. Available: {available}, Requested: {hours}")
+
+        status = (RequestStatus.PENDING.value if policy.get("requires_approval")
+                  else RequestStatus.APPROVED.value)
+        leave_request = PTOLeaveRequest(
+            id=str(uuid.uuid4()),
+            company_id=balance.company_id,
+            employee_id=employee_id,
+            policy_id=policy_id,
+            leave_type=policy["leave_type"],
+            start_date=start_date,
+            end_date=end_date,
+            hours=hours,
+            reason=data.get("reason", ""),
+            notes=data.get("notes", ""),
+            is_partial_day=data.get("is_partial_day", False),
+            partial_day_hours=data.get("partial_day_hours"),
+            status=status,
+            balance_at_submission=available,
+        )
+        balance.pending = _dec(balance.pending) + hours
+        db.session.add(leave_request)
+        db.session.commit()
+        return leave_request.to_dict()
+
+    def _get_request(self, request_id: str) -> PTOLeaveRequest:
+        leave_request = PTOLeaveRequest.query.get(request_id)
+        if not leave_request:
+            raise ValueError(f"Request {request_id} not found")
+        return leave_request
+
+    def _release_pending(self, leave_request: PTOLeaveRequest) -> PTOBalance:
+        balance = self._get_balance(leave_request.employee_id, leave_request.policy_id, lock=True)
+        balance.pending = max(ZERO, _dec(balance.pending) - _dec(leave_request.hours))
+        return balance
+
+    def approve_request(self, request_id: str, reviewer_id: str) -> dict:
+        """Approve a leave request"""
+        leave_request = self._get_request(request_id)
+        if leave_request.status != RequestStatus.PENDING.value:
+            raise ValueError(f"Request is not pending (status: {leave_request.status})")
+
+        leave_request.status = RequestStatus.APPROVED.value
+        leave_request.reviewed_by = str(reviewer_id)
+        leave_request.reviewed_at = datetime.utcnow()
+        db.session.commit()
+        return leave_request.to_dict()
+
+    def deny_request(self, request_id: str, reviewer_id: str, reason: str) -> dict:
+        """Deny a leave request and release its pending hours"""
+        leave_request = self._get_request(request_id)
+        if leave_request.status != RequestStatus.PENDING.value:
+            raise ValueError(f"Request is not pending (status: {leave_request.status})")
+
+        self._release_pending(leave_request)
+        leave_request.status = RequestStatus.DENIED.value
+        leave_request.reviewed_by = str(reviewer_id)
+        leave_request.reviewed_at = datetime.utcnow()
+        leave_request.denial_reason = reason
+        db.session.commit()
+        return leave_request.to_dict()
+
+    def cancel_request(self, request_id: str, employee_id: str) -> dict:
+        """Cancel a pending or approved leave request"""
+        leave_request = self._get_request(request_id)
+        if leave_request.employee_id != str(employee_id):
+            raise ValueError("Cannot cancel another employee's request")
+        if leave_request.status not in [RequestStatus.PENDING.value, RequestStatus.APPROVED.value]:
+            raise ValueError(f"Cannot cancel request with status: {leave_request.status}")
+
+        self._release_pending(leave_request)
+        leave_request.status = RequestStatus.CANCELLED.value
+        db.session.commit()
+        return leave_request.to_dict()
+
+    def mark_leave_taken(self, request_id: str, recorded_by: Optional[str] = None) -> dict:
+        """
+        Post usage for approved leave, drawing carryover hours first. Paid
+        leave may not exceed the balance; hours of unpaid leave beyond it
+        are posted as an explicit unpaid entry and reported as unpaid_hours.
+        """
+        leave_request = self._get_request(request_id)
+        if leave_request.status != RequestStatus.APPROVED.value:
+            raise ValueError(f"Request must be approved first (status: {leave_request.status})")
+
+        balance = self._get_balance(leave_request.employee_id, leave_request.policy_id, lock=True)
+        hours = _dec(leave_request.hours)
+        from_carryover = min(hours, _dec(balance.carryover))
+        from_available = min(hours - from_carryover, _dec(balance.available))
+        unpaid = hours - from_carryover - from_available
+
+        policy = self.policy_source.get_policy(leave_request.policy_id) or {}
+        if unpaid and policy.get("is_paid", True):
+            db.session.rollback()
+            raise ValueError(f"Insufficient balance to record leave. "
+                             f"Available: {from_carryover + from_available}, Requested: {hours}")
+
+        self._release_pending(leave_request)
+        balance.carryover = _dec(balance.carryover) - from_carryover
+        balance.available = _dec(balance.available) - from_available
+        balance.used = _dec(balance.used) + hours
+
+        remaining = balance.available + balance.carryover
+        if from_carryover:
+            self._post(balance, "usage", -from_carryover, leave_request.start_date, remaining,
+                       request_id=leave_request.id, created_by=recorded_by,
+                       source_key=f"usage:{leave_request.id}:carryover")
+        if from_available:
+            self._post(balance, "usage", -from_available, leave_request.start_date, remaining,
+                       request_id=leave_request.id, created_by=recorded_by,
+                       source_key=f"usage:{leave_request.id}")
+        if unpaid:
+            self._post(balance, "unpaid", -unpaid, leave_request.start_date, remaining,
+                       request_id=leave_request.id, created_by=recorded_by,
+                       source_key=f"usage:{leave_request.id}:unpaid")
+
+        leave_request.status = RequestStatus.TAKEN.value
+        db.session.commit()
+        return {**leave_request.to_dict(), "unpaid_hours": float(unpaid)}
+
+    def get_leave_requests(self, company_id: Optional[str] = None,
+                           employee_id: Optional[str] = None,
+                           status: Optional[str] = None,
+                           start_date: Optional[date] = None,
+                           end_date: Optional[date] = None) -> List[dict]:
+        """Get leave requests with filters"""
+        query = PTOLeaveRequest.query
+        if company_id:
+            query = query.filter(PTOLeaveRequest.company_id == company_id)
+        if employee_id:
+            query = query.filter(PTOLeaveRequest.employee_id == employee_id)
+        if status:
+            query = query.filter(PTOLeaveRequest.status == status)
+        if start_date:
+            query = query.filter(PTOLeaveRequest.start_date >= start_date)
+        if end_date:
+            query = query.filter(PTOLeaveRequest.end_date <= end_date)
+        return [r.to_dict() for r in query.order_by(PTOLeaveRequest.start_date.desc()).all()]
+
+    # =========================================================================
+    # REPORTS
+    # =========================================================================
+
+    def get_team_calendar(self, company_id: str, employee_ids: List[str],
+                          month: int, year: int) -> List[dict]:
+        """Holidays plus approved/taken leave overlapping the month"""
+        start = date(year, month, 1)
+        end = (date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)) - timedelta(days=1)
+
+        calendar = [
+            {"type": "holiday", "date": h["date"], "name": h["name"], "is_paid": h["is_paid"]}
+            for h in self.policy_source.holidays
+            if start <= date.fromisoformat(h["date"]) <= end
+        ]
+
+        query = PTOLeaveRequest.query.filter(
+            PTOLeaveRequest.company_id == company_id,
+            PTOLeaveRequest.start_date <= end,
+            PTOLeaveRequest.end_date >= start,
+            PTOLeaveRequest.status.in_([RequestStatus.APPROVED.value, RequestStatus.TAKEN.value])
+        )
+        if employee_ids:
+            query = query.filter(PTOLeaveRequest.employee_id.in_(employee_ids))
+
+        for leave_request in query.all():
+            calendar.append({
+                "type": "leave",
+                "employee_id": leave_request.employee_id,
+                "start_date": leave_request.start_date.isoformat(),
+                "end_date": leave_request.end_date.isoformat(),
+                "leave_type": leave_request.leave_type,
+                "hours": float(leave_request.hours),
+                "status": leave_request.status
+            })
+
+        return calendar
+
+    def get_pto_liability_report(self, company_id: str, hourly_rates: Optional[Dict[str, float]] = None) -> dict:
+        """PTO liability from balance snapshots, aggregated in SQL per employee"""
+        hourly_rates = hourly_rates or {}
+        paid_policies = [pid for pid, p in self.policy_source.policies.items() if p.get("is_paid")]
+
+        rows = db.session.query(
+            PTOBalance.employee_id,
+            db.func.sum(PTOBalance.available + PTOBalance.carryover)
+        ).filter(
+            PTOBalance.company_id == company_id,
+            PTOBalance.is_active.is_(True),
+            PTOBalance.policy_id.in_(paid_policies)
+        ).group_by(PTOBalance.employee_id).all()
+
+        total_liability = ZERO
+        by_employee = []
+        for employee_id, hours in rows:
+            # $50/hour average when no rate is supplied
+            rate = _dec(hourly_rates.get(employee_id, 50))
+            liability = _dec(hours) * rate
+            total_liability += liability
+            by_employee.append({
+                "employee_id": employee_id,
+                "hours": float(hours or 0),
+                "liability": float(liability)
+            })
+
+        return {
+            "total_liability": float(total_liability),
+            "employee_count": len(by_employee),
+            "by_employee": by_employee,
+            "generated_at": datetime.now().isoformat()
+        }
+
+
+# Singleton instance
+pto_ledger = PTOLedgerService()
@@ -56,6 +56,7 @@ class SaurelliusPTO:
         self.policies: Dict[str, dict] = {}
         self.employee_balances: Dict[str, dict] = {}
         self.leave_requests: List[dict] = []
+        self._requests_by_id: Dict[str, dict] = {}
         self.accrual_history: List[dict] = []
         self.holidays: List[dict] = []
         
@@ -304,8 +305,14 @@ class SaurelliusPTO:
         if not policy or policy_id not in employee["enrolled_policies"]:
             return Decimal("0.00")
         
+        return self.accrual_for_policy(
+            policy, date.fromisoformat(employee["hire_date"]), pay_period_end, hours_worked
+        )
+    
+    def accrual_for_policy(self, policy: dict, hire_date: date,
+                           pay_period_end: date, hours_worked: Optional[float] = None) -> Decimal:
+        """Accrual amount for one pay period under a policy (no balance cap applied)"""
         # Check waiting period
-        hire_date = date.fromisoformat(employee["hire_date"])
         waiting_end = hire_date + timedelta(days=policy.get("waiting_period_days", 0))
         if pay_period_end < waiting_end:
             return Decimal("0.00")
@@ -344,6 +351,16 @@ class SaurelliusPTO:
         
         return accrual
     
+    @staticmethod
+    def cap_accrual(policy: dict, accrual: Decimal, current_balance: Decimal) -> Decimal:
+        """Limit an accrual so the balance does not exceed the policy maximum"""
+        max_balance = policy.get("max_balance")
+        if max_balance:
+            max_balance = Decimal(str(max_balance))
+            if current_balance + accrual > max_balance:
+                return max(Decimal("0.00"), max_balance - current_balance)
+        return accrual
+    
     def process_accrual(self, employee_id: str, policy_id: str,
                        pay_period_end: date, hours_worked: Optional[float] = None) -> dict:
         """Process and apply accrual for an employee"""
@@ -357,12 +374,7 @@ class SaurelliusPTO:
         policy = self.policies[policy_id]
         
         # Check max balance cap
-        max_balance = policy.get("max_balance")
-        if max_balance:
-            max_balance = Decimal(str(max_balance))
-            current = balance["available"] + balance["carryover"]
-            if current + accrual > max_balance:
-                accrual = max(Decimal("0.00"), max_balance - current)
+        accrual = self.cap_accrual(policy, accrual, balance["available"] + balance["carryover"])
         
         # Apply accrual
         balance["available"] += accrual
@@ -456,6 +468,7 @@ class SaurelliusPTO:
         balance["pending"] = balance.get("pending", Decimal("0.00")) + hours
         
         self.leave_requests.append(request)
+        self._requests_by_id[request_id] = request
         return request
     
     def _count_work_days(self, start: date, end: date) -> int:
@@ -473,7 +486,7 @@ class SaurelliusPTO:
     
     def approve_request(self, request_id: str, reviewer_id: str) -> dict:
         """Approve a leave request"""
-        request = next((r for r in self.leave_requests if r["id"] == request_id), None)
+        request = self._requests_by_id.get(request_id)
         if not request:
             raise ValueError(f"Request {request_id} not found")
         
@@ -488,7 +501,7 @@ class SaurelliusPTO:
     
     def deny_request(self, request_id: str, reviewer_id: str, reason: str) -> dict:
         """Deny a leave request"""
-        request = next((r for r in self.leave_requests if r["id"] == request_id), None)
+        request = self._requests_by_id.get(request_id)
         if not request:
             raise ValueError(f"Request {request_id} not found")
         
@@ -511,7 +524,7 @@ class SaurelliusPTO:
     
     def cancel_request(self, request_id: str, employee_id: str) -> dict:
         """Cancel a leave request"""
-        request = next((r for r in self.leave_requests if r["id"] == request_id), None)
+        request = self._requests_by_id.get(request_id)
         if not request:
             raise ValueError(f"Request {request_id} not found")
         
@@ -534,7 +547,7 @@ class SaurelliusPTO:
     
     def mark_leave_taken(self, request_id: str) -> dict:
         """Mark approved leave as taken (deduct from balance)"""
-        request = next((r for r in self.leave_requests if r["id"] == request_id), None)
+        request = self._requests_by_id.get(request_id)
         if not request:
             raise ValueError(f"Request {request_id} not found")
         
@@ -14,13 +14,23 @@ Supports:
 
 import os
 import uuid
+import shutil
 import hashlib
+import tempfile
 import requests
 from datetime import datetime, date, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 from enum import Enum
 from decimal import Decimal
 
+from services.efile_writer import EFW2Writer, FIREWriter
+
+# Generated EFW2/FIRE files, one subdirectory per filing
+EFILE_OUTPUT_DIR = os.getenv('EFILE_OUTPUT_DIR', os.path.join(tempfile.gettempdir(), 'saurellius_efile'))
+
+# Validation errors reported back per submission
+MAX_VALIDATION_ERRORS = 100
+
 
 class FilingAgency(Enum):
     """Government agencies for filing"""
@@ -79,6 +89,11 @@ class RegulatoryFilingService:
         'production_url': 'https://fire.irs.gov',
         'test_url': 'https://fire.test.irs.gov',
         'tcc_code': os.getenv('IRS_TCC_CODE', ''),  # Transmitter Control Code
+        'transmitter_tin': os.getenv('IRS_TRANSMITTER_TIN', ''),
+        'transmitter_name': os.getenv('IRS_TRANSMITTER_NAME', 'Saurellius Payroll'),
+        'contact_name': os.getenv('FILING_CONTACT_NAME', 'Payroll Administrator'),
+        'contact_phone': os.getenv('FILING_CONTACT_PHONE', ''),
+        'contact_email': os.getenv('FILING_CONTACT_EMAIL', ''),
         'port': 443,
         'forms_supported': ['1099-NEC', '1099-MISC', '1099-INT', '1099-DIV', '1099-R', 'W-2G']
     }
@@ -88,6 +103,9 @@ class RegulatoryFilingService:
         'production_url': 'https://www.ssa.gov/bso',
         'test_url': 'https://www.ssa.gov/bso/bsotest',
         'user_id': os.getenv('SSA_BSO_USER_ID', ''),
+        'contact_name': os.getenv('FILING_CONTACT_NAME', 'Payroll Administrator'),
+        'contact_phone': os.getenv('FILING_CONTACT_PHONE', ''),
+        'contact_email': os.getenv('FILING_CONTACT_EMAIL', ''),
         'forms_supported': ['W-2', 'W-3', 'W-2c', 'W-3c']
     }
     
@@ -202,42 +220,44 @@ class RegulatoryFilingService:
     def submit_1099_fire(
         self,
         company_id: str,
-        forms: List[Dict],
+        forms: Iterable[Dict],
         tax_year: int,
-        is_correction: bool = False
+        is_correction: bool = False,
+        form_type: str = '1099-NEC'
     ) -> Dict:
         """
         Submit 1099 forms to IRS FIRE system.
         
         Args:
             company_id: Employer company ID
-            forms: List of 1099 form data
+            forms: 1099 form data; any iterable, consumed once
             tax_year: Tax year for filing
             is_correction: Whether this is a correction filing
+            form_type: 1099-NEC or 1099-MISC
         
         Returns:
             Filing result with confirmation number
         """
         filing_id = str(uuid.uuid4())
         
-        # Validate forms
-        validation = self._validate_1099_forms(forms)
-        if not validation['valid']:
+        # Payers must be contiguous for A/C blocks; lists are grouped here,
+        # streamed iterables are expected to arrive grouped already
+        if isinstance(forms, list):
+            forms = sorted(forms, key=lambda f: str(f.get('payer_tin', '')))
+        
+        # Build FIRE format files, validating each form as it is written
+        build = self._build_fire_file(forms, tax_year, is_correction, filing_id, form_type)
+        if build['errors']:
             return {
                 'success': False,
                 'error': 'Form validation failed',
-                'validation_errors': validation['errors']
+                'validation_errors': build['errors']
             }
-        
-        # Build FIRE format file
-        fire_file = self._build_fire_file(forms, tax_year, is_correction)
-        
-        # Calculate checksum for audit
-        checksum = hashlib.sha256(fire_file.encode()).hexdigest()
+        fire_files = build['files']
         
         # Submit to FIRE (in production)
         if self.is_production:
-            result = self._submit_to_fire(fire_file)
+            result = self._submit_to_fire([f['path'] for f in fire_files])
         else:
             result = {
                 'success': True,
@@ -252,10 +272,11 @@ class RegulatoryFilingService:
             'filing_type': FilingType.FORM_1099.value,
             'agency': FilingAgency.IRS.value,
             'tax_year': tax_year,
-            'form_count': len(forms),
-            'total_amount': sum(f.get('amount', 0) for f in forms),
+            'form_count': build['form_count'],
+            'total_amount': build['totals'].get('1', 0),
             'is_correction': is_correction,
-            'fire_file_checksum': checksum,
+            'fire_file_checksum': self._combined_checksum(fire_files),
+            'fire_files': fire_files,
             'status': FilingStatus.SUBMITTED.value if result['success'] else FilingStatus.REJECTED.value,
             'confirmation_number': result.get('confirmation_number'),
             'submitted_at': datetime.utcnow().isoformat(),
@@ -269,59 +290,86 @@ class RegulatoryFilingService:
             'success': result['success'],
             'filing_id': filing_id,
             'confirmation_number': result.get('confirmation_number'),
-            'form_count': len(forms),
+            'form_count': build['form_count'],
+            'file_count': len(fire_files),
             'message': result.get('message')
         }
     
-    def _validate_1099_forms(self, forms: List[Dict]) -> Dict:
-        """Validate 1099 forms before submission."""
+    def _validate_1099_form(self, number: int, form: Dict) -> List[str]:
+        """Validate a 1099 form before it is written."""
         errors = []
-        
-        for i, form in enumerate(forms):
-            if not form.get('recipient_tin'):
-                errors.append(f"Form {i+1}: Missing recipient TIN")
-            if not form.get('recipient_name'):
-                errors.append(f"Form {i+1}: Missing recipient name")
-            if not form.get('amount') or form['amount'] < 600:
-                errors.append(f"Form {i+1}: Amount below $600 threshold")
-            if not form.get('payer_tin'):
-                errors.append(f"Form {i+1}: Missing payer TIN")
-        
-        return {'valid': len(errors) == 0, 'errors': errors}
-    
-    def _build_fire_file(self, forms: List[Dict], tax_year: int, is_correction: bool) -> str:
-        """Build IRS FIRE format file."""
-        lines = []
-        
-        # Transmitter Record (T Record)
-        t_record = f"T{tax_year}{'C' if is_correction else ' '}{self.IRS_FIRE_CONFIG['tcc_code']:5}"
-        lines.append(t_record)
-        
-        # Payer Record (A Record) - one per payer
-        # Payee Records (B Records) - one per recipient
-        for form in forms:
-            b_record = self._build_1099_b_record(form, tax_year)
-            lines.append(b_record)
-        
-        # End of Payer Record (C Record)
-        c_record = f"C{len(forms):08d}"
-        lines.append(c_record)
-        
-        # End of Transmission (F Record)
-        f_record = f"F{len(forms):08d}"
-        lines.append(f_record)
-        
-        return '\n'.join(lines)
-    
-    def _build_1099_b_record(self, form: Dict, tax_year: int) -> str:
-        """Build B Record for 1099."""
-        # Simplified B record structure
-        return f"B{tax_year}{form.get('recipient_tin', ''):9}{form.get('amount', 0):012.2f}"
-    
-    def _submit_to_fire(self, fire_file: str) -> Dict:
-        """Submit file to IRS FIRE system."""
+        if not form.get('recipient_tin'):
+            errors.append(f"Form {number}: Missing recipient TIN")
+        if not form.get('recipient_name'):
+            errors.append(f"Form {number}: Missing recipient name")
+        if not form.get('amount') or form['amount'] < 600:
+            errors.append(f"Form {number}: Amount below $600 threshold")
+        if not form.get('payer_tin'):
+            errors.append(f"Form {number}: Missing payer TIN")
+        return errors
+    
+    def _efile_dir(self, filing_id: str) -> str:
+        return os.path.join(EFILE_OUTPUT_DIR, filing_id)
+    
+    def _combined_checksum(self, files: List[Dict]) -> str:
+        """SHA-256 of a single file, or of the ordered per-file digests for a split submission."""
+        if len(files) == 1:
+            return files[0]['sha256']
+        return hashlib.sha256(''.join(f['sha256'] for f in files).encode()).hexdigest()
+    
+    def _build_fire_file(
+        self,
+        forms: Iterable[Dict],
+        tax_year: int,
+        is_correction: bool,
+        filing_id: str,
+        form_type: str = '1099-NEC'
+    ) -> Dict:
+        """
+        Stream forms into IRS FIRE (Pub 1220) files, split under the size limit.
+        Returns the written files and control totals, or the validation errors;
+        files of a rejected build are removed.
+        """
+        directory = self._efile_dir(filing_id)
+        transmitter = {
+            'tin': self.IRS_FIRE_CONFIG['transmitter_tin'],
+            'tcc': self.IRS_FIRE_CONFIG['tcc_code'] or ('' if self.is_production else 'TEST0'),
+            'name': self.IRS_FIRE_CONFIG['transmitter_name'],
+            'contact_name': self.IRS_FIRE_CONFIG['contact_name'],
+            'contact_phone': self.IRS_FIRE_CONFIG['contact_phone'],
+            'contact_email': self.IRS_FIRE_CONFIG['contact_email'],
+        }
+        errors = []
+        writer = FIREWriter(directory, transmitter, tax_year, form_type=form_type,
+                            is_correction=is_correction, is_test=not self.is_production)
         try:
-            # In production, this would use SFTP to upload to FIRE
+            for number, form in enumerate(forms, start=1):
+                form_errors = self._validate_1099_form(number, form)
+                if not form_errors:
+                    try:
+                        # After the first error keep validating, but stop writing
+                        if errors:
+                            writer.validate_form(form)
+                        else:
+                            writer.write_form(form)
+                    except ValueError as e:
+                        form_errors = [f"Form {number}: {e}"]
+                if form_errors and len(errors) < MAX_VALIDATION_ERRORS:
+                    errors.extend(form_errors)
+            summary = writer.close()
+        except ValueError as e:
+            writer.abort()
+            errors.append(str(e))
+        
+        if errors or not writer.form_count:
+            shutil.rmtree(directory, ignore_errors=True)
+            return {'errors': errors or ['No forms to file'], 'files': [], 'form_count': 0, 'totals': {}}
+        return {'errors': [], **summary}
+    
+    def _submit_to_fire(self, fire_files: List[str]) -> Dict:
+        """Submit files to IRS FIRE system."""
+        try:
+            # In production, this would use SFTP to upload each file to FIRE
             # fire.irs.gov on port 443
             url = self.IRS_FIRE_CONFIG['production_url'] if self.is_production else self.IRS_FIRE_CONFIG['test_url']
             
@@ -329,7 +377,7 @@ class RegulatoryFilingService:
             return {
                 'success': True,
                 'confirmation_number': f"FIRE-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}",
-                'message': 'Successfully submitted to IRS FIRE'
+                'message': f'Successfully submitted {len(fire_files)} file(s) to IRS FIRE'
             }
         except Exception as e:
             return {
@@ -344,7 +392,7 @@ class RegulatoryFilingService:
     def submit_w2_ssa(
         self,
         company_id: str,
-        w2_forms: List[Dict],
+        w2_forms: Iterable[Dict],
         w3_form: Dict,
         tax_year: int
     ) -> Dict:
@@ -353,7 +401,7 @@ class RegulatoryFilingService:
         
         Args:
             company_id: Employer company ID
-            w2_forms: List of W-2 form data
+            w2_forms: W-2 form data; any iterable, consumed once
             w3_form: W-3 transmittal form data
             tax_year: Tax year for filing
         
@@ -362,22 +410,19 @@ class RegulatoryFilingService:
         """
         filing_id = str(uuid.uuid4())
         
-        # Validate W-2 totals match W-3
-        validation = self._validate_w2_w3(w2_forms, w3_form)
-        if not validation['valid']:
+        # Build EFW2 format files; W-2 totals are reconciled to the W-3 as they stream
+        build = self._build_efw2_file(w2_forms, w3_form, tax_year, filing_id)
+        if build['errors']:
             return {
                 'success': False,
                 'error': 'W-2/W-3 validation failed',
-                'validation_errors': validation['errors']
+                'validation_errors': build['errors']
             }
-        
-        # Build EFW2 format file
-        efw2_file = self._build_efw2_file(w2_forms, w3_form, tax_year)
-        checksum = hashlib.sha256(efw2_file.encode()).hexdigest()
+        efw2_files = build['files']
         
         # Submit to SSA BSO
         if self.is_production:
-            result = self._submit_to_ssa_bso(efw2_file)
+            result = self._submit_to_ssa_bso([f['path'] for f in efw2_files])
         else:
             result = {
                 'success': True,
@@ -391,10 +436,11 @@ class RegulatoryFilingService:
             'filing_type': FilingType.W2_W3.value,
             'agency': FilingAgency.SSA.value,
             'tax_year': tax_year,
-            'w2_count': len(w2_forms),
-            'total_wages': w3_form.get('total_wages', 0),
-            'total_federal_tax': w3_form.get('total_federal_tax', 0),
-            'efw2_checksum': checksum,
+            'w2_count': build['employee_count'],
+            'total_wages': build['totals'].get('box_1', 0),
+            'total_federal_tax': build['totals'].get('box_2', 0),
+            'efw2_checksum': self._combined_checksum(efw2_files),
+            'efw2_files': efw2_files,
             'status': FilingStatus.SUBMITTED.value if result['success'] else FilingStatus.REJECTED.value,
             'confirmation_number': result.get('confirmation_number'),
             'submitted_at': datetime.utcnow().isoformat(),
@@ -408,60 +454,75 @@ class RegulatoryFilingService:
             'success': result['success'],
             'filing_id': filing_id,
             'confirmation_number': result.get('confirmation_number'),
-            'w2_count': len(w2_forms),
+            'w2_count': build['employee_count'],
+            'file_count': len(efw2_files),
             'message': result.get('message')
         }
     
-    def _validate_w2_w3(self, w2_forms: List[Dict], w3_form: Dict) -> Dict:
-        """Validate W-2 totals match W-3."""
+    def _validate_w2_w3(self, w2_totals: Dict, w3_form: Dict) -> Dict:
+        """Validate streamed W-2 totals match W-3."""
         errors = []
-        
-        # Sum W-2 values
-        w2_totals = {
-            'wages': sum(w.get('box_1', 0) for w in w2_forms),
-            'federal_tax': sum(w.get('box_2', 0) for w in w2_forms),
-            'ss_wages': sum(w.get('box_3', 0) for w in w2_forms),
-            'ss_tax': sum(w.get('box_4', 0) for w in w2_forms),
-            'medicare_wages': sum(w.get('box_5', 0) for w in w2_forms),
-            'medicare_tax': sum(w.get('box_6', 0) for w in w2_forms),
-        }
+        w3_totals = w3_form.get('totals', {})
         
         # Compare to W-3
-        if abs(w2_totals['wages'] - w3_form.get('total_wages', 0)) > 0.01:
+        w3_wages = w3_form.get('total_wages', w3_totals.get('box_1', 0))
+        w3_federal = w3_form.get('total_federal_tax', w3_totals.get('box_2', 0))
+        if abs(w2_totals.get('box_1', 0) - w3_wages) > 0.01:
             errors.append('W-2 wages total does not match W-3 Box 1')
-        if abs(w2_totals['federal_tax'] - w3_form.get('total_federal_tax', 0)) > 0.01:
+        if abs(w2_totals.get('box_2', 0) - w3_federal) > 0.01:
             errors.append('W-2 federal tax total does not match W-3 Box 2')
         
         return {'valid': len(errors) == 0, 'errors': errors}
     
-    def _build_efw2_file(self, w2_forms: List[Dict], w3_form: Dict, tax_year: int) -> str:
-        """Build EFW2 format file for SSA."""
-        lines = []
-        
-        # RA Record (Submitter)
-        # RE Record (Employer)
-        # RW Records (Employee W-2s)
-        for w2 in w2_forms:
-            rw_record = self._build_rw_record(w2)
-            lines.append(rw_record)
-        
-        # RT Record (Employer Total)
-        # RF Record (Final)
-        
-        return '\n'.join(lines)
-    
-    def _build_rw_record(self, w2: Dict) -> str:
-        """Build RW record for W-2."""
-        return f"RW{w2.get('ssn', ''):9}{w2.get('first_name', ''):15}{w2.get('last_name', ''):20}"
-    
-    def _submit_to_ssa_bso(self, efw2_file: str) -> Dict:
-        """Submit file to SSA BSO."""
+    def _build_efw2_file(self, w2_forms: Iterable[Dict], w3_form: Dict, tax_year: int, filing_id: str) -> Dict:
+        """
+        Stream W-2s into SSA EFW2 files, split under the size limit. Returns
+        the written files and control totals, or the validation errors; files
+        of a rejected build are removed.
+        """
+        directory = self._efile_dir(filing_id)
+        submitter = {
+            **w3_form,
+            'ein': w3_form.get('employer_ein'),
+            'user_id': self.SSA_BSO_CONFIG['user_id'] or ('' if self.is_production else 'TESTUSER'),
+            'contact_name': self.SSA_BSO_CONFIG['contact_name'],
+            'contact_phone': self.SSA_BSO_CONFIG['contact_phone'],
+            'contact_email': self.SSA_BSO_CONFIG['contact_email'],
+        }
+        errors = []
+        writer = EFW2Writer(directory, submitter, tax_year)
+        try:
+            writer.begin_employer(w3_form)
+            for number, w2 in enumerate(w2_forms, start=1):
+                try:
+                    # After the first error keep validating, but stop writing
+                    if errors:
+                        writer.validate_w2(w2)
+                    else:
+                        writer.write_w2(w2)
+                except ValueError as e:
+                    if len(errors) < MAX_VALIDATION_ERRORS:
+                        errors.append(f"W-2 {number}: {e}")
+            summary = writer.close()
+        except ValueError as e:
+            writer.abort()
+            errors.append(str(e))
+        
+        if not errors:
+            errors = self._validate_w2_w3(summary['totals'], w3_form)['errors']
+        if errors or not writer.employee_count:
+            shutil.rmtree(directory, ignore_errors=True)
+            return {'errors': errors or ['No W-2 forms to file'], 'files': [], 'employee_count': 0, 'totals': {}}
+        return {'errors': [], **summary}
+    
+    def _submit_to_ssa_bso(self, efw2_files: List[str]) -> Dict:
+        """Submit files to SSA BSO."""
         try:
-            # In production, upload via SSA BSO web interface or API
+            # In production, upload each file via SSA BSO web interface or API
             return {
                 'success': True,
                 'confirmation_number': f"SSA-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}",
-                'message': 'Successfully submitted to SSA BSO'
+                'message': f'Successfully submitted {len(efw2_files)} file(s) to SSA BSO'
             }
         except Exception as e:
             return {'success': False, 'error': str(e)}
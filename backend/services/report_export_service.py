@@ -0,0 +1,406 @@
+"""
+SAURELLIUS REPORT EXPORT SERVICE
+Streaming CSV, XLSX and JSON-lines exports straight from database cursors
+Rows are rendered as they are fetched so large exports run in constant memory
+"""
+
+import csv
+import io
+import json
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+from models import (
+    db, Paycheck, PayrollRun, TaxLiability, GLJournalEntry, GLJournalLine
+)
+
+
+# Bytes buffered before a chunk is handed to the response / file
+CHUNK_SIZE = 64 * 1024
+# Rows fetched per round trip from the server-side cursor
+FETCH_SIZE = 1000
+
+FORMAT_ALIASES = {"excel": "xlsx", "json": "jsonl"}
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _stream_query(query) -> Iterator:
+    """Iterate a query through a server-side cursor, FETCH_SIZE rows at a time"""
+    return iter(query.execution_options(stream_results=True).yield_per(FETCH_SIZE))
+
+
+# =============================================================================
+# FORMAT WRITERS
+# =============================================================================
+
+class _ChunkBuffer:
+    """Write-only sink that hands back accumulated bytes on drain()"""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self._parts.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        self.size = 0
+        return data
+
+
+def iter_csv(columns: Sequence[str], rows: Iterable[Sequence]) -> Iterator[bytes]:
+    """Render rows as CSV, yielding ~CHUNK_SIZE byte chunks"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([_cell(v) for v in row])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_jsonl(columns: Sequence[str], rows: Iterable[Sequence]) -> Iterator[bytes]:
+    """Render rows as JSON lines, one object per row"""
+    parts: List[str] = []
+    size = 0
+    for row in rows:
+        line = json.dumps({c: _cell(v) for c, v in zip(columns, row)}) + "\n"
+        parts.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield "".join(parts).encode("utf-8")
+            parts = []
+            size = 0
+    if parts:
+        yield "".join(parts).encode("utf-8")
+
+
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+def _xlsx_row(values: Sequence) -> str:
+    cells = []
+    for value in values:
+        value = _cell(value)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            cells.append(f'<c t="inlineStr"><is><t>{escape(str(value))}</t></is></c>')
+        else:
+            cells.append(f'<c><v>{value}</v></c>')
+    return f'<row>{"".join(cells)}</row>'
+
+
+def iter_xlsx(columns: Sequence[str], rows: Iterable[Sequence],
+              sheet_name: str = "Report") -> Iterator[bytes]:
+    """
+    Render rows as a single-sheet XLSX workbook.
+    Cells use inline strings (no shared string table) and the zip is written
+    with data descriptors, so nothing but the current chunk is held in memory.
+    """
+    sink = _ChunkBuffer()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _XLSX_CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _XLSX_ROOT_RELS)
+        archive.writestr("xl/workbook.xml", _XLSX_WORKBOOK.format(name=escape(sheet_name[:31])))
+        archive.writestr("xl/_rels/workbook.xml.rels", _XLSX_WORKBOOK_RELS)
+        yield sink.drain()
+
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b'<sheetData>'
+            )
+            sheet.write(_xlsx_row(columns).encode("utf-8"))
+            for row in rows:
+                sheet.write(_xlsx_row(row).encode("utf-8"))
+                if sink.size >= CHUNK_SIZE:
+                    yield sink.drain()
+            sheet.write(b'</sheetData></worksheet>')
+    yield sink.drain()
+
+
+EXPORT_FORMATS: Dict[str, Tuple[Callable, str, str]] = {
+    "csv": (iter_csv, "text/csv", "csv"),
+    "xlsx": (iter_xlsx, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+    "jsonl": (iter_jsonl, "application/x-ndjson", "jsonl"),
+}
+
+
+def _writer_for(fmt: str) -> Tuple[Callable, str, str]:
+    fmt = FORMAT_ALIASES.get(fmt, fmt)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    return EXPORT_FORMATS[fmt]
+
+
+# =============================================================================
+# EXPORT SERVICE
+# =============================================================================
+
+class ReportExportService:
+    """
+    Row generators for the large payroll reports plus the format writers.
+
+    stream() returns a byte-chunk generator; nothing is fetched until the
+    consumer pulls the first chunk, and the next cursor batch is only read
+    once the previous chunk has been taken, so a slow client throttles the
+    database read instead of filling memory.
+    """
+
+    DATASETS = {
+        "payroll_register": (
+            "payroll_register_rows",
+            ["payroll_run_id", "pay_date", "employee_id", "employee_name", "department",
+             "regular_hours", "overtime_hours", "gross_pay", "federal_tax", "state_tax",
+             "social_security", "medicare", "total_taxes", "health_insurance",
+             "retirement_401k", "total_deductions", "net_pay", "payment_method"],
+        ),
+        "tax_liability": (
+            "tax_liability_rows",
+            ["liability_date", "due_date", "payroll_run_id", "tax_type", "jurisdiction",
+             "employee_amount", "employer_amount", "total_amount", "status",
+             "deposit_confirmation"],
+        ),
+        "labor_cost": (
+            "labor_cost_rows",
+            ["payroll_run_id", "pay_date", "pay_type", "employee_count", "gross_pay",
+             "employer_social_security", "employer_medicare", "futa", "suta",
+             "employer_taxes", "total_labor_cost"],
+        ),
+        "employee_earnings": (
+            "employee_earnings_rows",
+            ["employee_id", "employee_name", "pay_date", "regular_pay", "overtime_pay",
+             "bonus", "commission", "gross_pay", "federal_tax", "state_tax",
+             "social_security", "medicare", "net_pay", "ytd_gross", "ytd_net"],
+        ),
+        "journal_lines": (
+            "journal_line_rows",
+            ["entry_date", "entry_number", "reference", "source", "description",
+             "account_code", "debit", "credit", "memo"],
+        ),
+    }
+
+    # -------------------------------------------------------------------------
+    # Row sources
+    # -------------------------------------------------------------------------
+
+    def payroll_register_rows(self, company_id, start_date: Optional[date] = None,
+                              end_date: Optional[date] = None,
+                              payroll_run_id: Optional[str] = None, **_) -> Iterator[tuple]:
+        query = Paycheck.query.filter(Paycheck.company_id == company_id)
+        if payroll_run_id:
+            query = query.filter(Paycheck.payroll_run_id == payroll_run_id)
+        if start_date:
+            query = query.filter(Paycheck.pay_date >= start_date)
+        if end_date:
+            query = query.filter(Paycheck.pay_date <= end_date)
+
+        for check in _stream_query(query.order_by(Paycheck.pay_date, Paycheck.employee_id)):
+            earnings = check.earnings or {}
+            taxes = check.taxes or {}
+            deductions = check.deductions or {}
+            yield (
+                check.payroll_run_id, check.pay_date, check.employee_id, check.employee_name,
+                check.department, earnings.get("regular_hours", 0),
+                earnings.get("overtime_hours", 0), check.gross_pay,
+                taxes.get("federal", 0), taxes.get("state", 0),
+                taxes.get("social_security", 0), taxes.get("medicare", 0), check.total_taxes,
+                deductions.get("health_insurance", 0), deductions.get("retirement_401k", 0),
+                check.total_deductions, check.net_pay, check.payment_method,
+            )
+
+    def tax_liability_rows(self, company_id, start_date: Optional[date] = None,
+                           end_date: Optional[date] = None, **_) -> Iterator[tuple]:
+        query = db.session.query(
+            TaxLiability.liability_date, TaxLiability.due_date, TaxLiability.payroll_run_id,
+            TaxLiability.tax_type, TaxLiability.jurisdiction, TaxLiability.employee_amount,
+            TaxLiability.employer_amount, TaxLiability.total_amount, TaxLiability.status,
+            TaxLiability.deposit_confirmation
+        ).filter(TaxLiability.company_id == company_id)
+        if start_date:
+            query = query.filter(TaxLiability.liability_date >= start_date)
+        if end_date:
+            query = query.filter(TaxLiability.liability_date <= end_date)
+
+        for row in _stream_query(query.order_by(TaxLiability.liability_date, TaxLiability.id)):
+            yield tuple(row)
+
+    def labor_cost_rows(self, company_id, start_date: Optional[date] = None,
+                        end_date: Optional[date] = None, **_) -> Iterator[tuple]:
+        query = db.session.query(
+            PayrollRun.id, PayrollRun.pay_date, PayrollRun.pay_type, PayrollRun.employee_count,
+            PayrollRun.gross_pay, PayrollRun.employer_ss, PayrollRun.employer_medicare,
+            PayrollRun.futa, PayrollRun.suta, PayrollRun.employer_taxes, PayrollRun.total_cost
+        ).filter(
+            PayrollRun.company_id == company_id,
+            PayrollRun.status != "cancelled"
+        )
+        if start_date:
+            query = query.filter(PayrollRun.pay_date >= start_date)
+        if end_date:
+            query = query.filter(PayrollRun.pay_date <= end_date)
+
+        for row in _stream_query(query.order_by(PayrollRun.pay_date)):
+            yield tuple(row)
+
+    def employee_earnings_rows(self, company_id, start_date: Optional[date] = None,
+                               end_date: Optional[date] = None,
+                               employee_id: Optional[int] = None, **_) -> Iterator[tuple]:
+        query = Paycheck.query.filter(Paycheck.company_id == company_id)
+        if employee_id:
+            query = query.filter(Paycheck.employee_id == employee_id)
+        if start_date:
+            query = query.filter(Paycheck.pay_date >= start_date)
+        if end_date:
+            query = query.filter(Paycheck.pay_date <= end_date)
+
+        for check in _stream_query(query.order_by(Paycheck.employee_id, Paycheck.pay_date)):
+            earnings = check.earnings or {}
+            taxes = check.taxes or {}
+            yield (
+                check.employee_id, check.employee_name, check.pay_date,
+                earnings.get("regular_pay", 0), earnings.get("overtime_pay", 0),
+                earnings.get("bonus", 0), earnings.get("commission", 0), check.gross_pay,
+                taxes.get("federal", 0), taxes.get("state", 0),
+                taxes.get("social_security", 0), taxes.get("medicare", 0),
+                check.net_pay, check.ytd_gross, check.ytd_net,
+            )
+
+    def journal_line_rows(self, company_id, start_date: Optional[date] = None,
+                          end_date: Optional[date] = None,
+                          account_code: Optional[str] = None, **_) -> Iterator[tuple]:
+        query = db.session.query(
+            GLJournalLine.entry_date, GLJournalEntry.entry_number, GLJournalEntry.reference,
+            GLJournalEntry.source, GLJournalEntry.description, GLJournalLine.account_code,
+            GLJournalLine.debit, GLJournalLine.credit, GLJournalLine.memo
+        ).join(GLJournalEntry, GLJournalEntry.id == GLJournalLine.entry_id).filter(
+            GLJournalLine.company_id == str(company_id)
+        )
+        if account_code:
+            query = query.filter(GLJournalLine.account_code == account_code)
+        if start_date:
+            query = query.filter(GLJournalLine.entry_date >= start_date)
+        if end_date:
+            query = query.filter(GLJournalLine.entry_date <= end_date)
+
+        for row in _stream_query(query.order_by(GLJournalLine.entry_date, GLJournalLine.id)):
+            yield tuple(row)
+
+    @staticmethod
+    def report_rows(report: dict) -> Tuple[List[str], Iterator[tuple]]:
+        """
+        Flatten a generated report dict: its detail list when it has one
+        (entries, employees, departments), otherwise dotted key/value pairs.
+        """
+        for key in ("entries", "employees", "departments"):
+            records = report.get(key)
+            if records:
+                columns = list(records[0].keys())
+                return columns, (tuple(r.get(c) for c in columns) for r in records)
+
+        def flatten(value, prefix=""):
+            if isinstance(value, dict):
+                for k, v in value.items():
+                    yield from flatten(v, f"{prefix}{k}.")
+            elif isinstance(value, list):
+                yield prefix.rstrip("."), json.dumps(value)
+            else:
+                yield prefix.rstrip("."), value
+
+        return ["field", "value"], flatten(report)
+
+    # -------------------------------------------------------------------------
+    # Output
+    # -------------------------------------------------------------------------
+
+    def stream(self, dataset: str, fmt: str, company_id, **filters) -> Tuple[Iterator[bytes], str, str]:
+        """Byte-chunk generator, mimetype and filename for a dataset export"""
+        if dataset not in self.DATASETS:
+            raise ValueError(f"Unknown export dataset: {dataset}")
+        if company_id in (None, ""):
+            raise ValueError("company_id is required")
+        writer, mimetype, extension = _writer_for(fmt)
+
+        method, columns = self.DATASETS[dataset]
+        rows = getattr(self, method)(company_id, **filters)
+        filename = f"{dataset}_{date.today().isoformat()}.{extension}"
+        if writer is iter_xlsx:
+            return writer(columns, rows, sheet_name=dataset), mimetype, filename
+        return writer(columns, rows), mimetype, filename
+
+    def stream_report(self, report: dict, fmt: str) -> Tuple[Iterator[bytes], str, str]:
+        """Byte-chunk generator, mimetype and filename for a generated report"""
+        writer, mimetype, extension = _writer_for(fmt)
+        columns, rows = self.report_rows(report)
+        filename = f"{report['report_type']}_{report['id'][:8]}.{extension}"
+        return writer(columns, rows), mimetype, filename
+
+    def write_to_file(self, path: str, dataset: str, fmt: str, company_id, **filters) -> dict:
+        """Export a dataset to a file on disk, chunk by chunk"""
+        chunks, mimetype, _ = self.stream(dataset, fmt, company_id, **filters)
+        size = 0
+        with open(path, "wb") as fh:
+            for chunk in chunks:
+                fh.write(chunk)
+                size += len(chunk)
+        return {"path": path, "dataset": dataset, "mimetype": mimetype, "bytes": size}
+
+
+# Singleton instance
+report_export_service = ReportExportService()
@@ -7,9 +7,18 @@ from datetime import datetime, date, timedelta
 from decimal import Decimal, ROUND_HALF_UP
 from typing import Dict, List, Optional, Tuple
 from enum import Enum
+from collections import OrderedDict
 import uuid
 
 
+# Generated reports kept in process for get_report/export; oldest evicted first
+MAX_RETAINED_REPORTS = 200
+
+
+def _percent_change(current: float, previous: float) -> float:
+    return round((current - previous) / previous * 100, 2) if previous else 0
+
+
 class ReportType(Enum):
     PAYROLL_SUMMARY = "payroll_summary"
     PAYROLL_REGISTER = "payroll_register"
@@ -42,14 +51,50 @@ class SaurelliusReporting:
     
     def __init__(self, company_id: str):
         self.company_id = company_id
-        self.generated_reports: List[dict] = []
+        self.generated_reports: "OrderedDict[str, dict]" = OrderedDict()
         self.scheduled_reports: List[dict] = []
         self.saved_report_configs: Dict[str, dict] = {}
     
+    def _payroll_rows_from_facts(self, company_id: str, start_date: date, end_date: date) -> List[dict]:
+        """One pre-aggregated row per pay type, shaped like caller payroll_data"""
+        from services.payroll_fact_service import payroll_facts
+        
+        return [
+            {
+                "pay_type": pay_type,
+                "employee_count": row["employee_count"],
+                "gross_pay": row["gross_pay"],
+                "total_taxes": row["total_taxes"],
+                "total_deductions": row["total_deductions"],
+                "net_pay": row["net_pay"],
+                "employer_taxes": row["employer_taxes"],
+                "payroll_runs": row["payroll_run_count"]
+            }
+            for pay_type, row in payroll_facts.totals(
+                company_id, start_date, end_date, by="pay_type"
+            ).items()
+        ]
+    
+    def _retain(self, report: dict):
+        """Keep a generated report, evicting the oldest beyond MAX_RETAINED_REPORTS"""
+        self.generated_reports[report["id"]] = report
+        while len(self.generated_reports) > MAX_RETAINED_REPORTS:
+            self.generated_reports.popitem(last=False)
+    
     def generate_payroll_summary(self, start_date: date, end_date: date,
-                                 payroll_data: List[dict]) -> dict:
-        """Generate payroll summary report"""
+                                 payroll_data: Optional[List[dict]] = None,
+                                 company_id: Optional[str] = None) -> dict:
+        """Generate payroll summary report (from the payroll fact cubes if no data given)"""
+        from services.payroll_fact_service import payroll_facts
+        
         report_id = str(uuid.uuid4())
+        company_id = str(company_id or self.company_id)
+        headcount = None
+        
+        if payroll_data is None:
+            payroll_data = self._payroll_rows_from_facts(company_id, start_date, end_date)
+            # Employees paid under several pay types count once
+            headcount = payroll_facts.headcount_by(company_id, start_date, end_date).get("", 0)
         
         # Aggregate data
         total_gross = Decimal("0.00")
@@ -64,7 +109,7 @@ class SaurelliusReporting:
         by_department = {}
         
         for payroll in payroll_data:
-            payroll_count += 1
+            payroll_count += payroll.get("payroll_runs", 1)
             employee_count += payroll.get("employee_count", 0)
             
             total_gross += Decimal(str(payroll.get("gross_pay", 0)))
@@ -79,10 +124,13 @@ class SaurelliusReporting:
                 by_pay_type[pay_type] = Decimal("0.00")
             by_pay_type[pay_type] += Decimal(str(payroll.get("gross_pay", 0)))
         
+        if headcount is not None:
+            employee_count = headcount
+        
         report = {
             "id": report_id,
             "report_type": ReportType.PAYROLL_SUMMARY.value,
-            "company_id": self.company_id,
+            "company_id": company_id,
             "period": {
                 "start": start_date.isoformat(),
                 "end": end_date.isoformat()
@@ -101,7 +149,7 @@ class SaurelliusReporting:
             "generated_at": datetime.now().isoformat()
         }
         
-        self.generated_reports.append(report)
+        self._retain(report)
         return report
     
     def generate_payroll_register(self, payroll_run_id: str,
@@ -159,7 +207,7 @@ class SaurelliusReporting:
             "generated_at": datetime.now().isoformat()
         }
         
-        self.generated_reports.append(report)
+        self._retain(report)
         return report
     
     def generate_tax_liability_report(self, quarter: int, year: int,
@@ -201,7 +249,7 @@ class SaurelliusReporting:
             "generated_at": datetime.now().isoformat()
         }
         
-        self.generated_reports.append(report)
+        self._retain(report)
         return report
     
     def _get_941_due_date(self, year: int, quarter: int) -> str:
@@ -265,21 +313,35 @@ class SaurelliusReporting:
             "generated_at": datetime.now().isoformat()
         }
         
-        self.generated_reports.append(report)
+        self._retain(report)
         return report
     
     def generate_department_summary(self, start_date: date, end_date: date,
-                                   department_data: Dict[str, List[dict]]) -> dict:
-        """Generate department-level payroll summary"""
+                                   department_data: Optional[Dict[str, List[dict]]] = None,
+                                   company_id: Optional[str] = None) -> dict:
+        """Generate department-level payroll summary (from the payroll fact cubes if no data given)"""
+        from services.payroll_fact_service import payroll_facts
+        
         report_id = str(uuid.uuid4())
+        company_id = str(company_id or self.company_id)
+        
+        if department_data is None:
+            dept_rows = [
+                (dept_name or "Unassigned", Decimal(str(row["gross_pay"])), row["employee_count"])
+                for dept_name, row in payroll_facts.totals(
+                    company_id, start_date, end_date, by="department"
+                ).items()
+            ]
+        else:
+            dept_rows = [
+                (dept_name, sum(Decimal(str(e.get("gross_pay", 0))) for e in employees), len(employees))
+                for dept_name, employees in department_data.items()
+            ]
         
         departments = []
         grand_total = Decimal("0.00")
         
-        for dept_name, employees in department_data.items():
-            dept_total = sum(Decimal(str(e.get("gross_pay", 0))) for e in employees)
-            dept_headcount = len(employees)
-            
+        for dept_name, dept_total, dept_headcount in dept_rows:
             departments.append({
                 "department": dept_name,
                 "headcount": dept_headcount,
@@ -297,7 +359,7 @@ class SaurelliusReporting:
         report = {
             "id": report_id,
             "report_type": ReportType.DEPARTMENT_SUMMARY.value,
-            "company_id": self.company_id,
+            "company_id": company_id,
             "period": {
                 "start": start_date.isoformat(),
                 "end": end_date.isoformat()
@@ -308,18 +370,23 @@ class SaurelliusReporting:
             "generated_at": datetime.now().isoformat()
         }
         
-        self.generated_reports.append(report)
+        self._retain(report)
         return report
     
     def generate_labor_cost_report(self, start_date: date, end_date: date,
-                                  labor_data: dict) -> dict:
-        """Generate labor cost analysis report"""
+                                  labor_data: Optional[dict] = None,
+                                  company_id: Optional[str] = None) -> dict:
+        """Generate labor cost analysis report (from the payroll fact cubes if no data given)"""
         report_id = str(uuid.uuid4())
+        company_id = str(company_id or self.company_id)
+        
+        if labor_data is None:
+            labor_data = self._labor_data_from_facts(company_id, start_date, end_date)
         
         report = {
             "id": report_id,
             "report_type": ReportType.LABOR_COST.value,
-            "company_id": self.company_id,
+            "company_id": company_id,
             "period": {
                 "start": start_date.isoformat(),
                 "end": end_date.isoformat()
@@ -352,7 +419,7 @@ class SaurelliusReporting:
             "generated_at": datetime.now().isoformat()
         }
         
-        self.generated_reports.append(report)
+        self._retain(report)
         return report
     
     def generate_pto_balance_report(self, as_of_date: date,
@@ -399,30 +466,69 @@ class SaurelliusReporting:
             "generated_at": datetime.now().isoformat()
         }
         
-        self.generated_reports.append(report)
+        self._retain(report)
         return report
     
-    def generate_analytics_dashboard(self, year: int) -> dict:
-        """Generate analytics dashboard data"""
-        # This would aggregate data from various sources
+    def _labor_data_from_facts(self, company_id: str, start_date: date, end_date: date) -> dict:
+        """Labor cost inputs from the fact cubes, compared with the preceding period"""
+        from services.payroll_fact_service import payroll_facts
+        
+        current = payroll_facts.totals(company_id, start_date, end_date).get("")
+        if not current:
+            return {}
+        
+        prior_end = start_date - timedelta(days=1)
+        prior_start = prior_end - (end_date - start_date)
+        prior = payroll_facts.totals(company_id, prior_start, prior_end).get("")
+        
+        hours = current["regular_hours"] + current["overtime_hours"]
         return {
-            "company_id": self.company_id,
+            "wages": round(current["regular_pay"] + current["other_earnings"], 2),
+            "overtime": current["overtime_pay"],
+            "bonuses": current["bonus"],
+            "commissions": current["commission"],
+            "total_direct": current["gross_pay"],
+            "fica_match": round(current["employer_social_security"] + current["employer_medicare"], 2),
+            "futa": current["futa"],
+            "suta": current["suta"],
+            "total_employer": current["employer_taxes"],
+            "total_labor_cost": current["total_cost"],
+            "per_employee_avg": round(current["total_cost"] / current["employee_count"], 2) if current["employee_count"] else 0,
+            "cost_per_hour": round(current["total_cost"] / hours, 2) if hours else 0,
+            "vs_prior_period": _percent_change(current["total_cost"], prior["total_cost"] if prior else 0)
+        }
+    
+    def generate_analytics_dashboard(self, year: int, company_id: Optional[str] = None) -> dict:
+        """Generate analytics dashboard data from the monthly payroll cubes"""
+        from services.payroll_fact_service import payroll_facts
+        
+        company_id = str(company_id or self.company_id)
+        year_start, year_end = date(year, 1, 1), date(year, 12, 31)
+        ytd = payroll_facts.totals(company_id, year_start, year_end).get("") or {}
+        prior = payroll_facts.totals(company_id, date(year - 1, 1, 1), date(year - 1, 12, 31)).get("") or {}
+        monthly = payroll_facts.totals(company_id, year_start, year_end, by="month")
+        
+        gross = ytd.get("gross_pay", 0)
+        employees = payroll_facts.headcount_by(company_id, year_start, year_end).get("", 0)
+        
+        return {
+            "company_id": company_id,
             "year": year,
             "kpis": {
-                "total_payroll_ytd": 0,
-                "employee_count": 0,
-                "average_salary": 0,
+                "total_payroll_ytd": gross,
+                "employee_count": employees,
+                "average_salary": round(gross / employees, 2) if employees else 0,
                 "turnover_rate": 0,
-                "overtime_percentage": 0,
-                "benefits_cost_ratio": 0
+                "overtime_percentage": round(ytd["overtime_pay"] / gross * 100, 2) if gross else 0,
+                "benefits_cost_ratio": round(ytd["benefit_deductions"] / gross * 100, 2) if gross else 0
             },
             "trends": {
-                "monthly_payroll": [],
-                "headcount_trend": [],
-                "overtime_trend": []
+                "monthly_payroll": [{"month": m[:7], "gross_pay": r["gross_pay"]} for m, r in monthly.items()],
+                "headcount_trend": [{"month": m[:7], "employees": r["employee_count"]} for m, r in monthly.items()],
+                "overtime_trend": [{"month": m[:7], "overtime_pay": r["overtime_pay"]} for m, r in monthly.items()]
             },
             "comparisons": {
-                "vs_prior_year": 0,
+                "vs_prior_year": _percent_change(gross, prior.get("gross_pay", 0)),
                 "vs_budget": 0
             },
             "generated_at": datetime.now().isoformat()
@@ -476,11 +582,12 @@ class SaurelliusReporting:
     
     def export_report(self, report_id: str, format: str) -> dict:
         """Export report in specified format"""
-        report = next((r for r in self.generated_reports if r["id"] == report_id), None)
+        report = self.generated_reports.get(report_id)
         if not report:
             raise ValueError(f"Report {report_id} not found")
+        if format not in ("csv", "xlsx", "excel", "jsonl", "json"):
+            raise ValueError(f"Unsupported export format: {format}")
         
-        # In production, this would generate actual file
         return {
             "report_id": report_id,
             "format": format,
@@ -490,12 +597,12 @@ class SaurelliusReporting:
     
     def get_report(self, report_id: str) -> Optional[dict]:
         """Get report by ID"""
-        return next((r for r in self.generated_reports if r["id"] == report_id), None)
+        return self.generated_reports.get(report_id)
     
     def get_reports(self, report_type: Optional[str] = None,
                    start_date: Optional[date] = None) -> List[dict]:
         """Get reports with filters"""
-        reports = self.generated_reports.copy()
+        reports = list(self.generated_reports.values())
         
         if report_type:
             reports = [r for r in reports if r["report_type"] == report_type]
@@ -0,0 +1,146 @@
+"""
+RESPONSE CACHE
+Serialized, pre-compressed bodies for reference endpoints, keyed by route, params and data version
+Strong ETags let polling clients revalidate with If-None-Match and get a 304
+"""
+
+import gzip
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Optional, Union
+
+from flask import current_app, make_response, request
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+    logger.warning("Brotli response compression unavailable. Install with: pip install Brotli")
+
+MIN_COMPRESS_BYTES = 512
+
+
+class CachedBody:
+    """One response body in every encoding we serve, plus a strong ETag per encoding"""
+
+    __slots__ = ('mimetype', 'etag', 'encodings')
+
+    def __init__(self, body: bytes, mimetype: str):
+        self.mimetype = mimetype
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.encodings: Dict[str, bytes] = {'identity': body}
+        if len(body) >= MIN_COMPRESS_BYTES:
+            self.encodings['gzip'] = gzip.compress(body, compresslevel=9, mtime=0)
+            if HAS_BROTLI:
+                self.encodings['br'] = brotli.compress(body, quality=11)
+
+    def etag_for(self, encoding: str) -> str:
+        return self.etag if encoding == 'identity' else f"{self.etag}-{encoding}"
+
+    def respond(self, cache_control: str):
+        etags = [self.etag_for(encoding) for encoding in self.encodings]
+        encoding = request.accept_encodings.best_match(
+            [e for e in ('br', 'gzip') if e in self.encodings]
+        ) or 'identity'
+
+        if any(request.if_none_match.contains(etag) for etag in etags):
+            response = current_app.response_class(status=304)
+        else:
+            response = current_app.response_class(self.encodings[encoding], mimetype=self.mimetype)
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+
+        response.set_etag(self.etag_for(encoding))
+        response.headers['Cache-Control'] = cache_control
+        if len(self.encodings) > 1:
+            response.vary.add('Accept-Encoding')
+        return response
+
+
+class ResponseCache:
+    """Bounded LRU of CachedBody entries shared by every decorated view"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[tuple, CachedBody]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key: tuple) -> Optional[CachedBody]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return entry
+
+    def put(self, key: tuple, entry: CachedBody):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self, endpoint: Optional[str] = None):
+        with self._lock:
+            if endpoint is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == endpoint]:
+                    del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'not_modified': self.not_modified,
+            'brotli': HAS_BROTLI,
+        }
+
+
+# Singleton instance
+response_cache = ResponseCache()
+
+
+def cached_response(version: Union[str, Callable[[], Any], None] = None,
+                    cache_control: str = 'private, no-cache'):
+    """
+    Cache a view's successful JSON response. Place it below the auth decorator
+    so every request is still authenticated. `version` (a value or callable)
+    names the data the body depends on; a new version builds a new entry.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            data_version = version() if callable(version) else version
+            key = (
+                request.endpoint,
+                tuple(sorted(kwargs.items())),
+                tuple(sorted(request.args.items(multi=True))),
+                data_version,
+            )
+            entry = response_cache.get(key)
+            if entry is None:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200 or response.direct_passthrough or not response.is_json:
+                    return response
+                entry = CachedBody(response.get_data(), response.mimetype)
+                response_cache.put(key, entry)
+
+            response = entry.respond(cache_control)
+            if response.status_code == 304:
+                response_cache.not_modified += 1
+            return response
+        return decorated
+    return decorator
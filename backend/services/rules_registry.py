@@ -0,0 +1,199 @@
+"""
+RULES REGISTRY
+Effective-dated payroll rule sets loaded from the versioned JSON files in data/
+Each version is frozen once into a snapshot and found by date through an interval index
+"""
+
+import bisect
+import copy
+import hashlib
+import json
+import logging
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
+
+# Rule types whose fractional numbers are money or rates and load as Decimal
+DECIMAL_RULE_TYPES = {'state_payroll_rules'}
+
+METADATA_KEYS = ('schema_version', 'jurisdiction', 'rule_type', 'tax_year',
+                 'effective_start', 'effective_end', 'source', 'notes')
+
+
+class FrozenDict(dict):
+    """Read-only dict; still a dict so jsonify and isinstance checks keep working"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Rule snapshots are read-only")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _readonly
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return {k: copy.deepcopy(v, memo) for k, v in self.items()}
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+def freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Mutable deep copy of a frozen section"""
+    if isinstance(value, dict):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+def to_jsonable(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, dict):
+        return {k: to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    return value
+
+
+class RuleSnapshot:
+    """One immutable version of a rule set, with memoized derived payloads"""
+
+    def __init__(self, payload: Dict, source_file: str, digest: str = ''):
+        self.rule_type = payload['rule_type']
+        self.version = payload.get('tax_year') or payload['effective_start']
+        self.effective_start = date.fromisoformat(payload['effective_start'])
+        self.effective_end = (date.fromisoformat(payload['effective_end'])
+                              if payload.get('effective_end') else None)
+        self.source_file = source_file
+        self.digest = digest  # content hash; changes whenever the file does
+        self.data = freeze(payload)
+        self._derived = {}
+        self._lock = threading.Lock()
+
+    def section(self, name: str, default: Any = None) -> Any:
+        return self.data.get(name, default)
+
+    def rules(self) -> Dict:
+        """Rule sections without the file metadata"""
+        return {k: v for k, v in self.data.items() if k not in METADATA_KEYS}
+
+    def covers(self, on_date: date) -> bool:
+        return self.effective_start <= on_date and (self.effective_end is None or on_date <= self.effective_end)
+
+    def derived(self, key: str, builder: Callable[['RuleSnapshot'], Any]) -> Any:
+        """Build a value from this snapshot once; later calls return the same object"""
+        try:
+            return self._derived[key]
+        except KeyError:
+            pass
+        with self._lock:
+            if key not in self._derived:
+                self._derived[key] = builder(self)
+            return self._derived[key]
+
+    def serialized(self, key: str, builder: Callable[['RuleSnapshot'], Any]) -> Tuple[bytes, str]:
+        """JSON body and strong ETag for a payload built from this snapshot"""
+        def build(snapshot):
+            body = json.dumps(to_jsonable(builder(snapshot)), separators=(',', ':')).encode('utf-8')
+            return body, hashlib.sha256(body).hexdigest()[:32]
+        return self.derived(f"json:{key}", build)
+
+    def __repr__(self):
+        return f"<RuleSnapshot {self.rule_type} {self.version} {self.effective_start}..{self.effective_end or ''}>"
+
+
+class IntervalIndex:
+    """Versions sorted by effective start; a later start supersedes an open-ended earlier one"""
+
+    def __init__(self, snapshots: List[RuleSnapshot]):
+        self.snapshots = sorted(snapshots, key=lambda s: s.effective_start)
+        self.starts = [s.effective_start for s in self.snapshots]
+        for prev, nxt in zip(self.snapshots, self.snapshots[1:]):
+            if prev.effective_start == nxt.effective_start:
+                raise ValueError(f"{prev.source_file} and {nxt.source_file} start on the same date")
+
+    def find(self, on_date: date) -> Optional[RuleSnapshot]:
+        i = bisect.bisect_right(self.starts, on_date) - 1
+        if i < 0:
+            return None
+        snapshot = self.snapshots[i]
+        return snapshot if snapshot.covers(on_date) else None
+
+    def nearest(self, on_date: date) -> Optional[RuleSnapshot]:
+        """Covering version, else the latest one before the date, else the earliest"""
+        if not self.snapshots:
+            return None
+        i = bisect.bisect_right(self.starts, on_date) - 1
+        return self.snapshots[max(i, 0)]
+
+
+class RulesRegistry:
+    """Loads every versioned rule file once and answers lookups by rule type and date"""
+
+    def __init__(self, data_dir: Path = DATA_DIR):
+        self.data_dir = Path(data_dir)
+        self._indexes: Optional[Dict[str, IntervalIndex]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, IntervalIndex]:
+        grouped: Dict[str, List[RuleSnapshot]] = {}
+        for path in sorted(self.data_dir.glob('*.json')):
+            with open(path, 'r', encoding='utf-8') as f:
+                raw = f.read()
+            head = json.loads(raw)
+            if not isinstance(head, dict) or 'rule_type' not in head or 'effective_start' not in head:
+                continue
+            payload = (json.loads(raw, parse_float=Decimal)
+                       if head['rule_type'] in DECIMAL_RULE_TYPES else head)
+            digest = hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+            grouped.setdefault(head['rule_type'], []).append(RuleSnapshot(payload, path.name, digest))
+        logger.info(f"Loaded rule sets: {', '.join(f'{k} ({len(v)})' for k, v in sorted(grouped.items()))}")
+        return {rule_type: IntervalIndex(snapshots) for rule_type, snapshots in grouped.items()}
+
+    @property
+    def indexes(self) -> Dict[str, IntervalIndex]:
+        if self._indexes is None:
+            with self._lock:
+                if self._indexes is None:
+                    self._indexes = self._load()
+        return self._indexes
+
+    def reload(self):
+        """Re-read the data files; snapshots already handed out stay valid"""
+        indexes = self._load()
+        with self._lock:
+            self._indexes = indexes
+
+    def snapshot(self, rule_type: str, on_date: Optional[date] = None) -> RuleSnapshot:
+        """Version in effect on a date (today by default), or the closest one"""
+        index = self.indexes.get(rule_type)
+        if index is None:
+            raise LookupError(f"No rule files for {rule_type}")
+        if isinstance(on_date, datetime):
+            on_date = on_date.date()
+        on_date = on_date or date.today()
+        return index.find(on_date) or index.nearest(on_date)
+
+    def versions(self, rule_type: str) -> Tuple[RuleSnapshot, ...]:
+        index = self.indexes.get(rule_type)
+        return tuple(index.snapshots) if index else ()
+
+
+# Singleton instance
+rules_registry = RulesRegistry()
@@ -7,10 +7,13 @@ Uses Google Gemini with user-specific context and learning.
 import os
 import json
 import logging
+import threading
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Iterator, Tuple
 import uuid
 
+from flask import current_app
+
 logger = logging.getLogger(__name__)
 
 # Try to import Gemini
@@ -147,6 +150,18 @@ Be clear and step-by-step in explanations."""
             logger.error(f"Error generating content: {e}")
             return None
     
+    def _stream_content(self, prompt: str) -> Iterator[str]:
+        """Yield response text as the model produces it (the legacy API answers in one piece)"""
+        if self.use_legacy_api:
+            text = self._generate_content(prompt)
+            if text:
+                yield text
+            return
+        
+        for chunk in self.model.generate_content(prompt, stream=True):
+            if chunk.text:
+                yield chunk.text
+    
     def _build_system_prompt(self, user_context: dict, feature: str) -> str:
         """Build comprehensive system prompt with user context"""
         base_prompt = self.FEATURE_PROMPTS.get(feature, self.FEATURE_PROMPTS['general'])
@@ -177,7 +192,7 @@ LEARNING LEVEL: {profile.get('learning_level', 1)}/10 (How well you know this us
 
 REMEMBERED FACTS ABOUT USER:
 {self._format_memories(user_context.get('memories', []))}
-
+{self._format_related_conversations(user_context.get('related_conversations', []))}
 ACTIVE INSIGHTS TO CONSIDER:
 {self._format_insights(user_context.get('insights', []))}
 
@@ -197,6 +212,14 @@ INSTRUCTIONS:
         
         return "\n".join([f"- {m['key']}: {m['value']}" for m in memories[:10]])
     
+    def _format_related_conversations(self, turns: list) -> str:
+        """Format relevant turns from earlier sessions for prompt (omitted when there are none)"""
+        if not turns:
+            return ""
+        
+        lines = "\n".join([f"- {t['role'].upper()}: {t['message'][:300]}" for t in turns])
+        return f"\nRELEVANT PAST CONVERSATIONS:\n{lines}\n"
+    
     def _format_insights(self, insights: list) -> str:
         """Format insights for prompt"""
         if not insights:
@@ -206,8 +229,14 @@ INSTRUCTIONS:
     
     async def chat(self, user_id: int, message: str, feature: str = 'general',
                    session_id: str = None) -> dict:
+        """Chat with full context awareness (see chat_sync; nothing here awaits)"""
+        return self.chat_sync(user_id, message, feature, session_id)
+    
+    def chat_sync(self, user_id: int, message: str, feature: str = 'general',
+                  session_id: str = None) -> dict:
         """
-        Main chat interface with full context awareness.
+        Main chat method with full context awareness.
+        Returns the whole response once generation completes; see stream_chat.
         """
         if not self.initialized:
             return {
@@ -223,8 +252,8 @@ INSTRUCTIONS:
         if not session_id:
             session_id = str(uuid.uuid4())
         
-        # Build full context
-        context = memory.build_full_context(feature)
+        # Build full context, ranked against this message
+        context = memory.build_full_context(feature, query=message, session_id=session_id)
         
         # Log user message
         memory.log_conversation(
@@ -235,44 +264,16 @@ INSTRUCTIONS:
         )
         
         try:
-            # Build prompt with context
-            system_prompt = self._build_system_prompt(context, feature)
-            
             # Get conversation history for continuity
-            history = memory.get_conversation_history(session_id, limit=10)
-            history_text = "\n".join([
-                f"{m['role'].upper()}: {m['message']}" 
-                for m in history[:-1]  # Exclude current message
-            ]) if len(history) > 1 else ""
+            history = memory.get_conversation_history(session_id, limit=10)[:-1]  # Exclude current message
+            full_prompt = self._build_chat_prompt(context, feature, history, message)
             
-            # Build full prompt
-            full_prompt = f"""{system_prompt}
-
-CONVERSATION HISTORY:
-{history_text if history_text else "This is the start of the conversation."}
-
-USER MESSAGE: {message}
-
-Respond naturally and helpfully. If you learn something new about the user or their preferences, note it mentally for future reference."""
-
             # Generate response
             ai_response = self._generate_content(full_prompt)
             if not ai_response:
                 raise Exception("No response from AI")
             
-            # Log AI response
-            conv_id = memory.log_conversation(
-                session_id=session_id,
-                role='assistant',
-                message=ai_response,
-                context_type=feature
-            )
-            
-            # Learn from interaction
-            memory.learn_from_interaction(message, feature)
-            
-            # Extract and store any learnings
-            self._extract_learnings(memory, message, ai_response)
+            conv_id = self._finish_chat(memory, session_id, feature, message, ai_response)
             
             return {
                 'success': True,
@@ -294,17 +295,110 @@ Respond naturally and helpfully. If you learn something new about the user or th
                 'error': str(e)
             }
     
-    def chat_sync(self, user_id: int, message: str, feature: str = 'general',
-                  session_id: str = None) -> dict:
-        """Synchronous version of chat for non-async contexts"""
-        import asyncio
+    def stream_chat(self, user_id: int, message: str, feature: str = 'general',
+                    session_id: str = None) -> Iterator[Tuple[str, dict]]:
+        """
+        Chat as a stream of (event, data) pairs: 'start' straight away, a
+        'token' per model chunk as it arrives, then 'done' or 'error'.
+        Both turns are logged on a background thread once the stream closes,
+        including a partial answer when the client disconnects mid-stream.
+        """
+        session_id = session_id or str(uuid.uuid4())
+        yield 'start', {'session_id': session_id}
+        
+        if not self.initialized:
+            yield 'error', {
+                'message': "I apologize, but AI features are currently unavailable. Please try again later.",
+                'session_id': session_id
+            }
+            return
+        
+        app = current_app._get_current_object()
+        memory = get_ai_service(user_id)
+        parts = []
         try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+            context = memory.build_full_context(feature, query=message, session_id=session_id)
+            history = memory.get_conversation_history(session_id, limit=9)
+            full_prompt = self._build_chat_prompt(context, feature, history, message)
+            
+            for text in self._stream_content(full_prompt):
+                parts.append(text)
+                yield 'token', {'text': text}
+            if not parts:
+                raise Exception("No response from AI")
+            
+            yield 'done', {
+                'session_id': session_id,
+                'context': {
+                    'feature': feature,
+                    'learning_level': context['profile'].get('learning_level', 1)
+                }
+            }
+        except Exception as e:
+            logger.error(f"AI stream error: {e}")
+            yield 'error', {
+                'message': "I encountered an issue processing your request. Please try again.",
+                'session_id': session_id
+            }
+        finally:
+            self._log_chat_in_background(app, user_id, session_id, feature, message, ''.join(parts))
+    
+    def _build_chat_prompt(self, context: dict, feature: str, history: list, message: str) -> str:
+        """Full chat prompt: system prompt with context, prior turns of this session, the message"""
+        system_prompt = self._build_system_prompt(context, feature)
+        history_text = "\n".join([
+            f"{m['role'].upper()}: {m['message']}" 
+            for m in history
+        ])
+        
+        return f"""{system_prompt}
+
+CONVERSATION HISTORY:
+{history_text if history_text else "This is the start of the conversation."}
+
+USER MESSAGE: {message}
+
+Respond naturally and helpfully. If you learn something new about the user or their preferences, note it mentally for future reference."""
+    
+    def _finish_chat(self, memory: AIMemoryService, session_id: str, feature: str,
+                     message: str, ai_response: str) -> int:
+        """Log the AI response and learn from the exchange; returns the response's conversation id"""
+        conv_id = memory.log_conversation(
+            session_id=session_id,
+            role='assistant',
+            message=ai_response,
+            context_type=feature
+        )
+        
+        # Learn from interaction
+        memory.learn_from_interaction(message, feature)
+        
+        # Extract and store any learnings
+        self._extract_learnings(memory, message, ai_response)
+        return conv_id
+    
+    def _log_chat_in_background(self, app, user_id: int, session_id: str, feature: str,
+                                message: str, ai_response: str):
+        """Log a streamed exchange off the response path"""
+        def work():
+            with app.app_context():
+                try:
+                    memory = get_ai_service(user_id)
+                    memory.log_conversation(
+                        session_id=session_id,
+                        role='user',
+                        message=message,
+                        context_type=feature
+                    )
+                    if ai_response:
+                        self._finish_chat(memory, session_id, feature, message, ai_response)
+                except Exception as e:
+                    logger.error(f"AI stream logging error: {e}")
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
         
-        return loop.run_until_complete(self.chat(user_id, message, feature, session_id))
+        threading.Thread(target=work, daemon=True).start()
     
     def _extract_learnings(self, memory: AIMemoryService, message: str, response: str):
         """Extract learnable facts from conversation"""
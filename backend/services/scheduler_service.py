@@ -12,11 +12,23 @@ from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 import pytz
 
+from services.rules_registry import rules_registry, thaw
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger('SaurelliusScheduler')
 
 
+def _federal_rates(snapshot) -> Dict[str, Any]:
+    """Rates dict for one federal rules version; open-ended brackets use infinity"""
+    rates = thaw(snapshot.rules())
+    rates['federal_brackets'] = {
+        status: [(float('inf') if limit is None else limit, rate) for limit, rate in brackets]
+        for status, brackets in rates['federal_brackets'].items()
+    }
+    return rates
+
+
 class TaxUpdateScheduler:
     """
     Manages scheduled tax and compliance updates.
@@ -54,113 +66,10 @@ class TaxUpdateScheduler:
         }
         
         # Federal tax data by year (automatically applied on effective date)
+        # Loaded from data/federal_payroll_rates_*.json via the rules registry
         self.federal_rates_by_year = {
-            2025: {
-                'social_security_rate': 0.062,
-                'social_security_wage_base': 176100,
-                'medicare_rate': 0.0145,
-                'additional_medicare_rate': 0.009,
-                'additional_medicare_threshold': 200000,
-                'futa_rate': 0.006,
-                'futa_wage_base': 7000,
-                'federal_brackets': {
-                    'single': [
-                        (11925, 0.10),
-                        (48475, 0.12),
-                        (103350, 0.22),
-                        (197300, 0.24),
-                        (250525, 0.32),
-                        (626350, 0.35),
-                        (float('inf'), 0.37)
-                    ],
-                    'married_filing_jointly': [
-                        (23850, 0.10),
-                        (96950, 0.12),
-                        (206700, 0.22),
-                        (394600, 0.24),
-                        (501050, 0.32),
-                        (751600, 0.35),
-                        (float('inf'), 0.37)
-                    ],
-                    'married_filing_separately': [
-                        (11925, 0.10),
-                        (48475, 0.12),
-                        (103350, 0.22),
-                        (197300, 0.24),
-                        (250525, 0.32),
-                        (375800, 0.35),
-                        (float('inf'), 0.37)
-                    ],
-                    'head_of_household': [
-                        (17000, 0.10),
-                        (64850, 0.12),
-                        (103350, 0.22),
-                        (197300, 0.24),
-                        (250500, 0.32),
-                        (626350, 0.35),
-                        (float('inf'), 0.37)
-                    ]
-                },
-                'standard_deductions': {
-                    'single': 15000,
-                    'married_filing_jointly': 30000,
-                    'married_filing_separately': 15000,
-                    'head_of_household': 22500
-                }
-            },
-            2026: {
-                'social_security_rate': 0.062,
-                'social_security_wage_base': 181200,  # Projected increase
-                'medicare_rate': 0.0145,
-                'additional_medicare_rate': 0.009,
-                'additional_medicare_threshold': 200000,
-                'futa_rate': 0.006,
-                'futa_wage_base': 7000,
-                'federal_brackets': {
-                    'single': [
-                        (12300, 0.10),
-                        (50000, 0.12),
-                        (106500, 0.22),
-                        (203500, 0.24),
-                        (258500, 0.32),
-                        (645800, 0.35),
-                        (float('inf'), 0.37)
-                    ],
-                    'married_filing_jointly': [
-                        (24600, 0.10),
-                        (100000, 0.12),
-                        (213000, 0.22),
-                        (407000, 0.24),
-                        (517000, 0.32),
-                        (775200, 0.35),
-                        (float('inf'), 0.37)
-                    ],
-                    'married_filing_separately': [
-                        (12300, 0.10),
-                        (50000, 0.12),
-                        (106500, 0.22),
-                        (203500, 0.24),
-                        (258500, 0.32),
-                        (387600, 0.35),
-                        (float('inf'), 0.37)
-                    ],
-                    'head_of_household': [
-                        (17550, 0.10),
-                        (66900, 0.12),
-                        (106500, 0.22),
-                        (203500, 0.24),
-                        (258500, 0.32),
-                        (645800, 0.35),
-                        (float('inf'), 0.37)
-                    ]
-                },
-                'standard_deductions': {
-                    'single': 15500,
-                    'married_filing_jointly': 31000,
-                    'married_filing_separately': 15500,
-                    'head_of_household': 23250
-                }
-            }
+            snapshot.version: _federal_rates(snapshot)
+            for snapshot in rules_registry.versions('federal_payroll_rates')
         }
         
         # State rate changes with effective dates
@@ -564,4 +473,43 @@ def init_scheduler(app=None):
         tax_scheduler.start()
         logger.info("Tax Update Scheduler initialized and running")
     
+    if app is not None:
+        # Federal deposits - submit due EFTPS obligations each business morning
+        tax_scheduler.scheduler.add_job(
+            lambda: _submit_due_deposits(app),
+            CronTrigger(day_of_week='mon-fri', hour=6, minute=0),
+            id='daily_eftps_deposit_submission',
+            name='Daily EFTPS Deposit Submission',
+            replace_existing=True
+        )
+        
+        # Usage metering - start a new paystub month for users whose cycle has elapsed
+        tax_scheduler.scheduler.add_job(
+            lambda: _rollover_monthly_usage(app),
+            CronTrigger(hour=0, minute=5),
+            id='daily_usage_rollover',
+            name='Daily Monthly-Usage Rollover',
+            replace_existing=True
+        )
+    
     return tax_scheduler
+
+
+def _submit_due_deposits(app):
+    """Run the deposit queue inside an application context"""
+    from services.deposit_scheduler_service import deposit_scheduler
+    
+    with app.app_context():
+        result = deposit_scheduler.submit_due()
+        logger.info(f"EFTPS deposit queue: {result['submitted']} submitted, {result['failed']} failed")
+
+
+def _rollover_monthly_usage(app):
+    """Reset monthly paystub counters for elapsed billing cycles inside an application context"""
+    from billing import BillingManager
+    from models import db
+    
+    with app.app_context():
+        rolled_over = BillingManager.rollover_monthly_usage()
+        db.session.commit()
+        logger.info(f"Monthly usage rollover: {rolled_over} users started a new cycle")
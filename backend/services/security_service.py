@@ -12,11 +12,11 @@ import secrets
 import uuid
 import json
 from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import base64
 import os
 
+from services.credential_hasher import credential_hasher
+
 
 class SecurityService:
     """
@@ -237,13 +237,9 @@ class SecurityService:
         if salt is None:
             salt = secrets.token_bytes(32)
         
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=600000,  # OWASP recommended minimum
-        )
-        key = base64.b64encode(kdf.derive(password.encode())).decode()
+        # OWASP recommended minimum; runs on the credential-hashing pool
+        derived = credential_hasher.pbkdf2_sha256(password, salt, 600000)
+        key = base64.b64encode(derived).decode()
         salt_b64 = base64.b64encode(salt).decode()
         
         return key, salt_b64
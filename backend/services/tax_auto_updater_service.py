@@ -243,50 +243,36 @@ class TaxAutoUpdaterService:
         }
     
     def _get_default_state_rates(self) -> Dict[str, Any]:
-        """Get default state tax rates."""
-        return {
-            'CA': {'rate_type': 'progressive', 'brackets': [
-                {'min': 0, 'max': 10756, 'rate': 0.01},
-                {'min': 10756, 'max': 25499, 'rate': 0.02},
-                {'min': 25499, 'max': 40245, 'rate': 0.04},
-                {'min': 40245, 'max': 55866, 'rate': 0.06},
-                {'min': 55866, 'max': 70606, 'rate': 0.08},
-                {'min': 70606, 'max': 360659, 'rate': 0.093},
-                {'min': 360659, 'max': 432787, 'rate': 0.103},
-                {'min': 432787, 'max': 721314, 'rate': 0.113},
-                {'min': 721314, 'max': float('inf'), 'rate': 0.123}
-            ], 'sdi_rate': 0.012, 'sdi_wage_base': 173228, 'sui_rate': 0.034},
-            'NY': {'rate_type': 'progressive', 'brackets': [
-                {'min': 0, 'max': 8500, 'rate': 0.04},
-                {'min': 8500, 'max': 11700, 'rate': 0.045},
-                {'min': 11700, 'max': 13900, 'rate': 0.0525},
-                {'min': 13900, 'max': 80650, 'rate': 0.055},
-                {'min': 80650, 'max': 215400, 'rate': 0.06},
-                {'min': 215400, 'max': 1077550, 'rate': 0.0685},
-                {'min': 1077550, 'max': 5000000, 'rate': 0.0965},
-                {'min': 5000000, 'max': 25000000, 'rate': 0.103},
-                {'min': 25000000, 'max': float('inf'), 'rate': 0.109}
-            ]},
-            'TX': {'rate_type': 'none', 'rate': 0},
-            'FL': {'rate_type': 'none', 'rate': 0},
-            'WA': {'rate_type': 'none', 'rate': 0},
-            'NV': {'rate_type': 'none', 'rate': 0},
-            'AK': {'rate_type': 'none', 'rate': 0},
-            'SD': {'rate_type': 'none', 'rate': 0},
-            'WY': {'rate_type': 'none', 'rate': 0},
-            'TN': {'rate_type': 'none', 'rate': 0},
-            'NH': {'rate_type': 'none', 'rate': 0},
-            'IL': {'rate_type': 'flat', 'rate': 0.0495},
-            'PA': {'rate_type': 'flat', 'rate': 0.0307},
-            'MI': {'rate_type': 'flat', 'rate': 0.0425},
-            'IN': {'rate_type': 'flat', 'rate': 0.0305},
-            'NC': {'rate_type': 'flat', 'rate': 0.0475},
-            'MA': {'rate_type': 'flat', 'rate': 0.05, 'millionaire_rate': 0.09},
-            'CO': {'rate_type': 'flat', 'rate': 0.044},
-            'UT': {'rate_type': 'flat', 'rate': 0.0465},
-            'AZ': {'rate_type': 'flat', 'rate': 0.025},
-            'KY': {'rate_type': 'flat', 'rate': 0.04}
-        }
+        """Get default state tax rates from the current state rules version."""
+        from services.rules_registry import rules_registry
+        from services.state_payroll_rules import RULE_TYPE, STATE_CODES
+        
+        rules = rules_registry.snapshot(RULE_TYPE)
+        no_income_tax = rules.section('no_income_tax_states')
+        flat_tax = rules.section('flat_tax_states')
+        brackets = rules.section('income_tax_brackets')
+        extras = rules.section('income_tax_extras', {})
+        
+        rates = {}
+        for state in STATE_CODES:
+            if state in no_income_tax:
+                rates[state] = {'rate_type': 'none', 'rate': 0}
+            elif state in flat_tax:
+                rates[state] = {'rate_type': 'flat', 'rate': float(flat_tax[state])}
+            elif state in brackets:
+                rates[state] = {'rate_type': 'progressive', 'brackets': [
+                    {'min': b['min'], 'max': float('inf') if b['max'] is None else b['max'], 'rate': float(b['rate'])}
+                    for b in brackets[state]
+                ]}
+            else:
+                continue
+            sdi = rules.section('sdi').get(state)
+            if sdi:
+                rates[state]['sdi_rate'] = float(sdi['rate'])
+                if sdi['wage_base']:
+                    rates[state]['sdi_wage_base'] = float(sdi['wage_base'])
+            rates[state].update({k: float(v) for k, v in extras.get(state, {}).items()})
+        return rates
     
     def _get_default_province_rates(self) -> Dict[str, Any]:
         """Get default Canadian province tax rates."""
@@ -0,0 +1,41 @@
+"""
+TENANCY
+Which companies a signed-in user may act for: the companies they own, or any company for a platform admin
+"""
+
+from typing import Optional, Set
+
+from models import db, User, Company
+
+
+def company_scope(user_id) -> Optional[Set[int]]:
+    """Ids of the companies the user may act for; None means every company"""
+    user = User.query.get(int(user_id))
+    if user is None:
+        return set()
+    if user.is_admin:
+        return None
+    return {company_id for (company_id,) in
+            db.session.query(Company.id).filter(Company.user_id == user.id)}
+
+
+def resolve_company_id(user_id, requested=None) -> int:
+    """
+    The requested company if the user may act for it, otherwise the user's
+    own (first) company. Raises PermissionError for someone else's company
+    and ValueError when there is no company to use.
+    """
+    scope = company_scope(user_id)
+    if requested not in (None, ''):
+        try:
+            company_id = int(requested)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid company_id: {requested}")
+        if scope is not None and company_id not in scope:
+            raise PermissionError("Not authorized for this company")
+        return company_id
+
+    own = db.session.query(db.func.min(Company.id)).filter(Company.user_id == int(user_id)).scalar()
+    if own is None:
+        raise ValueError("No company found for this account")
+    return own
@@ -0,0 +1,344 @@
+"""
+SAURELLIUS TIME COMPLIANCE ENGINE
+Pay-period overtime and meal/rest break compliance for a whole company
+Daily, weekly, double-time and 7th consecutive day rules from StatePayrollRules
+"""
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from services.state_payroll_rules import StatePayrollRules
+
+
+# Below this many employees the process pool costs more than it saves
+PARALLEL_THRESHOLD = 250
+BATCH_SIZE = 200
+
+# Second meal period is a California-only requirement
+SECOND_MEAL_BREAK_HOURS = {'CA': 10}
+
+# States whose law pays a premium hour for a missed break (CA Labor Code 226.7);
+# elsewhere a missed break is a compliance violation with no pay remedy
+BREAK_PREMIUM_STATES = {'CA'}
+
+_MEAL_RULE = re.compile(r'^(\d+)_min_after_([\d.]+)_hours$')
+_REST_RULE = re.compile(r'^(\d+)_min_per_([\d.]+)_hours$')
+
+
+def _parse_break_rules(state: str) -> Optional[Dict]:
+    """Translate StatePayrollRules break strings into numeric thresholds."""
+    requirements = StatePayrollRules.get_break_requirements(state)
+    if not requirements:
+        return None
+
+    rules = {'meal_minutes': None, 'meal_after_hours': None,
+             'rest_minutes': None, 'rest_per_hours': None,
+             'second_meal_after_hours': SECOND_MEAL_BREAK_HOURS.get(state),
+             'premium_pay': state in BREAK_PREMIUM_STATES}
+
+    meal = _MEAL_RULE.match(requirements.get('meal_break') or '')
+    if meal:
+        rules['meal_minutes'] = int(meal.group(1))
+        rules['meal_after_hours'] = float(meal.group(2))
+
+    rest = _REST_RULE.match(requirements.get('rest_break') or '')
+    if rest:
+        rules['rest_minutes'] = int(rest.group(1))
+        rules['rest_per_hours'] = float(rest.group(2))
+
+    if rules['meal_after_hours'] is None and rules['rest_per_hours'] is None:
+        return None
+    return rules
+
+
+def _overtime_rules(state: str) -> Dict:
+    """Numeric overtime thresholds for a state."""
+    rule = StatePayrollRules.get_overtime_rule(state)
+    return {
+        'daily_ot_threshold': rule.get('threshold_daily'),
+        'daily_double_threshold': rule.get('double_time'),
+        'weekly_ot_threshold': rule.get('threshold_weekly') or 40,
+        'seventh_day_rule': bool(rule.get('seventh_day')),
+        'ot_multiplier': float(rule.get('rate', 1.5)),
+    }
+
+
+def _week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def calculate_employee_hours(entries: List[Dict], state: str) -> Dict:
+    """
+    Split one employee's time entries into regular/OT/double-time hours
+    and collect break violations.
+    """
+    rules = _overtime_rules(state)
+    break_rules = _parse_break_rules(state)
+    daily_ot = rules['daily_ot_threshold']
+    daily_dt = rules['daily_double_threshold']
+    weekly_ot = rules['weekly_ot_threshold']
+
+    weeks: Dict[str, Dict] = {}
+    violations: List[Dict] = []
+    premium_days: Dict[str, Dict[str, int]] = {}
+
+    for entry in entries:
+        day_key = entry['date']
+        week_key = _week_start(date.fromisoformat(day_key)).isoformat()
+        hours = entry.get('total_hours', 0) or 0
+
+        week = weeks.get(week_key)
+        if week is None:
+            week = weeks[week_key] = {
+                'days': {},
+                'total_hours': 0,
+                'regular_hours': 0,
+                'overtime_hours': 0,
+                'double_time_hours': 0,
+            }
+        day = week['days'].get(day_key)
+        if day is None:
+            day = week['days'][day_key] = {
+                'hours': 0, 'regular': 0, 'overtime': 0, 'double_time': 0,
+            }
+        day['hours'] += hours
+        week['total_hours'] += hours
+
+        if break_rules:
+            entry_violations = _check_breaks(entry, hours, break_rules)
+            if entry_violations:
+                violations.extend(entry_violations)
+                if not break_rules['premium_pay']:
+                    continue
+                kinds = premium_days.setdefault(day_key, {'meal': 0, 'rest': 0})
+                for v in entry_violations:
+                    kinds['rest' if v['violation_type'] == 'missing_rest_break' else 'meal'] = 1
+
+    total_regular = total_ot = total_dt = 0
+
+    for week in weeks.values():
+        days_worked = sorted(week['days'])
+        for i, day_key in enumerate(days_worked):
+            day = week['days'][day_key]
+            hours = day['hours']
+            regular = ot = dt = 0
+
+            # 7th consecutive day in the workweek: first 8 at 1.5x, rest at 2x
+            if rules['seventh_day_rule'] and i >= 6:
+                ot = min(hours, 8)
+                dt = max(hours - 8, 0)
+            elif daily_ot:
+                if hours <= daily_ot:
+                    regular = hours
+                elif daily_dt and hours > daily_dt:
+                    regular = daily_ot
+                    ot = daily_dt - daily_ot
+                    dt = hours - daily_dt
+                else:
+                    regular = daily_ot
+                    ot = hours - daily_ot
+            else:
+                regular = hours
+
+            day['regular'] = regular
+            day['overtime'] = ot
+            day['double_time'] = dt
+
+        if daily_ot:
+            week['regular_hours'] = sum(d['regular'] for d in week['days'].values())
+            week['overtime_hours'] = sum(d['overtime'] for d in week['days'].values())
+            week['double_time_hours'] = sum(d['double_time'] for d in week['days'].values())
+            if week['regular_hours'] > weekly_ot:
+                week['overtime_hours'] += week['regular_hours'] - weekly_ot
+                week['regular_hours'] = weekly_ot
+        else:
+            week['regular_hours'] = min(week['total_hours'], weekly_ot)
+            week['overtime_hours'] = max(week['total_hours'] - weekly_ot, 0)
+
+        total_regular += week['regular_hours']
+        total_ot += week['overtime_hours']
+        total_dt += week['double_time_hours']
+
+    # At most one meal and one rest premium hour per workday, in premium states only
+    premium_hours = sum(k['meal'] + k['rest'] for k in premium_days.values())
+
+    return {
+        'work_state': state,
+        'rules_applied': rules,
+        'hours': {
+            'regular': round(total_regular, 2),
+            'overtime': round(total_ot, 2),
+            'double_time': round(total_dt, 2),
+            'total': round(total_regular + total_ot + total_dt, 2),
+        },
+        'weeks_in_period': max(len(weeks), 1),
+        'weekly_breakdown': weeks,
+        'violations': violations,
+        'break_premium_hours': premium_hours,
+    }
+
+
+def _check_breaks(entry: Dict, hours: float, rules: Dict) -> List[Dict]:
+    """Meal/rest break violations for a single time entry."""
+    violations = []
+    breaks = entry.get('breaks', [])
+
+    def violation(kind: str, description: str, **extra) -> Dict:
+        record = {
+            'entry_id': entry.get('id'),
+            'employee_id': entry.get('employee_id'),
+            'date': entry['date'],
+            'violation_type': kind,
+            'hours_worked': hours,
+            'premium_eligible': rules['premium_pay'],
+            'penalty': ('One hour of pay at regular rate' if rules['premium_pay']
+                        else 'None; state requires the break but sets no premium pay'),
+            'description': description,
+        }
+        record.update(extra)
+        return record
+
+    if rules['meal_after_hours'] is not None and hours > rules['meal_after_hours']:
+        meal_breaks = [b for b in breaks
+                       if b.get('type') == 'meal'
+                       and b.get('duration_minutes', 0) >= rules['meal_minutes']]
+        if not meal_breaks:
+            violations.append(violation(
+                'missing_meal_break',
+                f"Worked over {rules['meal_after_hours']:g} hours without "
+                f"{rules['meal_minutes']}-minute meal break"
+            ))
+        second = rules['second_meal_after_hours']
+        if second and hours > second and len(meal_breaks) < 2:
+            violations.append(violation(
+                'missing_second_meal_break',
+                f"Worked over {second} hours without second "
+                f"{rules['meal_minutes']}-minute meal break"
+            ))
+
+    if rules['rest_per_hours']:
+        required = int(hours / rules['rest_per_hours'])
+        taken = sum(1 for b in breaks if b.get('type') == 'rest')
+        if taken < required:
+            violations.append(violation(
+                'missing_rest_break',
+                f'Required {required} rest breaks, only {taken} taken',
+                rest_periods_required=required,
+                rest_periods_taken=taken,
+            ))
+
+    return violations
+
+
+def _calculate_batch(batch: List[Tuple[str, str, List[Dict]]]) -> List[Tuple[str, Dict]]:
+    """Process-pool worker: calculate a slice of employees."""
+    return [(employee_id, calculate_employee_hours(entries, state))
+            for employee_id, state, entries in batch]
+
+
+class TimeComplianceEngine:
+    """
+    Bulk overtime and break-compliance calculation for a pay period.
+    Entries are grouped by employee in a single pass, then each employee is
+    calculated independently, across a process pool for large workforces.
+    """
+
+    def __init__(self, parallel_threshold: int = PARALLEL_THRESHOLD,
+                 batch_size: int = BATCH_SIZE, max_workers: Optional[int] = None):
+        self.parallel_threshold = parallel_threshold
+        self.batch_size = batch_size
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def group_entries(
+        self,
+        entries: Iterable[Dict],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        employee_ids: Optional[Iterable[str]] = None
+    ) -> Dict[str, List[Dict]]:
+        """Bucket time entries by employee, filtered to the period, sorted by date."""
+        wanted = set(employee_ids) if employee_ids is not None else None
+        grouped: Dict[str, List[Dict]] = {}
+        for entry in entries:
+            if start_date and entry['date'] < start_date:
+                continue
+            if end_date and entry['date'] > end_date:
+                continue
+            employee_id = entry['employee_id']
+            if wanted is not None and employee_id not in wanted:
+                continue
+            grouped.setdefault(employee_id, []).append(entry)
+        for employee_entries in grouped.values():
+            employee_entries.sort(key=lambda e: e['date'])
+        return grouped
+
+    def calculate_period(
+        self,
+        entries: Iterable[Dict],
+        start_date: date,
+        end_date: date,
+        employee_states: Optional[Dict[str, str]] = None,
+        default_state: str = 'DEFAULT'
+    ) -> Dict[str, Dict]:
+        """
+        Calculate hours and break violations for every employee with entries
+        in the period. `employee_states` maps employee_id to work state.
+        """
+        employee_states = employee_states or {}
+        grouped = self.group_entries(entries, start_date.isoformat(), end_date.isoformat())
+        work = [(emp_id, (employee_states.get(emp_id) or default_state).upper(), emp_entries)
+                for emp_id, emp_entries in grouped.items()]
+
+        if len(work) < self.parallel_threshold or self.max_workers < 2:
+            results = _calculate_batch(work)
+        else:
+            batches = [work[i:i + self.batch_size]
+                       for i in range(0, len(work), self.batch_size)]
+            results = []
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                for batch_result in pool.map(_calculate_batch, batches):
+                    results.extend(batch_result)
+
+        period = f'{start_date.isoformat()} to {end_date.isoformat()}'
+        calculated = {}
+        for employee_id, result in results:
+            result['employee_id'] = employee_id
+            result['period'] = period
+            calculated[employee_id] = result
+        return calculated
+
+    @staticmethod
+    def to_hours_data(result: Dict, extra: Optional[Dict] = None) -> Dict:
+        """Shape an employee result as `hours_data` for PayrollProcessingService."""
+        hours_data = {
+            'regular': result['hours']['regular'],
+            'overtime': result['hours']['overtime'],
+            'double_time': result['hours']['double_time'],
+            'break_premium': result['break_premium_hours'],
+            'weeks_in_period': result['weeks_in_period'],
+        }
+        if extra:
+            hours_data.update(extra)
+        return hours_data
+
+    @staticmethod
+    def summarize_violations(results: Dict[str, Dict]) -> Dict:
+        """
+        Flatten violations across employees for compliance reporting.
+        total_penalty_hours is the premium pay owed, not the violation count:
+        at most one meal and one rest hour per workday, and only in
+        BREAK_PREMIUM_STATES.
+        """
+        violations = [v for r in results.values() for v in r['violations']]
+        return {
+            'violations': violations,
+            'count': len(violations),
+            'total_penalty_hours': sum(r['break_premium_hours'] for r in results.values()),
+        }
+
+
+# Singleton instance
+time_compliance_engine = TimeComplianceEngine()
@@ -0,0 +1,376 @@
+"""
+SAURELLIUS YEAR-END SERVICE
+Bulk W-2 generation for a company or the whole platform with W-3 transmittals
+Chunked, checkpointed and resumable; W-2s are built across a process pool
+"""
+
+import logging
+import os
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from models import db, Company, Employee, YearEndRun, YearEndForm, YTDAccumulator
+from services.government_forms_service import GovernmentFormsService, government_forms_service
+from services.ytd_service import ytd_accumulators
+
+logger = logging.getLogger(__name__)
+
+# Employees fetched, built and committed together; one checkpoint per chunk
+CHUNK_SIZE = 500
+# Below this many employees the process pool costs more than it saves
+PARALLEL_THRESHOLD = 2000
+MAX_ERRORS_KEPT = 200
+
+EMPLOYEE_COLUMNS = (
+    Employee.id, Employee.company_id, Employee.first_name, Employee.last_name,
+    Employee.ssn_last_four, Employee.address, Employee.city, Employee.state,
+    Employee.zip_code, Employee.work_state,
+)
+
+
+def _company_payload(company: Company) -> Dict:
+    return {
+        'id': company.id,
+        'ein': company.ein or '',
+        'legal_name': company.name,
+        'physical_address': company.address or '',
+        'physical_city': company.city or '',
+        'physical_state': company.state or '',
+        'physical_zip': company.zip_code or '',
+    }
+
+
+def _employee_payload(row) -> Dict:
+    """Employee identity in generate_w2's input shape"""
+    return {
+        'id': row.id,
+        'first_name': row.first_name,
+        'last_name': row.last_name,
+        'ssn_last_four': row.ssn_last_four or 'XXXX',
+        'residence_address': row.address or '',
+        'residence_city': row.city or '',
+        'residence_state': row.state or '',
+        'residence_zip': row.zip_code or '',
+        'work_state': row.work_state or '',
+    }
+
+
+def _build_w2_chunk(tax_year: int, items: List[Tuple[Dict, Dict, Dict]]) -> List[Tuple]:
+    """
+    Process-pool worker: W-2 data for a chunk of employees. A bad record
+    is reported back instead of failing the chunk.
+    """
+    results = []
+    for company, employee, ytd in items:
+        form_id = str(uuid.uuid4())
+        try:
+            data = government_forms_service.build_w2_data(
+                company, employee, ytd, tax_year, form_id[:8].upper()
+            )
+            results.append((True, company['id'], employee['id'], form_id, data))
+        except Exception as e:
+            results.append((False, company['id'], employee['id'], None, f'{type(e).__name__}: {e}'))
+    return results
+
+
+class YearEndPipeline:
+    """
+    Drives a company, or every company, through W-2 generation.
+
+    Employees are read in keyset-paginated chunks (id > checkpoint), so
+    commits between chunks never invalidate an open cursor. Each chunk's
+    W-2s, the advanced checkpoint and the running per-company W-3 totals
+    are committed in one transaction; a crashed run resumes after the last
+    committed employee. At the end each company's W-3 is rebuilt from all of
+    its W-2s for the year, including those issued by earlier runs.
+    """
+
+    def __init__(self, forms: GovernmentFormsService = government_forms_service,
+                 chunk_size: int = CHUNK_SIZE, parallel_threshold: int = PARALLEL_THRESHOLD,
+                 max_workers: Optional[int] = None):
+        self.forms = forms
+        self.chunk_size = chunk_size
+        self.parallel_threshold = parallel_threshold
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._active = set()
+        self._lock = threading.Lock()
+
+    # =========================================================================
+    # RUNS
+    # =========================================================================
+
+    def open_run(self, tax_year: int, company_id: Optional[int] = None,
+                 restart: bool = False) -> YearEndRun:
+        """Latest run for the scope (resumed if unfinished), or a new one"""
+        if restart:
+            self._discard(tax_year, company_id)
+
+        run = YearEndRun.query.filter_by(
+            tax_year=tax_year, company_id=company_id
+        ).order_by(YearEndRun.started_at.desc()).first()
+        if run:
+            if run.status != 'completed':
+                run.status = 'running'
+                run.last_error = None
+                db.session.commit()
+            return run
+
+        run = YearEndRun(
+            id=str(uuid.uuid4()),
+            company_id=company_id,
+            tax_year=tax_year,
+            status='running',
+            checkpoint_employee_id=0,
+            w2_count=0,
+            error_count=0,
+            w3_totals={},
+            errors=[]
+        )
+        db.session.add(run)
+        db.session.commit()
+        return run
+
+    def run(self, tax_year: int, company_id: Optional[int] = None,
+            restart: bool = False) -> dict:
+        """Generate (or resume) every W-2 in scope, then the W-3s"""
+        scope = (tax_year, company_id)
+        with self._lock:
+            if scope in self._active:
+                raise ValueError(f'Year-end run for {tax_year} is already in progress')
+            self._active.add(scope)
+
+        try:
+            run = self.open_run(tax_year, company_id, restart)
+            if run.status == 'completed':
+                return run.to_dict()
+            run_id = run.id
+            try:
+                self._generate(run)
+                self._write_w3s(run)
+            except Exception as e:
+                db.session.rollback()
+                run = YearEndRun.query.get(run_id)
+                run.status = 'failed'
+                run.last_error = f'{type(e).__name__}: {e}'
+                db.session.commit()
+                raise
+            return run.to_dict()
+        finally:
+            with self._lock:
+                self._active.discard(scope)
+
+    def start_background(self, app, tax_year: int, company_id: Optional[int] = None,
+                         restart: bool = False) -> dict:
+        """Open the run now and generate it on a background thread"""
+        run = self.open_run(tax_year, company_id, restart)
+        if run.status == 'completed':
+            return run.to_dict()
+
+        def work():
+            with app.app_context():
+                try:
+                    self.run(tax_year, company_id)
+                except Exception:
+                    # The failure is also recorded on the run; keep the traceback
+                    logger.exception('Year-end run for %s (company %s) failed', tax_year, company_id)
+                finally:
+                    db.session.remove()
+
+        threading.Thread(target=work, daemon=True).start()
+        return run.to_dict()
+
+    def get_run(self, run_id: str) -> Optional[dict]:
+        run = YearEndRun.query.get(run_id)
+        return run.to_dict() if run else None
+
+    def get_forms(self, run_id: str, form_type: str = GovernmentFormsService.FORM_W2,
+                  after_employee_id: int = 0, limit: int = 100) -> List[dict]:
+        """Page through a run's forms by employee id"""
+        query = YearEndForm.query.filter(
+            YearEndForm.run_id == run_id,
+            YearEndForm.form_type == form_type
+        )
+        if form_type == GovernmentFormsService.FORM_W2:
+            query = query.filter(YearEndForm.employee_id > after_employee_id).order_by(YearEndForm.employee_id)
+        else:
+            query = query.order_by(YearEndForm.company_id)
+        return [f.to_dict() for f in query.limit(limit)]
+
+    def _discard(self, tax_year: int, company_id: Optional[int]):
+        forms = YearEndForm.query.filter(YearEndForm.tax_year == tax_year)
+        runs = YearEndRun.query.filter(YearEndRun.tax_year == tax_year)
+        if company_id is not None:
+            forms = forms.filter(YearEndForm.company_id == company_id)
+            runs = runs.filter(YearEndRun.company_id == company_id)
+        forms.delete(synchronize_session=False)
+        runs.delete(synchronize_session=False)
+        db.session.commit()
+
+    # =========================================================================
+    # GENERATION
+    # =========================================================================
+
+    def _scope_query(self, run: YearEndRun, *columns):
+        already_issued = db.exists().where(
+            YearEndForm.employee_id == Employee.id,
+            YearEndForm.form_type == GovernmentFormsService.FORM_W2,
+            YearEndForm.tax_year == run.tax_year
+        )
+        posted = db.exists().where(
+            YTDAccumulator.company_id == db.cast(Employee.company_id, db.String),
+            YTDAccumulator.employee_id == db.cast(Employee.id, db.String),
+            YTDAccumulator.tax_year == run.tax_year
+        )
+        query = db.session.query(*columns).filter(
+            Employee.company_id.isnot(None),
+            posted,
+            ~already_issued
+        )
+        if run.company_id is not None:
+            query = query.filter(Employee.company_id == run.company_id)
+        return query
+
+    def _chunks(self, run: YearEndRun) -> Iterator[Tuple[int, List[Tuple[Dict, Dict, Dict]]]]:
+        companies: Dict[int, Dict] = {}
+        cursor = run.checkpoint_employee_id or 0
+        while True:
+            rows = self._scope_query(run, *EMPLOYEE_COLUMNS).filter(
+                Employee.id > cursor
+            ).order_by(Employee.id).limit(self.chunk_size).all()
+            if not rows:
+                return
+            cursor = rows[-1].id
+
+            missing = {r.company_id for r in rows} - companies.keys()
+            if missing:
+                for company in Company.query.filter(Company.id.in_(missing)):
+                    companies[company.id] = _company_payload(company)
+
+            # Year-keyed accumulators only: Employee.ytd_* carry no tax year
+            posted = ytd_accumulators.w2_ytd(
+                ((r.company_id, r.id, r.work_state) for r in rows), run.tax_year
+            )
+            yield cursor, [
+                (companies[r.company_id], _employee_payload(r), posted[(str(r.company_id), str(r.id))])
+                for r in rows
+            ]
+
+    def _generate(self, run: YearEndRun):
+        remaining = self._scope_query(run, db.func.count(Employee.id)).filter(
+            Employee.id > (run.checkpoint_employee_id or 0)
+        ).scalar()
+
+        if remaining < self.parallel_threshold or self.max_workers < 2:
+            for last_id, chunk in self._chunks(run):
+                self._persist(run, last_id, _build_w2_chunk(run.tax_year, chunk))
+            return
+
+        # Keep a bounded window of chunks in flight and commit them in order,
+        # so the checkpoint only ever moves past fully persisted employees
+        window = self.max_workers * 2
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            pending = deque()
+            for last_id, chunk in self._chunks(run):
+                pending.append((last_id, pool.submit(_build_w2_chunk, run.tax_year, chunk)))
+                if len(pending) >= window:
+                    done_id, future = pending.popleft()
+                    self._persist(run, done_id, future.result())
+            while pending:
+                done_id, future = pending.popleft()
+                self._persist(run, done_id, future.result())
+
+    def _persist(self, run: YearEndRun, last_employee_id: int, results: List[Tuple]):
+        now = datetime.utcnow()
+        totals = {k: dict(v) for k, v in (run.w3_totals or {}).items()}
+        errors = list(run.errors or [])
+        rows = []
+
+        for ok, company_id, employee_id, form_id, payload in results:
+            if not ok:
+                run.error_count += 1
+                if len(errors) < MAX_ERRORS_KEPT:
+                    errors.append({'company_id': company_id, 'employee_id': employee_id, 'error': payload})
+                continue
+            rows.append({
+                'id': form_id,
+                'run_id': run.id,
+                'form_type': GovernmentFormsService.FORM_W2,
+                'tax_year': run.tax_year,
+                'company_id': company_id,
+                'employee_id': employee_id,
+                'control_number': payload['control_number'],
+                'data': payload,
+                'status': 'generated',
+                'created_at': now,
+            })
+            company_totals = totals.setdefault(str(company_id), {'number_of_w2s': 0})
+            self.forms.accumulate_w3_totals(company_totals, payload)
+            company_totals['number_of_w2s'] += 1
+
+        if rows:
+            db.session.bulk_insert_mappings(YearEndForm, rows)
+        run.w2_count += len(rows)
+        run.w3_totals = totals
+        run.errors = errors
+        run.checkpoint_employee_id = last_employee_id
+        db.session.commit()
+
+    def _write_w3s(self, run: YearEndRun):
+        now = datetime.utcnow()
+        company_ids = [int(c) for c in (run.w3_totals or {})]
+        companies = {c.id: _company_payload(c) for c in Company.query.filter(Company.id.in_(company_ids))}
+
+        YearEndForm.query.filter(
+            YearEndForm.form_type == GovernmentFormsService.FORM_W3,
+            YearEndForm.tax_year == run.tax_year,
+            YearEndForm.company_id.in_(company_ids)
+        ).delete(synchronize_session=False)
+
+        rows = []
+        for company_id in company_ids:
+            # Every W-2 the company holds for the year, not just this run's: a
+            # rerun only issues forms for employees that did not have one yet
+            totals = self._company_w3_totals(company_id, run.tax_year)
+            form_id = str(uuid.uuid4())
+            data = self.forms.build_w3_data(
+                companies[company_id], totals, totals['number_of_w2s'],
+                run.tax_year, form_id[:8].upper()
+            )
+            rows.append({
+                'id': form_id,
+                'run_id': run.id,
+                'form_type': GovernmentFormsService.FORM_W3,
+                'tax_year': run.tax_year,
+                'company_id': company_id,
+                'employee_id': None,
+                'control_number': data['control_number'],
+                'data': data,
+                'status': 'generated',
+                'created_at': now,
+            })
+        if rows:
+            db.session.bulk_insert_mappings(YearEndForm, rows)
+
+        run.status = 'completed'
+        run.completed_at = now
+        db.session.commit()
+
+    def _company_w3_totals(self, company_id: int, tax_year: int) -> Dict:
+        totals = {'number_of_w2s': 0}
+        w2s = db.session.query(YearEndForm.data).filter(
+            YearEndForm.form_type == GovernmentFormsService.FORM_W2,
+            YearEndForm.tax_year == tax_year,
+            YearEndForm.company_id == company_id
+        ).yield_per(500)
+        for (data,) in w2s:
+            self.forms.accumulate_w3_totals(totals, data)
+            totals['number_of_w2s'] += 1
+        return totals
+
+
+# Singleton instance
+year_end_pipeline = YearEndPipeline()
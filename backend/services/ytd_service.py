@@ -0,0 +1,331 @@
+"""
+SAURELLIUS YTD ACCUMULATOR SERVICE
+Year-to-date wages, taxes and pre-tax deductions per employee, jurisdiction and bucket
+Posted in the transaction that finalizes a payroll run and reversed when it is voided
+"""
+
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+
+from models import db, YTDAccumulator, YTDPosting
+
+
+FEDERAL = "FED"
+# Employees per accumulator lookup; keeps IN lists well under driver limits
+BATCH_SIZE = 500
+# Passes at creating missing accumulator rows when concurrent runs race to insert them
+INSERT_ATTEMPTS = 3
+
+# bucket -> (paycheck section, keys summed into it); a None section reads the paycheck itself
+FEDERAL_BUCKETS = {
+    "gross_wages": ("earnings", "gross_pay"),
+    "tips": ("earnings", "tips"),
+    "federal_wages": ("taxable_wages", "federal"),
+    "federal_tax": ("taxes", "federal"),
+    "ss_wages": ("taxable_wages", "social_security"),
+    "ss_tax": ("taxes", "social_security"),
+    "medicare_wages": ("taxable_wages", "medicare"),
+    "medicare_tax": ("taxes", "medicare"),
+    "additional_medicare_tax": ("taxes", "additional_medicare"),
+    "futa_wages": ("taxable_wages", "futa"),
+    "futa_tax": ("employer_taxes", "futa"),
+    "pretax_401k": ("deductions", "retirement_401k"),
+    "roth_401k": ("deductions", "roth_401k"),
+    "pretax_hsa": ("deductions", "hsa"),
+    "pretax_fsa": ("deductions", "fsa"),
+    "pretax_health": ("deductions", "health_insurance", "dental_insurance", "vision_insurance"),
+    "pretax_other": ("deductions", "other_pretax"),
+    "union_dues": ("deductions", "union_dues"),
+    "net_pay": (None, "net_pay"),
+}
+STATE_BUCKETS = {
+    "state_wages": ("taxable_wages", "state"),
+    "state_tax": ("taxes", "state"),
+    "sdi_wages": ("taxable_wages", "state_disability"),
+    "sdi_tax": ("taxes", "state_disability"),
+    "suta_wages": ("taxable_wages", "suta"),
+    "suta_tax": ("employer_taxes", "suta"),
+}
+LOCAL_BUCKETS = {
+    "local_wages": ("taxable_wages", "local"),
+    "local_tax": ("taxes", "local"),
+}
+
+# Flat ytd_* inputs read by the payroll and tax engines: key -> (federal?, bucket)
+TAX_INPUTS = {
+    "ytd_gross": (True, "gross_wages"),
+    "ytd_ss_wages": (True, "ss_wages"),
+    "ytd_medicare_wages": (True, "medicare_wages"),
+    "ytd_futa_wages": (True, "futa_wages"),
+    "ytd_401k": (True, "pretax_401k"),
+    "ytd_federal": (True, "federal_tax"),
+    "ytd_ss": (True, "ss_tax"),
+    "ytd_medicare": (True, "medicare_tax"),
+    "ytd_net": (True, "net_pay"),
+    "ytd_suta_wages": (False, "suta_wages"),
+    "ytd_sdi_wages": (False, "sdi_wages"),
+    "ytd_state": (False, "state_tax"),
+}
+
+
+def _as_date(value) -> date:
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def _money(value) -> Decimal:
+    return Decimal(str(value or 0)).quantize(Decimal("0.01"))
+
+
+def _amounts(paycheck: dict, buckets: Dict[str, tuple]) -> Iterable[Tuple[str, Decimal]]:
+    for bucket, (section, *keys) in buckets.items():
+        source = (paycheck.get(section) or {}) if section else paycheck
+        amount = sum(_money(source.get(k)) for k in keys)
+        if amount:
+            yield bucket, amount
+
+
+def paycheck_deltas(paycheck: dict) -> List[Tuple[str, str, Decimal]]:
+    """(jurisdiction, bucket, amount) a paycheck adds to its employee's YTD"""
+    state = paycheck.get("work_state") or ""
+    deltas = [(FEDERAL, b, a) for b, a in _amounts(paycheck, FEDERAL_BUCKETS)]
+    if state:
+        deltas.extend((state, b, a) for b, a in _amounts(paycheck, STATE_BUCKETS))
+        locality = paycheck.get("local_jurisdiction") or "LOCAL"
+        deltas.extend((f"{state}:{locality}", b, a) for b, a in _amounts(paycheck, LOCAL_BUCKETS))
+    return deltas
+
+
+class YTDAccumulatorService:
+    """Maintains and reads the persistent YTD accumulators"""
+
+    # =========================================================================
+    # POSTING
+    # =========================================================================
+
+    def post_run(self, run: dict, paychecks: List[dict], commit: bool = True) -> dict:
+        """
+        Add a processed run's paychecks to YTD. Any earlier posting of the same
+        run is reversed first, so reprocessing a correction replaces it.
+        """
+        company_id = str(run["company_id"])
+        reversed_count = self._reverse(company_id, run["id"])
+
+        rows = []
+        for paycheck in paychecks:
+            tax_year = _as_date(paycheck.get("pay_date") or run["pay_date"]).year
+            employee_id = str(paycheck["employee_id"])
+            for jurisdiction, bucket, amount in paycheck_deltas(paycheck):
+                rows.append({
+                    "company_id": company_id,
+                    "payroll_run_id": run["id"],
+                    "paycheck_id": paycheck["id"],
+                    "employee_id": employee_id,
+                    "tax_year": tax_year,
+                    "jurisdiction": jurisdiction,
+                    "bucket": bucket,
+                    "amount": amount,
+                })
+
+        if rows:
+            db.session.bulk_insert_mappings(YTDPosting, rows)
+            self._apply(company_id, rows, sign=1)
+        if commit:
+            db.session.commit()
+
+        return {"payroll_run_id": run["id"], "postings": len(rows), "postings_replaced": reversed_count}
+
+    def reverse_run(self, company_id: str, run_id: str, commit: bool = True) -> dict:
+        """Back a voided run's postings out of YTD"""
+        removed = self._reverse(str(company_id), run_id)
+        if commit:
+            db.session.commit()
+        return {"payroll_run_id": run_id, "postings_reversed": removed}
+
+    def _reverse(self, company_id: str, run_id: str) -> int:
+        postings = db.session.query(
+            YTDPosting.employee_id, YTDPosting.tax_year, YTDPosting.jurisdiction,
+            YTDPosting.bucket, YTDPosting.amount
+        ).filter(YTDPosting.company_id == company_id, YTDPosting.payroll_run_id == run_id).all()
+        if not postings:
+            return 0
+
+        self._apply(company_id, [p._asdict() for p in postings], sign=-1)
+        YTDPosting.query.filter(
+            YTDPosting.company_id == company_id, YTDPosting.payroll_run_id == run_id
+        ).delete(synchronize_session=False)
+        return len(postings)
+
+    def _apply(self, company_id: str, postings: List[dict], sign: int):
+        """Add signed posting totals to the accumulators, locking the rows touched"""
+        deltas: Dict[tuple, Decimal] = defaultdict(Decimal)
+        for p in postings:
+            key = (p["employee_id"], p["tax_year"], p["jurisdiction"], p["bucket"])
+            deltas[key] += sign * p["amount"]
+
+        for attempt in range(INSERT_ATTEMPTS):
+            self._add_to_existing(company_id, deltas)
+            if not deltas:
+                return
+            try:
+                with db.session.begin_nested():
+                    db.session.bulk_insert_mappings(YTDAccumulator, [
+                        {"company_id": company_id, "employee_id": employee_id, "tax_year": tax_year,
+                         "jurisdiction": jurisdiction, "bucket": bucket, "amount": amount}
+                        for (employee_id, tax_year, jurisdiction, bucket), amount in deltas.items()
+                    ])
+                return
+            except IntegrityError:
+                # A concurrent run created some of these rows first; add to them on the next pass
+                if attempt == INSERT_ATTEMPTS - 1:
+                    raise
+
+    def _add_to_existing(self, company_id: str, deltas: Dict[tuple, Decimal]):
+        """Apply (and pop) every delta whose accumulator row already exists"""
+        employee_ids = sorted({key[0] for key in deltas})
+        years = {key[1] for key in deltas}
+        for i in range(0, len(employee_ids), BATCH_SIZE):
+            existing = YTDAccumulator.query.filter(
+                YTDAccumulator.company_id == company_id,
+                YTDAccumulator.tax_year.in_(years),
+                YTDAccumulator.employee_id.in_(employee_ids[i:i + BATCH_SIZE])
+            ).with_for_update()
+            for acc in existing:
+                key = (acc.employee_id, acc.tax_year, acc.jurisdiction, acc.bucket)
+                if key in deltas:
+                    acc.amount = _money(acc.amount) + deltas.pop(key)
+
+    # =========================================================================
+    # READS
+    # =========================================================================
+
+    def get_ytd(self, company_id: str, employee_id: str, tax_year: int) -> Dict[str, Dict[str, float]]:
+        """{jurisdiction: {bucket: amount}} for one employee"""
+        rows = db.session.query(
+            YTDAccumulator.jurisdiction, YTDAccumulator.bucket, YTDAccumulator.amount
+        ).filter(
+            YTDAccumulator.company_id == str(company_id),
+            YTDAccumulator.employee_id == str(employee_id),
+            YTDAccumulator.tax_year == tax_year
+        )
+        ytd: Dict[str, Dict[str, float]] = defaultdict(dict)
+        for jurisdiction, bucket, amount in rows:
+            ytd[jurisdiction][bucket] = float(amount or 0)
+        return dict(ytd)
+
+    def tax_inputs(self, company_id: str, employee_id: str, tax_year: int,
+                   state: Optional[str] = None) -> Dict[str, float]:
+        """The ytd_* inputs the tax calculations expect; empty if nothing is posted"""
+        return self._tax_inputs(self.get_ytd(company_id, employee_id, tax_year), state)
+
+    def bulk_tax_inputs(self, company_id: str, employees: Dict[str, Optional[str]],
+                        tax_year: int) -> Dict[str, Dict[str, float]]:
+        """
+        tax_inputs for many employees ({employee_id: work_state}) of one
+        company, BATCH_SIZE employees per query. Employees with nothing
+        posted are left out.
+        """
+        ids = [str(e) for e in employees]
+        states = {str(e): s for e, s in employees.items()}
+        amounts: Dict[str, Dict[str, Dict[str, float]]] = defaultdict(lambda: defaultdict(dict))
+        for start in range(0, len(ids), BATCH_SIZE):
+            rows = db.session.query(
+                YTDAccumulator.employee_id, YTDAccumulator.jurisdiction,
+                YTDAccumulator.bucket, YTDAccumulator.amount
+            ).filter(
+                YTDAccumulator.company_id == str(company_id),
+                YTDAccumulator.tax_year == tax_year,
+                YTDAccumulator.employee_id.in_(ids[start:start + BATCH_SIZE])
+            )
+            for employee_id, jurisdiction, bucket, amount in rows:
+                amounts[employee_id][jurisdiction][bucket] = float(amount or 0)
+
+        return {e: self._tax_inputs(ytd, states[e]) for e, ytd in amounts.items()}
+
+    def _tax_inputs(self, ytd: Dict[str, Dict[str, float]], state: Optional[str]) -> Dict[str, float]:
+        if not ytd:
+            return {}
+        federal = ytd.get(FEDERAL, {})
+        local = ytd.get(state, {}) if state else {}
+        return {
+            key: (federal if is_federal else local).get(bucket, 0.0)
+            for key, (is_federal, bucket) in TAX_INPUTS.items()
+        }
+
+    def w2_ytd(self, employees: Iterable[Tuple[int, int, str]], tax_year: int) -> Dict[tuple, Dict]:
+        """
+        W-2 YTD data for (company_id, employee_id, work_state) triples in
+        generate_w2's input shape, keyed by (company_id, employee_id).
+        Employees without accumulator rows are left out.
+        """
+        wanted = {(str(c), str(e)): s or "" for c, e, s in employees}
+        if not wanted:
+            return {}
+
+        amounts: Dict[tuple, Dict[str, Dict[str, float]]] = defaultdict(lambda: defaultdict(dict))
+        rows = db.session.query(
+            YTDAccumulator.company_id, YTDAccumulator.employee_id, YTDAccumulator.jurisdiction,
+            YTDAccumulator.bucket, YTDAccumulator.amount
+        ).filter(
+            YTDAccumulator.tax_year == tax_year,
+            YTDAccumulator.company_id.in_({c for c, _ in wanted}),
+            YTDAccumulator.employee_id.in_({e for _, e in wanted})
+        )
+        for company_id, employee_id, jurisdiction, bucket, amount in rows:
+            if (company_id, employee_id) in wanted:
+                amounts[(company_id, employee_id)][jurisdiction][bucket] = float(amount or 0)
+
+        return {key: self._w2_payload(ytd, wanted[key]) for key, ytd in amounts.items()}
+
+    def _w2_payload(self, ytd: Dict[str, Dict[str, float]], state: str) -> Dict:
+        federal = ytd.get(FEDERAL, {})
+        # Boxes 15-20 per state worked in during the year, not just the current one
+        state_wages: Dict[str, float] = {}
+        state_tax: Dict[str, float] = {}
+        local_wages: Dict[str, float] = defaultdict(float)
+        local_tax: Dict[str, float] = defaultdict(float)
+        localities: Dict[str, str] = {}
+        sdi = 0.0
+        for jurisdiction, buckets in ytd.items():
+            if jurisdiction == FEDERAL:
+                continue
+            code, _, locality = jurisdiction.partition(":")
+            if locality:
+                local_wages[code] += buckets.get("local_wages", 0.0)
+                local_tax[code] += buckets.get("local_tax", 0.0)
+                if locality != "LOCAL":
+                    localities.setdefault(code, locality)
+            elif buckets.get("state_wages") or buckets.get("state_tax"):
+                state_wages[code] = buckets.get("state_wages", 0.0)
+                state_tax[code] = buckets.get("state_tax", 0.0)
+                sdi += buckets.get("sdi_tax", 0.0)
+
+        retirement = federal.get("pretax_401k", 0.0) + federal.get("roth_401k", 0.0)
+        return {
+            "ytd_gross": federal.get("gross_wages", 0.0),
+            "federal_taxable_wages": federal.get("federal_wages", 0.0),
+            "ytd_federal_tax": federal.get("federal_tax", 0.0),
+            "ytd_ss_wages": federal.get("ss_wages", 0.0),
+            "ytd_social_security": federal.get("ss_tax", 0.0),
+            "ytd_medicare_wages": federal.get("medicare_wages", 0.0),
+            "ytd_medicare": federal.get("medicare_tax", 0.0) + federal.get("additional_medicare_tax", 0.0),
+            "ytd_tips": federal.get("tips", 0.0),
+            "ytd_401k": federal.get("pretax_401k", 0.0),
+            "ytd_roth_401k": federal.get("roth_401k", 0.0),
+            "ytd_union_dues": federal.get("union_dues", 0.0),
+            "ytd_sdi": sdi,
+            "retirement_plan_participant": retirement > 0,
+            "ytd_state_tax": state_tax,
+            "state_taxable_wages": state_wages,
+            "local_taxable_wages": {code: local_wages[code] for code in state_wages},
+            "ytd_local_tax": {code: local_tax[code] for code in state_wages},
+            "locality_names": localities,
+            "locality_name": localities.get(state, ""),
+        }
+
+
+# Singleton instance
+ytd_accumulators = YTDAccumulatorService()
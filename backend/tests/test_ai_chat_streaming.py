@@ -0,0 +1,173 @@
+"""
+AI CHAT STREAMING TEST SUITE
+Server-sent event chat against a local fake streaming model
+"""
+
+import json
+import threading
+import time
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+
+class FakeChunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeStreamingModel:
+    """Stands in for genai.GenerativeModel; yields chunks, optionally pausing after the first."""
+
+    def __init__(self, chunks, fail_after=None):
+        self.chunks = chunks
+        self.fail_after = fail_after
+        self.release = threading.Event()
+        self.release.set()
+        self.prompts = []
+
+    def generate_content(self, prompt, stream=False):
+        self.prompts.append(prompt)
+        if not stream:
+            return FakeChunk(''.join(self.chunks))
+        return self._stream()
+
+    def _stream(self):
+        for i, text in enumerate(self.chunks):
+            if i == self.fail_after:
+                raise RuntimeError('model went away')
+            yield FakeChunk(text)
+            if i == 0:
+                self.release.wait(timeout=5)
+
+
+def parse_events(body):
+    """(event, data) pairs from a text/event-stream body"""
+    events = []
+    for block in body.strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.splitlines())
+        events.append((fields['event'], json.loads(fields['data'])))
+    return events
+
+
+def wait_for_turns(app, session_id, count, timeout=5):
+    from models_ai import UserAIConversation
+    deadline = time.monotonic() + timeout
+    while True:
+        with app.app_context():
+            turns = UserAIConversation.query.filter_by(session_id=session_id).order_by(UserAIConversation.id).all()
+            rows = [(t.role, t.message) for t in turns]
+        if len(rows) >= count or time.monotonic() > deadline:
+            return rows
+        time.sleep(0.02)
+
+
+class TestChatStreaming:
+    """Test suite for /api/ai/chat/stream."""
+
+    def test_stream_relays_tokens_in_order(self, client, token, fake_model):
+        response = client.post('/api/ai/chat/stream', json={'message': 'How is overtime taxed?'},
+                               headers={'Authorization': f'Bearer {token}'})
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        events = parse_events(response.get_data(as_text=True))
+        assert events[0][0] == 'start'
+        assert [data['text'] for event, data in events if event == 'token'] == fake_model.chunks
+        assert events[-1][0] == 'done'
+        assert events[-1][1]['session_id'] == events[0][1]['session_id']
+        assert 'USER MESSAGE: How is overtime taxed?' in fake_model.prompts[0]
+
+    def test_first_token_arrives_before_generation_finishes(self, client, token, fake_model):
+        fake_model.release.clear()
+        response = client.post('/api/ai/chat/stream', json={'message': 'Explain FUTA'},
+                               headers={'Authorization': f'Bearer {token}'}, buffered=False)
+        chunks = iter(response.response)
+
+        received = ''
+        while 'event: token' not in received:
+            received += next(chunks).decode()
+        assert fake_model.chunks[0] in received
+        assert 'event: done' not in received
+
+        fake_model.release.set()
+        rest = ''.join(chunk.decode() for chunk in chunks)
+        assert 'event: done' in rest
+        response.close()
+
+    def test_conversation_logged_after_stream_closes(self, app, client, token, fake_model):
+        response = client.post('/api/ai/chat/stream', json={'message': 'Hello', 'session_id': 'stream-1'},
+                               headers={'Authorization': f'Bearer {token}'})
+        response.get_data()
+
+        turns = wait_for_turns(app, 'stream-1', 2)
+        assert turns == [('user', 'Hello'), ('assistant', ''.join(fake_model.chunks))]
+
+    def test_model_failure_mid_stream_reports_error(self, app, client, token, fake_model):
+        fake_model.fail_after = 2
+        response = client.post('/api/ai/chat/stream', json={'message': 'Hi', 'session_id': 'stream-2'},
+                               headers={'Authorization': f'Bearer {token}'})
+
+        events = parse_events(response.get_data(as_text=True))
+        assert [event for event, _ in events] == ['start', 'token', 'token', 'error']
+        turns = wait_for_turns(app, 'stream-2', 2)
+        assert turns == [('user', 'Hi'), ('assistant', ''.join(fake_model.chunks[:2]))]
+
+    def test_empty_message_rejected(self, client, token, fake_model):
+        response = client.post('/api/ai/chat/stream', json={'message': '  '},
+                               headers={'Authorization': f'Bearer {token}'})
+
+        assert response.status_code == 400
+        assert response.get_json()['success'] is False
+
+    def test_blocking_chat_still_returns_full_response(self, app, user_id, fake_model):
+        from services.saurellius_ai_service import saurellius_ai
+        with app.app_context():
+            result = saurellius_ai.chat_sync(user_id, 'Hello', session_id='blocking-1')
+
+        assert result['success'] is True
+        assert result['response'] == ''.join(fake_model.chunks)
+        assert result['conversation_id']
+
+
+@pytest.fixture
+def app():
+    """Create test application on in-memory SQLite."""
+    from app import create_app
+    app = create_app('testing')
+    return app
+
+
+@pytest.fixture
+def client(app):
+    """Create test client."""
+    return app.test_client()
+
+
+@pytest.fixture
+def user_id(app):
+    """A fresh user."""
+    from models import db, User
+    with app.app_context():
+        user = User(email='stream@example.com', password_hash='x', first_name='Sam', last_name='Stream')
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+@pytest.fixture
+def token(app, user_id):
+    """JWT for the fresh user."""
+    with app.app_context():
+        return create_access_token(identity=str(user_id))
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    """Point the global Saurellius AI at a fake streaming model."""
+    from services.saurellius_ai_service import saurellius_ai
+    model = FakeStreamingModel(['Overtime ', 'is taxed ', 'as regular ', 'wages.'])
+    monkeypatch.setattr(saurellius_ai, 'model', model)
+    monkeypatch.setattr(saurellius_ai, 'initialized', True)
+    monkeypatch.setattr(saurellius_ai, 'use_legacy_api', False)
+    return model
@@ -0,0 +1,127 @@
+"""
+DEPOSIT SCHEDULER TEST SUITE
+Semiweekly and monthly due dates, the lookback test and the $100,000 next-day rule
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from services.deposit_scheduler_service import (
+    MONTHLY, NEXT_DAY, SEMIWEEKLY, deposit_scheduler, federal_holidays,
+    monthly_due_date, semiweekly_due_date
+)
+
+EIN = '12-3456789'
+
+
+class TestDueDates:
+    """Due dates per IRS Publication 15, section 11, rolled past DC legal holidays."""
+
+    @pytest.mark.parametrize('payday, due', [
+        (date(2025, 3, 5), date(2025, 3, 12)),   # Wednesday: Wed-Fri period, due the next Wednesday
+        (date(2025, 3, 7), date(2025, 3, 12)),   # Friday: same period
+        (date(2025, 3, 8), date(2025, 3, 14)),   # Saturday: Sat-Tue period, due Friday
+        (date(2025, 3, 11), date(2025, 3, 14)),  # Tuesday: same period
+        (date(2025, 1, 17), date(2025, 1, 23)),  # Martin Luther King Jr. Day adds a business day
+    ])
+    def test_semiweekly(self, payday, due):
+        assert semiweekly_due_date(payday) == due
+
+    @pytest.mark.parametrize('liability, due', [
+        (date(2025, 3, 7), date(2025, 4, 15)),
+        (date(2025, 1, 31), date(2025, 2, 18)),   # Feb 15 is a Saturday and Feb 17 a holiday
+        (date(2025, 12, 10), date(2026, 1, 15)),  # December rolls into the next year
+    ])
+    def test_monthly(self, liability, due):
+        assert monthly_due_date(liability) == due
+
+    def test_dc_holidays(self):
+        holidays = federal_holidays(2025)
+        assert date(2025, 4, 16) in holidays     # DC Emancipation Day
+        assert date(2025, 2, 17) in holidays     # Washington's Birthday
+        assert date(2025, 7, 4) in holidays
+
+
+class TestSchedule:
+    """Lookback determination and accrual into obligations."""
+
+    def test_new_ein_is_monthly(self, app):
+        with app.app_context():
+            assert deposit_scheduler.determine(EIN, 2025)['schedule'] == MONTHLY
+
+    def test_lookback_over_50k_is_semiweekly(self, app):
+        from models import db, TaxLiabilityQuarter
+        with app.app_context():
+            for year, quarter in [(2023, 3), (2023, 4), (2024, 1), (2024, 2)]:
+                db.session.add(TaxLiabilityQuarter(ein='123456789', tax_type='941', year=year,
+                                                   quarter=quarter, liability=Decimal('12500.01')))
+            db.session.commit()
+            assert deposit_scheduler.determine(EIN, 2025)['schedule'] == SEMIWEEKLY
+
+    def test_monthly_liabilities_share_one_obligation(self, app):
+        with app.app_context():
+            first = deposit_scheduler.record_liability('1', EIN, 20000, date(2025, 3, 7))
+            second = deposit_scheduler.record_liability('1', EIN, 15000, date(2025, 3, 21))
+            assert second['id'] == first['id']
+            assert second['amount'] == 35000
+            assert second['schedule'] == MONTHLY
+            assert second['due_date'] == '2025-04-15'
+
+
+class TestNextDayRule:
+    """$100,000 accumulated in a deposit period is due the next business day."""
+
+    def test_crossing_100k_makes_obligation_next_day(self, app):
+        with app.app_context():
+            deposit_scheduler.record_liability('1', EIN, 60000, date(2025, 3, 7))
+            obligation = deposit_scheduler.record_liability('1', EIN, 45000, date(2025, 3, 10))
+            assert obligation['schedule'] == NEXT_DAY
+            assert obligation['priority'] == 0
+            assert obligation['due_date'] == '2025-03-11'
+
+            status = deposit_scheduler.determine(EIN, 2025)
+            assert status['schedule'] == SEMIWEEKLY
+            assert status['next_day_triggered_on'] == '2025-03-10'
+
+    def test_accumulation_restarts_on_semiweekly_schedule(self, app):
+        with app.app_context():
+            triggered = deposit_scheduler.record_liability('1', EIN, 100000, date(2025, 3, 10))
+            after = deposit_scheduler.record_liability('1', EIN, 1000, date(2025, 3, 12))
+            assert after['id'] != triggered['id']
+            assert after['schedule'] == SEMIWEEKLY
+            assert after['due_date'] == '2025-03-19'
+
+    def test_just_under_100k_keeps_regular_date(self, app):
+        with app.app_context():
+            obligation = deposit_scheduler.record_liability('1', EIN, Decimal('99999.99'), date(2025, 3, 10))
+            assert obligation['schedule'] == MONTHLY
+            assert obligation['due_date'] == '2025-04-15'
+
+    def test_reversal_under_100k_restores_monthly_schedule(self, app):
+        with app.app_context():
+            deposit_scheduler.record_liability('1', EIN, 60000, date(2025, 3, 7))
+            obligation = deposit_scheduler.record_liability('1', EIN, 45000, date(2025, 3, 10))
+            reversed_ = deposit_scheduler.reverse_liability(obligation['id'], 45000, date(2025, 3, 10))
+            assert reversed_['schedule'] == MONTHLY
+            assert reversed_['due_date'] == '2025-04-15'
+            status = deposit_scheduler.determine(EIN, 2025)
+            assert status['schedule'] == MONTHLY
+            assert status['next_day_triggered_on'] is None
+
+    def test_reversal_refused_after_submission(self, app):
+        from models import db, DepositObligation
+        with app.app_context():
+            obligation = deposit_scheduler.record_liability('1', EIN, 5000, date(2025, 3, 7))
+            DepositObligation.query.get(obligation['id']).status = 'submitted'
+            db.session.commit()
+            with pytest.raises(ValueError, match='already been submitted'):
+                deposit_scheduler.reverse_liability(obligation['id'], 5000, date(2025, 3, 7))
+
+
+@pytest.fixture
+def app():
+    """Create test application on in-memory SQLite."""
+    from app import create_app
+    return create_app('testing')
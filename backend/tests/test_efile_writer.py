@@ -0,0 +1,106 @@
+"""
+E-FILE WRITER TEST SUITE
+Field offsets of the SSA EFW2 RW/RT records checked against Publication 42-007
+"""
+
+import pytest
+
+from services.efile_writer import EFW2_RECORD_LENGTH, RW_LAYOUT, RT_LAYOUT
+
+
+# (field, 1-based start, length) as published for the RW record
+RW_SPEC = [
+    ('ssn', 3, 9),
+    ('box_1', 188, 11),
+    ('box_2', 199, 11),
+    ('box_3', 210, 11),
+    ('box_4', 221, 11),
+    ('box_5', 232, 11),
+    ('box_6', 243, 11),
+    ('box_7', 254, 11),
+    ('box_10', 276, 11),
+    ('box_12_D', 287, 11),
+    ('box_12_E', 298, 11),
+    ('box_12_F', 309, 11),
+    ('box_12_G', 320, 11),
+    ('box_12_H', 331, 11),
+    ('box_11_457', 353, 11),
+    ('box_12_W', 364, 11),
+    ('box_11', 375, 11),
+    ('box_12_Q', 386, 11),
+    ('box_12_C', 408, 11),
+    ('box_12_V', 419, 11),
+    ('box_12_Y', 430, 11),
+    ('box_12_AA', 441, 11),
+    ('box_12_BB', 452, 11),
+    ('box_12_DD', 463, 11),
+    ('box_12_FF', 474, 11),
+    ('statutory_employee', 486, 1),
+    ('retirement_plan', 488, 1),
+    ('third_party_sick_pay', 489, 1),
+]
+
+# (field, 1-based start, length) as published for the RT record
+RT_SPEC = [
+    ('rw_count', 3, 7),
+    ('box_1', 10, 15),
+    ('box_2', 25, 15),
+    ('box_3', 40, 15),
+    ('box_4', 55, 15),
+    ('box_5', 70, 15),
+    ('box_6', 85, 15),
+    ('box_7', 100, 15),
+    ('box_10', 130, 15),
+    ('box_12_D', 145, 15),
+    ('box_12_E', 160, 15),
+    ('box_12_F', 175, 15),
+    ('box_12_G', 190, 15),
+    ('box_12_H', 205, 15),
+    ('box_11_457', 235, 15),
+    ('box_12_W', 250, 15),
+    ('box_11', 265, 15),
+    ('box_12_Q', 280, 15),
+    ('box_12_C', 295, 15),
+    ('third_party_income_tax', 310, 15),
+    ('box_12_V', 325, 15),
+    ('box_12_Y', 340, 15),
+    ('box_12_AA', 355, 15),
+    ('box_12_BB', 370, 15),
+    ('box_12_DD', 385, 15),
+    ('box_12_FF', 400, 15),
+]
+
+
+def _positions(layout):
+    return {name: (start, width) for name, start, width, _ in layout.fields}
+
+
+class TestEFW2Offsets:
+    """Every RW/RT field sits where the specification puts it."""
+
+    @pytest.mark.parametrize('layout, spec', [(RW_LAYOUT, RW_SPEC), (RT_LAYOUT, RT_SPEC)])
+    def test_field_positions_match_spec(self, layout, spec):
+        positions = _positions(layout)
+        for name, start, width in spec:
+            assert positions.get(name) == (start, width), name
+
+    @pytest.mark.parametrize('layout, spec', [(RW_LAYOUT, RW_SPEC), (RT_LAYOUT, RT_SPEC)])
+    def test_rendered_value_lands_at_offset(self, layout, spec):
+        values = {'ssn': '123456789', 'first_name': 'Ada', 'last_name': 'Lovelace', 'rw_count': 1}
+        money = [name for name, _, width in spec if width in (11, 15) and name.startswith('box_')]
+        # A distinct amount per field, so a shifted slot shows up as the wrong number
+        values.update({name: i + 1 for i, name in enumerate(money)})
+
+        record = layout.render(values)
+        assert len(record) == EFW2_RECORD_LENGTH
+        for i, name in enumerate(money):
+            start, width = _positions(layout)[name]
+            assert record[start - 1:start - 1 + width] == str((i + 1) * 100).zfill(width), name
+
+    def test_box_12_codes_land_in_their_rw_slots(self):
+        record = RW_LAYOUT.render({
+            'ssn': '123456789', 'first_name': 'Ada', 'last_name': 'Lovelace',
+            'box_12_C': 1, 'box_12_DD': 2,
+        })
+        assert record[407:418] == '00000000100'
+        assert record[462:473] == '00000000200'
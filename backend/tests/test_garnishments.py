@@ -0,0 +1,69 @@
+"""
+GARNISHMENT TEST SUITE
+Orders loaded for a payroll run never withhold more than the balance still owed
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from services.payroll_run_calculator import payroll_run_calculator
+from services.payroll_run_service import payroll_run_service
+
+PAY_DATE = date(2025, 3, 7)
+
+
+def withheld(app, disposable, **order):
+    """Garnishments withheld from `disposable` for one order on employee 1."""
+    from models import db, Garnishment
+    with app.app_context():
+        db.session.add(Garnishment(employee_id=1, company_id=1, status='active', **order))
+        db.session.commit()
+        orders = payroll_run_calculator._load_garnishments([1], PAY_DATE)[1]
+        return payroll_run_service._calculate_garnishments(orders, Decimal(disposable))
+
+
+class TestRemainingBalance:
+    """total_required - total_withheld caps every order type."""
+
+    def test_percentage_order_capped_at_balance(self, app):
+        result = withheld(app, '2000', garnishment_type='creditor', amount_type='percentage', amount=25,
+                          total_required=1000, total_withheld=960)
+        assert result['garnishments'] == Decimal('40.00')
+
+    def test_percentage_order_under_balance_unchanged(self, app):
+        result = withheld(app, '2000', garnishment_type='creditor', amount_type='percentage', amount=25,
+                          total_required=10000, total_withheld=0)
+        assert result['garnishments'] == Decimal('500.00')
+
+    def test_fixed_order_capped_at_balance(self, app):
+        result = withheld(app, '2000', garnishment_type='child_support', amount_type='fixed', amount=300,
+                          total_required=500, total_withheld=450)
+        assert result['child_support'] == Decimal('50.00')
+
+    def test_open_ended_percentage_order(self, app):
+        result = withheld(app, '2000', garnishment_type='tax_levy', amount_type='percentage', amount=15)
+        assert result['garnishments'] == Decimal('300.00')
+
+    def test_paid_off_order_skipped(self, app):
+        from models import db, Garnishment
+        with app.app_context():
+            db.session.add(Garnishment(employee_id=1, company_id=1, status='active', garnishment_type='creditor',
+                                       amount_type='percentage', amount=25, total_required=1000, total_withheld=1000))
+            db.session.commit()
+            assert payroll_run_calculator._load_garnishments([1], PAY_DATE) == {}
+
+
+@pytest.fixture
+def app():
+    """Create test application on in-memory SQLite, with one employee."""
+    from app import create_app
+    from models import db, User, Company, Employee
+    app = create_app('testing')
+    with app.app_context():
+        db.session.add(User(id=1, email='owner@example.com', password_hash='x'))
+        db.session.add(Company(id=1, user_id=1, name='Analytical Engines'))
+        db.session.add(Employee(id=1, user_id=1, company_id=1, first_name='Ada', last_name='Lovelace'))
+        db.session.commit()
+    return app
@@ -0,0 +1,76 @@
+"""
+GENERAL LEDGER TEST SUITE
+Closed periods reject back-dated postings until reopened; snapshots keep balances exact
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from services.general_ledger_service import general_ledger
+
+COMPANY = '1'
+
+
+def wages(amount, day, reference='PR-1'):
+    """Wages expense paid from payroll checking."""
+    return general_ledger.post_entry(COMPANY, day, 'Payroll', [
+        {'account_code': '5000', 'debit': amount, 'credit': 0},
+        {'account_code': '1010', 'debit': 0, 'credit': amount},
+    ], reference=reference)
+
+
+class TestClosedPeriods:
+    """Entries on or before the latest closed period end are refused."""
+
+    def test_post_into_closed_period_rejected(self, app):
+        with app.app_context():
+            wages(1000, date(2025, 1, 15))
+            general_ledger.close_period(COMPANY, date(2025, 1, 31))
+
+            with pytest.raises(ValueError, match='Period closed through 2025-01-31'):
+                wages(500, date(2025, 1, 31))
+            assert general_ledger.balances_as_of(COMPANY, date(2025, 1, 31))['5000'] == Decimal('1000')
+
+    def test_reversal_dated_in_closed_period_rejected(self, app):
+        with app.app_context():
+            entry = wages(1000, date(2025, 1, 15))
+            general_ledger.close_period(COMPANY, date(2025, 1, 31))
+
+            with pytest.raises(ValueError, match='reopen it'):
+                general_ledger.reverse_entry(COMPANY, entry['id'], reversal_date=date(2025, 1, 20))
+
+    def test_post_after_closed_period_allowed(self, app):
+        with app.app_context():
+            wages(1000, date(2025, 1, 15))
+            general_ledger.close_period(COMPANY, date(2025, 1, 31))
+            wages(500, date(2025, 2, 1), reference='PR-2')
+
+            balances = general_ledger.balances_as_of(COMPANY, date(2025, 2, 28))
+            assert balances['5000'] == Decimal('1500')
+            assert balances['1010'] == Decimal('-1500')
+
+    def test_reopen_allows_back_dated_post(self, app):
+        with app.app_context():
+            wages(1000, date(2025, 1, 15))
+            general_ledger.close_period(COMPANY, date(2025, 1, 31))
+
+            reopened = general_ledger.reopen_period(COMPANY, date(2025, 1, 31))
+            assert reopened['closed_through'] is None
+            wages(500, date(2025, 1, 20), reference='PR-2')
+            general_ledger.close_period(COMPANY, date(2025, 1, 31))
+            assert general_ledger.balances_as_of(COMPANY, date(2025, 1, 31))['5000'] == Decimal('1500')
+
+    def test_close_is_per_company(self, app):
+        with app.app_context():
+            general_ledger.close_period('2', date(2025, 1, 31))
+            wages(1000, date(2025, 1, 15))
+            assert general_ledger.closed_through(COMPANY) is None
+
+
+@pytest.fixture
+def app():
+    """Create test application on in-memory SQLite."""
+    from app import create_app
+    return create_app('testing')
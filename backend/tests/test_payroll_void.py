@@ -0,0 +1,114 @@
+"""
+PAYROLL VOID TEST SUITE
+Voiding a processed run backs it out of YTD accumulators and its federal tax deposit
+"""
+
+from datetime import date
+
+import pytest
+
+EIN = '12-3456789'
+
+
+def process_run(service, pay_date='2025-03-07', annual_salary=260000):
+    """Create, approve and process a one-employee salaried run for company 1."""
+    run = service.create_payroll_run({
+        'company_id': 1, 'pay_period_start': '2025-02-22', 'pay_period_end': pay_date, 'pay_date': pay_date
+    })
+    service.add_employee_to_payroll(run['id'], {
+        'employee_id': '7', 'first_name': 'Ada', 'last_name': 'Lovelace', 'pay_type': 'salary',
+        'pay_rate': annual_salary, 'work_state': 'TX', 'filing_status': 'single',
+    })
+    service.submit_for_approval(run['id'])
+    service.approve_payroll(run['id'], '1')
+    return service.process_payroll(run['id'])
+
+
+class TestVoidReversal:
+    """A void leaves YTD, the deposit obligation and the 941 quarter as if the run never happened."""
+
+    def test_void_reverses_ytd(self, app, service):
+        from services.ytd_service import ytd_accumulators
+        with app.app_context():
+            run = process_run(service)
+            posted = ytd_accumulators.get_ytd('1', '7', 2025)
+            assert posted['FED']['gross_wages'] > 0
+
+            service.void_payroll(run['id'], 'entered twice')
+            voided = ytd_accumulators.get_ytd('1', '7', 2025)
+            assert all(amount == 0 for buckets in voided.values() for amount in buckets.values())
+
+    def test_void_cancels_deposit_and_zeroes_quarter(self, app, service):
+        from models import DepositObligation, TaxLiabilityQuarter
+        with app.app_context():
+            run = process_run(service)
+            obligation_id = service.payroll_runs[run['id']]['deposit_obligation_id']
+            assert DepositObligation.query.get(obligation_id).amount > 0
+
+            service.void_payroll(run['id'], 'entered twice')
+            obligation = DepositObligation.query.get(obligation_id)
+            assert obligation.status == 'cancelled'
+            assert obligation.amount == 0
+            quarter = TaxLiabilityQuarter.query.filter_by(ein='123456789', year=2025, quarter=1).one()
+            assert quarter.liability == 0
+
+    def test_void_leaves_other_runs_deposit(self, app, service):
+        from models import DepositObligation
+        with app.app_context():
+            kept = process_run(service, pay_date='2025-03-07')
+            voided = process_run(service, pay_date='2025-03-14')
+            kept_id = service.payroll_runs[kept['id']]['deposit_obligation_id']
+            before = DepositObligation.query.get(kept_id).amount
+
+            service.void_payroll(voided['id'], 'entered twice')
+            obligation = DepositObligation.query.get(kept_id)
+            assert obligation.status == 'pending'
+            assert obligation.amount == before - service._deposit_liability(service.payroll_runs[voided['id']])
+
+    def test_void_removes_run_from_reporting_facts(self, app, service):
+        from services.payroll_fact_service import payroll_facts
+        with app.app_context():
+            kept = process_run(service, pay_date='2025-03-07')
+            voided = process_run(service, pay_date='2025-03-14')
+            # Month-aligned ranges read the cubes; an unaligned one reads the facts
+            for start, end in [(date(2025, 3, 1), date(2025, 3, 31)), (date(2025, 3, 2), date(2025, 3, 20))]:
+                assert payroll_facts.totals('1', start, end)['']['gross_pay'] == pytest.approx(
+                    kept['totals']['gross_pay'] + voided['totals']['gross_pay'])
+
+            service.void_payroll(voided['id'], 'entered twice')
+            for start, end in [(date(2025, 3, 1), date(2025, 3, 31)), (date(2025, 3, 2), date(2025, 3, 20))]:
+                assert payroll_facts.totals('1', start, end)['']['gross_pay'] == pytest.approx(kept['totals']['gross_pay'])
+
+    def test_void_refused_after_deposit_submitted(self, app, service):
+        from models import db, DepositObligation
+        from services.ytd_service import ytd_accumulators
+        with app.app_context():
+            run = process_run(service)
+            obligation_id = service.payroll_runs[run['id']]['deposit_obligation_id']
+            DepositObligation.query.get(obligation_id).status = 'submitted'
+            db.session.commit()
+
+            with pytest.raises(ValueError, match='already been submitted'):
+                service.void_payroll(run['id'], 'too late')
+            assert service.payroll_runs[run['id']]['status'] == 'completed'
+            assert ytd_accumulators.get_ytd('1', '7', 2025)['FED']['gross_wages'] > 0
+
+
+@pytest.fixture
+def app():
+    """Create test application on in-memory SQLite, with one company that has an EIN."""
+    from app import create_app
+    from models import db, User, Company
+    app = create_app('testing')
+    with app.app_context():
+        db.session.add(User(id=1, email='owner@example.com', password_hash='x'))
+        db.session.add(Company(id=1, user_id=1, name='Analytical Engines', ein=EIN))
+        db.session.commit()
+    return app
+
+
+@pytest.fixture
+def service():
+    """A payroll run service with no runs of its own."""
+    from services.payroll_run_service import SaurelliusPayrollRun
+    return SaurelliusPayrollRun("default")
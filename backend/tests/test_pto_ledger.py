@@ -0,0 +1,89 @@
+"""
+PTO LEDGER TEST SUITE
+Paid leave never overdraws the ledger balance; unpaid leave posts an explicit unpaid entry
+"""
+
+from datetime import date
+
+import pytest
+
+from services.pto_ledger_service import pto_ledger
+
+EMPLOYEE = '7'
+
+
+def balance(policy_id='sick_standard'):
+    return pto_ledger.get_employee_balances(EMPLOYEE)['balances'][policy_id]
+
+
+def request_leave(hours, policy_id='sick_standard', start='2025-03-03'):
+    """Submit a leave request and approve it if the policy requires approval."""
+    leave_request = pto_ledger.submit_leave_request(EMPLOYEE, {
+        'policy_id': policy_id, 'start_date': start, 'end_date': start, 'hours': hours
+    })
+    if leave_request['status'] == 'pending':
+        leave_request = pto_ledger.approve_request(leave_request['id'], '1')
+    return leave_request
+
+
+class TestPaidLeaveOverdraft:
+    """Paid leave is refused, at request and at posting, once it exceeds the balance."""
+
+    def test_request_over_balance_rejected(self, app):
+        with app.app_context():
+            with pytest.raises(ValueError, match='Insufficient balance'):
+                pto_ledger.submit_leave_request(EMPLOYEE, {
+                    'policy_id': 'sick_standard', 'start_date': '2025-03-03',
+                    'end_date': '2025-03-03', 'hours': 10
+                })
+            assert balance()['pending'] == 0
+
+    def test_usage_within_balance_posts_entry(self, app):
+        with app.app_context():
+            taken = pto_ledger.mark_leave_taken(request_leave(8)['id'], recorded_by='1')
+            assert taken['unpaid_hours'] == 0
+            assert balance()['available'] == pytest.approx(1.24)
+            assert balance()['used'] == 8
+
+            latest = pto_ledger.get_ledger(EMPLOYEE, 'sick_standard', limit=1)[0]
+            assert latest['entry_type'] == 'usage'
+            assert latest['hours'] == -8
+
+    def test_taking_leave_beyond_balance_rejected(self, app):
+        with app.app_context():
+            # Each request fits the balance on its own; together they overdraw it
+            first = request_leave(8)
+            second = request_leave(8, start='2025-03-04')
+            pto_ledger.mark_leave_taken(first['id'])
+
+            with pytest.raises(ValueError, match='Insufficient balance to record leave'):
+                pto_ledger.mark_leave_taken(second['id'])
+            assert balance()['available'] == pytest.approx(1.24)
+            assert balance()['pending'] == 8
+            assert [e['entry_type'] for e in pto_ledger.get_ledger(EMPLOYEE, 'sick_standard')].count('usage') == 1
+
+
+class TestUnpaidLeave:
+    """Unpaid policies may exceed the balance; the excess is posted as unpaid hours."""
+
+    def test_unpaid_leave_posts_only_unpaid_entry(self, app):
+        with app.app_context():
+            pto_ledger.enroll_employee('1', EMPLOYEE, '2020-01-06', ['fmla_standard'])
+            taken = pto_ledger.mark_leave_taken(request_leave(16, policy_id='fmla_standard')['id'])
+            assert taken['unpaid_hours'] == 16
+
+            entries = pto_ledger.get_ledger(EMPLOYEE, 'fmla_standard')
+            assert [(e['entry_type'], e['hours']) for e in entries] == [('unpaid', -16)]
+            assert balance('fmla_standard')['available'] == 0
+
+
+@pytest.fixture
+def app():
+    """Create test application on in-memory SQLite, with sick leave accrued for three pay periods."""
+    from app import create_app
+    app = create_app('testing')
+    with app.app_context():
+        pto_ledger.enroll_employee('1', EMPLOYEE, '2020-01-06', ['sick_standard'])
+        for period_end in (date(2025, 1, 10), date(2025, 1, 24), date(2025, 2, 7)):
+            pto_ledger.process_accrual(EMPLOYEE, 'sick_standard', period_end)
+    return app
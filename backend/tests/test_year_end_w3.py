@@ -0,0 +1,69 @@
+"""
+YEAR-END W-3 TEST SUITE
+A company's W-3 totals cover every W-2 it has for the year, whichever run generated them
+"""
+
+import uuid
+
+import pytest
+
+from services.year_end_service import year_end_pipeline
+
+BOXES = ('box_1_wages', 'box_2_federal_tax', 'box_3_ss_wages', 'box_4_ss_tax',
+         'box_5_medicare_wages', 'box_6_medicare_tax', 'box_7_ss_tips', 'box_10_dependent_care')
+
+
+def add_w2(run_id, company_id, employee_id, wages, tax_year=2024):
+    from models import db, YearEndForm
+    data = {box: 0 for box in BOXES}
+    data.update(box_1_wages=wages, box_2_federal_tax=round(wages * 0.1, 2), box_3_ss_wages=wages)
+    db.session.add(YearEndForm(id=str(uuid.uuid4()), run_id=run_id, form_type='W-2', tax_year=tax_year,
+                               company_id=company_id, employee_id=employee_id, data=data))
+
+
+def add_run(company_id, tax_year=2024):
+    from models import db, YearEndRun
+    run = YearEndRun(id=str(uuid.uuid4()), company_id=company_id, tax_year=tax_year)
+    db.session.add(run)
+    db.session.flush()
+    return run.id
+
+
+class TestCompanyW3Totals:
+    """W-3 boxes sum the company's W-2s for the tax year only."""
+
+    def test_rerun_totals_include_earlier_runs_w2s(self, app):
+        from models import db
+        with app.app_context():
+            add_w2(add_run(1), 1, 1, 50000)
+            add_w2(add_run(1), 1, 2, 30000.55)
+            db.session.commit()
+
+            totals = year_end_pipeline._company_w3_totals(1, 2024)
+            assert totals['number_of_w2s'] == 2
+            assert totals['box_1'] == pytest.approx(80000.55)
+            assert totals['box_2'] == pytest.approx(8000.06)
+            assert totals['box_3'] == pytest.approx(80000.55)
+
+    def test_other_companies_and_years_excluded(self, app):
+        from models import db
+        with app.app_context():
+            add_w2(add_run(1), 1, 1, 50000)
+            add_w2(add_run(2), 2, 3, 70000)
+            add_w2(add_run(1, tax_year=2023), 1, 1, 40000, tax_year=2023)
+            db.session.commit()
+
+            totals = year_end_pipeline._company_w3_totals(1, 2024)
+            assert totals['number_of_w2s'] == 1
+            assert totals['box_1'] == 50000
+
+    def test_no_w2s(self, app):
+        with app.app_context():
+            assert year_end_pipeline._company_w3_totals(1, 2024) == {'number_of_w2s': 0}
+
+
+@pytest.fixture
+def app():
+    """Create test application on in-memory SQLite."""
+    from app import create_app
+    return create_app('testing')